@@ -2,7 +2,7 @@
 """
 Modbus RTU IO 8CH FastAPI Server
 Provides HTTP API for controlling Waveshare Modbus RTU IO 8CH device
-Uses mod.py ModbusRTUClient for actual hardware communication
+Uses modbusapi AsyncModbusClient for non-blocking hardware communication
 """
 
 import asyncio
@@ -15,8 +15,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 
-# Import the working ModbusRTUClient from mod.py
-from mod import ModbusRTUClient, auto_detect_modbus_port
+# Port detection from mod.py, bus I/O through the asyncio-native client
+from mod import auto_detect_modbus_device
+from modbusapi.async_client import AsyncModbusClient
+from modbusapi.combiner import AsyncWriteCombiner, WriteRequest, KIND_COIL
+from modbusapi.image import QUALITY_GOOD, QUALITY_STALE, QUALITY_COMM_FAILED
+from modbusapi.planner import READ_COILS, READ_DISCRETE_INPUTS
+from modbusapi.profile import default_profile
+from modbusapi.pool import parse_units
+from modbusapi.poller import Poller
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -29,6 +36,28 @@ logger = logging.getLogger(__name__)
 # Configuration from environment variables
 MODBUS_DEVICE_ADDRESS = int(os.getenv('MODBUS_DEVICE_ADDRESS', '1'))
 UPDATE_INTERVAL = float(os.getenv('UPDATE_INTERVAL', '1.0'))
+# Seconds a bus request waits for background detection and connection
+READY_TIMEOUT = float(os.getenv('MODBUS_READY_TIMEOUT', '5.0'))
+
+# Startup stages: the server answers at once, the device is found in the background
+STAGE_DETECTING = 'detecting'
+STAGE_CONNECTING = 'connecting'
+STAGE_READY = 'ready'
+STAGE_FAILED = 'failed'
+
+# Device profile (MODBUS_PROFILE, default waveshare-io-8ch): points polled and channels exposed
+profile = default_profile()
+device = profile.compile(MODBUS_DEVICE_ADDRESS)
+OUTPUT_CHANNELS = profile.addresses(READ_COILS, writable=True)
+INPUT_CHANNELS = profile.addresses(READ_DISCRETE_INPUTS)
+
+# Units polled in turn (MODBUS_POLL_UNITS, e.g. 1-30; default: the device above).
+# Units that stop answering are only probed, so they do not slow down the others.
+POLL_UNITS = parse_units(os.getenv('MODBUS_POLL_UNITS', '')) or [MODBUS_DEVICE_ADDRESS]
+poller = Poller(None, [device] + [profile.compile(unit) for unit in POLL_UNITS if unit != MODBUS_DEVICE_ADDRESS])
+
+# Worst quality wins when outputs and inputs differ
+QUALITY_ORDER = [QUALITY_GOOD, QUALITY_STALE, QUALITY_COMM_FAILED]
 
 # FastAPI app
 app = FastAPI(
@@ -47,7 +76,10 @@ app.add_middleware(
 )
 
 # Global modbus client
-modbus_client: Optional[ModbusRTUClient] = None
+modbus_client: Optional[AsyncModbusClient] = None
+
+# Concurrent output writes are merged into Write Multiple Coils
+write_combiner: Optional[AsyncWriteCombiner] = None
 
 # Pydantic models
 class ControlRequest(BaseModel):
@@ -55,81 +87,138 @@ class ControlRequest(BaseModel):
     action: str  # "on", "off", "toggle"
 
 class ControlAllRequest(BaseModel):
-    states: List[bool]  # Array of 8 boolean values
+    states: List[bool]  # One boolean value per output channel
 
 class StatusResponse(BaseModel):
     connected: bool
     outputs: List[bool]
     inputs: List[bool]
     timestamp: float
+    quality: Optional[str] = None  # process image quality: good, stale or comm_failed
+    age: Optional[float] = None    # seconds since the oldest channel was read
+    stage: Optional[str] = None    # startup stage: detecting, connecting, ready or failed
 
-# Device state management using mod.py ModbusRTUClient
+# Device state management
 class DeviceState:
     def __init__(self):
         self.connected = False
-        self.outputs = [False] * 8
-        self.inputs = [False] * 8
+        self.outputs = [False] * len(OUTPUT_CHANNELS)
+        self.inputs = [False] * len(INPUT_CHANNELS)
         self.last_update = 0
+        self.stage = STAGE_DETECTING
+        self.error: Optional[str] = None
+        self.started = time.time()
+        # Set when startup has finished, successfully or not (created on the server's loop)
+        self.ready: Optional[asyncio.Event] = None
 
 # Global device state
 device_state = DeviceState()
 
+# Background detection and connection, started by startup_event
+startup_task: Optional[asyncio.Task] = None
+
 async def initialize_modbus_client():
-    """Initialize the Modbus client using mod.py"""
-    global modbus_client
+    """Initialize the asyncio Modbus client (runs as a background task)"""
+    global modbus_client, write_combiner
     
     try:
-        # Try auto-detection first
-        port = auto_detect_modbus_port()
-        if port:
-            logger.info(f"Auto-detected Modbus device on port: {port}")
-            modbus_client = ModbusRTUClient(port=port)
+        # Try auto-detection first, off the event loop (probing blocks)
+        device_state.stage = STAGE_DETECTING
+        device = await asyncio.get_running_loop().run_in_executor(None, auto_detect_modbus_device)
+        device_state.stage = STAGE_CONNECTING
+        if device:
+            logger.info(f"Auto-detected Modbus device on port: {device.port}")
+            modbus_client = AsyncModbusClient(port=device.port, baudrate=device.baudrate, parity=device.parity)
         else:
             # Fallback to .env configuration
             logger.info("Using .env configuration for Modbus connection")
-            modbus_client = ModbusRTUClient()
+            modbus_client = AsyncModbusClient()
+        
+        write_combiner = AsyncWriteCombiner(modbus_client)
         
         # Test connection
-        if modbus_client.connect():
+        if await modbus_client.connect():
             device_state.connected = True
             logger.info("Successfully connected to Modbus device")
             
             # Initial state read
-            await update_device_state()
+            await update_device_state(poll_all=True)
+            device_state.stage = STAGE_READY
         else:
             device_state.connected = False
+            device_state.stage = STAGE_FAILED
+            device_state.error = f"Failed to open {modbus_client.port}"
             logger.error("Failed to connect to Modbus device")
             
     except Exception as e:
         logger.error(f"Error initializing Modbus client: {e}")
         device_state.connected = False
+        device_state.stage = STAGE_FAILED
+        device_state.error = str(e)
+    finally:
+        device_state.ready.set()
+
+async def wait_ready() -> bool:
+    """Wait up to READY_TIMEOUT for startup; True if the device is connected"""
+    if device_state.ready is None:
+        return device_state.connected
+    try:
+        await asyncio.wait_for(device_state.ready.wait(), READY_TIMEOUT)
+    except asyncio.TimeoutError:
+        return False
+    return device_state.connected
 
-async def update_device_state():
-    """Update device state by reading from hardware"""
+def startup_status() -> dict:
+    """Startup progress reported by the status endpoints"""
+    return {
+        "stage": device_state.stage,
+        "port": modbus_client.port if modbus_client else None,
+        "error": device_state.error,
+        "elapsed": round(time.time() - device_state.started, 3)
+    }
+
+def channel_states(function_code: int, channels: List[int], states: List[bool]) -> List[bool]:
+    """Channel states from the process image (channels never read keep their state)"""
+    result = []
+    for channel, address in enumerate(channels):
+        snapshot = modbus_client.image.read(function_code, address, 1, MODBUS_DEVICE_ADDRESS)
+        result.append(snapshot.values[0] if snapshot else states[channel])
+    return result
+
+async def update_device_state(poll_all: bool = False):
+    """Update device state by reading the profile points that are due from hardware"""
     global modbus_client
     
     if not modbus_client or not device_state.connected:
         return
         
     try:
-        # Read outputs (coils)
-        outputs = modbus_client.read_coils(0, 8, unit=MODBUS_DEVICE_ADDRESS)
-        if outputs is not None:
-            device_state.outputs = outputs
-            
-        # Read inputs (discrete inputs)
-        inputs = modbus_client.read_discrete_inputs(0, 8, unit=MODBUS_DEVICE_ADDRESS)
-        if inputs is not None:
-            device_state.inputs = inputs
-            
+        # Only points defined by the profile, each at its own poll rate, unit by unit
+        work = [(device, list(device.points), None)] if poll_all else poller.plan()
+        if not work:
+            return
+        start = time.monotonic()
+        for polled, names, due_at in work:
+            values = await modbus_client.read_many([polled.requests[name] for name in names])
+            poller.record(polled, names, values, due_at)
+            if polled is not device:
+                continue
+            for name, point_values in zip(names, values):
+                point = device.points[name]
+                if point.function_code == READ_COILS and point_values is not None:
+                    write_combiner.observe(KIND_COIL, point.address, point_values, MODBUS_DEVICE_ADDRESS)
+        poller.record_cycle(time.monotonic() - start)
+        
+        device_state.outputs = channel_states(READ_COILS, OUTPUT_CHANNELS, device_state.outputs)
+        device_state.inputs = channel_states(READ_DISCRETE_INPUTS, INPUT_CHANNELS, device_state.inputs)
         device_state.last_update = time.time()
         
     except Exception as e:
         logger.error(f"Error updating device state: {e}")
         device_state.connected = False
 
-def write_single_output(channel: int, state: bool) -> bool:
-    """Write single output channel using mod.py client"""
+async def write_single_output(channel: int, state: bool) -> bool:
+    """Write single output channel"""
     global modbus_client
     
     if not modbus_client or not device_state.connected:
@@ -137,12 +226,11 @@ def write_single_output(channel: int, state: bool) -> bool:
         return False
         
     try:
-        if channel < 0 or channel > 7:
+        if channel < 0 or channel >= len(OUTPUT_CHANNELS):
             logger.error(f"Invalid channel: {channel}")
             return False
             
-        # Use mod.py client to write coil
-        success = modbus_client.write_coil(channel, state, unit=MODBUS_DEVICE_ADDRESS)
+        success = await write_combiner.write_coil(OUTPUT_CHANNELS[channel], state, unit=MODBUS_DEVICE_ADDRESS)
         
         if success:
             device_state.outputs[channel] = state
@@ -158,6 +246,7 @@ def write_single_output(channel: int, state: bool) -> bool:
 
 async def background_update_task():
     """Background task to periodically update device state"""
+    await device_state.ready.wait()
     while True:
         try:
             await update_device_state()
@@ -169,39 +258,60 @@ async def background_update_task():
 @app.on_event("startup")
 async def startup_event():
     """Initialize device connection on startup"""
+    global startup_task
     logger.info("Starting Modbus RTU IO 8CH API server...")
-    await initialize_modbus_client()
     
-    # Start background task for status updates
+    # Detection and connection run in the background; requests are served meanwhile
+    device_state.ready = asyncio.Event()
+    startup_task = asyncio.create_task(initialize_modbus_client())
+    
+    # Start background task for status updates (waits for startup to finish)
     asyncio.create_task(background_update_task())
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up on shutdown"""
     global modbus_client
+    if startup_task and not startup_task.done():
+        startup_task.cancel()
     if modbus_client:
-        modbus_client.disconnect()
+        await modbus_client.disconnect()
     logger.info("Modbus RTU IO 8CH API server shutdown")
 
 @app.get("/status", response_model=StatusResponse)
 async def get_status():
     """Get current device status"""
+    snapshots = []
+    if modbus_client:
+        snapshots = [
+            modbus_client.image.read(point.function_code, point.address, point.count, MODBUS_DEVICE_ADDRESS)
+            for point in profile.points
+        ]
+        snapshots = [snapshot for snapshot in snapshots if snapshot is not None]
     return StatusResponse(
         connected=device_state.connected,
         outputs=device_state.outputs,
         inputs=device_state.inputs,
-        timestamp=time.time()
+        timestamp=time.time(),
+        quality=max((s.quality for s in snapshots), key=QUALITY_ORDER.index, default=None),
+        age=max((s.age for s in snapshots), default=None),
+        stage=device_state.stage
     )
 
+@app.get("/startup")
+async def get_startup():
+    """Get device detection and connection progress"""
+    return startup_status()
+
 @app.post("/control")
 async def control_output(request: ControlRequest):
     """Control digital output channel"""
     try:
-        if not device_state.connected:
-            raise HTTPException(status_code=503, detail="Device not connected")
+        if not await wait_ready():
+            raise HTTPException(status_code=503, detail=f"Device not connected ({device_state.stage})")
             
-        if request.channel < 0 or request.channel > 7:
-            raise HTTPException(status_code=400, detail="Channel must be 0-7")
+        if request.channel < 0 or request.channel >= len(OUTPUT_CHANNELS):
+            raise HTTPException(status_code=400, detail=f"Channel must be 0-{len(OUTPUT_CHANNELS) - 1}")
             
         current_state = device_state.outputs[request.channel]
         
@@ -214,7 +324,7 @@ async def control_output(request: ControlRequest):
         else:
             raise HTTPException(status_code=400, detail="Action must be 'on', 'off', or 'toggle'")
             
-        if write_single_output(request.channel, new_state):
+        if await write_single_output(request.channel, new_state):
             return {
                 "success": True,
                 "channel": request.channel,
@@ -235,25 +345,30 @@ async def control_output(request: ControlRequest):
 async def control_all_outputs(request: ControlAllRequest):
     """Control all digital output channels"""
     try:
-        if not device_state.connected:
-            raise HTTPException(status_code=503, detail="Device not connected")
+        if not await wait_ready():
+            raise HTTPException(status_code=503, detail=f"Device not connected ({device_state.stage})")
             
-        if len(request.states) != 8:
-            raise HTTPException(status_code=400, detail="Must provide exactly 8 boolean values")
+        if len(request.states) != len(OUTPUT_CHANNELS):
+            raise HTTPException(status_code=400, detail=f"Must provide exactly {len(OUTPUT_CHANNELS)} boolean values")
             
-        success_count = 0
-        for channel, state in enumerate(request.states):
-            if write_single_output(channel, state):
-                success_count += 1
+        # One Write Multiple Coils instead of one single write per channel
+        results = await write_combiner.write_many(
+            WriteRequest(KIND_COIL, address, state, MODBUS_DEVICE_ADDRESS)
+            for address, state in zip(OUTPUT_CHANNELS, request.states)
+        )
+        for channel, (state, success) in enumerate(zip(request.states, results)):
+            if success:
+                device_state.outputs[channel] = state
+        success_count = sum(results)
             
-        if success_count == 8:
+        if success_count == len(OUTPUT_CHANNELS):
             return {
                 "success": True,
                 "states": request.states,
                 "timestamp": time.time()
             }
         else:
-            raise HTTPException(status_code=500, detail=f"Only {success_count}/8 outputs controlled successfully")
+            raise HTTPException(status_code=500, detail=f"Only {success_count}/{len(OUTPUT_CHANNELS)} outputs controlled successfully")
             
     except HTTPException:
         raise
@@ -265,19 +380,27 @@ async def control_all_outputs(request: ControlAllRequest):
 async def get_device_info():
     """Get device information"""
     return {
-        "device": "Waveshare Modbus RTU IO 8CH",
+        "device": profile.description or profile.name,
+        "profile": profile.name,
         "status": "online" if device_state.connected else "offline",
+        "startup": startup_status(),
         "last_update": device_state.last_update,
-        "channels": {"inputs": 8, "outputs": 8}
+        "channels": {"inputs": len(INPUT_CHANNELS), "outputs": len(OUTPUT_CHANNELS)}
     }
 
+@app.get("/poller")
+async def get_poller():
+    """Get poll cycle time and per-unit health"""
+    return poller.get_stats()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
     return {
         "message": "Modbus RTU IO 8CH API",
         "status": "running",
-        "connected": device_state.connected
+        "connected": device_state.connected,
+        "stage": device_state.stage
     }
 
 if __name__ == "__main__":
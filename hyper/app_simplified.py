@@ -295,10 +295,16 @@ def widget_register(register):
 @app.route('/widget/status')
 def widget_status():
     """System status widget (HTML)"""
+    startup = modbus_client.get_status()
     try:
-        result = modbus_client.execute_command(['help'])
-        status = "Connected" if result['success'] else "Error"
-        status_class = "status-good" if result['success'] else "status-error"
+        if not startup['ready']:
+            # Device detection still running in the background
+            status = f"Starting ({startup['stage']}, {startup['elapsed']:.0f}s)"
+            status_class = "status-wait"
+        else:
+            result = modbus_client.execute_command(['help'])
+            status = "Connected" if result['success'] else "Error"
+            status_class = "status-good" if result['success'] else "status-error"
     except:
         status = "Disconnected"
         status_class = "status-error"
@@ -306,7 +312,7 @@ def widget_status():
     html = f"""
     <!DOCTYPE html>
     <html><head><title>System Status</title>
-    <style>body {{ font-family: Arial, sans-serif; margin: 0; padding: 15px; background: #1e1e1e; color: #fff; text-align: center; }} .status-good {{ color: #28a745; }} .status-error {{ color: #dc3545; }}</style></head>
+    <style>body {{ font-family: Arial, sans-serif; margin: 0; padding: 15px; background: #1e1e1e; color: #fff; text-align: center; }} .status-good {{ color: #28a745; }} .status-error {{ color: #dc3545; }} .status-wait {{ color: #ffc107; }}</style></head>
     <body>
         <h3>System Status</h3>
         <p class="{status_class}"><strong>{status}</strong></p>
@@ -6,6 +6,12 @@ Centralized configuration management
 import os
 from dotenv import load_dotenv
 
+try:
+    from modbusapi.profile import default_profile
+    from modbusapi.planner import READ_COILS
+except ImportError:
+    default_profile = None
+
 load_dotenv()
 
 # Flask Configuration
@@ -27,6 +33,6 @@ WIDGET_REFRESH_INTERVALS = {
     'register': 3000
 }
 
-# Default widget channels/registers
-DEFAULT_CHANNELS = 8
+# Default widget channels/registers (channels: writable coils of the MODBUS_PROFILE device profile)
+DEFAULT_CHANNELS = len(default_profile().addresses(READ_COILS, writable=True)) if default_profile else 8
 DEFAULT_REGISTERS = 10
@@ -5,10 +5,12 @@ Centralized Modbus communication functions using modbusapi package
 
 import os
 import logging
+import time
+import threading
 from typing import Dict, Any, Optional
 
 # Import modbusapi package
-from modbusapi.client import ModbusClient as ModbusAPIClient, auto_detect_modbus_port
+from modbusapi.client import ModbusClient as ModbusAPIClient, detect_modbus_devices
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -22,27 +24,93 @@ MODBUS_PORT = os.getenv('MODBUS_PORT')
 MODBUS_BAUDRATE = int(os.getenv('MODBUS_BAUDRATE', '9600'))
 MODBUS_TIMEOUT = float(os.getenv('MODBUS_TIMEOUT', '1.0'))
 MODBUS_DEVICE_ADDRESS = int(os.getenv('MODBUS_DEVICE_ADDRESS', '1'))
+# Seconds a bus request waits for background detection to finish
+MODBUS_READY_TIMEOUT = float(os.getenv('MODBUS_READY_TIMEOUT', '5.0'))
+
+# Startup stages
+STAGE_DETECTING = 'detecting'
+STAGE_CONNECTING = 'connecting'
+STAGE_READY = 'ready'
+STAGE_FAILED = 'failed'
 
 
 class ModbusClient:
-    """Centralized Modbus client for communication"""
+    """Centralized Modbus client for communication
+    
+    Detection and connection run on a background thread, so importing the
+    module does not block; bus requests wait for them up to MODBUS_READY_TIMEOUT.
+    """
     
     def __init__(self):
         self.timeout = MODBUS_TIMEOUT
-        self.port = MODBUS_PORT or auto_detect_modbus_port()
+        self.port = MODBUS_PORT
         self.baudrate = MODBUS_BAUDRATE
+        self.parity = 'N'
         self.unit = MODBUS_DEVICE_ADDRESS
+        self.client = None
+        self.stage = STAGE_CONNECTING if self.port else STAGE_DETECTING
+        self.error = None
+        self.started = time.time()
+        self.ready = threading.Event()
+        threading.Thread(target=self._start, name='modbus-startup', daemon=True).start()
+        
+    def _start(self):
+        """Detect the device (unless MODBUS_PORT is set) and open the port"""
+        try:
+            if not self.port:
+                # Cached settings are confirmed with one request, otherwise all ports are scanned
+                devices = detect_modbus_devices()
+                if devices:
+                    self.port = devices[0].port
+                    self.baudrate = devices[0].baudrate
+                    self.parity = devices[0].parity
+                self.stage = STAGE_CONNECTING
+            
+            # Create ModbusAPI client (it reconnects lazily if the port cannot be opened now)
+            client = ModbusAPIClient(
+                port=self.port,
+                baudrate=self.baudrate,
+                parity=self.parity,
+                timeout=self.timeout
+            )
+            connected = client.connect()
+            self.port = client.port
+            self.client = client
+            self.stage = STAGE_READY if connected else STAGE_FAILED
+            if not connected:
+                self.error = f'Failed to open {self.port}'
+        except Exception as e:
+            logger.error(f"Modbus startup failed: {e}")
+            self.stage = STAGE_FAILED
+            self.error = str(e)
+        finally:
+            self.ready.set()
+            
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait for startup to finish; True once the bus client exists"""
+        self.ready.wait(MODBUS_READY_TIMEOUT if timeout is None else timeout)
+        return self.client is not None
         
-        # Create ModbusAPI client
-        self.client = ModbusAPIClient(
-            port=self.port,
-            baudrate=self.baudrate,
-            timeout=self.timeout,
-            unit=self.unit
-        )
+    def get_status(self) -> Dict[str, Any]:
+        """Startup stage and connection details, without waiting"""
+        return {
+            'stage': self.stage,
+            'ready': self.ready.is_set(),
+            'port': self.port,
+            'baudrate': self.baudrate,
+            'error': self.error,
+            'elapsed': round(time.time() - self.started, 3)
+        }
         
     def execute_command(self, command_args: list) -> Dict[str, Any]:
         """Execute Modbus command and return structured result"""
+        if not self.wait_ready():
+            return {
+                'success': False,
+                'output': '',
+                'command': ' '.join(command_args),
+                'error': f'Modbus device not ready ({self.stage})'
+            }
         try:
             command = command_args[0] if command_args else ''
             
@@ -198,6 +266,8 @@ class ModbusClient:
     
     def read_coil(self, channel: int) -> Optional[bool]:
         """Read coil state and return boolean value"""
+        if not self.wait_ready():
+            return None
         values = self.client.read_coils(channel, 1, self.unit)
         
         if values is None or len(values) == 0:
@@ -207,10 +277,14 @@ class ModbusClient:
     
     def write_coil(self, channel: int, value: bool) -> bool:
         """Write coil state"""
+        if not self.wait_ready():
+            return False
         return self.client.write_coil(channel, value, self.unit)
         
     def read_register(self, register: int) -> Optional[int]:
         """Read holding register value"""
+        if not self.wait_ready():
+            return None
         values = self.client.read_holding_registers(register, 1, self.unit)
         
         if values is None or len(values) == 0:
@@ -220,10 +294,14 @@ class ModbusClient:
     
     def write_register(self, register: int, value: int) -> bool:
         """Write holding register value"""
+        if not self.wait_ready():
+            return False
         return self.client.write_register(register, value, self.unit)
     
     def read_input_register(self, address: int) -> Optional[int]:
         """Read input register value"""
+        if not self.wait_ready():
+            return None
         values = self.client.read_input_registers(address, 1, self.unit)
         
         if values is None or len(values) == 0:
@@ -233,6 +311,8 @@ class ModbusClient:
     
     def read_discrete_input(self, address: int) -> Optional[bool]:
         """Read discrete input value"""
+        if not self.wait_ready():
+            return None
         values = self.client.read_discrete_inputs(address, 1, self.unit)
         
         if values is None or len(values) == 0:
@@ -241,5 +321,5 @@ class ModbusClient:
         return values[0]
 
 
-# Global instance
+# Global instance (returns at once, the device is detected in the background)
 modbus_client = ModbusClient()
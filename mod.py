@@ -18,10 +18,16 @@ import sys
 import time
 import os
 import glob
-from typing import Optional, List, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from typing import Optional, List, Union, NamedTuple
+from urllib.parse import urlsplit
 
 try:
     from pymodbus.client.serial import ModbusSerialClient
+    from pymodbus.client.tcp import ModbusTcpClient
+    from pymodbus.framer.rtu_framer import ModbusRtuFramer
+    from pymodbus.framer.socket_framer import ModbusSocketFramer
     from pymodbus.exceptions import ModbusException, ConnectionException
     from pymodbus.constants import Endian
     from pymodbus.payload import BinaryPayloadDecoder, BinaryPayloadBuilder
@@ -37,6 +43,19 @@ except ImportError:
     print("Install with: pip3 install python-dotenv")
     sys.exit(1)
 
+# Detection with a per-adapter settings cache when modbusapi is installed
+try:
+    from modbusapi.detect import detect_modbus_devices, DetectedDevice
+except ImportError:
+    detect_modbus_devices = None
+
+    class DetectedDevice(NamedTuple):
+        """Serial line settings at which a Modbus device answered"""
+        port: str
+        baudrate: int
+        parity: str
+        units: List[int]
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -133,18 +152,43 @@ def test_modbus_port(port: str, baudrate: int = 9600, timeout: float = 0.5) -> b
         return False
 
 
-def auto_detect_modbus_port(baudrates: List[int] = None) -> Optional[str]:
+def _probe_port_baudrates(port: str, baudrates: List[int], stop: threading.Event) -> Optional[int]:
+    """Try each baud rate on one port until a device answers (or detection is stopped)"""
+    for baudrate in baudrates:
+        if stop.is_set():
+            return None
+        if test_modbus_port(port, baudrate):
+            return baudrate
+    return None
+
+
+def auto_detect_modbus_device(baudrates: List[int] = None, budget: Optional[float] = None) -> Optional[DetectedDevice]:
     """
-    Automatically detect which serial port has a working Modbus device
+    Automatically detect a working Modbus device and its line settings
+    
+    All ports are probed at the same time, one worker per port. With modbusapi
+    installed, the settings that worked last time (MODBUS_DETECT_CACHE) are
+    confirmed with a single request before any scan.
     
     Args:
         baudrates: List of baud rates to test (default: common rates)
+        budget: Total detection time in seconds (default: from .env MODBUS_DETECT_BUDGET or 10)
         
     Returns:
-        Path to working Modbus port or None if not found
+        Port, baud rate and parity of the device, or None if not found
     """
+    if detect_modbus_devices is not None:
+        devices = detect_modbus_devices(baudrates=baudrates, budget=budget)
+        if devices:
+            print(f"✓ Modbus device detected on {devices[0].port} at {devices[0].baudrate} baud {devices[0].parity}")
+            return devices[0]
+        print("No Modbus devices found on any serial port")
+        return None
+    
     if baudrates is None:
         baudrates = [9600, 19200, 38400, 115200]  # Common Modbus baud rates
+    if budget is None:
+        budget = float(os.getenv('MODBUS_DETECT_BUDGET', '10'))
     
     ports = find_serial_ports()
     if not ports:
@@ -153,20 +197,40 @@ def auto_detect_modbus_port(baudrates: List[int] = None) -> Optional[str]:
     
     print(f"Scanning {len(ports)} serial ports for Modbus devices...")
     
-    for port in ports:
-        print(f"Testing {port}...")
-        
-        for baudrate in baudrates:
-            if test_modbus_port(port, baudrate):
-                print(f"✓ Modbus device detected on {port} at {baudrate} baud")
-                return port
-        
-        print(f"✗ No Modbus response on {port}")
+    stop = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=len(ports))
+    futures = {executor.submit(_probe_port_baudrates, port, baudrates, stop): port for port in ports}
+    try:
+        for future in as_completed(futures, timeout=budget):
+            baudrate = future.result()
+            if baudrate is not None:
+                print(f"✓ Modbus device detected on {futures[future]} at {baudrate} baud")
+                return DetectedDevice(futures[future], baudrate, 'N', [])
+    except FutureTimeout:
+        logger.warning(f"Modbus detection budget of {budget:.1f}s exhausted")
+    finally:
+        # Workers still probing stop after their current baud rate
+        stop.set()
+        executor.shutdown(wait=False)
     
     print("No Modbus devices found on any serial port")
     return None
 
 
+def auto_detect_modbus_port(baudrates: List[int] = None, budget: Optional[float] = None) -> Optional[str]:
+    """
+    Automatically detect which serial port has a working Modbus device
+    
+    Use auto_detect_modbus_device to also get the baud rate and parity the
+    port must be opened at.
+    
+    Returns:
+        Path to working Modbus port or None if not found
+    """
+    device = auto_detect_modbus_device(baudrates, budget)
+    return device.port if device else None
+
+
 class ModbusRTUClient:
     """
     Modbus RTU Client for USB-RS485 communication
@@ -183,7 +247,8 @@ class ModbusRTUClient:
         Initialize Modbus RTU client
         
         Args:
-            port: Serial port (default: from .env MODBUS_PORT or /dev/ttyUSB0)
+            port: Serial port or gateway URL (tcp://host:502, rtu+tcp://host:port)
+                (default: from .env MODBUS_PORT or /dev/ttyUSB0)
             baudrate: Communication speed (default: from .env MODBUS_BAUDRATE or 9600)
             parity: Parity bit ('N', 'E', 'O') (default: 'N')
             stopbits: Stop bits (default: 1)
@@ -211,15 +276,26 @@ class ModbusRTUClient:
             bool: True if connection successful, False otherwise
         """
         try:
-            self.client = ModbusSerialClient(
-                method='rtu',
-                port=self.port,
-                baudrate=self.baudrate,
-                parity=self.parity,
-                stopbits=self.stopbits,
-                bytesize=self.bytesize,
-                timeout=self.timeout
-            )
+            if '://' in self.port:
+                # Ethernet gateway: tcp://host[:502] or rtu+tcp://host:port
+                url = urlsplit(self.port)
+                framer = ModbusRtuFramer if url.scheme.startswith('rtu') else ModbusSocketFramer
+                self.client = ModbusTcpClient(
+                    url.hostname,
+                    port=url.port or 502,
+                    framer=framer,
+                    timeout=self.timeout
+                )
+            else:
+                self.client = ModbusSerialClient(
+                    method='rtu',
+                    port=self.port,
+                    baudrate=self.baudrate,
+                    parity=self.parity,
+                    stopbits=self.stopbits,
+                    bytesize=self.bytesize,
+                    timeout=self.timeout
+                )
             
             if self.client.connect():
                 logger.info(f"Successfully connected to {self.port}")
@@ -256,7 +332,7 @@ class ModbusRTUClient:
                 logger.error(f"Error reading coils: {result}")
                 return None
             
-            logger.info(f"Read {count} coils from address {address}: {result.bits}")
+            logger.info("Read %d coils from address %d: %s", count, address, result.bits)
             return result.bits
             
         except Exception as e:
@@ -281,7 +357,7 @@ class ModbusRTUClient:
                 logger.error(f"Error reading discrete inputs: {result}")
                 return None
             
-            logger.info(f"Read {count} discrete inputs from address {address}: {result.bits}")
+            logger.info("Read %d discrete inputs from address %d: %s", count, address, result.bits)
             return result.bits
             
         except Exception as e:
@@ -306,7 +382,7 @@ class ModbusRTUClient:
                 logger.error(f"Error reading holding registers: {result}")
                 return None
             
-            logger.info(f"Read {count} holding registers from address {address}: {result.registers}")
+            logger.info("Read %d holding registers from address %d: %s", count, address, result.registers)
             return result.registers
             
         except Exception as e:
@@ -331,7 +407,7 @@ class ModbusRTUClient:
                 logger.error(f"Error reading input registers: {result}")
                 return None
             
-            logger.info(f"Read {count} input registers from address {address}: {result.registers}")
+            logger.info("Read %d input registers from address %d: %s", count, address, result.registers)
             return result.registers
             
         except Exception as e:
@@ -356,7 +432,7 @@ class ModbusRTUClient:
                 logger.error(f"Error writing coil: {result}")
                 return False
             
-            logger.info(f"Written coil at address {address}: {value}")
+            logger.info("Written coil at address %d: %s", address, value)
             return True
             
         except Exception as e:
@@ -381,7 +457,7 @@ class ModbusRTUClient:
                 logger.error(f"Error writing register: {result}")
                 return False
             
-            logger.info(f"Written register at address {address}: {value}")
+            logger.info("Written register at address %d: %s", address, value)
             return True
             
         except Exception as e:
@@ -406,7 +482,7 @@ class ModbusRTUClient:
                 logger.error(f"Error writing coils: {result}")
                 return False
             
-            logger.info(f"Written {len(values)} coils starting at address {address}: {values}")
+            logger.info("Written %d coils starting at address %d: %s", len(values), address, values)
             return True
             
         except Exception as e:
@@ -431,7 +507,7 @@ class ModbusRTUClient:
                 logger.error(f"Error writing registers: {result}")
                 return False
             
-            logger.info(f"Written {len(values)} registers starting at address {address}: {values}")
+            logger.info("Written %d registers starting at address %d: %s", len(values), address, values)
             return True
             
         except Exception as e:
@@ -459,10 +535,10 @@ def demo_usage():
         print(f"Failed to connect to configured port {configured_port}")
         print("Attempting auto-detection...")
         
-        detected_port = auto_detect_modbus_port()
-        if detected_port:
-            print(f"Using auto-detected port: {detected_port}")
-            modbus = ModbusRTUClient(port=detected_port)
+        device = auto_detect_modbus_device()
+        if device:
+            print(f"Using auto-detected port: {device.port}")
+            modbus = ModbusRTUClient(port=device.port, baudrate=device.baudrate, parity=device.parity)
             if not modbus.connect():
                 print("Failed to connect to auto-detected port!")
                 return
@@ -541,16 +617,16 @@ def interactive_mode():
     default_port = os.getenv('MODBUS_PORT', '/dev/ttyUSB0')
     default_baudrate = os.getenv('MODBUS_BAUDRATE', '9600')
     default_timeout = os.getenv('MODBUS_TIMEOUT', '1.0')
+    default_parity = 'N'
     
     # Ask user if they want auto-detection
     auto_detect = input("Auto-detect Modbus port? (y/N): ").strip().lower()
     
     if auto_detect in ['y', 'yes']:
         print("\nScanning for Modbus devices...")
-        detected_port = auto_detect_modbus_port()
-        if detected_port:
-            port = detected_port
-            baudrate = int(default_baudrate)  # Use default baudrate for now
+        device = auto_detect_modbus_device()
+        if device:
+            port, baudrate, default_parity = device.port, device.baudrate, device.parity
         else:
             print("No devices found. Please enter manually:")
             port = input(f"Enter serial port [{default_port}]: ").strip() or default_port
@@ -559,7 +635,7 @@ def interactive_mode():
         port = input(f"Enter serial port [{default_port}]: ").strip() or default_port
         baudrate = int(input(f"Enter baud rate [{default_baudrate}]: ").strip() or default_baudrate)
     
-    parity = input("Enter parity (N/E/O) [N]: ").strip().upper() or 'N'
+    parity = input(f"Enter parity (N/E/O) [{default_parity}]: ").strip().upper() or default_parity
     
     modbus = ModbusRTUClient(port=port, baudrate=baudrate, parity=parity)
 
@@ -664,9 +740,9 @@ def command_line_mode(args):
         print(f"Failed to connect to configured port {configured_port}")
         print("Attempting auto-detection...")
         
-        detected_port = auto_detect_modbus_port()
-        if detected_port:
-            modbus = ModbusRTUClient(port=detected_port)
+        device = auto_detect_modbus_device()
+        if device:
+            modbus = ModbusRTUClient(port=device.port, baudrate=device.baudrate, parity=device.parity)
             if not modbus.connect():
                 print("Failed to connect to auto-detected port!")
                 return False
@@ -731,6 +807,18 @@ def command_line_mode(args):
                 print(f"Failed to write coil {addr}")
                 return False
         
+        elif cmd == 'wcm' and len(args) >= 3:
+            # Consecutive coils in one Write Multiple Coils, e.g. "wcm 0 11110000"
+            addr, values = int(args[1]), [bool(int(v)) for v in args[2].replace(',', '')]
+            unit = int(args[3]) if len(args) > 3 else 1
+            result = modbus.write_coils(addr, values, unit)
+            if result:
+                print(f"Coils [{addr}-{addr+len(values)-1}] set to {values}")
+                return True
+            else:
+                print(f"Failed to write coils {addr}-{addr+len(values)-1}")
+                return False
+        
         elif cmd == 'wr' and len(args) >= 3:
             addr, value = int(args[1]), int(args[2])
             unit = int(args[3]) if len(args) > 3 else 1
@@ -767,11 +855,13 @@ def print_command_help():
     print("  ri <addr> <count> [unit] - Read input registers")
     print("  rd <addr> <count> [unit] - Read discrete inputs")
     print("  wc <addr> <value> [unit] - Write coil (0/1)")
+    print("  wcm <addr> <bits> [unit] - Write consecutive coils (e.g. 11110000)")
     print("  wr <addr> <value> [unit] - Write register")
     print("\nExamples:")
     print("  python mod.py wc 0 1     # Turn ON output 0")
     print("  python mod.py wc 0 0     # Turn OFF output 0")
     print("  python mod.py rc 0 8     # Read 8 coils from address 0")
+    print("  python mod.py wcm 0 11111111  # Turn ON outputs 0-7 at once")
     print("  python mod.py rh 0 4     # Read 4 holding registers")
     print("  python mod.py wr 1 500   # Write 500 to register 1")
     print("\nOther modes:")
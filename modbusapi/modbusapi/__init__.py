@@ -41,7 +41,13 @@ load_env_files()
 
 # Import components after environment is configured
 from .client import ModbusClient
+from .async_client import AsyncModbusClient
+from .pool import ModbusClientPool
+from .bitmask import BitMask
+from .profile import DeviceProfile, load_profile
+from .poller import Poller
+from .hotplug import HotplugWatcher
 from .api import create_rest_app, start_mqtt_broker
 from .shell import main as shell_main
 
-__all__ = ['ModbusClient', 'create_rest_app', 'start_mqtt_broker', 'shell_main', 'load_env_files']
+__all__ = ['ModbusClient', 'AsyncModbusClient', 'ModbusClientPool', 'BitMask', 'DeviceProfile', 'load_profile', 'Poller', 'HotplugWatcher', 'create_rest_app', 'start_mqtt_broker', 'shell_main', 'load_env_files']
@@ -4,16 +4,53 @@ ModbusAPI - Main entry point for running as a module
 
 import os
 import sys
+import json
+import time
 import argparse
 import logging
 
 from . import load_env_files
 from .api import create_rest_app, start_mqtt_broker
 from .shell import main as shell_main
+from .simulator import RtuSimulator, SlaveDevice, load_layout
+from .bench import main as bench_main
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+def run_simulator(args) -> int:
+    """Serve simulated slaves until interrupted"""
+    if args.layout:
+        slaves = load_layout(args.layout)
+        if not slaves:
+            print(f"No slaves loaded from {args.layout}", file=sys.stderr)
+            return 1
+    else:
+        slaves = [
+            SlaveDevice.from_dict({'unit': int(unit), 'profile': args.profile, 'delay': args.delay})
+            for unit in args.units.split(',')
+        ]
+    simulator = RtuSimulator(slaves, baudrate=args.baudrate, pacing=not args.no_pacing)
+    port = simulator.start()
+    if args.link:
+        if os.path.islink(args.link):
+            os.unlink(args.link)
+        os.symlink(port, args.link)
+        port = f"{args.link} -> {port}"
+    print(f"Simulating units {', '.join(str(unit) for unit in sorted(simulator.slaves))} on {port} "
+          f"({args.baudrate} baud{'' if simulator.pacing else ', no pacing'})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.close()
+        if args.link and os.path.islink(args.link):
+            os.unlink(args.link)
+    print(json.dumps(simulator.get_stats()))
+    return 0
+
 def main():
     """Main entry point for the modbusapi module"""
     # Load environment variables
@@ -54,7 +91,23 @@ def main():
     shell_parser.add_argument('--verbose', action='store_true', help='Enable verbose output')
     shell_parser.add_argument('command', nargs='*', help='Command to run')
     
-    args = parser.parse_args()
+    # Simulator command
+    sim_parser = subparsers.add_parser('simulate', help='Run simulated RTU slaves on a pseudo-terminal')
+    sim_parser.add_argument('--layout', help='Slave layout file (JSON or YAML)')
+    sim_parser.add_argument('--units', default='1', help='Comma separated unit IDs (without --layout)')
+    sim_parser.add_argument('--profile', help='Device profile sizing the banks (without --layout)')
+    sim_parser.add_argument('--baudrate', type=int, default=int(os.environ.get('MODBUS_BAUDRATE', 9600)),
+                           help='Baud rate used for byte pacing')
+    sim_parser.add_argument('--delay', type=float, default=0.0, help='Slave response delay in seconds')
+    sim_parser.add_argument('--no-pacing', action='store_true', help='Answer without emulating wire time')
+    sim_parser.add_argument('--link', help='Create a symlink to the pseudo-terminal at this path')
+    
+    # Benchmark command (options are parsed by modbusapi.bench)
+    subparsers.add_parser('bench', help='Run transport benchmarks', add_help=False)
+    
+    args, extra = parser.parse_known_args()
+    if extra and args.command != 'bench':
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
     
     # Run the selected command
     if args.command == 'rest':
@@ -94,6 +147,10 @@ def main():
         # Run shell main
         sys.argv = sys_argv
         shell_main()
+    elif args.command == 'simulate':
+        return run_simulator(args)
+    elif args.command == 'bench':
+        return bench_main(extra)
     else:
         # Default to help if no command specified
         parser.print_help()
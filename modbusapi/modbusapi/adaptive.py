@@ -0,0 +1,263 @@
+"""
+ModbusAPI Adaptive Timeouts - Per-unit timeouts learned from observed round trips
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from typing import Optional, List, Dict, Any, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds (log spaced, 0.5 ms .. ~16 s)
+BUCKET_BOUNDS = [0.0005 * (2 ** (i / 4)) for i in range(61)]
+
+
+class RttHistogram:
+    """
+    Rolling histogram of response turnaround times
+
+    Counts are halved whenever the total exceeds the window, so old
+    observations fade out and the histogram follows the device over time.
+    """
+
+    def __init__(self, window: int = 512, counts: Optional[List[float]] = None):
+        self.window = window
+        self.counts = list(counts) if counts else [0.0] * (len(BUCKET_BOUNDS) + 1)
+        self.total = sum(self.counts)
+        self.samples = int(self.total)
+
+    def add(self, value: float):
+        """Record one observation"""
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS, value)] += 1
+        self.total += 1
+        self.samples += 1
+        if self.total > self.window:
+            self.counts = [count / 2 for count in self.counts]
+            self.total = sum(self.counts)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Return the upper bound of the bucket holding the p-th percentile
+
+        Args:
+            p: Percentile between 0 and 100
+
+        Returns:
+            Value in seconds or None if the histogram is empty
+        """
+        if self.total <= 0:
+            return None
+        target = self.total * p / 100.0
+        running = 0.0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target and count:
+                return BUCKET_BOUNDS[min(index, len(BUCKET_BOUNDS) - 1)]
+        return BUCKET_BOUNDS[-1]
+
+
+class AdaptiveTimeouts:
+    """
+    Learn response timeouts per (port, unit, function code)
+
+    The turnaround (wall time minus predicted wire time) of each successful
+    transaction is recorded; the timeout for the next transaction is the
+    predicted wire time plus the configured percentile of the turnaround plus
+    a margin, clamped between floor and ceiling.
+    """
+
+    def __init__(self,
+                 percentile: Optional[float] = None,
+                 margin: Optional[float] = None,
+                 floor: Optional[float] = None,
+                 ceiling: Optional[float] = None,
+                 min_samples: Optional[int] = None,
+                 path: Optional[str] = None,
+                 save_interval: float = 60.0):
+        """
+        Initialize adaptive timeouts
+
+        Args:
+            percentile: Turnaround percentile used (default: from .env MODBUS_TIMEOUT_PERCENTILE or 99)
+            margin: Seconds added to the percentile (default: from .env MODBUS_TIMEOUT_MARGIN or 0.02)
+            floor: Minimum timeout (default: from .env MODBUS_TIMEOUT_FLOOR or 0.02)
+            ceiling: Maximum timeout (default: from .env MODBUS_TIMEOUT_CEILING or 1.0)
+            min_samples: Observations needed before a learned value is used
+                (default: from .env MODBUS_TIMEOUT_MIN_SAMPLES or 20)
+            path: JSON file persisting learned histograms
+                (default: from .env MODBUS_TIMEOUT_STATE, unset or empty keeps them in memory)
+            save_interval: Minimum seconds between automatic saves
+        """
+        self.percentile = percentile if percentile is not None else float(os.getenv('MODBUS_TIMEOUT_PERCENTILE', '99'))
+        self.margin = margin if margin is not None else float(os.getenv('MODBUS_TIMEOUT_MARGIN', '0.02'))
+        self.floor = floor if floor is not None else float(os.getenv('MODBUS_TIMEOUT_FLOOR', '0.02'))
+        self.ceiling = ceiling if ceiling is not None else float(os.getenv('MODBUS_TIMEOUT_CEILING', '1.0'))
+        self.min_samples = min_samples if min_samples is not None else int(os.getenv('MODBUS_TIMEOUT_MIN_SAMPLES', '20'))
+        self.path = os.path.expanduser(path if path is not None else os.getenv('MODBUS_TIMEOUT_STATE', ''))
+        self.save_interval = save_interval
+        self._histograms: Dict[Tuple[str, int, int], RttHistogram] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+        if self.path:
+            self.load()
+
+    def record(self, port: str, unit: int, function_code: int, turnaround: float):
+        """
+        Record the turnaround of a successful transaction
+
+        Args:
+            port: Bus identifier
+            unit: Slave unit ID
+            function_code: Modbus function code
+            turnaround: Wall time minus predicted wire time, in seconds
+        """
+        key = (port, unit, function_code)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = RttHistogram()
+            histogram.add(max(0.0, turnaround))
+            self._dirty = True
+
+        if self.path and time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def record_timeout(self, port: str, unit: int, function_code: int):
+        """
+        Record a transaction that timed out
+
+        Its turnaround is unknown but at least the timeout used, so it is
+        recorded at the ceiling: when timeouts exceed the share the percentile
+        allows, the learned timeout falls back to the ceiling.
+
+        Args:
+            port: Bus identifier
+            unit: Slave unit ID
+            function_code: Modbus function code
+        """
+        self.record(port, unit, function_code, self.ceiling)
+
+    def timeout(self, port: str, unit: int, function_code: int,
+                wire_time: float = 0.0, default: Optional[float] = None) -> float:
+        """
+        Timeout for the next transaction
+
+        Args:
+            port: Bus identifier
+            unit: Slave unit ID
+            function_code: Modbus function code
+            wire_time: Predicted wire time of the transaction
+            default: Timeout used until enough samples are known (default: ceiling)
+
+        Returns:
+            Timeout in seconds
+        """
+        learned = self.learned(port, unit, function_code)
+        if learned is None:
+            return default if default is not None else self.ceiling
+        return min(self.ceiling, max(self.floor, wire_time + learned + self.margin))
+
+    def learned(self, port: str, unit: int, function_code: int) -> Optional[float]:
+        """Return the learned turnaround percentile, or None if not enough samples"""
+        with self._lock:
+            histogram = self._histograms.get((port, unit, function_code))
+            if histogram is None or histogram.samples < self.min_samples:
+                return None
+            return histogram.percentile(self.percentile)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return configuration and learned values per (port, unit, function code)"""
+        with self._lock:
+            keys = list(self._histograms.items())
+        return {
+            'percentile': self.percentile,
+            'margin': self.margin,
+            'floor': self.floor,
+            'ceiling': self.ceiling,
+            'min_samples': self.min_samples,
+            'units': [
+                {
+                    'port': port,
+                    'unit': unit,
+                    'function_code': function_code,
+                    'samples': histogram.samples,
+                    'turnaround': self.learned(port, unit, function_code),
+                }
+                for (port, unit, function_code), histogram in keys
+            ]
+        }
+
+    def save(self, path: Optional[str] = None) -> bool:
+        """
+        Persist learned histograms to a JSON file
+
+        Args:
+            path: File path (default: self.path)
+
+        Returns:
+            True if saved, False otherwise
+        """
+        path = path or self.path
+        if not path:
+            return False
+        with self._lock:
+            if not self._dirty and path == self.path:
+                return True
+            data = {
+                'version': 1,
+                'histograms': [
+                    {'port': port, 'unit': unit, 'function_code': fc,
+                     'samples': h.samples, 'counts': h.counts}
+                    for (port, unit, fc), h in self._histograms.items()
+                ]
+            }
+            self._dirty = False
+            self._last_save = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not save adaptive timeouts to {path}: {e}")
+            return False
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """
+        Load learned histograms from a JSON file
+
+        Args:
+            path: File path (default: self.path)
+
+        Returns:
+            True if loaded, False otherwise
+        """
+        path = path or self.path
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            histograms = {}
+            for entry in data.get('histograms', []):
+                if len(entry['counts']) != len(BUCKET_BOUNDS) + 1:
+                    continue
+                histogram = RttHistogram(counts=entry['counts'])
+                histogram.samples = int(entry.get('samples', histogram.total))
+                histograms[(entry['port'], int(entry['unit']), int(entry['function_code']))] = histogram
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not load adaptive timeouts from {path}: {e}")
+            return False
+        with self._lock:
+            self._histograms.update(histograms)
+        logger.info(f"Loaded adaptive timeouts for {len(histograms)} units from {path}")
+        return True
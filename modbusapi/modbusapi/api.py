@@ -4,18 +4,33 @@ ModbusAPI - REST and MQTT API implementations
 
 import os
 import json
+import struct
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, List, Union
 from functools import wraps
 
-from .client import ModbusClient, auto_detect_modbus_port
+from .client import ModbusClient, auto_detect_modbus_device
+from .arbiter import LANE_POLL
+from .pool import ModbusClientPool, BusReadRequest, parse_units
+from .poller import create_poller
+from .hotplug import HotplugWatcher
+from .discovery import Inventory
+from .decoder import decode_array, load_register_maps, TYPES, BIG, LITTLE
+from .bitmask import FORMATS, FORMAT_VERBOSE
+from .trace import trace_buffer
+from .profile import load_profile
+from .planner import (
+    ReadPlanner, parse_function_code, READ_METHODS,
+    READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Try to import Flask for REST API
 try:
-    from flask import Flask, request, jsonify, Response
+    from flask import Flask, request, jsonify, Response, abort, make_response
 except ImportError:
     logger.warning("Flask not installed. REST API will not be available.")
     Flask = None
@@ -52,6 +67,90 @@ def require_mqtt(func):
     return wrapper
 
 
+def decode_options(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Array decoding options from query parameters or a JSON payload
+    
+    Args:
+        params: Mapping with 'type' and optional 'byte_order', 'word_order', 'scale', 'offset'
+        
+    Returns:
+        Keyword arguments for decode_array, or None if no type was requested
+        
+    Raises:
+        ValueError: If an option is invalid
+    """
+    value_type = params.get('type')
+    if not value_type:
+        return None
+    if value_type not in TYPES:
+        raise ValueError(f"Unknown type: {value_type}")
+    options = {
+        'type': value_type,
+        'byte_order': params.get('byte_order', BIG),
+        'word_order': params.get('word_order', BIG),
+        'scale': float(params.get('scale', 1.0)),
+        'offset': float(params.get('offset', 0.0)),
+    }
+    if options['byte_order'] not in (BIG, LITTLE) or options['word_order'] not in (BIG, LITTLE):
+        raise ValueError(f"Byte/word order must be '{BIG}' or '{LITTLE}'")
+    return options
+
+
+def bit_format(params: Dict[str, Any]) -> str:
+    """
+    Output format for coil and discrete input reads
+    
+    Args:
+        params: Mapping with optional 'format' ('verbose', 'hex' or 'base64')
+        
+    Returns:
+        Requested format (default: 'verbose')
+        
+    Raises:
+        ValueError: If the format is unknown
+    """
+    fmt = params.get('format') or FORMAT_VERBOSE
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt} (use one of: {', '.join(FORMATS)})")
+    return fmt
+
+
+def broadcast_options(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Broadcast write options from a JSON payload
+    
+    Args:
+        params: Mapping with 'value' or 'values', optional 'type' ('coils' or
+            'holding_registers', default 'coils') and 'verify' (list of units)
+        
+    Returns:
+        Keyword arguments for ModbusClient.broadcast (without the address)
+        
+    Raises:
+        ValueError: If an option is invalid
+    """
+    function_code = parse_function_code(params.get('type', 'coils'))
+    if function_code not in (READ_COILS, READ_HOLDING_REGISTERS):
+        raise ValueError("Only coils and holding_registers can be broadcast")
+    if 'values' in params:
+        values = params['values']
+        if not isinstance(values, list) or not values:
+            raise ValueError("values must be a non-empty list")
+    elif 'value' in params:
+        values = params['value']
+    else:
+        raise ValueError("Missing value parameter")
+    verify = params.get('verify') or []
+    if not isinstance(verify, list):
+        raise ValueError("verify must be a list of unit IDs")
+    return {
+        'function_code': function_code,
+        'values': values,
+        'verify_units': [int(unit) for unit in verify],
+    }
+
+
 @require_flask
 def create_rest_app(port: Optional[str] = None, 
                    baudrate: Optional[int] = None,
@@ -81,18 +180,91 @@ def create_rest_app(port: Optional[str] = None,
         log.setLevel(logging.ERROR)
     
     # Create Modbus client
+    parity = 'N'
     if port is None:
-        port = auto_detect_modbus_port()
-        if port is None:
+        # Open the detected port at the line settings the device answered at
+        device = auto_detect_modbus_device()
+        if device is None:
             logger.error("No Modbus device found! REST API will not work correctly.")
+        else:
+            port, baudrate, parity = device.port, device.baudrate, device.parity
+    
+    # Buses: the default port plus extra buses from MODBUS_BUSES, each owned by its arbiter
+    pool = ModbusClientPool(timeout=timeout)
+    pool.add_client(ModbusClient(port=port, baudrate=baudrate, parity=parity, timeout=timeout))
+    pool.add_from_env()
+    
+    # Open the ports once; clients reconnect lazily after I/O failures
+    pool.connect()
+    
+    # Typed register maps (JSON) for engineering values
+    register_map_path = os.getenv('MODBUS_REGISTER_MAP')
+    register_maps = load_register_maps(register_map_path) if register_map_path else {}
+    
+    # Device profile: when configured, only points it defines may be read or written
+    profile_source = os.getenv('MODBUS_PROFILE')
+    profile = load_profile(profile_source) if profile_source else None
+    devices = {}
     
-    modbus_client = ModbusClient(port=port, baudrate=baudrate, timeout=timeout)
+    # Background poller over MODBUS_POLL_UNITS (e.g. 1-30) on the default bus, poll lane
+    poll_units = os.getenv('MODBUS_POLL_UNITS')
+    poller = None
+    if poll_units:
+        poller = create_poller(pool.get().for_lane(LANE_POLL), parse_units(poll_units), profile)
+        poller.start()
     
-    @app.before_request
-    def connect_modbus():
-        """Connect to Modbus device before each request"""
-        if not hasattr(modbus_client, '_connected') or not modbus_client._connected:
-            modbus_client.connect()
+    # Rebind buses to re-enumerated USB adapters (MODBUS_HOTPLUG=true)
+    watcher = None
+    if os.getenv('MODBUS_HOTPLUG', 'false').lower() == 'true':
+        watcher = HotplugWatcher()
+        for name in pool.names():
+            watcher.watch(pool.get(name))
+        watcher.start()
+    
+    def get_device(unit):
+        """Return the profile compiled for a unit (compiled once per unit)"""
+        device = devices.get(unit)
+        if device is None:
+            device = devices[unit] = profile.compile(unit)
+        return device
+    
+    def check_points(function_code, address, count=1, write=False):
+        """Abort with 400 if a profile is configured and does not define (or allow writing) the points"""
+        if profile is None:
+            return
+        try:
+            if write:
+                get_device(1).validate_write(function_code, address, count)
+            else:
+                get_device(1).validate_read(function_code, address, count)
+        except ValueError as e:
+            abort(make_response(jsonify({'error': str(e)}), 400))
+    
+    def resolve_bus(bus):
+        """Return the client of a bus (default bus if not given), abort with 404 if unknown"""
+        bus_client = pool.get(bus)
+        if bus_client is None:
+            abort(make_response(jsonify({'error': f'Unknown bus: {bus}'}), 404))
+        return bus_client
+    
+    def read_cached(bus_client, function_code, address, count, unit):
+        """
+        Read points from the bus, or from the process image when ?max_age= is given
+        
+        Returns:
+            Tuple of values (None if error) and process image info (None for bus reads)
+        """
+        max_age = request.args.get('max_age', type=float)
+        if max_age is None:
+            return getattr(bus_client, READ_METHODS[function_code])(address, count, unit), None
+        snapshot = bus_client.image.fetch(bus_client, function_code, address, count, unit, max_age)
+        if snapshot is None:
+            return None, None
+        return snapshot.values, {
+            'age': round(snapshot.age, 3),
+            'quality': snapshot.quality,
+            'version': snapshot.version
+        }
     
     @app.after_request
     def add_cors_headers(response):
@@ -102,20 +274,95 @@ def create_rest_app(port: Optional[str] = None,
         response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
         return response
     
+    @app.route('/api/buses', methods=['GET'])
+    def get_buses():
+        """List buses with their connection state and arbiter statistics"""
+        return jsonify(pool.get_stats())
+    
     @app.route('/api/status', methods=['GET'])
     def get_status():
-        """Get Modbus connection status"""
+        """Get Modbus connection status (from client state, without probing the bus)"""
+        bus_client = resolve_bus(request.args.get('bus'))
+        state = bus_client.get_state()
         return jsonify({
-            'connected': hasattr(modbus_client, '_connected') and modbus_client._connected,
-            'port': modbus_client.port,
-            'baudrate': modbus_client.baudrate
+            'connected': bus_client.is_connected(),
+            'status': state['state'],
+            'port': state['port'],
+            'baudrate': state['baudrate'],
+            'connection': state
         })
     
+    @app.route('/api/bus/stats', methods=['GET'])
+    def get_bus_stats():
+        """Get bus arbiter queue depth and wait-time statistics"""
+        bus_client = resolve_bus(request.args.get('bus'))
+        return jsonify(bus_client.arbiter.get_stats())
+    
+    @app.route('/api/bus/timing', methods=['GET'])
+    def get_bus_timing():
+        """Get RTU timing parameters and per-transaction wire vs wall time"""
+        bus_client = resolve_bus(request.args.get('bus'))
+        return jsonify(bus_client.get_timing())
+    
+    @app.route('/api/bus/timeouts', methods=['GET'])
+    def get_bus_timeouts():
+        """Get timeouts learned per unit and function code"""
+        bus_client = resolve_bus(request.args.get('bus'))
+        return jsonify(bus_client.get_timeouts())
+    
+    @app.route('/api/bus/health', methods=['GET'])
+    def get_bus_health():
+        """Get retry counters and per-unit circuit breaker states"""
+        bus_client = resolve_bus(request.args.get('bus'))
+        return jsonify(bus_client.get_health())
+    
+    @app.route('/api/trace', methods=['GET'])
+    def get_trace():
+        """Get recent transaction records (enabled with MODBUS_TRACE_BUFFER)"""
+        buffer = trace_buffer()
+        if buffer is None:
+            return jsonify({'enabled': False, 'records': []})
+        limit = request.args.get('limit', default=100, type=int)
+        errors_only = request.args.get('errors', 'false').lower() in ('1', 'true')
+        records = buffer.records(limit, errors_only=errors_only)
+        return jsonify({
+            'enabled': True,
+            'size': buffer.size,
+            'records': [record.to_dict() for record in records]
+        })
+    
+    @app.route('/api/image', methods=['GET'])
+    @app.route('/api/image/<int:unit>', methods=['GET'])
+    def get_process_image(unit=None):
+        """Get last known point values with age and quality"""
+        bus_client = resolve_bus(request.args.get('bus'))
+        return jsonify({
+            'port': bus_client.port,
+            'stale_after': bus_client.image.stale_after,
+            'units': bus_client.image.to_dict(unit)
+        })
+    
+    @app.route('/api/poller', methods=['GET'])
+    def get_poller():
+        """Get poller cycle time and per-unit health"""
+        if poller is None:
+            return jsonify({'error': 'No poller configured (MODBUS_POLL_UNITS)'}), 404
+        return jsonify(poller.get_stats())
+    
+    @app.route('/api/hotplug', methods=['GET'])
+    def get_hotplug():
+        """Get adapter nodes and recent rebinds of the hotplug watcher"""
+        if watcher is None:
+            return jsonify({'error': 'Hotplug watcher not enabled (MODBUS_HOTPLUG)'}), 404
+        return jsonify(watcher.get_stats())
+    
     @app.route('/api/coils/<int:address>', methods=['GET'])
     def read_coil(address):
         """Read single coil"""
         unit = request.args.get('unit', default=1, type=int)
-        result = modbus_client.read_coils(address, 1, unit)
+        check_points(READ_COILS, address)
+        bus_client = resolve_bus(request.args.get('bus'))
+        result = bus_client.read_coils(address, 1, unit)
         
         if result is None:
             return jsonify({'error': 'Failed to read coil'}), 500
@@ -129,20 +376,34 @@ def create_rest_app(port: Optional[str] = None,
     
     @app.route('/api/coils/<int:address>/<int:count>', methods=['GET'])
     def read_coils(address, count):
-        """Read multiple coils"""
+        """Read multiple coils (?format=hex|base64 for a packed bitmask)"""
         unit = request.args.get('unit', default=1, type=int)
-        result = modbus_client.read_coils(address, count, unit)
+        check_points(READ_COILS, address, count)
+        try:
+            fmt = bit_format(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        bus_client = resolve_bus(request.args.get('bus'))
+        if fmt != FORMAT_VERBOSE:
+            mask = bus_client.read_coils_mask(address, count, unit)
+            if mask is None:
+                return jsonify({'error': 'Failed to read coils'}), 500
+            return jsonify(dict(mask.to_dict(fmt), unit=unit))
+        result, image_info = read_cached(bus_client, READ_COILS, address, count, unit)
         
         if result is None:
             return jsonify({'error': 'Failed to read coils'}), 500
             
-        return jsonify({
+        response = {
             'address': address,
             'count': count,
             'values': result,
             'values_dict': {str(i): val for i, val in enumerate(result, address)},
             'unit': unit
-        })
+        }
+        if image_info:
+            response['image'] = image_info
+        return jsonify(response)
     
     @app.route('/api/coils/<int:address>', methods=['POST'])
     def write_coil(address):
@@ -162,8 +423,10 @@ def create_rest_app(port: Optional[str] = None,
             value = bool(value)
             
         unit = data.get('unit', 1)
+        check_points(READ_COILS, address, write=True)
+        bus_client = resolve_bus(data.get('bus'))
         
-        if modbus_client.write_coil(address, value, unit):
+        if bus_client.write_coil(address, value, unit):
             return jsonify({
                 'success': True,
                 'address': address,
@@ -178,9 +441,11 @@ def create_rest_app(port: Optional[str] = None,
     def toggle_coil(address):
         """Toggle coil state"""
         unit = request.args.get('unit', default=1, type=int)
+        check_points(READ_COILS, address, write=True)
+        bus_client = resolve_bus(request.args.get('bus'))
         
         # Read current state
-        result = modbus_client.read_coils(address, 1, unit)
+        result = bus_client.read_coils(address, 1, unit)
         if result is None:
             return jsonify({'error': 'Failed to read coil'}), 500
             
@@ -188,7 +453,7 @@ def create_rest_app(port: Optional[str] = None,
         current_state = result[0]
         new_state = not current_state
         
-        if modbus_client.write_coil(address, new_state, unit):
+        if bus_client.write_coil(address, new_state, unit):
             return jsonify({
                 'success': True,
                 'address': address,
@@ -203,38 +468,64 @@ def create_rest_app(port: Optional[str] = None,
     
     @app.route('/api/discrete_inputs/<int:address>/<int:count>', methods=['GET'])
     def read_discrete_inputs(address, count):
-        """Read discrete inputs"""
+        """Read discrete inputs (?format=hex|base64 for a packed bitmask)"""
         unit = request.args.get('unit', default=1, type=int)
-        result = modbus_client.read_discrete_inputs(address, count, unit)
+        check_points(READ_DISCRETE_INPUTS, address, count)
+        try:
+            fmt = bit_format(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        bus_client = resolve_bus(request.args.get('bus'))
+        if fmt != FORMAT_VERBOSE:
+            mask = bus_client.read_discrete_inputs_mask(address, count, unit)
+            if mask is None:
+                return jsonify({'error': 'Failed to read discrete inputs'}), 500
+            return jsonify(dict(mask.to_dict(fmt), unit=unit))
+        result, image_info = read_cached(bus_client, READ_DISCRETE_INPUTS, address, count, unit)
         
         if result is None:
             return jsonify({'error': 'Failed to read discrete inputs'}), 500
             
-        return jsonify({
+        response = {
             'address': address,
             'count': count,
             'values': result,
             'values_dict': {str(i): val for i, val in enumerate(result, address)},
             'unit': unit
-        })
+        }
+        if image_info:
+            response['image'] = image_info
+        return jsonify(response)
     
     @app.route('/api/holding_registers/<int:address>/<int:count>', methods=['GET'])
     def read_holding_registers(address, count):
-        """Read holding registers"""
+        """Read holding registers (decoded to engineering values with ?type=)"""
         unit = request.args.get('unit', default=1, type=int)
-        result = modbus_client.read_holding_registers(address, count, unit)
+        check_points(READ_HOLDING_REGISTERS, address, count)
+        try:
+            options = decode_options(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        bus_client = resolve_bus(request.args.get('bus'))
+        result, image_info = read_cached(bus_client, READ_HOLDING_REGISTERS, address, count, unit)
         
         if result is None:
             return jsonify({'error': 'Failed to read holding registers'}), 500
             
-        return jsonify({
+        response = {
             'address': address,
             'count': count,
             'values': result,
             'values_dict': {str(i): val for i, val in enumerate(result, address)},
             'hex_values': [f"0x{val:04X}" for val in result],
             'unit': unit
-        })
+        }
+        if options:
+            response['decoded'] = decode_array(result, **options)
+            response['decoding'] = options
+        if image_info:
+            response['image'] = image_info
+        return jsonify(response)
     
     @app.route('/api/holding_registers/<int:address>', methods=['POST'])
     def write_holding_register(address):
@@ -248,8 +539,10 @@ def create_rest_app(port: Optional[str] = None,
             
         value = int(data['value'])
         unit = data.get('unit', 1)
+        check_points(READ_HOLDING_REGISTERS, address, write=True)
+        bus_client = resolve_bus(data.get('bus'))
         
-        if modbus_client.write_register(address, value, unit):
+        if bus_client.write_register(address, value, unit):
             return jsonify({
                 'success': True,
                 'address': address,
@@ -262,29 +555,197 @@ def create_rest_app(port: Optional[str] = None,
     
     @app.route('/api/input_registers/<int:address>/<int:count>', methods=['GET'])
     def read_input_registers(address, count):
-        """Read input registers"""
+        """Read input registers (decoded to engineering values with ?type=)"""
         unit = request.args.get('unit', default=1, type=int)
-        result = modbus_client.read_input_registers(address, count, unit)
+        check_points(READ_INPUT_REGISTERS, address, count)
+        try:
+            options = decode_options(request.args)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        bus_client = resolve_bus(request.args.get('bus'))
+        result, image_info = read_cached(bus_client, READ_INPUT_REGISTERS, address, count, unit)
         
         if result is None:
             return jsonify({'error': 'Failed to read input registers'}), 500
             
-        return jsonify({
+        response = {
             'address': address,
             'count': count,
             'values': result,
             'values_dict': {str(i): val for i, val in enumerate(result, address)},
             'hex_values': [f"0x{val:04X}" for val in result],
             'unit': unit
+        }
+        if options:
+            response['decoded'] = decode_array(result, **options)
+            response['decoding'] = options
+        if image_info:
+            response['image'] = image_info
+        return jsonify(response)
+    
+    @app.route('/api/maps', methods=['GET'])
+    def get_register_maps():
+        """List configured register maps"""
+        return jsonify({name: register_map.to_dict() for name, register_map in register_maps.items()})
+    
+    @app.route('/api/values/<name>', methods=['GET'])
+    def read_values(name):
+        """Read a register map and return engineering values"""
+        register_map = register_maps.get(name)
+        if register_map is None:
+            return jsonify({'error': f'Unknown register map: {name}'}), 404
+        unit = request.args.get('unit', default=register_map.unit, type=int)
+        bus_client = resolve_bus(request.args.get('bus'))
+        values = register_map.read(bus_client, unit)
+        
+        if values is None:
+            return jsonify({'error': f'Failed to read register map {name}'}), 500
+            
+        return jsonify({
+            'map': name,
+            'unit': unit,
+            'values': values,
+            'units': {field.name: field.units for field in register_map.fields if field.units}
+        })
+    
+    @app.route('/api/profile', methods=['GET'])
+    def get_profile():
+        """Get the device profile loaded from MODBUS_PROFILE"""
+        if profile is None:
+            return jsonify({'error': 'No device profile configured (MODBUS_PROFILE)'}), 404
+        return jsonify(profile.to_dict())
+    
+    @app.route('/api/device', methods=['GET'])
+    def read_device():
+        """Read the points of the device profile and return engineering values"""
+        if profile is None:
+            return jsonify({'error': 'No device profile configured (MODBUS_PROFILE)'}), 404
+        unit = request.args.get('unit', default=1, type=int)
+        names = request.args.get('points')
+        bus_client = resolve_bus(request.args.get('bus'))
+        try:
+            values = get_device(unit).read(bus_client, names.split(',') if names else None)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return jsonify({
+            'profile': profile.name,
+            'unit': unit,
+            'success': all(value is not None for value in values.values()),
+            'values': values
+        })
+    
+    @app.route('/api/device/<name>', methods=['POST'])
+    def write_device_point(name):
+        """Write a point of the device profile"""
+        if profile is None:
+            return jsonify({'error': 'No device profile configured (MODBUS_PROFILE)'}), 404
+        data = request.get_json()
+        if data is None or 'value' not in data:
+            return jsonify({'error': 'Missing value parameter'}), 400
+        unit = data.get('unit', 1)
+        bus_client = resolve_bus(data.get('bus'))
+        try:
+            success = get_device(unit).write(bus_client, name, data['value'])
+        except (ValueError, TypeError, struct.error) as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if success:
+            return jsonify({'success': True, 'point': name, 'value': data['value'], 'unit': unit})
+        else:
+            return jsonify({'error': f'Failed to write point {name}'}), 500
+    
+    @app.route('/api/read', methods=['POST'])
+    def read_points():
+        """Read many points in as few Modbus transactions as possible, buses in parallel"""
+        data = request.get_json()
+        if data is None or not isinstance(data.get('points'), list):
+            return jsonify({'error': 'Missing points list'}), 400
+            
+        try:
+            points = [
+                BusReadRequest(
+                    point.get('bus', data.get('bus')),
+                    parse_function_code(point.get('type', point.get('function_code'))),
+                    int(point['address']),
+                    int(point.get('count', 1)),
+                    int(point.get('unit', data.get('unit', 1)))
+                )
+                for point in data['points']
+            ]
+        except (KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': f'Invalid point definition: {e}'}), 400
+            
+        unknown = sorted({str(point.bus) for point in points if pool.get(point.bus) is None})
+        if unknown:
+            return jsonify({'error': f"Unknown bus: {', '.join(unknown)}"}), 404
+            
+        planner = ReadPlanner()
+        results = pool.read_many(points, planner)
+        stats = planner.get_stats()
+        
+        return jsonify({
+            'success': all(result is not None for result in results),
+            'results': [
+                {
+                    'bus': point.bus,
+                    'function_code': point.function_code,
+                    'address': point.address,
+                    'count': point.count,
+                    'unit': point.unit,
+                    'values': result
+                }
+                for point, result in zip(points, results)
+            ],
+            'transactions': stats['transactions'],
+            'transactions_saved': stats['saved']
+        })
+    
+    @app.route('/api/broadcast/<int:address>', methods=['POST'])
+    def broadcast_write(address):
+        """Write coils or holding registers on every unit at once (unit 0)"""
+        data = request.get_json()
+        if data is None:
+            return jsonify({'error': 'Invalid JSON data'}), 400
+        try:
+            options = broadcast_options(data)
+        except (ValueError, TypeError) as e:
+            return jsonify({'error': str(e)}), 400
+        bus_client = resolve_bus(data.get('bus'))
+        
+        result = bus_client.broadcast(options['function_code'], address, options['values'],
+                                      options['verify_units'])
+        if not result['sent']:
+            return jsonify({'error': f'Failed to broadcast write to {address}'}), 500
+        return jsonify({
+            'success': all(result['verified'].values()),
+            'address': address,
+            'values': options['values'],
+            'verified': {str(unit): ok for unit, ok in result['verified'].items()}
         })
     
     @app.route('/api/scan', methods=['GET'])
     def scan_devices():
-        """Scan for Modbus devices"""
-        port = auto_detect_modbus_port()
+        """Sweep unit IDs on every serial bus at once and return the device inventory"""
+        inventory = Inventory()
+        if request.args.get('cached', 'false').lower() == 'true':
+            return jsonify({'success': True, 'buses': inventory.to_dict()})
+        try:
+            units = parse_units(request.args['units']) if 'units' in request.args else None
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        map_ranges = request.args.get('ranges', 'true').lower() == 'true'
+        
+        # Each sweep is one job on its bus's arbiter, so buses are swept in parallel
+        buses = [pool.get(name) for name in pool.names()]
+        buses = [bus_client for bus_client in buses if not bus_client.endpoint.is_network]
+        with ThreadPoolExecutor(max_workers=max(1, len(buses))) as executor:
+            records = [record for record in executor.map(
+                lambda bus_client: bus_client.discover(units, map_ranges), buses) if record]
+        inventory.update(records)
         return jsonify({
-            'success': port is not None,
-            'port': port
+            'success': any(record['units'] for record in records),
+            'buses': {record['port']: record for record in records}
         })
     
     @app.route('/api/docs', methods=['GET'])
@@ -292,63 +753,163 @@ def create_rest_app(port: Optional[str] = None,
         """Get API documentation"""
         return jsonify({
             'endpoints': [
+                {
+                    'path': '/api/buses',
+                    'method': 'GET',
+                    'description': 'List buses with connection state and arbiter statistics'
+                },
                 {
                     'path': '/api/status',
                     'method': 'GET',
-                    'description': 'Get Modbus connection status'
+                    'description': 'Get Modbus connection status',
+                    'params': ['bus (query, optional)']
+                },
+                {
+                    'path': '/api/bus/stats',
+                    'method': 'GET',
+                    'description': 'Get bus arbiter queue and wait-time statistics'
+                },
+                {
+                    'path': '/api/bus/timing',
+                    'method': 'GET',
+                    'description': 'Get RTU timing and wire vs wall time per transaction'
+                },
+                {
+                    'path': '/api/bus/timeouts',
+                    'method': 'GET',
+                    'description': 'Get timeouts learned per unit and function code'
+                },
+                {
+                    'path': '/api/bus/health',
+                    'method': 'GET',
+                    'description': 'Get retry counters and per-unit circuit breaker states'
+                },
+                {
+                    'path': '/api/image[/<unit>]',
+                    'method': 'GET',
+                    'description': 'Get last known point values with age and quality (process image)'
+                },
+                {
+                    'path': '/api/trace',
+                    'method': 'GET',
+                    'description': 'Get recent transaction records (?limit=, ?errors=true)'
+                },
+                {
+                    'path': '/api/poller',
+                    'method': 'GET',
+                    'description': 'Get poller cycle time, per-unit last good poll and missed deadlines'
+                },
+                {
+                    'path': '/api/hotplug',
+                    'method': 'GET',
+                    'description': 'Get serial adapter nodes and clients rebound after re-enumeration'
                 },
                 {
                     'path': '/api/coils/<address>',
                     'method': 'GET',
                     'description': 'Read single coil',
-                    'params': ['unit (query, optional)']
+                    'params': ['unit (query, optional)', 'bus (query, optional)']
                 },
                 {
                     'path': '/api/coils/<address>/<count>',
                     'method': 'GET',
                     'description': 'Read multiple coils',
-                    'params': ['unit (query, optional)']
+                    'params': ['unit (query, optional)', 'bus (query, optional)',
+                               'format=verbose|hex|base64 (query, optional)',
+                               'max_age (query, optional, seconds: serve from process image)']
                 },
                 {
                     'path': '/api/coils/<address>',
                     'method': 'POST',
                     'description': 'Write single coil',
-                    'body': {'value': 'boolean/int/string', 'unit': 'int (optional)'}
+                    'body': {'value': 'boolean/int/string', 'unit': 'int (optional)', 'bus': 'string (optional)'}
                 },
                 {
                     'path': '/api/toggle/<address>',
                     'method': 'POST',
                     'description': 'Toggle coil state',
-                    'params': ['unit (query, optional)']
+                    'params': ['unit (query, optional)', 'bus (query, optional)']
                 },
                 {
                     'path': '/api/discrete_inputs/<address>/<count>',
                     'method': 'GET',
                     'description': 'Read discrete inputs',
-                    'params': ['unit (query, optional)']
+                    'params': ['unit (query, optional)', 'bus (query, optional)',
+                               'format=verbose|hex|base64 (query, optional)',
+                               'max_age (query, optional, seconds: serve from process image)']
                 },
                 {
                     'path': '/api/holding_registers/<address>/<count>',
                     'method': 'GET',
                     'description': 'Read holding registers',
-                    'params': ['unit (query, optional)']
+                    'params': ['unit (query, optional)', 'bus (query, optional)',
+                               'type, byte_order, word_order, scale, offset (query, optional)',
+                               'max_age (query, optional, seconds: serve from process image)']
                 },
                 {
                     'path': '/api/holding_registers/<address>',
                     'method': 'POST',
                     'description': 'Write holding register',
-                    'body': {'value': 'int', 'unit': 'int (optional)'}
+                    'body': {'value': 'int', 'unit': 'int (optional)', 'bus': 'string (optional)'}
                 },
                 {
                     'path': '/api/input_registers/<address>/<count>',
                     'method': 'GET',
                     'description': 'Read input registers',
-                    'params': ['unit (query, optional)']
+                    'params': ['unit (query, optional)', 'bus (query, optional)',
+                               'type, byte_order, word_order, scale, offset (query, optional)',
+                               'max_age (query, optional, seconds: serve from process image)']
+                },
+                {
+                    'path': '/api/maps',
+                    'method': 'GET',
+                    'description': 'List register maps loaded from MODBUS_REGISTER_MAP'
+                },
+                {
+                    'path': '/api/values/<map>',
+                    'method': 'GET',
+                    'description': 'Read a register map and return engineering values',
+                    'params': ['unit (query, optional)', 'bus (query, optional)']
+                },
+                {
+                    'path': '/api/profile',
+                    'method': 'GET',
+                    'description': 'Get the device profile loaded from MODBUS_PROFILE'
+                },
+                {
+                    'path': '/api/device',
+                    'method': 'GET',
+                    'description': 'Read the points of the device profile as engineering values',
+                    'params': ['points (query, optional, comma separated)', 'unit (query, optional)',
+                               'bus (query, optional)']
+                },
+                {
+                    'path': '/api/device/<point>',
+                    'method': 'POST',
+                    'description': 'Write a writable point of the device profile',
+                    'body': {'value': 'engineering value', 'unit': 'int (optional)', 'bus': 'string (optional)'}
+                },
+                {
+                    'path': '/api/read',
+                    'method': 'POST',
+                    'description': 'Read many points with coalesced block reads',
+                    'body': {'points': 'list of {type, address, count (optional), unit (optional), bus (optional)}'}
+                },
+                {
+                    'path': '/api/broadcast/<address>',
+                    'method': 'POST',
+                    'description': 'Write coils or holding registers on all units (unit 0, no response)',
+                    'body': {'type': 'coils|holding_registers (optional)', 'value': 'single value',
+                             'values': 'list (instead of value)',
+                             'verify': 'list of units to read back (optional)', 'bus': 'string (optional)'}
                 },
                 {
                     'path': '/api/scan',
                     'method': 'GET',
-                    'description': 'Scan for Modbus devices'
+                    'description': 'Sweep unit IDs 1-247 on every serial bus and return the inventory '
+                                   '(units and address range per table)',
+                    'params': ['units (query, optional, e.g. 1-50)', 'ranges=false (query, optional: units only)',
+                               'cached=true (query, optional: last inventory without sweeping)']
                 }
             ]
         })
@@ -388,20 +949,48 @@ def start_mqtt_broker(port: Optional[str] = None,
         password: MQTT password (default: None)
     """
     # Create Modbus client
+    parity = 'N'
     if port is None:
-        port = auto_detect_modbus_port()
-        if port is None:
+        device = auto_detect_modbus_device()
+        if device is None:
             logger.error("No Modbus device found! MQTT API will not work correctly.")
             return None
+        port, baudrate, parity = device.port, device.baudrate, device.parity
     
-    modbus_client = ModbusClient(port=port, baudrate=baudrate, timeout=timeout)
-    if not modbus_client.connect():
+    # Buses: the default port plus extra buses from MODBUS_BUSES
+    pool = ModbusClientPool(timeout=timeout)
+    default_bus = pool.add_client(ModbusClient(port=port, baudrate=baudrate, parity=parity, timeout=timeout))
+    pool.add_from_env()
+    modbus_client = pool.get()
+    if not pool.connect().get(default_bus):
         logger.error(f"Failed to connect to Modbus device on {port}")
         return None
     
+    # Typed register maps (JSON) for engineering values
+    register_map_path = os.getenv('MODBUS_REGISTER_MAP')
+    register_maps = load_register_maps(register_map_path) if register_map_path else {}
+    
     # Create MQTT client
     client = mqtt.Client(client_id=client_id)
     
+    # Background poller over MODBUS_POLL_UNITS, statistics published after every cycle
+    poll_units = os.getenv('MODBUS_POLL_UNITS')
+    poller = None
+    if poll_units:
+        poller = create_poller(
+            modbus_client.for_lane(LANE_POLL), parse_units(poll_units),
+            on_cycle=lambda stats: client.publish(f"{mqtt_topic_prefix}/poller", json.dumps(stats), qos=0)
+        )
+    
+    # Rebind buses to re-enumerated USB adapters, changes published to {prefix}/hotplug
+    watcher = None
+    if os.getenv('MODBUS_HOTPLUG', 'false').lower() == 'true':
+        watcher = HotplugWatcher(
+            on_change=lambda change: client.publish(f"{mqtt_topic_prefix}/hotplug", json.dumps(change), qos=1)
+        )
+        for name in pool.names():
+            watcher.watch(pool.get(name))
+    
     # Set username and password if provided
     if username and password:
         client.username_pw_set(username, password)
@@ -419,7 +1008,8 @@ def start_mqtt_broker(port: Optional[str] = None,
             json.dumps({
                 'connected': True,
                 'port': modbus_client.port,
-                'baudrate': modbus_client.baudrate
+                'baudrate': modbus_client.baudrate,
+                'buses': pool.names()
             }),
             qos=1,
             retain=True
@@ -434,13 +1024,15 @@ def start_mqtt_broker(port: Optional[str] = None,
         
         # Parse command from topic
         # Format: modbus/command/<command_type>/<address>[/<count>]
+        #         modbus/command/broadcast/<address>
+        #         modbus/command/read_values/<register map>
         parts = topic.split('/')
         if len(parts) < 4:
             logger.error(f"Invalid topic format: {topic}")
             return
             
         command_type = parts[2]
-        address = int(parts[3])
+        address = int(parts[3]) if command_type != 'read_values' else None
         
         try:
             # Parse payload as JSON
@@ -449,9 +1041,25 @@ def start_mqtt_broker(port: Optional[str] = None,
             
             response_topic = topic.replace('command', 'response')
             
+            # Optional 'bus' selects the bus by name or port (default bus otherwise)
+            bus_client = pool.get(data.get('bus'))
+            if bus_client is None:
+                client.publish(response_topic, json.dumps({'error': f"Unknown bus: {data.get('bus')}"}), qos=1)
+                return
+            
             if command_type == 'read_coil':
                 count = int(parts[4]) if len(parts) > 4 else 1
-                result = modbus_client.read_coils(address, count, unit)
+                fmt = bit_format(data)
+                if fmt != FORMAT_VERBOSE:
+                    # Packed bitmask instead of one JSON bool per point
+                    mask = bus_client.read_coils_mask(address, count, unit)
+                    if mask is not None:
+                        response = dict(mask.to_dict(fmt), success=True, unit=unit)
+                    else:
+                        response = {'error': 'Failed to read coils'}
+                    client.publish(response_topic, json.dumps(response), qos=1)
+                    return
+                result = bus_client.read_coils(address, count, unit)
                 
                 if result is not None:
                     response = {
@@ -479,7 +1087,7 @@ def start_mqtt_broker(port: Optional[str] = None,
                 else:
                     value = bool(value)
                     
-                if modbus_client.write_coil(address, value, unit):
+                if bus_client.write_coil(address, value, unit):
                     response = {
                         'success': True,
                         'address': address,
@@ -494,7 +1102,7 @@ def start_mqtt_broker(port: Optional[str] = None,
                 
             elif command_type == 'toggle_coil':
                 # Read current state
-                result = modbus_client.read_coils(address, 1, unit)
+                result = bus_client.read_coils(address, 1, unit)
                 if result is None:
                     response = {'error': 'Failed to read coil'}
                     client.publish(response_topic, json.dumps(response), qos=1)
@@ -504,7 +1112,7 @@ def start_mqtt_broker(port: Optional[str] = None,
                 current_state = result[0]
                 new_state = not current_state
                 
-                if modbus_client.write_coil(address, new_state, unit):
+                if bus_client.write_coil(address, new_state, unit):
                     response = {
                         'success': True,
                         'address': address,
@@ -521,7 +1129,17 @@ def start_mqtt_broker(port: Optional[str] = None,
                 
             elif command_type == 'read_discrete_input':
                 count = int(parts[4]) if len(parts) > 4 else 1
-                result = modbus_client.read_discrete_inputs(address, count, unit)
+                fmt = bit_format(data)
+                if fmt != FORMAT_VERBOSE:
+                    # Packed bitmask instead of one JSON bool per point
+                    mask = bus_client.read_discrete_inputs_mask(address, count, unit)
+                    if mask is not None:
+                        response = dict(mask.to_dict(fmt), success=True, unit=unit)
+                    else:
+                        response = {'error': 'Failed to read discrete inputs'}
+                    client.publish(response_topic, json.dumps(response), qos=1)
+                    return
+                result = bus_client.read_discrete_inputs(address, count, unit)
                 
                 if result is not None:
                     response = {
@@ -539,7 +1157,8 @@ def start_mqtt_broker(port: Optional[str] = None,
                 
             elif command_type == 'read_holding_register':
                 count = int(parts[4]) if len(parts) > 4 else 1
-                result = modbus_client.read_holding_registers(address, count, unit)
+                options = decode_options(data)
+                result = bus_client.read_holding_registers(address, count, unit)
                 
                 if result is not None:
                     response = {
@@ -551,6 +1170,8 @@ def start_mqtt_broker(port: Optional[str] = None,
                         'hex_values': [f"0x{val:04X}" for val in result],
                         'unit': unit
                     }
+                    if options:
+                        response['decoded'] = decode_array(result, **options)
                 else:
                     response = {'error': 'Failed to read holding registers'}
                     
@@ -564,7 +1185,7 @@ def start_mqtt_broker(port: Optional[str] = None,
                     
                 value = int(value)
                 
-                if modbus_client.write_register(address, value, unit):
+                if bus_client.write_register(address, value, unit):
                     response = {
                         'success': True,
                         'address': address,
@@ -579,7 +1200,8 @@ def start_mqtt_broker(port: Optional[str] = None,
                 
             elif command_type == 'read_input_register':
                 count = int(parts[4]) if len(parts) > 4 else 1
-                result = modbus_client.read_input_registers(address, count, unit)
+                options = decode_options(data)
+                result = bus_client.read_input_registers(address, count, unit)
                 
                 if result is not None:
                     response = {
@@ -591,11 +1213,42 @@ def start_mqtt_broker(port: Optional[str] = None,
                         'hex_values': [f"0x{val:04X}" for val in result],
                         'unit': unit
                     }
+                    if options:
+                        response['decoded'] = decode_array(result, **options)
                 else:
                     response = {'error': 'Failed to read input registers'}
                     
                 client.publish(response_topic, json.dumps(response), qos=1)
                 
+            elif command_type == 'broadcast':
+                options = broadcast_options(data)
+                result = bus_client.broadcast(options['function_code'], address, options['values'],
+                                              options['verify_units'])
+                if result['sent']:
+                    response = {
+                        'success': all(result['verified'].values()),
+                        'address': address,
+                        'values': options['values'],
+                        'verified': {str(unit): ok for unit, ok in result['verified'].items()}
+                    }
+                else:
+                    response = {'error': f'Failed to broadcast write to {address}'}
+                    
+                client.publish(response_topic, json.dumps(response), qos=1)
+                
+            elif command_type == 'read_values':
+                register_map = register_maps.get(parts[3])
+                if register_map is None:
+                    response = {'error': f'Unknown register map: {parts[3]}'}
+                else:
+                    values = register_map.read(bus_client, data.get('unit', register_map.unit))
+                    if values is not None:
+                        response = {'success': True, 'map': parts[3], 'values': values}
+                    else:
+                        response = {'error': f'Failed to read register map {parts[3]}'}
+                        
+                client.publish(response_topic, json.dumps(response), qos=1)
+                
         except Exception as e:
             logger.error(f"Error processing message: {e}")
             client.publish(
@@ -622,8 +1275,12 @@ def start_mqtt_broker(port: Optional[str] = None,
         except:
             pass
             
-        # Disconnect Modbus client
-        modbus_client.disconnect()
+        # Disconnect Modbus clients
+        if poller is not None:
+            poller.stop()
+        if watcher is not None:
+            watcher.stop()
+        pool.disconnect()
     
     # Set callbacks
     client.on_connect = on_connect
@@ -635,11 +1292,15 @@ def start_mqtt_broker(port: Optional[str] = None,
         client.connect(mqtt_broker, mqtt_port, 60)
     except Exception as e:
         logger.error(f"Failed to connect to MQTT broker: {e}")
-        modbus_client.disconnect()
+        pool.disconnect()
         return None
     
     # Start the loop
     client.loop_start()
+    if poller is not None:
+        poller.start()
+    if watcher is not None:
+        watcher.start()
     
     logger.info(f"MQTT client started, listening on {mqtt_topic_prefix}/command/#")
     
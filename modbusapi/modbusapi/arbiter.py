@@ -0,0 +1,421 @@
+"""
+ModbusAPI Arbiter - Single-owner serial bus access with priority lanes
+"""
+
+import os
+import time
+import queue
+import logging
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Optional, List, Dict, Any, Callable
+
+from .planner import ReadPlanner, ReadRequest
+from .bitmask import BitMask
+from .trace import set_queue_wait
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Priority lanes (lower value is served first)
+LANE_WRITE = 0
+LANE_INTERACTIVE = 1
+LANE_POLL = 2
+
+LANE_NAMES = {
+    LANE_WRITE: 'write',
+    LANE_INTERACTIVE: 'interactive',
+    LANE_POLL: 'poll',
+}
+
+# Default maximum number of queued transactions per lane
+DEFAULT_MAX_DEPTH = {
+    LANE_WRITE: int(os.getenv('MODBUS_ARBITER_WRITE_DEPTH', '64')),
+    LANE_INTERACTIVE: int(os.getenv('MODBUS_ARBITER_INTERACTIVE_DEPTH', '64')),
+    LANE_POLL: int(os.getenv('MODBUS_ARBITER_POLL_DEPTH', '16')),
+}
+
+# Number of recent wait times kept per lane for percentile statistics
+WAIT_SAMPLES = 1000
+
+
+class BusBusyError(Exception):
+    """Raised when a lane's queue is full"""
+
+
+class _LaneStats:
+    """Queue and wait-time statistics of one lane"""
+
+    def __init__(self):
+        self.depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.waits = deque(maxlen=WAIT_SAMPLES)
+
+    def record_wait(self, wait: float):
+        self.completed += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.waits.append(wait)
+
+    def to_dict(self) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return waits[min(len(waits) - 1, int(p * len(waits)))]
+
+        return {
+            'depth': self.depth,
+            'submitted': self.submitted,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'wait_avg': self.total_wait / self.completed if self.completed else 0.0,
+            'wait_p50': percentile(0.50),
+            'wait_p95': percentile(0.95),
+            'wait_max': self.max_wait,
+        }
+
+
+class BusArbiter:
+    """
+    Owner of one serial bus
+
+    All transactions run on a single worker thread, taken from a priority queue:
+    writes first, then interactive reads, then background polling. Within a lane
+    transactions are served in submission order.
+    """
+
+    def __init__(self, name: str, max_depth: Optional[Dict[int, int]] = None):
+        """
+        Initialize bus arbiter
+
+        Args:
+            name: Bus name (usually the serial port path)
+            max_depth: Maximum queued transactions per lane (default: DEFAULT_MAX_DEPTH)
+        """
+        self.name = name
+        self.max_depth = dict(DEFAULT_MAX_DEPTH)
+        if max_depth:
+            self.max_depth.update(max_depth)
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {lane: _LaneStats() for lane in LANE_NAMES}
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._move_listeners: List[Callable[[str, str], None]] = []
+
+    def start(self):
+        """Start the worker thread"""
+        with self._lock:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run, name=f"modbus-arbiter-{self.name}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the worker thread after the queued transactions
+
+        Args:
+            timeout: Maximum time to wait for the worker to finish
+        """
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        # Sentinel sorts after every real transaction
+        self._queue.put((len(LANE_NAMES), next(self._sequence), None))
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def submit(self, func: Callable[..., Any], *args, lane: int = LANE_INTERACTIVE, **kwargs) -> Future:
+        """
+        Queue a transaction
+
+        Args:
+            func: Callable performing the bus transaction
+            args: Positional arguments for func
+            lane: Priority lane (LANE_WRITE, LANE_INTERACTIVE or LANE_POLL)
+            kwargs: Keyword arguments for func
+
+        Returns:
+            Future resolved with the result of func
+
+        Raises:
+            BusBusyError: If the lane's queue is full
+        """
+        if lane not in LANE_NAMES:
+            raise ValueError(f"Unknown lane: {lane}")
+        self.start()
+
+        stats = self._stats[lane]
+        with self._lock:
+            if stats.depth >= self.max_depth[lane]:
+                stats.rejected += 1
+                raise BusBusyError(
+                    f"Bus {self.name}: {LANE_NAMES[lane]} queue full ({stats.depth} pending)"
+                )
+            stats.depth += 1
+            stats.submitted += 1
+
+        future: Future = Future()
+        self._queue.put((lane, next(self._sequence), (func, args, kwargs, future, time.monotonic())))
+        return future
+
+    def call(self, func: Callable[..., Any], *args, lane: int = LANE_INTERACTIVE, **kwargs) -> Any:
+        """
+        Run a transaction on the bus and wait for its result
+
+        Calls made from the worker thread itself run immediately.
+
+        Args:
+            func: Callable performing the bus transaction
+            args: Positional arguments for func
+            lane: Priority lane
+            kwargs: Keyword arguments for func
+
+        Returns:
+            Result of func
+        """
+        if threading.current_thread() is self._thread:
+            return func(*args, **kwargs)
+        return self.submit(func, *args, lane=lane, **kwargs).result()
+
+    def add_move_listener(self, listener: Callable[[str, str], None]):
+        """Call listener(old port, new port) when the bus moves to another port"""
+        with self._lock:
+            if listener not in self._move_listeners:
+                self._move_listeners.append(listener)
+
+    def moved(self, old_port: str, new_port: str):
+        """
+        Register the arbiter under the new port of its bus (e.g. after a rebind)
+
+        Args:
+            old_port: Port the bus was registered under
+            new_port: Port the bus uses now
+        """
+        with _arbiters_lock:
+            if _arbiters.get(old_port) is self:
+                del _arbiters[old_port]
+            other = _arbiters.get(new_port)
+            if other is not None and other is not self:
+                logger.warning(f"Replacing the arbiter of {new_port} with the one moved from {old_port}")
+            _arbiters[new_port] = self
+        with self._lock:
+            if self.name == old_port:
+                self.name = new_port
+            listeners = list(self._move_listeners)
+        for listener in listeners:
+            try:
+                listener(old_port, new_port)
+            except Exception as e:
+                logger.error(f"Error moving {old_port} to {new_port}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return per-lane queue depth and wait-time statistics"""
+        with self._lock:
+            return {
+                'bus': self.name,
+                'running': self._running,
+                'lanes': {LANE_NAMES[lane]: stats.to_dict() for lane, stats in self._stats.items()},
+            }
+
+    def _run(self):
+        """Worker loop executing queued transactions"""
+        while True:
+            lane, _, item = self._queue.get()
+            if item is None:
+                break
+
+            func, args, kwargs, future, enqueued = item
+            wait = time.monotonic() - enqueued
+            with self._lock:
+                stats = self._stats[lane]
+                stats.depth -= 1
+                stats.record_wait(wait)
+            # Picked up by the client's transaction trace
+            set_queue_wait(wait)
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+
+# Arbiters owning each bus, keyed by port
+_arbiters: Dict[str, BusArbiter] = {}
+_arbiters_lock = threading.Lock()
+
+
+def get_arbiter(port: str, max_depth: Optional[Dict[int, int]] = None) -> BusArbiter:
+    """
+    Return the arbiter owning a port, creating it on first use
+
+    Args:
+        port: Serial port path
+        max_depth: Maximum queued transactions per lane for a new arbiter
+
+    Returns:
+        BusArbiter for the port
+    """
+    with _arbiters_lock:
+        arbiter = _arbiters.get(port)
+        if arbiter is None:
+            arbiter = _arbiters[port] = BusArbiter(port, max_depth)
+        return arbiter
+
+
+class ArbitratedClient:
+    """
+    ModbusClient proxy routing every bus call through the port's BusArbiter
+
+    Writes use the write lane and reads use the lane the proxy was created for.
+    Attributes not related to bus access are read from the wrapped client.
+    """
+
+    def __init__(self, client: Any, arbiter: Optional[BusArbiter] = None,
+                 read_lane: int = LANE_INTERACTIVE):
+        """
+        Initialize arbitrated client
+
+        Args:
+            client: ModbusClient (or compatible) instance
+            arbiter: Arbiter to use (default: the arbiter owning client.port)
+            read_lane: Lane used for reads (default: LANE_INTERACTIVE)
+        """
+        self.client = client
+        self.arbiter = arbiter or get_arbiter(str(client.port))
+        self.read_lane = read_lane
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    def for_lane(self, read_lane: int) -> 'ArbitratedClient':
+        """Return a proxy on the same bus issuing reads on another lane"""
+        return ArbitratedClient(self.client, self.arbiter, read_lane)
+
+    def _call(self, method: str, failure: Any, lane: int, *args, **kwargs) -> Any:
+        try:
+            return self.arbiter.call(getattr(self.client, method), *args, lane=lane, **kwargs)
+        except BusBusyError as e:
+            logger.warning(f"Rejected {method}: {e}")
+            return failure
+
+    def connect(self) -> bool:
+        """Connect to Modbus device on the bus owner thread"""
+        return self._call('connect', False, LANE_WRITE)
+
+    def disconnect(self):
+        """Disconnect from Modbus device on the bus owner thread"""
+        return self._call('disconnect', None, LANE_WRITE)
+
+    def rebind(self, port: str, baudrate: Optional[int] = None, parity: Optional[str] = None) -> bool:
+        """Move the client to another port between two transactions, with the bus registries"""
+        try:
+            return self.arbiter.call(self._rebind, port, baudrate, parity, lane=LANE_WRITE)
+        except BusBusyError as e:
+            logger.warning(f"Rejected rebind: {e}")
+            return False
+
+    def _rebind(self, port: str, baudrate: Optional[int], parity: Optional[str]) -> bool:
+        old_port = str(self.client.port)
+        rebound = self.client.rebind(port, baudrate, parity)
+        # The port changes even when the new one cannot be opened yet
+        if str(self.client.port) != old_port:
+            self.arbiter.moved(old_port, str(self.client.port))
+        return rebound
+
+    def discover(self, units=None, map_ranges: bool = True) -> Optional[Dict[str, Any]]:
+        """Sweep unit IDs as one job on the poll lane (other requests wait for it)"""
+        return self._call('discover', None, LANE_POLL, units, map_ranges)
+
+    def read_coils(self, address: int, count: int, unit: int = None) -> Optional[List[bool]]:
+        """Read coils through the arbiter"""
+        return self._call('read_coils', None, self.read_lane, address, count, unit)
+
+    def read_discrete_inputs(self, address: int, count: int, unit: int = 1) -> Optional[List[bool]]:
+        """Read discrete inputs through the arbiter"""
+        return self._call('read_discrete_inputs', None, self.read_lane, address, count, unit)
+
+    def read_coils_mask(self, address: int, count: int, unit: int = None) -> Optional[BitMask]:
+        """Read coils into a bitmask through the arbiter"""
+        return self._call('read_coils_mask', None, self.read_lane, address, count, unit)
+
+    def read_discrete_inputs_mask(self, address: int, count: int, unit: int = 1) -> Optional[BitMask]:
+        """Read discrete inputs into a bitmask through the arbiter"""
+        return self._call('read_discrete_inputs_mask', None, self.read_lane, address, count, unit)
+
+    def read_holding_registers(self, address: int, count: int, unit: int = 1) -> Optional[List[int]]:
+        """Read holding registers through the arbiter"""
+        return self._call('read_holding_registers', None, self.read_lane, address, count, unit)
+
+    def read_input_registers(self, address: int, count: int, unit: int = 1) -> Optional[List[int]]:
+        """Read input registers through the arbiter"""
+        return self._call('read_input_registers', None, self.read_lane, address, count, unit)
+
+    def write_coil(self, address: int, value: bool, unit: int = None) -> bool:
+        """Write single coil through the arbiter"""
+        return self._call('write_coil', False, LANE_WRITE, address, value, unit)
+
+    def write_register(self, address: int, value: int, unit: int = 1) -> bool:
+        """Write single holding register through the arbiter"""
+        return self._call('write_register', False, LANE_WRITE, address, value, unit)
+
+    def write_coils(self, address: int, values: List[bool], unit: int = 1) -> bool:
+        """Write multiple coils through the arbiter"""
+        return self._call('write_coils', False, LANE_WRITE, address, values, unit)
+
+    def write_registers(self, address: int, values: List[int], unit: int = 1) -> bool:
+        """Write multiple holding registers through the arbiter"""
+        return self._call('write_registers', False, LANE_WRITE, address, values, unit)
+
+    def broadcast(self, function_code, address: int, values, verify_units=None) -> Dict[str, Any]:
+        """Broadcast a write, and its readback sweep, as one job on the write lane"""
+        return self._call('broadcast', {'sent': False, 'verified': {}}, LANE_WRITE,
+                          function_code, address, values, verify_units)
+
+    def read_many(self, requests, planner: Optional[ReadPlanner] = None) -> List[Optional[List[Any]]]:
+        """
+        Read many points with coalesced block reads, each block queued separately
+
+        Args:
+            requests: Point reads (ReadRequest instances or equivalent tuples)
+            planner: Planner to use (default: the wrapped client's planner)
+
+        Returns:
+            List of values (or None if error) in the order of the requests
+        """
+        planner = planner or self.client.planner
+        requests = [ReadRequest(*request) for request in requests]
+        results = planner.execute(self, requests)
+        return [results.get(request) for request in requests]
+
+
+def arbitrate(client: Any, read_lane: int = LANE_INTERACTIVE) -> ArbitratedClient:
+    """
+    Wrap a client so all its bus calls go through the arbiter owning its port
+
+    Args:
+        client: ModbusClient (or compatible) instance
+        read_lane: Lane used for reads (default: LANE_INTERACTIVE)
+
+    Returns:
+        ArbitratedClient proxy
+    """
+    if isinstance(client, ArbitratedClient):
+        return client.for_lane(read_lane)
+    return ArbitratedClient(client, read_lane=read_lane)
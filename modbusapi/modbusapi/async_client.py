@@ -0,0 +1,452 @@
+"""
+ModbusAPI Async Client - asyncio-native Modbus RTU communication
+"""
+
+import os
+import asyncio
+import logging
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Tuple
+
+try:
+    from pymodbus.client.serial import AsyncModbusSerialClient
+except ImportError:
+    raise ImportError(
+        "pymodbus library not found! Install with: pip install pymodbus[serial]"
+    )
+
+from .planner import ReadPlanner, ReadRequest, READ_METHODS, READ_COILS, READ_DISCRETE_INPUTS
+from .bitmask import BitMask
+from .transport import parse_endpoint, create_async_client
+from .timing import METHOD_FUNCTION_CODES
+from .image import get_image
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+BIT_FUNCTION_CODES = (READ_COILS, READ_DISCRETE_INPUTS)
+
+
+class _PortQueue:
+    """
+    Transaction queue serialising every bus transaction on one serial port
+
+    Also owns the pymodbus client of the port: every AsyncModbusClient of the
+    port in one event loop shares it, so the port is opened only once.
+    """
+
+    def __init__(self, port: str):
+        self.port = port
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.worker: Optional[asyncio.Task] = None
+        self.users = 0
+        self.client = None
+        self._opening = asyncio.Lock()
+
+    def start(self):
+        """Start the worker task if it is not running"""
+        if self.worker is None or self.worker.done():
+            self.worker = asyncio.ensure_future(self._run())
+
+    async def open(self, factory: Callable[[], Any]) -> Any:
+        """
+        Return the connected client of the port, creating it on first use
+
+        Args:
+            factory: Creates the pymodbus client (used when none is connected)
+
+        Returns:
+            pymodbus async client (check ``connected``)
+        """
+        async with self._opening:
+            if self.client is None or not self.client.connected:
+                if self.client is not None:
+                    await self.client.close()
+                self.client = factory()
+                await self.client.connect()
+            return self.client
+
+    async def stop(self):
+        """Cancel the worker task and close the client"""
+        if self.worker is not None:
+            self.worker.cancel()
+            try:
+                await self.worker
+            except asyncio.CancelledError:
+                pass
+            self.worker = None
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+            logger.info(f"Closed {self.port}")
+
+    async def submit(self, transaction: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Queue a transaction and wait for its result
+
+        Args:
+            transaction: Coroutine function performing one request/response exchange
+
+        Returns:
+            Result of the transaction
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((transaction, future))
+        return await future
+
+    async def _run(self):
+        """Execute queued transactions one at a time"""
+        while True:
+            transaction, future = await self.queue.get()
+            try:
+                if not future.cancelled():
+                    future.set_result(await transaction())
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                self.queue.task_done()
+
+
+# Port queues shared by all AsyncModbusClient instances, keyed by (event loop, port)
+_port_queues: Dict[Tuple[int, str], _PortQueue] = {}
+
+
+def _acquire_port_queue(port: str) -> _PortQueue:
+    """Return the transaction queue for a port in the running event loop"""
+    key = (id(asyncio.get_running_loop()), port)
+    port_queue = _port_queues.get(key)
+    if port_queue is None:
+        port_queue = _port_queues[key] = _PortQueue(port)
+    port_queue.users += 1
+    port_queue.start()
+    return port_queue
+
+
+async def _release_port_queue(port_queue: _PortQueue):
+    """Drop a reference to a port queue, stopping it when unused"""
+    port_queue.users -= 1
+    if port_queue.users <= 0:
+        await port_queue.stop()
+        for key, value in list(_port_queues.items()):
+            if value is port_queue:
+                del _port_queues[key]
+
+
+class AsyncModbusClient:
+    """Asyncio Modbus RTU Client for USB-RS485 communication"""
+
+    def __init__(self,
+                 port: Optional[str] = None,
+                 baudrate: Optional[int] = None,
+                 parity: str = 'N',
+                 stopbits: int = 1,
+                 bytesize: int = 8,
+                 timeout: Optional[float] = None,
+                 verbose: bool = False):
+        """
+        Initialize asyncio Modbus RTU client
+
+        Args:
+            port: Serial port or gateway URL (tcp://host:502, rtu+tcp://host:port)
+                (default: from .env MODBUS_PORT or /dev/ttyUSB0)
+            baudrate: Communication speed (default: from .env MODBUS_BAUDRATE or 9600)
+            parity: Parity bit ('N', 'E', 'O') (default: 'N')
+            stopbits: Stop bits (default: 1)
+            bytesize: Data bits (default: 8)
+            timeout: Communication timeout in seconds (default: from .env MODBUS_TIMEOUT or 1.0)
+            verbose: Enable verbose logging (default: False)
+        """
+        self.endpoint = parse_endpoint(port or os.getenv('MODBUS_PORT', '/dev/ttyUSB0'))
+        self.port = str(self.endpoint)
+        self.baudrate = baudrate or int(os.getenv('MODBUS_BAUDRATE', '9600'))
+        self.parity = parity
+        self.stopbits = stopbits
+        self.bytesize = bytesize
+        self.timeout = timeout or float(os.getenv('MODBUS_TIMEOUT', '1.0'))
+        self.unit_id = int(os.getenv('MODBUS_DEVICE_ADDRESS', os.getenv('MODBUS_UNIT_ID', '1')))
+        self.verbose = verbose
+        self.client = None
+        self.planner = ReadPlanner()
+        # Shared with synchronous clients of the same port
+        self.image = get_image(self.port)
+        self._port_queue: Optional[_PortQueue] = None
+
+        logger.info(f"Initializing async Modbus RTU client on {self.port}")
+
+    async def __aenter__(self) -> 'AsyncModbusClient':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.disconnect()
+
+    @property
+    def connected(self) -> bool:
+        """True if the serial transport is open"""
+        return self.client is not None and self.client.connected
+
+    def _create_client(self) -> Any:
+        """Create the pymodbus client for this client's settings"""
+        if self.endpoint.is_network:
+            return create_async_client(self.endpoint, timeout=self.timeout)
+        return AsyncModbusSerialClient(
+            port=self.port,
+            baudrate=self.baudrate,
+            parity=self.parity,
+            stopbits=self.stopbits,
+            bytesize=self.bytesize,
+            timeout=self.timeout
+        )
+
+    async def connect(self) -> bool:
+        """
+        Connect to Modbus device
+
+        Clients of the same port in one event loop share one connection,
+        opened with the settings of the first client to connect.
+
+        Returns:
+            bool: True if connection successful, False otherwise
+        """
+        if self.connected:
+            return True
+
+        if self._port_queue is None:
+            self._port_queue = _acquire_port_queue(self.port)
+        try:
+            self.client = await asyncio.wait_for(self._port_queue.open(self._create_client), self.timeout)
+        except Exception as e:
+            logger.error(f"Error connecting to {self.port}: {e}")
+            await self.disconnect()
+            return False
+
+        if not self.client.connected:
+            logger.error(f"Failed to connect to {self.port}")
+            await self.disconnect()
+            return False
+
+        logger.info(f"Successfully connected to {self.port}")
+        return True
+
+    async def disconnect(self):
+        """Disconnect from Modbus device (the port closes when its last client disconnects)"""
+        self.client = None
+        if self._port_queue is not None:
+            await _release_port_queue(self._port_queue)
+            self._port_queue = None
+            logger.info("Disconnected from Modbus device")
+
+    async def _execute(self, operation: str, method: str, *args, unit: Optional[int] = None) -> Any:
+        """
+        Run one transaction through the port queue
+
+        Args:
+            operation: Human readable operation for log messages
+            method: Name of the pymodbus client method to call
+            args: Positional arguments of the pymodbus call
+            unit: Slave unit ID (default: from configuration)
+
+        Returns:
+            pymodbus response or None if error
+        """
+        if not self.connected and not await self.connect():
+            logger.error("Failed to connect to Modbus device")
+            return None
+
+        unit_to_use = unit if unit is not None else self.unit_id
+
+        async def transaction():
+            call = getattr(self.client, method)(*args, slave=unit_to_use)
+            return await asyncio.wait_for(call, self.timeout)
+
+        function_code = METHOD_FUNCTION_CODES[method]
+        if method.startswith('read'):
+            values, count = None, args[1]
+        else:
+            values = list(args[1]) if isinstance(args[1], (list, tuple)) else [args[1]]
+            count = len(values)
+
+        try:
+            result = await self._port_queue.submit(transaction)
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout {operation}")
+            self.image.fail(function_code, args[0], count, unit_to_use)
+            return None
+        except Exception as e:
+            logger.error(f"Error {operation}: {e}")
+            self.image.fail(function_code, args[0], count, unit_to_use)
+            return None
+
+        if result.isError():
+            logger.error(f"Error {operation}: {result}")
+            return None
+
+        if values is None:
+            values = result.bits[:count] if function_code in BIT_FUNCTION_CODES else result.registers
+        self.image.update(function_code, args[0], values, unit_to_use)
+        return result
+
+    async def read_coils(self, address: int, count: int, unit: int = None) -> Optional[List[bool]]:
+        """
+        Read coils (discrete outputs)
+
+        Args:
+            address: Starting address
+            count: Number of coils to read
+            unit: Slave unit ID (default: from configuration)
+
+        Returns:
+            List of boolean values or None if error
+        """
+        result = await self._execute('reading coils', 'read_coils', address, count, unit=unit)
+        return None if result is None else result.bits[:count]
+
+    async def read_discrete_inputs(self, address: int, count: int, unit: int = None) -> Optional[List[bool]]:
+        """
+        Read discrete inputs
+
+        Args:
+            address: Starting address
+            count: Number of inputs to read
+            unit: Slave unit ID (default: from configuration)
+
+        Returns:
+            List of boolean values or None if error
+        """
+        result = await self._execute('reading discrete inputs', 'read_discrete_inputs',
+                                     address, count, unit=unit)
+        return None if result is None else result.bits[:count]
+
+    async def read_coils_mask(self, address: int, count: int, unit: int = None) -> Optional[BitMask]:
+        """Read coils into a compact bitmask (None if error)"""
+        result = await self._execute('reading coils', 'read_coils', address, count, unit=unit)
+        return None if result is None else BitMask.from_bits(result.bits[:count], address)
+
+    async def read_discrete_inputs_mask(self, address: int, count: int, unit: int = None) -> Optional[BitMask]:
+        """Read discrete inputs into a compact bitmask (None if error)"""
+        result = await self._execute('reading discrete inputs', 'read_discrete_inputs',
+                                     address, count, unit=unit)
+        return None if result is None else BitMask.from_bits(result.bits[:count], address)
+
+    async def read_holding_registers(self, address: int, count: int, unit: int = None) -> Optional[List[int]]:
+        """
+        Read holding registers
+
+        Args:
+            address: Starting address
+            count: Number of registers to read
+            unit: Slave unit ID (default: from configuration)
+
+        Returns:
+            List of register values or None if error
+        """
+        result = await self._execute('reading holding registers', 'read_holding_registers',
+                                     address, count, unit=unit)
+        return None if result is None else result.registers
+
+    async def read_input_registers(self, address: int, count: int, unit: int = None) -> Optional[List[int]]:
+        """
+        Read input registers
+
+        Args:
+            address: Starting address
+            count: Number of registers to read
+            unit: Slave unit ID (default: from configuration)
+
+        Returns:
+            List of register values or None if error
+        """
+        result = await self._execute('reading input registers', 'read_input_registers',
+                                     address, count, unit=unit)
+        return None if result is None else result.registers
+
+    async def write_coil(self, address: int, value: bool, unit: int = None) -> bool:
+        """
+        Write single coil
+
+        Args:
+            address: Coil address
+            value: Boolean value to write
+            unit: Slave unit ID (default: from configuration)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self._execute('writing coil', 'write_coil', address, value, unit=unit) is not None
+
+    async def write_register(self, address: int, value: int, unit: int = None) -> bool:
+        """
+        Write single holding register
+
+        Args:
+            address: Register address
+            value: Value to write
+            unit: Slave unit ID (default: from configuration)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self._execute('writing register', 'write_register', address, value, unit=unit) is not None
+
+    async def write_coils(self, address: int, values: List[bool], unit: int = None) -> bool:
+        """
+        Write multiple coils
+
+        Args:
+            address: Starting address
+            values: List of boolean values to write
+            unit: Slave unit ID (default: from configuration)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self._execute('writing coils', 'write_coils', address, values, unit=unit) is not None
+
+    async def write_registers(self, address: int, values: List[int], unit: int = None) -> bool:
+        """
+        Write multiple holding registers
+
+        Args:
+            address: Starting address
+            values: List of values to write
+            unit: Slave unit ID (default: from configuration)
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return await self._execute('writing registers', 'write_registers', address, values, unit=unit) is not None
+
+    async def read_many(self, requests, planner: Optional[ReadPlanner] = None) -> List[Optional[List[Any]]]:
+        """
+        Read many points with as few wire transactions as possible
+
+        Args:
+            requests: Point reads (ReadRequest instances or equivalent tuples)
+            planner: Planner to use (default: the client's own planner)
+
+        Returns:
+            List of values (or None if error) in the order of the requests
+        """
+        planner = planner or self.planner
+        requests = [ReadRequest(*request) for request in requests]
+        blocks = planner.plan(requests)
+
+        # Blocks are queued together so the port worker runs them back to back
+        values = await asyncio.gather(*[
+            getattr(self, READ_METHODS[block.function_code])(block.address, block.count, block.unit)
+            for block in blocks
+        ])
+
+        results: Dict[ReadRequest, Optional[List[Any]]] = {}
+        for block, block_values in zip(blocks, values):
+            for request in block.requests:
+                results[request] = None if block_values is None else block.slice(block_values, request)
+
+        planner.stats['requests'] += len(requests)
+        planner.stats['transactions'] += len(blocks)
+        planner.stats['saved'] += len(requests) - len(blocks)
+        return [results.get(request) for request in requests]
@@ -0,0 +1,325 @@
+"""
+ModbusAPI Bench - Throughput and latency of standard workloads on a port or the simulator
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+import platform
+from typing import Optional, List, Dict, Any, Callable, Iterator, Sequence, Tuple
+
+from .client import ModbusClient
+from .simulator import RtuSimulator, SlaveDevice
+from .protocol import ClientProtocol, add_crc
+from .timing import (
+    READ_COILS, READ_HOLDING_REGISTERS, WRITE_SINGLE_COIL, WRITE_SINGLE_REGISTER
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# One benchmark step: client method, its arguments, function code and point count
+Operation = Tuple[str, tuple, int, int]
+
+# Default regression tolerance when comparing against a baseline (10 %)
+DEFAULT_TOLERANCE = 0.10
+
+
+def _single_coil(client: ModbusClient, units: Sequence[int]) -> Iterator[Operation]:
+    while True:
+        yield 'read_coils', (0, 1, units[0]), READ_COILS, 1
+
+
+def _block_read(client: ModbusClient, units: Sequence[int]) -> Iterator[Operation]:
+    while True:
+        yield 'read_holding_registers', (0, 125, units[0]), READ_HOLDING_REGISTERS, 125
+
+
+def _mixed(client: ModbusClient, units: Sequence[int]) -> Iterator[Operation]:
+    # Writes put back the values just read, so the workload is safe on real devices
+    unit = units[0]
+    while True:
+        registers = yield 'read_holding_registers', (0, 10, unit), READ_HOLDING_REGISTERS, 10
+        if registers:
+            yield 'write_register', (0, registers[0], unit), WRITE_SINGLE_REGISTER, 1
+        coils = yield 'read_coils', (0, 8, unit), READ_COILS, 8
+        if coils:
+            yield 'write_coil', (0, coils[0], unit), WRITE_SINGLE_COIL, 1
+
+
+def _round_robin(client: ModbusClient, units: Sequence[int]) -> Iterator[Operation]:
+    while True:
+        for unit in units:
+            yield 'read_holding_registers', (0, 10, unit), READ_HOLDING_REGISTERS, 10
+
+
+# Standard workloads: name -> (description, operation generator)
+WORKLOADS: Dict[str, Tuple[str, Callable[[ModbusClient, Sequence[int]], Iterator[Operation]]]] = {
+    'single_coil': ('Read one coil', _single_coil),
+    'block_read': ('Read 125 holding registers', _block_read),
+    'mixed': ('Read 10 registers / write 1 register / read 8 coils / write 1 coil', _mixed),
+    'round_robin': ('Read 10 holding registers from each unit in turn', _round_robin),
+}
+
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def run_workload(client: ModbusClient, name: str, transactions: int = 200,
+                 units: Sequence[int] = (1,), warmup: int = 5) -> Dict[str, Any]:
+    """
+    Run one workload and measure it
+
+    Args:
+        client: Connected client
+        name: Workload name (see WORKLOADS)
+        transactions: Number of measured transactions
+        units: Unit IDs addressed (round_robin cycles through all of them)
+        warmup: Transactions run before measuring
+
+    Returns:
+        Transactions/sec, latency percentiles (ms), wire utilisation and CPU time
+        of the calling thread per transaction (µs)
+    """
+    if name not in WORKLOADS:
+        raise ValueError(f"Unknown workload: {name}")
+    description, factory = WORKLOADS[name]
+    operations = factory(client, list(units))
+    result = None
+    latencies: List[float] = []
+    errors = 0
+    wire_time = 0.0
+    cpu_start = wall_start = 0.0
+
+    for index in range(warmup + transactions):
+        if index == warmup:
+            latencies, errors, wire_time = [], 0, 0.0
+            cpu_start, wall_start = time.thread_time(), time.perf_counter()
+        method, args, function_code, count = operations.send(result) if result is not None else next(operations)
+        start = time.perf_counter()
+        result = getattr(client, method)(*args)
+        latencies.append(time.perf_counter() - start)
+        if result is None or result is False:
+            errors += 1
+        else:
+            wire_time += client.timing.transaction_wire_time(function_code, count)
+        # Read values are sent back into the workload (mixed writes them back)
+        result = result if isinstance(result, list) else None
+
+    duration = time.perf_counter() - wall_start
+    cpu_time = time.thread_time() - cpu_start
+    latencies.sort()
+    return {
+        'workload': name,
+        'description': description,
+        'transactions': transactions,
+        'errors': errors,
+        'duration': round(duration, 4),
+        'tps': round(transactions / duration, 2) if duration else 0.0,
+        'latency_ms': {
+            'mean': round(1000 * sum(latencies) / len(latencies), 3) if latencies else 0.0,
+            'p50': round(1000 * _percentile(latencies, 0.50), 3),
+            'p95': round(1000 * _percentile(latencies, 0.95), 3),
+            'p99': round(1000 * _percentile(latencies, 0.99), 3),
+            'max': round(1000 * latencies[-1], 3) if latencies else 0.0,
+        },
+        'wire_utilisation': round(wire_time / duration, 4) if duration else 0.0,
+        'cpu_us_per_transaction': round(1e6 * cpu_time / transactions, 1) if transactions else 0.0,
+    }
+
+
+def run_framing(iterations: int = 10000, count: int = 125) -> Dict[str, Any]:
+    """
+    Compare the CPU cost of framing a holding register read: encoding the
+    request and decoding the response, with the sans-IO protocol core and
+    with the pymodbus RTU framer
+
+    Args:
+        iterations: Transactions framed per implementation
+        count: Registers per response
+
+    Returns:
+        Microseconds per transaction for each implementation and the speedup
+    """
+    from pymodbus.factory import ClientDecoder
+    from pymodbus.framer.rtu_framer import ModbusRtuFramer
+    from pymodbus.register_read_message import ReadHoldingRegistersRequest
+
+    response = add_crc(bytes([1, READ_HOLDING_REGISTERS, 2 * count]) + bytes(range(2 * count)))
+    protocol = ClientProtocol()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        protocol.request(1, READ_HOLDING_REGISTERS, 0, count)
+        protocol.feed(response)
+    sans_io = time.perf_counter() - start
+
+    framer = ModbusRtuFramer(ClientDecoder())
+    results = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        framer.buildPacket(ReadHoldingRegistersRequest(0, count, unit=1))
+        framer.processIncomingPacket(response, results.append, unit=1)
+        results.pop().registers
+    pymodbus = time.perf_counter() - start
+    return {
+        'iterations': iterations,
+        'registers': count,
+        'sans_io_us': round(1e6 * sans_io / iterations, 2),
+        'pymodbus_us': round(1e6 * pymodbus / iterations, 2),
+        'speedup': round(pymodbus / sans_io, 2) if sans_io else 0.0,
+    }
+
+
+def run_benchmarks(client: ModbusClient, workloads: Optional[Sequence[str]] = None,
+                   transactions: int = 200, units: Sequence[int] = (1,),
+                   simulated: bool = False) -> Dict[str, Any]:
+    """
+    Run several workloads and collect a report
+
+    Args:
+        client: Connected client
+        workloads: Workload names (default: all)
+        transactions: Measured transactions per workload
+        units: Unit IDs addressed
+        simulated: The client talks to the built-in simulator (recorded in the report)
+
+    Returns:
+        Report with run metadata and one result per workload
+    """
+    workloads = list(workloads or WORKLOADS)
+    return {
+        'timestamp': time.time(),
+        'port': client.port,
+        'baudrate': client.baudrate,
+        'simulated': simulated,
+        'units': list(units),
+        'python': platform.python_version(),
+        'results': {name: run_workload(client, name, transactions, units) for name in workloads},
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Find regressions against a baseline report
+
+    Args:
+        report: Current report
+        baseline: Stored report
+        tolerance: Allowed relative change (0.1 = 10 %)
+
+    Returns:
+        One message per workload whose throughput dropped or p95 latency rose
+        by more than the tolerance
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        if result['tps'] < base['tps'] * (1 - tolerance):
+            regressions.append(f"{name}: {result['tps']} tps vs {base['tps']} tps baseline")
+        if result['latency_ms']['p95'] > base['latency_ms']['p95'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {result['latency_ms']['p95']} ms "
+                               f"vs {base['latency_ms']['p95']} ms baseline")
+    return regressions
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Render a report as a text table"""
+    lines = [
+        f"{report['port']} @ {report['baudrate']} baud"
+        f"{' (simulated)' if report['simulated'] else ''}, units {report['units']}",
+        f"{'workload':<12} {'tps':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'wire':>6} {'cpu µs':>8} {'err':>4}",
+    ]
+    for name, result in report['results'].items():
+        latency = result['latency_ms']
+        lines.append(
+            f"{name:<12} {result['tps']:>9.1f} {latency['p50']:>8.2f} {latency['p95']:>8.2f} "
+            f"{latency['p99']:>8.2f} {result['wire_utilisation']:>6.1%} "
+            f"{result['cpu_us_per_transaction']:>8.0f} {result['errors']:>4}"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point (modbusapi bench)
+
+    Returns:
+        Exit status: 0, or 1 if a regression against the baseline was found
+    """
+    parser = argparse.ArgumentParser(prog='modbusapi bench', description='Modbus transport benchmarks')
+    parser.add_argument('-p', '--port', help='Port or gateway URL (default: built-in simulator on a pty)')
+    parser.add_argument('-b', '--baud', type=int, default=int(os.getenv('MODBUS_BAUDRATE', '9600')),
+                        help='Baud rate')
+    parser.add_argument('-t', '--timeout', type=float, help='Timeout in seconds')
+    parser.add_argument('-w', '--workloads', default=','.join(WORKLOADS),
+                        help=f"Comma separated workloads ({', '.join(WORKLOADS)})")
+    parser.add_argument('-n', '--transactions', type=int, default=200, help='Measured transactions per workload')
+    parser.add_argument('-u', '--units', default='1,2,3,4', help='Comma separated unit IDs')
+    parser.add_argument('--delay', type=float, default=0.0, help='Simulated slave response delay in seconds')
+    parser.add_argument('-o', '--output', help='Save the report as JSON')
+    parser.add_argument('--baseline', help='Compare against a stored JSON report')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed relative regression (default: 0.1)')
+    parser.add_argument('--framing', action='store_true',
+                        help='Only compare framing CPU cost: sans-IO protocol core vs pymodbus')
+    args = parser.parse_args(argv)
+
+    if args.framing:
+        result = run_framing()
+        print(f"framing {result['registers']} registers: sans-IO {result['sans_io_us']} µs, "
+              f"pymodbus {result['pymodbus_us']} µs ({result['speedup']}x)")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(result, f, indent=2)
+        return 0
+
+    units = [int(unit) for unit in args.units.split(',')]
+    workloads = [name for name in args.workloads.split(',') if name]
+    unknown = [name for name in workloads if name not in WORKLOADS]
+    if unknown:
+        parser.error(f"Unknown workload: {', '.join(unknown)}")
+
+    simulator = None
+    port = args.port
+    if port is None:
+        simulator = RtuSimulator(
+            [SlaveDevice(unit, holding_registers=125, delay=args.delay) for unit in units],
+            baudrate=args.baud
+        )
+        port = simulator.start()
+
+    client = ModbusClient(port=port, baudrate=args.baud, timeout=args.timeout)
+    try:
+        if not client.connect():
+            print(f"Could not open {port}", file=sys.stderr)
+            return 1
+        report = run_benchmarks(client, workloads, args.transactions, units, simulated=simulator is not None)
+    finally:
+        client.disconnect()
+        if simulator is not None:
+            simulator.close()
+
+    print(format_report(report))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
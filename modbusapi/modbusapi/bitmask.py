@@ -0,0 +1,175 @@
+"""
+ModbusAPI BitMask - Compact int-backed results for coils and discrete inputs
+"""
+
+import base64
+import logging
+from typing import Optional, List, Dict, Any, Iterable, Iterator, Union
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Output formats
+FORMAT_VERBOSE = 'verbose'
+FORMAT_HEX = 'hex'
+FORMAT_BASE64 = 'base64'
+FORMATS = (FORMAT_VERBOSE, FORMAT_HEX, FORMAT_BASE64)
+
+
+class BitMask:
+    """
+    Block of bits stored in one Python int
+
+    Bit i of ``value`` is the point at ``address + i``, matching the Modbus
+    packing of coils and discrete inputs (LSB of the first byte first). Bit
+    access, slicing and XOR change detection are integer operations instead
+    of loops over lists of bools.
+    """
+
+    __slots__ = ('value', 'count', 'address')
+
+    def __init__(self, value: int = 0, count: int = 0, address: int = 0):
+        """
+        Initialize bitmask
+
+        Args:
+            value: Bits as an integer (bit 0 = first point)
+            count: Number of points
+            address: Address of the first point
+        """
+        self.value = value & ((1 << count) - 1)
+        self.count = count
+        self.address = address
+
+    @classmethod
+    def from_bits(cls, bits: Iterable[bool], address: int = 0) -> 'BitMask':
+        """Create a bitmask from a sequence of booleans"""
+        bits = list(bits)
+        digits = ''.join(map('01'.__getitem__, map(bool, reversed(bits))))
+        return cls(int(digits, 2) if digits else 0, len(bits), address)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, count: Optional[int] = None, address: int = 0) -> 'BitMask':
+        """
+        Create a bitmask from Modbus-packed bytes
+
+        Args:
+            data: Packed bits, LSB of the first byte first
+            count: Number of points (default: 8 per byte)
+            address: Address of the first point
+        """
+        return cls(int.from_bytes(data, 'little'), 8 * len(data) if count is None else count, address)
+
+    @classmethod
+    def decode(cls, text: str, count: int, address: int = 0, format: str = FORMAT_HEX) -> 'BitMask':
+        """Create a bitmask from its hex or base64 form"""
+        data = bytes.fromhex(text) if format == FORMAT_HEX else base64.b64decode(text)
+        return cls.from_bytes(data, count, address)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[bool, 'BitMask']:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            if step != 1:
+                return BitMask.from_bits(list(self)[index], self.address + start)
+            count = max(0, stop - start)
+            return BitMask(self.value >> start, count, self.address + start)
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("bit index out of range")
+        return bool((self.value >> index) & 1)
+
+    def __iter__(self) -> Iterator[bool]:
+        value = self.value
+        for _ in range(self.count):
+            yield bool(value & 1)
+            value >>= 1
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, BitMask):
+            return (self.value, self.count, self.address) == (other.value, other.count, other.address)
+        if isinstance(other, (list, tuple)):
+            return len(other) == self.count and self == BitMask.from_bits(other, self.address)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"BitMask(address={self.address}, count={self.count}, hex={self.hex()!r})"
+
+    def get(self, address: int) -> bool:
+        """Return the bit of an absolute point address"""
+        return self[address - self.address]
+
+    def set(self, index: int, value: bool) -> 'BitMask':
+        """Return a copy with one bit (relative index) changed"""
+        if not 0 <= index < self.count:
+            raise IndexError("bit index out of range")
+        bit = 1 << index
+        return BitMask(self.value | bit if value else self.value & ~bit, self.count, self.address)
+
+    def popcount(self) -> int:
+        """Number of bits that are on"""
+        return bin(self.value).count('1')
+
+    def changes(self, previous: 'BitMask') -> 'BitMask':
+        """
+        Bits that differ from a previous read of the same block
+
+        Args:
+            previous: Earlier bitmask with the same address and count
+
+        Returns:
+            Bitmask with a bit set for every changed point
+        """
+        if (previous.address, previous.count) != (self.address, self.count):
+            raise ValueError("Bitmasks cover different points")
+        return BitMask(self.value ^ previous.value, self.count, self.address)
+
+    def indices(self) -> List[int]:
+        """Relative indices of the bits that are on, in O(number of set bits)"""
+        result = []
+        value = self.value
+        while value:
+            low = value & -value
+            result.append(low.bit_length() - 1)
+            value ^= low
+        return result
+
+    def changed_addresses(self, previous: 'BitMask') -> List[int]:
+        """Absolute addresses of the points that changed since a previous read"""
+        return [self.address + index for index in self.changes(previous).indices()]
+
+    def to_list(self) -> List[bool]:
+        """Return the bits as a list of booleans"""
+        return list(self)
+
+    def to_bytes(self) -> bytes:
+        """Return the bits packed as in a Modbus frame"""
+        return self.value.to_bytes((self.count + 7) // 8, 'little')
+
+    def hex(self) -> str:
+        """Return the packed bits as hex"""
+        return self.to_bytes().hex()
+
+    def base64(self) -> str:
+        """Return the packed bits as base64"""
+        return base64.b64encode(self.to_bytes()).decode('ascii')
+
+    def to_dict(self, format: str = FORMAT_HEX) -> Dict[str, Any]:
+        """
+        Return the compact form for JSON output
+
+        Args:
+            format: FORMAT_HEX or FORMAT_BASE64
+
+        Returns:
+            Dictionary with address, count, format and data
+        """
+        return {
+            'address': self.address,
+            'count': self.count,
+            'format': format,
+            'data': self.base64() if format == FORMAT_BASE64 else self.hex(),
+        }
@@ -3,15 +3,13 @@ ModbusAPI Client - Core Modbus communication functionality
 """
 
 import os
+import time
 import logging
-import glob
-from typing import Optional, List, Union, Dict, Any
+from typing import Optional, List, Union, Dict, Any, Iterable
 
 try:
     from pymodbus.client.serial import ModbusSerialClient
     from pymodbus.exceptions import ModbusException, ConnectionException
-    # Usunięto import Endian, ponieważ nie jest używany w kodzie
-    from pymodbus.payload import BinaryPayloadDecoder, BinaryPayloadBuilder
 except ImportError:
     raise ImportError(
         "pymodbus library not found! Install with: pip install pymodbus[serial]"
@@ -24,32 +22,43 @@ except ImportError:
         "python-dotenv library not found! Install with: pip install python-dotenv"
     )
 
+from .planner import (
+    ReadPlanner, ReadRequest, parse_function_code,
+    READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS
+)
+from .bitmask import BitMask
+from .timing import (
+    RtuTiming, TimingStats, METHOD_FUNCTION_CODES, BROADCAST_UNIT,
+    request_length, response_length, EXCEPTION_RESPONSE_LENGTH
+)
+from .image import get_image, move_image, TABLES
+from .trace import Transaction, default_tracer, queue_wait, OUTCOME_OK
+from .adaptive import AdaptiveTimeouts
+from .transport import parse_endpoint, gateways, tune_socket, TRANSPORT_TCP
+from .detect import (
+    find_serial_ports, auto_detect_modbus_port, auto_detect_modbus_device,
+    detect_modbus_devices, DetectedDevice
+)
+from .discovery import discover_bus
+from .retry import (
+    RetryPolicy, CircuitBreakers, classify_error,
+    ERROR_TIMEOUT, ERROR_EXCEPTION, ERROR_PORT, ERROR_CIRCUIT_OPEN
+)
+
 # Load environment variables from .env file
 load_dotenv()
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# MBAP header (7 bytes) replaces the RTU address and CRC (3 bytes) on Modbus TCP
+MBAP_EXTRA_BYTES = 4
 
-def find_serial_ports() -> List[str]:
-    """
-    Find all available serial ports (ACM and USB)
-    
-    Returns:
-        List of available serial port paths
-    """
-    ports = []
-    
-    # Check for ACM ports (USB CDC devices)
-    acm_ports = glob.glob('/dev/ttyACM*')
-    ports.extend(sorted(acm_ports))
-    
-    # Check for USB serial ports
-    usb_ports = glob.glob('/dev/ttyUSB*')
-    ports.extend(sorted(usb_ports))
-    
-    logger.info(f"Found serial ports: {ports}")
-    return ports
+# Connection states of ModbusClient
+STATE_CLOSED = 'closed'
+STATE_CONNECTED = 'connected'
+STATE_DEGRADED = 'degraded'
+STATE_RECONNECTING = 'reconnecting'
 
 
 def test_modbus_port(port: str, baudrate: int = 9600, timeout: float = 0.5) -> bool:
@@ -98,52 +107,22 @@ def test_modbus_port(port: str, baudrate: int = 9600, timeout: float = 0.5) -> b
         return False
 
 
-def auto_detect_modbus_port(baudrates: List[int] = None) -> Optional[str]:
-    """
-    Automatically detect which serial port has a working Modbus device
+class ModbusClient:
+    """Modbus RTU Client for USB-RS485 communication
     
-    Args:
-        baudrates: List of baud rates to test (default: common rates)
-        
-    Returns:
-        Path to working Modbus port or None if not found
-    """
-    if baudrates is None:
-        baudrates = [9600, 19200, 38400, 57600, 115200]
-        
-    print("Scanning for Modbus devices...")
+    The port may also be a gateway URL: ``tcp://host[:502]`` for Modbus TCP or
+    ``rtu+tcp://host:port`` for RTU frames over TCP. Clients of the same
+    gateway share one persistent socket.
     
-    # Get available ports
-    ports = find_serial_ports()
-    if not ports:
-        print("No serial ports found!")
-        return None
-        
-    print(f"Scanning {len(ports)} serial ports for Modbus devices...")
+    The serial port is opened once and kept open across requests. The client
+    tracks its connection state:
     
-    # Try each port with default baudrate first
-    for port in ports:
-        print(f"Testing {port}...")
-        if test_modbus_port(port, baudrate=9600):
-            print(f"✓ Modbus device detected on {port} at 9600 baud")
-            return port
-            
-    # If not found, try all baudrates
-    for port in ports:
-        for baudrate in baudrates:
-            if baudrate == 9600:  # Already tested
-                continue
-                
-            if test_modbus_port(port, baudrate=baudrate):
-                print(f"✓ Modbus device detected on {port} at {baudrate} baud")
-                return port
-                
-    print("No Modbus devices found!")
-    return None
-
-
-class ModbusClient:
-    """Modbus RTU Client for USB-RS485 communication"""
+    - closed: not connected yet, or disconnect() was called
+    - connected: port open, last transaction succeeded
+    - degraded: port open, but recent transactions failed on I/O
+    - reconnecting: port closed after repeated failures, reopened lazily
+      on the next request once the backoff delay has passed
+    """
     
     def __init__(self, 
                  port: Optional[str] = None,
@@ -157,7 +136,7 @@ class ModbusClient:
         Initialize Modbus RTU client
         
         Args:
-            port: Serial port (default: from .env MODBUS_PORT or /dev/ttyUSB0)
+            port: Serial port or gateway URL (default: from .env MODBUS_PORT or /dev/ttyUSB0)
             baudrate: Communication speed (default: from .env MODBUS_BAUDRATE or 9600)
             parity: Parity bit ('N', 'E', 'O') (default: 'N')
             stopbits: Stop bits (default: 1)
@@ -181,46 +160,541 @@ class ModbusClient:
         # Obsługa różnych nazw zmiennych dla adresu urządzenia
         self.unit_id = int(os.getenv('MODBUS_DEVICE_ADDRESS', os.getenv('MODBUS_UNIT_ID', '1')))
         self.client = None
+        self.planner = ReadPlanner()
+        
+        # Serial port path, or tcp:// / rtu+tcp:// gateway URL
+        self.endpoint = parse_endpoint(self.port)
+        self.port = str(self.endpoint)
+        self.transport = self.endpoint.transport
+        
+        # RTU timing: per-transaction deadline predicted from the frame lengths
+        # (Modbus TCP gateways do their own serial timing)
+        self.timing = RtuTiming(self.baudrate, self.bytesize, self.parity, self.stopbits)
+        self.timing_stats = TimingStats()
+        self.precise_timing = os.getenv('MODBUS_PRECISE_TIMING', 'false').lower() == 'true' \
+            and self.transport != TRANSPORT_TCP
+        
+        # Timeouts learned per (port, unit, function code), capped at the configured timeout
+        self.adaptive = None
+        if os.getenv('MODBUS_ADAPTIVE_TIMEOUT', 'true').lower() == 'true':
+            self.adaptive = AdaptiveTimeouts(ceiling=self.timeout)
+        
+        # Retries of timeouts/CRC errors and per-unit circuit breakers
+        self.retry_policy = RetryPolicy()
+        self.breakers = CircuitBreakers()
+        self.last_error_class = None
+        
+        # Last known value, age and quality of every point on this bus
+        self.image = get_image(self.port)
+        
+        # One structured record per transaction for registered sinks
+        # (verbose clients log them at INFO level)
+        self.tracer = default_tracer(verbose)
+        
+        # Connection lifecycle
+        self.state = STATE_CLOSED
+        self.max_failures = int(os.getenv('MODBUS_MAX_FAILURES', '3'))
+        self.reconnect_backoff = float(os.getenv('MODBUS_RECONNECT_BACKOFF', '0.5'))
+        self.reconnect_backoff_max = float(os.getenv('MODBUS_RECONNECT_BACKOFF_MAX', '30.0'))
+        self._failures = 0
+        self._backoff = self.reconnect_backoff
+        self._next_attempt = 0.0
+        self._last_error = None
+        self._last_success = None
+        self._connected_since = None
+        # End of the turnaround delay after a broadcast (nothing is sent before it)
+        self._quiet_until = 0.0
         
         logger.info(f"Initializing Modbus RTU client on {self.port}")
         logger.info(f"Parameters: {self.baudrate} {self.parity} {self.bytesize} {self.stopbits}")
         logger.info(f"Configuration loaded from .env: port={self.port}, baudrate={self.baudrate}, timeout={self.timeout}")
         self.verbose = verbose
         
+    @property
+    def _connected(self) -> bool:
+        """True while the port is open (connected or degraded)"""
+        return self.state in (STATE_CONNECTED, STATE_DEGRADED)
+        
+    def is_connected(self) -> bool:
+        """
+        Check connection state without touching the bus
+        
+        Returns:
+            bool: True if the port is open
+        """
+        return self._connected
+        
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Get connection state details without touching the bus
+        
+        Returns:
+            Dictionary with state, failure count, last error and timestamps
+        """
+        reconnect_in = None
+        if self.state == STATE_RECONNECTING:
+            reconnect_in = max(0.0, self._next_attempt - time.monotonic())
+        return {
+            'state': self.state,
+            'connected': self._connected,
+            'port': self.port,
+            'transport': self.transport,
+            'baudrate': self.baudrate,
+            'consecutive_failures': self._failures,
+            'last_error': self._last_error,
+            'last_success': self._last_success,
+            'connected_since': self._connected_since,
+            'reconnect_in': reconnect_in
+        }
+        
     def connect(self) -> bool:
         """
         Connect to Modbus device
         
+        The port is opened once; calling connect() on an open client is a no-op.
+        
         Returns:
             bool: True if connection successful, False otherwise
         """
+        if self._connected and self.client and self.client.is_socket_open():
+            return True
+            
         try:
-            self.client = ModbusSerialClient(
-                method='rtu',
-                port=self.port,
-                baudrate=self.baudrate,
-                parity=self.parity,
-                stopbits=self.stopbits,
-                bytesize=self.bytesize,
-                timeout=self.timeout
-            )
+            if self.client is None and self.endpoint.is_network:
+                # One persistent socket per gateway, shared with other clients
+                self.client = gateways.acquire(self.endpoint, self.timeout)
+            elif self.client is None:
+                self.client = ModbusSerialClient(
+                    method='rtu',
+                    port=self.port,
+                    baudrate=self.baudrate,
+                    parity=self.parity,
+                    stopbits=self.stopbits,
+                    bytesize=self.bytesize,
+                    timeout=self.timeout,
+                    # Port lifecycle is managed here, not per failed transaction
+                    reset_socket=False
+                )
+                # Frame gaps computed from the actual character format
+                self.client.silent_interval = self.timing.silent_interval
+                self.client.inter_char_timeout = self.timing.inter_char_timeout
             
             if self.client.connect():
+                if self.endpoint.is_network:
+                    tune_socket(self.client)
                 logger.info(f"Successfully connected to {self.port}")
+                self.state = STATE_CONNECTED
+                self._failures = 0
+                self._backoff = self.reconnect_backoff
+                self._connected_since = time.time()
                 return True
             else:
                 logger.error(f"Failed to connect to {self.port}")
+                self._schedule_reconnect(f"Failed to open {self.port}")
                 return False
                 
         except Exception as e:
             logger.error(f"Error connecting to {self.port}: {e}")
+            self._schedule_reconnect(str(e))
             return False
             
     def disconnect(self):
         """Disconnect from Modbus device"""
-        if self.client:
+        if self.adaptive:
+            self.adaptive.save()
+        if self.client and self.endpoint.is_network:
+            gateways.release(self.endpoint)
+            self.client = None
+            logger.info("Disconnected from Modbus gateway")
+        elif self.client:
             self.client.close()
             logger.info("Disconnected from Modbus device")
+        self.state = STATE_CLOSED
+        self._connected_since = None
+        
+    def rebind(self, port: str, baudrate: Optional[int] = None, parity: Optional[str] = None) -> bool:
+        """
+        Move the client to another serial port (e.g. a re-enumerated adapter)
+        
+        The old port is closed and the new one opened; the process image and
+        unit settings are kept. Call it on the bus owner thread (see
+        ArbitratedClient.rebind) so no transaction is in flight.
+        
+        Args:
+            port: New serial port path
+            baudrate: New baud rate (default: unchanged)
+            parity: New parity (default: unchanged)
+            
+        Returns:
+            bool: True if the new port was opened
+        """
+        if self.endpoint.is_network:
+            logger.error(f"Cannot rebind gateway client {self.port} to {port}")
+            return False
+        if self.client:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+            self.client = None
+        old_port = self.port
+        self.endpoint = parse_endpoint(port)
+        self.port = str(self.endpoint)
+        self.baudrate = baudrate or self.baudrate
+        self.parity = parity or self.parity
+        self.timing = RtuTiming(self.baudrate, self.bytesize, self.parity, self.stopbits)
+        self.state = STATE_CLOSED
+        self._failures = 0
+        self._backoff = self.reconnect_backoff
+        move_image(old_port, self.port)
+        logger.info(f"Rebinding Modbus client from {old_port} to {self.port} at {self.baudrate} baud")
+        return self.connect()
+        
+    def discover(self, units: Optional[Iterable[int]] = None, map_ranges: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Sweep unit IDs on this bus (see discovery.discover_bus)
+        
+        The port is closed during the sweep and reopened afterwards. Call it on
+        the bus owner thread (see ArbitratedClient.discover).
+        
+        Args:
+            units: Unit IDs to try (default: 1-247)
+            map_ranges: Also map the address ranges each unit answers
+            
+        Returns:
+            Bus inventory, or None for gateway connections
+        """
+        if self.endpoint.is_network:
+            logger.error(f"Unit discovery needs a serial port, not gateway {self.port}")
+            return None
+        was_open = self._connected
+        if self.client:
+            self.client.close()
+        self.state = STATE_CLOSED
+        try:
+            return discover_bus(self.port, self.baudrate, self.parity, units, map_ranges=map_ranges)
+        finally:
+            if was_open:
+                self.connect()
+        
+    def _schedule_reconnect(self, error: str):
+        """Close the port and schedule the next reconnect attempt with backoff"""
+        if self.client:
+            try:
+                self.client.close()
+            except Exception:
+                pass
+        self.state = STATE_RECONNECTING
+        self._last_error = error
+        self._connected_since = None
+        self._next_attempt = time.monotonic() + self._backoff
+        logger.warning(f"Modbus connection on {self.port} lost, retrying in {self._backoff:.1f}s")
+        self._backoff = min(self._backoff * 2, self.reconnect_backoff_max)
+        
+    def _ensure_connected(self) -> bool:
+        """
+        Make sure the port is open before a transaction
+        
+        Reconnects lazily: while backing off after a failure no attempt is made.
+        
+        Returns:
+            bool: True if the port is open
+        """
+        if self._connected and self.client and self.client.is_socket_open():
+            return True
+        if self.state == STATE_RECONNECTING and time.monotonic() < self._next_attempt:
+            return False
+        return self.connect()
+        
+    def _record_success(self):
+        """Mark the connection healthy after a completed transaction"""
+        self._failures = 0
+        self._last_success = time.time()
+        if self.state == STATE_DEGRADED:
+            logger.info(f"Modbus connection on {self.port} recovered")
+        self.state = STATE_CONNECTED
+        
+    def _record_failure(self, error: Any):
+        """
+        Degrade the connection after a port failure, reconnecting after repeated ones
+        
+        Only port errors come here: a unit that does not answer (timeouts, CRC
+        errors) says nothing about the port and is left to its circuit breaker.
+        """
+        self._failures += 1
+        self._last_error = str(error)
+        if isinstance(error, ConnectionException) or self._failures >= self.max_failures:
+            self._schedule_reconnect(str(error))
+        else:
+            self.state = STATE_DEGRADED
+            
+    def _execute(self, operation: str, method: str, *args, unit: int) -> Any:
+        """
+        Run one transaction and update the connection state
+        
+        Timeouts and garbled responses are retried within the retry policy;
+        exception responses and port errors are not. Requests to a unit whose
+        circuit breaker is open fail immediately without using the bus.
+        
+        Args:
+            operation: Human readable operation for log messages
+            method: Name of the pymodbus client method to call
+            args: Positional arguments of the pymodbus call
+            unit: Slave unit ID
+            
+        Returns:
+            pymodbus response or None if error
+        """
+        function_code = METHOD_FUNCTION_CODES[method]
+        if method.startswith('read'):
+            count = args[1]
+        elif isinstance(args[1], (list, tuple)):
+            count = len(args[1])
+        else:
+            count = 1
+            
+        if unit == BROADCAST_UNIT:
+            return self._broadcast(operation, method, function_code, count, args)
+            
+        breaker = self.breakers.get(unit)
+        if not breaker.allow():
+            logger.warning(f"Circuit open for unit {unit}, skipping {operation}")
+            self.last_error_class = ERROR_CIRCUIT_OPEN
+            if self.tracer.sinks:
+                self._trace(function_code, args[0], count, unit, 0, ERROR_CIRCUIT_OPEN, 0.0, sent=False)
+            return None
+            
+        if not self._ensure_connected():
+            logger.error("Failed to connect to Modbus device")
+            self.last_error_class = ERROR_PORT
+            if self.tracer.sinks:
+                self._trace(function_code, args[0], count, unit, 0, ERROR_PORT, 0.0, sent=False)
+            return None
+            
+        self._apply_timeout(self._transaction_timeout(function_code, count, unit))
+        self._wait_quiet()
+        
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                result = getattr(self.client, method)(*args, unit=unit)
+                error = result if result.isError() else None
+            except Exception as e:
+                error = e
+            wall_time = time.perf_counter() - start
+            
+            if error is None:
+                break
+                
+            error_class = classify_error(error)
+            self.last_error_class = error_class
+            logger.error(f"Error {operation}: {error} ({error_class})")
+            self.timing_stats.record_failure()
+            if self.tracer.sinks:
+                self._trace(function_code, args[0], count, unit, attempt, error_class, wall_time)
+            # An exception response means the device answered: the bus is fine
+            if error_class == ERROR_EXCEPTION:
+                self._record_success()
+                breaker.record_success()
+                return None
+            if error_class == ERROR_TIMEOUT and self.adaptive:
+                self.adaptive.record_timeout(self.port, unit, function_code)
+            if error_class == ERROR_PORT:
+                self._record_failure(error)
+            if not self.retry_policy.should_retry(error_class, attempt) or not self._ensure_connected():
+                breaker.record_failure(error_class)
+                self.image.fail(function_code, args[0], count, unit)
+                return None
+            time.sleep(self.retry_policy.delay(attempt))
+            # A late answer to the failed attempt must not be taken for the retry's,
+            # and the retry gets the full configured timeout
+            self._flush_input()
+            self._apply_timeout(self.timeout)
+            attempt += 1
+            logger.warning(f"Retrying {operation} (attempt {attempt + 1})")
+            
+        wire_time = self.timing.transaction_wire_time(function_code, count)
+        self.timing_stats.record(function_code, count, wire_time, wall_time)
+        if self.adaptive:
+            self.adaptive.record(self.port, unit, function_code, wall_time - wire_time)
+        self._record_success()
+        breaker.record_success()
+        self.retry_policy.record_success()
+        self.last_error_class = None
+        if self.tracer.sinks:
+            self._trace(function_code, args[0], count, unit, attempt, OUTCOME_OK, wall_time)
+        self._update_image(function_code, args, count, unit, result)
+        return result
+        
+    def _broadcast(self, operation: str, method: str, function_code: int, count: int, args: tuple) -> Any:
+        """
+        Send one broadcast write (unit 0) without waiting for a response
+        
+        Broadcasts are never retried (a lost frame cannot be detected) and do
+        not touch circuit breakers or the process image. The turnaround delay
+        is honoured by holding back the next request on this client.
+        
+        Returns:
+            True if the request was sent, None if error
+        """
+        if method.startswith('read'):
+            logger.error(f"Error {operation}: reads cannot be broadcast")
+            return None
+            
+        if not self._ensure_connected():
+            logger.error("Failed to connect to Modbus device")
+            self.last_error_class = ERROR_PORT
+            if self.tracer.sinks:
+                self._trace(function_code, args[0], count, BROADCAST_UNIT, 0, ERROR_PORT, 0.0, sent=False)
+            return None
+            
+        self._wait_quiet()
+        start = time.perf_counter()
+        self.client.params.broadcast_enable = True
+        try:
+            result = getattr(self.client, method)(*args, unit=BROADCAST_UNIT)
+            error = result if hasattr(result, 'isError') and result.isError() else None
+        except Exception as e:
+            error = e
+        finally:
+            self.client.params.broadcast_enable = False
+        wall_time = time.perf_counter() - start
+        
+        if error is not None:
+            error_class = classify_error(error)
+            self.last_error_class = error_class
+            logger.error(f"Error {operation}: {error} ({error_class})")
+            if error_class == ERROR_PORT:
+                self._record_failure(error)
+            if self.tracer.sinks:
+                self._trace(function_code, args[0], count, BROADCAST_UNIT, 0, error_class, wall_time)
+            return None
+            
+        self._quiet_until = time.monotonic() + self.timing.broadcast_time(function_code, count)
+        self._record_success()
+        self.last_error_class = None
+        if self.tracer.sinks:
+            self._trace(function_code, args[0], count, BROADCAST_UNIT, 0, OUTCOME_OK, wall_time)
+        return True
+        
+    def _wait_quiet(self):
+        """Sleep until the turnaround delay of the last broadcast has passed"""
+        remaining = self._quiet_until - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+            
+    def _update_image(self, function_code: int, args: tuple, count: int, unit: int, result: Any):
+        """Store the values read or written by a successful transaction in the process image"""
+        if function_code in (READ_COILS, READ_DISCRETE_INPUTS):
+            values = result.bits[:count]
+        elif function_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+            values = result.registers
+        else:
+            values = args[1] if isinstance(args[1], (list, tuple)) else [args[1]]
+        self.image.update(function_code, args[0], values, unit)
+        
+    def _trace(self, function_code: int, address: int, count: int, unit: int,
+               attempt: int, outcome: str, latency: float, sent: bool = True):
+        """
+        Emit the record of one transaction attempt to the tracer sinks
+        
+        Frame sizes are the RTU lengths (MBAP framing adds 4 bytes per frame).
+        """
+        overhead = MBAP_EXTRA_BYTES if self.transport == TRANSPORT_TCP else 0
+        if unit == BROADCAST_UNIT:
+            response_bytes = 0
+        elif outcome == OUTCOME_OK:
+            response_bytes = response_length(function_code, count) + overhead
+        elif outcome == ERROR_EXCEPTION:
+            response_bytes = EXCEPTION_RESPONSE_LENGTH + overhead
+        else:
+            response_bytes = 0
+        self.tracer.emit(Transaction(
+            timestamp=time.time(),
+            port=self.port,
+            unit=unit,
+            function_code=function_code,
+            address=address,
+            count=count,
+            request_bytes=request_length(function_code, count) + overhead if sent else 0,
+            response_bytes=response_bytes,
+            queue_wait=queue_wait(),
+            latency=latency,
+            attempt=attempt,
+            outcome=outcome
+        ))
+        
+    def _transaction_timeout(self, function_code: int, count: int, unit: int) -> float:
+        """
+        Response deadline for one transaction
+        
+        Once enough round trips to the unit have been observed, the deadline is
+        the turnaround learned for it plus the predicted wire time. Until then
+        it is the configured timeout or, with precise timing, the predicted wire
+        time plus the turnaround allowance. It never exceeds the configured timeout.
+        """
+        default = self.timeout
+        if self.precise_timing:
+            default = min(self.timeout, self.timing.response_timeout(function_code, count))
+        if self.adaptive is None:
+            return default
+        wire_time = self.timing.transaction_wire_time(function_code, count)
+        return min(self.timeout, self.adaptive.timeout(self.port, unit, function_code, wire_time, default=default))
+        
+    def _apply_timeout(self, timeout: float):
+        """Set the read timeout used by pymodbus and the open serial port"""
+        self.client.params.timeout = timeout
+        # TCP reads wait on select() with params.timeout; serial reads use the port timeout
+        if not self.endpoint.is_network and getattr(self.client, 'socket', None) is not None:
+            self.client.socket.timeout = timeout
+            
+    def _flush_input(self):
+        """Discard bytes still waiting on the open serial port (late or partial responses)"""
+        if self.endpoint.is_network or getattr(self.client, 'socket', None) is None:
+            return
+        try:
+            self.client.socket.reset_input_buffer()
+        except Exception as e:
+            logger.debug(f"Could not flush input of {self.port}: {e}")
+            
+    def get_timeouts(self) -> Dict[str, Any]:
+        """
+        Get learned per-unit timeouts
+        
+        Returns:
+            Adaptive timeout configuration and learned turnaround per unit
+        """
+        if self.adaptive is None:
+            return {'enabled': False, 'timeout': self.timeout}
+        return dict(self.adaptive.to_dict(), enabled=True, timeout=self.timeout)
+        
+    def get_health(self) -> Dict[str, Any]:
+        """
+        Get retry policy counters and per-unit circuit breaker states
+        
+        Returns:
+            Dictionary with 'retry' policy and 'breakers' keyed by unit ID
+        """
+        return {
+            'retry': self.retry_policy.to_dict(),
+            'breakers': self.breakers.to_dict(),
+            'last_error_class': self.last_error_class
+        }
+        
+    def get_timing(self) -> Dict[str, Any]:
+        """
+        Get RTU timing parameters and wire vs wall time statistics
+        
+        Returns:
+            Dictionary with 'line' timing parameters and 'transactions' summary
+        """
+        return {
+            'precise_timing': self.precise_timing,
+            'timeout': self.timeout,
+            'line': self.timing.to_dict(),
+            'transactions': self.timing_stats.summary()
+        }
             
     def read_coils(self, address: int, count: int, unit: int = None) -> Optional[List[bool]]:
         """
@@ -234,29 +708,17 @@ class ModbusClient:
         Returns:
             List of boolean values or None if error
         """
-        if not self.client or not self.client.is_socket_open():
-            if not self.connect():
-                logger.error("Failed to connect to Modbus device")
-                return None
-        
         # Użyj unit_id z konfiguracji, jeśli nie podano innego
         unit_to_use = unit if unit is not None else self.unit_id
         
-        try:
-            result = self.client.read_coils(address, count, unit=unit_to_use)
-            if result.isError():
-                logger.error(f"Error reading coils: {result}")
-                return None
-            
-            # Convert to list of booleans
-            values = result.bits[:count]
-            logger.info(f"Read {count} coils from address {address}: {values}")
-            return values
-            
-        except Exception as e:
-            logger.error(f"Error reading coils: {e}")
+        result = self._execute('reading coils', 'read_coils', address, count, unit=unit_to_use)
+        if result is None:
             return None
             
+        # Convert to list of booleans
+        values = result.bits[:count]
+        return values
+            
     def read_discrete_inputs(self, address: int, count: int, unit: int = 1) -> Optional[List[bool]]:
         """
         Read discrete inputs
@@ -269,20 +731,48 @@ class ModbusClient:
         Returns:
             List of boolean values or None if error
         """
-        try:
-            result = self.client.read_discrete_inputs(address, count, unit=unit)
-            if result.isError():
-                logger.error(f"Error reading discrete inputs: {result}")
-                return None
-                
-            # Convert to list of booleans
-            values = result.bits[:count]
-            logger.info(f"Read {count} discrete inputs from address {address}: {values}")
-            return values
+        result = self._execute('reading discrete inputs', 'read_discrete_inputs', address, count, unit=unit)
+        if result is None:
+            return None
             
-        except Exception as e:
-            logger.error(f"Error reading discrete inputs: {e}")
+        # Convert to list of booleans
+        values = result.bits[:count]
+        return values
+            
+    def read_coils_mask(self, address: int, count: int, unit: int = None) -> Optional[BitMask]:
+        """
+        Read coils into a compact bitmask
+        
+        Args:
+            address: Starting address
+            count: Number of coils to read
+            unit: Slave unit ID (default: from configuration)
+            
+        Returns:
+            BitMask or None if error
+        """
+        unit_to_use = unit if unit is not None else self.unit_id
+        result = self._execute('reading coils', 'read_coils', address, count, unit=unit_to_use)
+        if result is None:
             return None
+        return BitMask.from_bits(result.bits[:count], address)
+            
+    def read_discrete_inputs_mask(self, address: int, count: int, unit: int = 1) -> Optional[BitMask]:
+        """
+        Read discrete inputs into a compact bitmask
+        
+        Args:
+            address: Starting address
+            count: Number of inputs to read
+            unit: Slave unit ID (default: 1)
+            
+        Returns:
+            BitMask or None if error
+        """
+        result = self._execute('reading discrete inputs', 'read_discrete_inputs', address, count, unit=unit)
+        if result is None:
+            return None
+        return BitMask.from_bits(result.bits[:count], address)
             
     def read_holding_registers(self, address: int, count: int, unit: int = 1) -> Optional[List[int]]:
         """
@@ -296,21 +786,14 @@ class ModbusClient:
         Returns:
             List of register values or None if error
         """
-        try:
-            result = self.client.read_holding_registers(address, count, unit=unit)
-            if result.isError():
-                logger.error(f"Error reading holding registers: {result}")
-                return None
-                
-            # Convert to list of integers
-            values = result.registers
-            logger.info(f"Read {count} holding registers from address {address}: {values}")
-            return values
-            
-        except Exception as e:
-            logger.error(f"Error reading holding registers: {e}")
+        result = self._execute('reading holding registers', 'read_holding_registers', address, count, unit=unit)
+        if result is None:
             return None
             
+        # Convert to list of integers
+        values = result.registers
+        return values
+            
     def read_input_registers(self, address: int, count: int, unit: int = 1) -> Optional[List[int]]:
         """
         Read input registers
@@ -323,21 +806,14 @@ class ModbusClient:
         Returns:
             List of register values or None if error
         """
-        try:
-            result = self.client.read_input_registers(address, count, unit=unit)
-            if result.isError():
-                logger.error(f"Error reading input registers: {result}")
-                return None
-                
-            # Convert to list of integers
-            values = result.registers
-            logger.info(f"Read {count} input registers from address {address}: {values}")
-            return values
-            
-        except Exception as e:
-            logger.error(f"Error reading input registers: {e}")
+        result = self._execute('reading input registers', 'read_input_registers', address, count, unit=unit)
+        if result is None:
             return None
             
+        # Convert to list of integers
+        values = result.registers
+        return values
+            
     def write_coil(self, address: int, value: bool, unit: int = None) -> bool:
         """
         Write single coil
@@ -350,27 +826,14 @@ class ModbusClient:
         Returns:
             True if successful, False otherwise
         """
-        if not self.client or not self.client.is_socket_open():
-            if not self.connect():
-                logger.error("Failed to connect to Modbus device")
-                return False
-        
         # Użyj unit_id z konfiguracji, jeśli nie podano innego
         unit_to_use = unit if unit is not None else self.unit_id
         
-        try:
-            result = self.client.write_coil(address, value, unit=unit_to_use)
-            if result.isError():
-                logger.error(f"Error writing coil: {result}")
-                return False
-            
-            logger.info(f"Written coil at address {address}: {value}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error writing coil: {e}")
+        if self._execute('writing coil', 'write_coil', address, value, unit=unit_to_use) is None:
             return False
             
+        return True
+            
     def write_register(self, address: int, value: int, unit: int = 1) -> bool:
         """
         Write single holding register
@@ -383,19 +846,11 @@ class ModbusClient:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            result = self.client.write_register(address, value, unit=unit)
-            if result.isError():
-                logger.error(f"Error writing register: {result}")
-                return False
-                
-            logger.info(f"Written register at address {address}: {value}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error writing register: {e}")
+        if self._execute('writing register', 'write_register', address, value, unit=unit) is None:
             return False
             
+        return True
+            
     def write_coils(self, address: int, values: List[bool], unit: int = 1) -> bool:
         """
         Write multiple coils
@@ -408,19 +863,11 @@ class ModbusClient:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            result = self.client.write_coils(address, values, unit=unit)
-            if result.isError():
-                logger.error(f"Error writing coils: {result}")
-                return False
-                
-            logger.info(f"Written {len(values)} coils starting at address {address}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error writing coils: {e}")
+        if self._execute('writing coils', 'write_coils', address, values, unit=unit) is None:
             return False
             
+        return True
+            
     def write_registers(self, address: int, values: List[int], unit: int = 1) -> bool:
         """
         Write multiple holding registers
@@ -433,15 +880,72 @@ class ModbusClient:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            result = self.client.write_registers(address, values, unit=unit)
-            if result.isError():
-                logger.error(f"Error writing registers: {result}")
-                return False
-                
-            logger.info(f"Written {len(values)} registers starting at address {address}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error writing registers: {e}")
+        if self._execute('writing registers', 'write_registers', address, values, unit=unit) is None:
             return False
+            
+        return True
+            
+    def broadcast(self, function_code: Union[int, str], address: int, values: Union[bool, int, List[Any]],
+                  verify_units: Optional[Iterable[int]] = None) -> Dict[str, Any]:
+        """
+        Write coils or holding registers on every slave of the line at once
+        
+        The write is sent to unit 0: no slave answers, and the next request
+        waits for the broadcast turnaround delay. Optionally each unit listed
+        in verify_units is read back with one block read and compared.
+        
+        Args:
+            function_code: Table written: coils (1/5/15) or holding registers (3/6/16),
+                as a function code or a name such as 'coils'
+            address: Starting address
+            values: One value (single write) or a list (multiple write)
+            verify_units: Units to read back after the write (default: none)
+            
+        Returns:
+            Dictionary with 'sent' and, per verified unit, True/False
+            (None if the readback failed) under 'verified'
+            
+        Raises:
+            ValueError: If the table is not writable
+        """
+        table = TABLES.get(function_code) or parse_function_code(function_code)
+        multiple = isinstance(values, (list, tuple))
+        if table == READ_COILS:
+            read = 'read_coils'
+            values = [bool(v) for v in values] if multiple else bool(values)
+            method = 'write_coils' if multiple else 'write_coil'
+        elif table == READ_HOLDING_REGISTERS:
+            read = 'read_holding_registers'
+            values = [int(v) for v in values] if multiple else int(values)
+            method = 'write_registers' if multiple else 'write_register'
+        else:
+            raise ValueError(f"Function code {function_code} cannot be broadcast")
+            
+        sent = self._execute(f'broadcasting {method}', method, address, values, unit=BROADCAST_UNIT) is not None
+        expected = list(values) if multiple else [values]
+        verified = {}
+        if sent:
+            for unit in verify_units or ():
+                current = getattr(self, read)(address, len(expected), unit)
+                verified[unit] = None if current is None else list(current) == expected
+        return {'sent': sent, 'verified': verified}
+            
+    def read_many(self, requests: Iterable[ReadRequest],
+                  planner: Optional[ReadPlanner] = None) -> List[Optional[List[Any]]]:
+        """
+        Read many points with as few wire transactions as possible
+        
+        Adjacent or nearby addresses of the same function code and unit are
+        merged into block reads and the values are sliced back per request.
+        
+        Args:
+            requests: Point reads (ReadRequest instances or equivalent tuples)
+            planner: Planner to use (default: the client's own planner)
+            
+        Returns:
+            List of values (or None if error) in the order of the requests
+        """
+        planner = planner or self.planner
+        requests = [ReadRequest(*request) for request in requests]
+        results = planner.execute(self, requests)
+        return [results.get(request) for request in requests]
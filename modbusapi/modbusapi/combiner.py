@@ -0,0 +1,391 @@
+"""
+ModbusAPI Write Combiner - Merge single writes into Write Multiple Coils/Registers
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Iterable, List, NamedTuple, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Kinds of writable points
+KIND_COIL = 'coil'
+KIND_REGISTER = 'register'
+
+# Maximum number of points a single write PDU may carry (Modbus spec)
+MAX_WRITE_COUNT = {
+    KIND_COIL: 1968,
+    KIND_REGISTER: 123,
+}
+
+# Client method writing one point / a block of points
+WRITE_METHODS = {
+    KIND_COIL: ('write_coil', 'write_coils'),
+    KIND_REGISTER: ('write_register', 'write_registers'),
+}
+
+
+class WriteRequest(NamedTuple):
+    """Single pending point write"""
+    kind: str
+    address: int
+    value: Any
+    unit: int = 1
+
+
+class WriteBlock:
+    """One wire transaction carrying one or more write requests"""
+
+    def __init__(self, kind: str, unit: int, address: int):
+        self.kind = kind
+        self.unit = unit
+        self.address = address
+        self.values: List[Any] = []
+        # Index (in the submitted order) of each request carried by this block
+        self.requests: List[int] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.values)
+
+    @property
+    def end(self) -> int:
+        return self.address + len(self.values)
+
+    @property
+    def method(self) -> str:
+        """Client method sending this block (single write for one point)"""
+        single, multiple = WRITE_METHODS[self.kind]
+        return single if self.count == 1 else multiple
+
+    @property
+    def args(self) -> Tuple[int, Any]:
+        """Address and value(s) passed to the client method"""
+        return self.address, self.values[0] if self.count == 1 else list(self.values)
+
+    def __repr__(self) -> str:
+        return f"WriteBlock({self.kind}, unit={self.unit}, address={self.address}, count={self.count})"
+
+
+def plan_writes(writes: Iterable[WriteRequest],
+                known: Optional[Callable[[str, int, int], Any]] = None,
+                max_gap: int = 0) -> List[WriteBlock]:
+    """
+    Merge point writes into as few block writes as possible
+
+    Writes are cut into batches so that no batch writes the same point twice;
+    every write therefore reaches the device, and writes to one point arrive
+    in issue order. Within a batch, writes of one kind to one unit are merged
+    when contiguous, or when the gap between them is at most ``max_gap``
+    points whose current value is known (the gap is rewritten with that
+    value). Blocks of a batch run in the order of their first write, so
+    writes to different points of one batch may reach the device out of
+    issue order.
+
+    Args:
+        writes: Point writes in issue order
+        known: Returns the known value of (kind, unit, address), or None
+        max_gap: Largest gap bridged with known values
+
+    Returns:
+        Blocks in execution order
+    """
+    writes = list(writes)
+    batches: List[List[int]] = []
+    seen = set()
+    for index, write in enumerate(writes):
+        key = (write.kind, write.unit, write.address)
+        if not batches or key in seen:
+            batches.append([])
+            seen = set()
+        batches[-1].append(index)
+        seen.add(key)
+
+    blocks = []
+    for batch in batches:
+        groups: Dict[Tuple[str, int], List[int]] = {}
+        for index in batch:
+            groups.setdefault((writes[index].kind, writes[index].unit), []).append(index)
+        batch_blocks = []
+        for (kind, unit), indices in groups.items():
+            indices.sort(key=lambda i: writes[i].address)
+            block = None
+            for index in indices:
+                write = writes[index]
+                if block is not None:
+                    gap = _gap_values(block, write, known, max_gap)
+                    if gap is not None and block.count + len(gap) < MAX_WRITE_COUNT[kind]:
+                        block.values.extend(gap)
+                        block.values.append(write.value)
+                        block.requests.append(index)
+                        continue
+                block = WriteBlock(kind, unit, write.address)
+                block.values.append(write.value)
+                block.requests.append(index)
+                batch_blocks.append(block)
+        # Blocks of a batch run in the order of their first write
+        batch_blocks.sort(key=lambda b: min(b.requests))
+        blocks.extend(batch_blocks)
+    return blocks
+
+
+def _gap_values(block: WriteBlock, write: WriteRequest,
+                known: Optional[Callable[[str, int, int], Any]], max_gap: int) -> Optional[List[Any]]:
+    """Values filling the gap between a block and the next write, or None if it cannot be bridged"""
+    gap = write.address - block.end
+    if gap == 0:
+        return []
+    if gap < 0 or gap > max_gap or known is None:
+        return None
+    values = [known(write.kind, write.unit, address) for address in range(block.end, write.address)]
+    return None if any(value is None for value in values) else values
+
+
+class _Combiner:
+    """Pending writes, known point values and statistics shared by both combiners"""
+
+    def __init__(self, client: Any, window: Optional[float] = None, max_gap: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        """
+        Initialize combiner
+
+        Args:
+            client: Client with write_coil(s)/write_register(s) methods
+            window: Seconds writes are collected before being sent
+                    (default: from .env MODBUS_WRITE_WINDOW or 0.005)
+            max_gap: Points bridged with known values between writes
+                     (default: from .env MODBUS_WRITE_MAX_GAP or 4)
+            max_age: Age in seconds after which a known value no longer bridges gaps
+                     (default: from .env MODBUS_WRITE_MAX_AGE or 1.0)
+        """
+        self.client = client
+        self.window = float(os.getenv('MODBUS_WRITE_WINDOW', '0.005')) if window is None else window
+        self.max_gap = int(os.getenv('MODBUS_WRITE_MAX_GAP', '4')) if max_gap is None else max_gap
+        self.max_age = float(os.getenv('MODBUS_WRITE_MAX_AGE', '1.0')) if max_age is None else max_age
+        # Value and time.monotonic() of its read or write, per point
+        self.known: Dict[Tuple[str, int, int], Tuple[Any, float]] = {}
+        self._pending: List[Tuple[WriteRequest, Any]] = []
+        self._writes = 0
+        self._transactions = 0
+
+    def _unit(self, unit: Optional[int]) -> int:
+        return unit if unit is not None else getattr(self.client, 'unit_id', 1)
+
+    def known_value(self, kind: str, unit: int, address: int) -> Any:
+        """Last value read from or written to a point (None if unknown or older than max_age)"""
+        entry = self.known.get((kind, unit, address))
+        if entry is None or time.monotonic() - entry[1] > self.max_age:
+            return None
+        return entry[0]
+
+    def observe(self, kind: str, address: int, values: Iterable[Any], unit: int = 1):
+        """
+        Record point values read from the device (used to bridge gaps)
+
+        Args:
+            kind: KIND_COIL or KIND_REGISTER
+            address: Address of the first value
+            values: Values read
+            unit: Slave unit ID
+        """
+        now = time.monotonic()
+        for offset, value in enumerate(values):
+            self.known[(kind, unit, address + offset)] = (value, now)
+
+    def _plan(self, pending: List[Tuple[WriteRequest, Any]]) -> List[WriteBlock]:
+        blocks = plan_writes([request for request, _ in pending], self.known_value, self.max_gap)
+        self._writes += len(pending)
+        self._transactions += len(blocks)
+        return blocks
+
+    def _completed(self, block: WriteBlock, success: bool):
+        if success:
+            self.observe(block.kind, block.address, block.values, block.unit)
+        else:
+            logger.error(f"Combined write failed: {block}")
+            # The points may or may not have been written
+            for address in range(block.address, block.end):
+                self.known.pop((block.kind, block.unit, address), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get combining statistics
+
+        Returns:
+            Dictionary with 'writes', 'transactions' and 'saved' counts
+        """
+        return {
+            'window': self.window,
+            'max_gap': self.max_gap,
+            'writes': self._writes,
+            'transactions': self._transactions,
+            'saved': self._writes - self._transactions,
+        }
+
+
+class WriteCombiner(_Combiner):
+    """
+    Collects writes issued within a short window and sends them as block writes
+
+    Each write returns a Future resolving to True/False, the outcome of the
+    transaction that carried it. Writes are flushed ``window`` seconds after
+    the first pending one, or at once by flush()/write_many().
+    """
+
+    def __init__(self, client: Any, window: Optional[float] = None, max_gap: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        super().__init__(client, window, max_gap, max_age)
+        self._lock = threading.Lock()
+        # Serializes flushes so batches reach the bus in submission order
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, request: WriteRequest) -> Future:
+        """
+        Queue a write
+
+        Args:
+            request: Point write
+
+        Returns:
+            Future resolving to True if the write succeeded
+        """
+        future = self._enqueue(request, schedule=self.window > 0)
+        if self.window <= 0:
+            self.flush()
+        return future
+
+    def _enqueue(self, request: WriteRequest, schedule: bool) -> Future:
+        future = Future()
+        with self._lock:
+            self._pending.append((request, future))
+            if schedule and self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        return future
+
+    def submit_coil(self, address: int, value: bool, unit: Optional[int] = None) -> Future:
+        """Queue a coil write"""
+        return self.submit(WriteRequest(KIND_COIL, address, bool(value), self._unit(unit)))
+
+    def submit_register(self, address: int, value: int, unit: Optional[int] = None) -> Future:
+        """Queue a holding register write"""
+        return self.submit(WriteRequest(KIND_REGISTER, address, int(value), self._unit(unit)))
+
+    def write_coil(self, address: int, value: bool, unit: Optional[int] = None) -> bool:
+        """Write a coil, combined with writes issued by other threads"""
+        return self.submit_coil(address, value, unit).result()
+
+    def write_register(self, address: int, value: int, unit: Optional[int] = None) -> bool:
+        """Write a holding register, combined with writes issued by other threads"""
+        return self.submit_register(address, value, unit).result()
+
+    def write_many(self, writes: Iterable[WriteRequest]) -> List[bool]:
+        """
+        Write many points now with as few transactions as possible
+
+        Args:
+            writes: Point writes (WriteRequest instances or equivalent tuples)
+
+        Returns:
+            Outcome of each write, in order
+        """
+        futures = [self._enqueue(WriteRequest(*write), schedule=False) for write in writes]
+        self.flush()
+        return [future.result() for future in futures]
+
+    def flush(self):
+        """Send all pending writes"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if not pending:
+                return
+            for block in self._plan(pending):
+                try:
+                    success = bool(getattr(self.client, block.method)(*block.args, block.unit))
+                except Exception as e:
+                    logger.error(f"Error writing {block}: {e}")
+                    success = False
+                self._completed(block, success)
+                for index in block.requests:
+                    if not pending[index][1].done():
+                        pending[index][1].set_result(success)
+
+
+class AsyncWriteCombiner(_Combiner):
+    """WriteCombiner for AsyncModbusClient, flushing on the event loop"""
+
+    def __init__(self, client: Any, window: Optional[float] = None, max_gap: Optional[int] = None,
+                 max_age: Optional[float] = None):
+        super().__init__(client, window, max_gap, max_age)
+        self._flush_lock = asyncio.Lock()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def submit(self, request: WriteRequest) -> asyncio.Future:
+        """
+        Queue a write
+
+        Args:
+            request: Point write
+
+        Returns:
+            Future resolving to True if the write succeeded
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((request, future))
+        if self._timer is None:
+            self._timer = loop.call_later(max(self.window, 0), lambda: loop.create_task(self.flush()))
+        return future
+
+    async def write_coil(self, address: int, value: bool, unit: Optional[int] = None) -> bool:
+        """Write a coil, combined with concurrent writes"""
+        return await self.submit(WriteRequest(KIND_COIL, address, bool(value), self._unit(unit)))
+
+    async def write_register(self, address: int, value: int, unit: Optional[int] = None) -> bool:
+        """Write a holding register, combined with concurrent writes"""
+        return await self.submit(WriteRequest(KIND_REGISTER, address, int(value), self._unit(unit)))
+
+    async def write_many(self, writes: Iterable[WriteRequest]) -> List[bool]:
+        """
+        Write many points now with as few transactions as possible
+
+        Args:
+            writes: Point writes (WriteRequest instances or equivalent tuples)
+
+        Returns:
+            Outcome of each write, in order
+        """
+        futures = [self.submit(WriteRequest(*write)) for write in writes]
+        await self.flush()
+        return list(await asyncio.gather(*futures))
+
+    async def flush(self):
+        """Send all pending writes"""
+        async with self._flush_lock:
+            pending, self._pending = self._pending, []
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not pending:
+                return
+            for block in self._plan(pending):
+                try:
+                    success = bool(await getattr(self.client, block.method)(*block.args, block.unit))
+                except Exception as e:
+                    logger.error(f"Error writing {block}: {e}")
+                    success = False
+                self._completed(block, success)
+                for index in block.requests:
+                    if not pending[index][1].done():
+                        pending[index][1].set_result(success)
@@ -0,0 +1,379 @@
+"""
+ModbusAPI Decoder - Typed register maps decoded block-wise with precompiled structs
+"""
+
+import json
+import struct
+import logging
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+from .planner import READ_HOLDING_REGISTERS, READ_METHODS, MAX_READ_COUNT
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Byte/word orders
+BIG = 'big'
+LITTLE = 'little'
+
+# struct code and size in registers of each numeric type
+TYPES = {
+    'int16': ('h', 1),
+    'uint16': ('H', 1),
+    'int32': ('i', 2),
+    'uint32': ('I', 2),
+    'int64': ('q', 4),
+    'uint64': ('Q', 4),
+    'float32': ('f', 2),
+    'float64': ('d', 4),
+}
+TYPE_STRING = 'string'
+TYPE_BITS = 'bits'
+
+# NumPy dtypes of the numeric types (big-endian, byte order fixed per buffer)
+NUMPY_TYPES = {
+    'int16': 'i2', 'uint16': 'u2', 'int32': 'i4', 'uint32': 'u4',
+    'int64': 'i8', 'uint64': 'u8', 'float32': 'f4', 'float64': 'f8',
+}
+
+
+def _layout(byte_order: str, word_order: str) -> Tuple[str, str]:
+    """
+    Register packing and unpack prefix reproducing a byte/word order
+
+    Registers packed big-endian give the bytes as sent on the wire (ABCD...).
+    Reading that buffer little-endian reverses all bytes (DCBA); packing the
+    registers little-endian swaps bytes within each register, so reading it
+    little-endian yields swapped words (CDAB) and big-endian swapped bytes (BADC).
+
+    Returns:
+        (register packing prefix, value unpack prefix)
+    """
+    if byte_order == BIG:
+        return ('>', '>') if word_order == BIG else ('<', '<')
+    return ('<', '>') if word_order == BIG else ('>', '<')
+
+
+class Field:
+    """Typed value stored in one or more registers"""
+
+    def __init__(self,
+                 name: str,
+                 address: int,
+                 type: str = 'uint16',
+                 scale: float = 1.0,
+                 offset: float = 0.0,
+                 byte_order: str = BIG,
+                 word_order: str = BIG,
+                 bit: int = 0,
+                 width: int = 1,
+                 length: int = 1,
+                 units: Optional[str] = None):
+        """
+        Initialize field
+
+        Args:
+            name: Field name
+            address: First register address
+            type: int16/32/64, uint16/32/64, float32/64, 'string' or 'bits'
+            scale: Engineering value = raw * scale + offset (numeric types)
+            offset: See scale
+            byte_order: Byte order within a register ('big' or 'little')
+            word_order: Register order of multi-register values ('big' or 'little')
+            bit: First bit of a bitfield (0 = least significant)
+            width: Number of bits of a bitfield (1 gives a bool)
+            length: Number of registers of a string
+            units: Engineering units, e.g. 'V' or 'degC'
+        """
+        if type not in TYPES and type not in (TYPE_STRING, TYPE_BITS):
+            raise ValueError(f"Unknown field type: {type}")
+        if byte_order not in (BIG, LITTLE) or word_order not in (BIG, LITTLE):
+            raise ValueError(f"Byte/word order must be '{BIG}' or '{LITTLE}'")
+        self.name = name
+        self.address = address
+        self.type = type
+        self.scale = scale
+        self.offset = offset
+        self.byte_order = byte_order
+        self.word_order = word_order
+        self.bit = bit
+        self.width = width
+        self.length = length
+        self.units = units
+
+        if type == TYPE_STRING:
+            self.registers = length
+            self.code = f'{2 * length}s'
+        elif type == TYPE_BITS:
+            if bit < 0 or width < 1 or bit + width > 32:
+                raise ValueError(f"Bitfield {name} does not fit in 32 bits")
+            self.registers = 1 if bit + width <= 16 else 2
+            self.code = 'H' if self.registers == 1 else 'I'
+        else:
+            self.code, self.registers = TYPES[type]
+
+    @property
+    def end(self) -> int:
+        """First address after the field"""
+        return self.address + self.registers
+
+    def convert(self, raw: Any) -> Any:
+        """Turn an unpacked raw value into the engineering value"""
+        if self.type == TYPE_STRING:
+            return raw.rstrip(b'\x00 ').decode('ascii', errors='replace')
+        if self.type == TYPE_BITS:
+            value = (raw >> self.bit) & ((1 << self.width) - 1)
+            return bool(value) if self.width == 1 else value
+        if self.scale != 1 or self.offset:
+            return raw * self.scale + self.offset
+        return raw
+
+    def encode(self, value: Any) -> List[int]:
+        """
+        Encode an engineering value into registers
+
+        Args:
+            value: Engineering value (bitfields are not encodable on their own)
+
+        Returns:
+            Register values to write at self.address
+        """
+        if self.type == TYPE_BITS:
+            raise ValueError(f"Bitfield {self.name} cannot be written on its own")
+        pack_prefix, value_prefix = _layout(self.byte_order, self.word_order)
+        if self.type == TYPE_STRING:
+            raw = str(value).encode('ascii')[:2 * self.length]
+        else:
+            if self.scale != 1 or self.offset:
+                value = (value - self.offset) / self.scale
+            if self.code not in 'fd':
+                value = int(round(value))
+            raw = struct.pack(value_prefix + self.code, value)
+        return list(struct.unpack(f'{pack_prefix}{self.registers}H', raw.ljust(2 * self.registers, b'\x00')))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return field definition"""
+        data = {'name': self.name, 'address': self.address, 'type': self.type}
+        if self.type == TYPE_STRING:
+            data['length'] = self.length
+        elif self.type == TYPE_BITS:
+            data.update(bit=self.bit, width=self.width)
+        else:
+            data.update(scale=self.scale, offset=self.offset)
+        data.update(byte_order=self.byte_order, word_order=self.word_order)
+        if self.units:
+            data['units'] = self.units
+        return data
+
+
+class _Layer:
+    """Non-overlapping fields sharing one byte/word order, read by one Struct"""
+
+    def __init__(self, pack_prefix: str, value_prefix: str):
+        self.pack_prefix = pack_prefix
+        self.value_prefix = value_prefix
+        self.fields: List[Field] = []
+        self.struct: Optional[struct.Struct] = None
+        self.offset = 0
+
+    def fits(self, field: Field) -> bool:
+        return not self.fields or field.address >= self.fields[-1].end
+
+    def compile(self, base: int):
+        """Build one format for all fields, padding the gaps"""
+        parts = []
+        position = self.fields[0].address
+        for field in self.fields:
+            if field.address > position:
+                parts.append(f'{2 * (field.address - position)}x')
+            parts.append(field.code)
+            position = field.end
+        self.offset = 2 * (self.fields[0].address - base)
+        self.struct = struct.Struct(self.value_prefix + ''.join(parts))
+
+
+class RegisterMap:
+    """
+    Typed fields over one contiguous register block
+
+    The map is compiled once: fields are grouped by byte/word order into
+    layers of non-overlapping fields, and each layer is decoded with a single
+    precompiled ``struct.unpack_from`` over the packed block.
+    """
+
+    def __init__(self, fields: Iterable[Field], function_code: int = READ_HOLDING_REGISTERS,
+                 unit: int = 1, name: Optional[str] = None):
+        """
+        Initialize register map
+
+        Args:
+            fields: Field definitions
+            function_code: Read function code of the block (3 or 4)
+            unit: Slave unit ID
+            name: Map name
+        """
+        self.fields = sorted(fields, key=lambda field: field.address)
+        if not self.fields:
+            raise ValueError("Register map needs at least one field")
+        names = [field.name for field in self.fields]
+        if len(set(names)) != len(names):
+            raise ValueError("Field names must be unique")
+        self.function_code = function_code
+        self.unit = unit
+        self.name = name
+        self.address = self.fields[0].address
+        self.count = max(field.end for field in self.fields) - self.address
+        self._layers: List[_Layer] = []
+        self._compile()
+
+    def _compile(self):
+        for field in self.fields:
+            pack_prefix, value_prefix = _layout(field.byte_order, field.word_order)
+            layer = next(
+                (layer for layer in self._layers
+                 if layer.pack_prefix == pack_prefix and layer.value_prefix == value_prefix and layer.fits(field)),
+                None
+            )
+            if layer is None:
+                layer = _Layer(pack_prefix, value_prefix)
+                self._layers.append(layer)
+            layer.fields.append(field)
+        for layer in self._layers:
+            layer.compile(self.address)
+        self._pack = {
+            prefix: struct.Struct(f'{prefix}{self.count}H')
+            for prefix in {layer.pack_prefix for layer in self._layers}
+        }
+
+    def decode(self, registers: List[int]) -> Dict[str, Any]:
+        """
+        Decode a register block
+
+        Args:
+            registers: Values of the registers self.address .. self.address + self.count - 1
+
+        Returns:
+            Dictionary of engineering values by field name
+        """
+        if len(registers) < self.count:
+            raise ValueError(f"Expected {self.count} registers, got {len(registers)}")
+        buffers = {prefix: packer.pack(*registers[:self.count]) for prefix, packer in self._pack.items()}
+        values = {}
+        for layer in self._layers:
+            raw = layer.struct.unpack_from(buffers[layer.pack_prefix], layer.offset)
+            for field, value in zip(layer.fields, raw):
+                values[field.name] = field.convert(value)
+        return {field.name: values[field.name] for field in self.fields}
+
+    def read(self, client: Any, unit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Read the block from a client and decode it
+
+        Args:
+            client: Object exposing ModbusClient's read_* methods
+            unit: Slave unit ID (default: self.unit)
+
+        Returns:
+            Dictionary of engineering values, or None if a read failed
+        """
+        unit = self.unit if unit is None else unit
+        read = getattr(client, READ_METHODS[self.function_code])
+        limit = MAX_READ_COUNT[self.function_code]
+        registers: List[int] = []
+        for start in range(self.address, self.address + self.count, limit):
+            chunk = read(start, min(limit, self.address + self.count - start), unit)
+            if chunk is None:
+                return None
+            registers.extend(chunk)
+        return self.decode(registers)
+
+    def field(self, name: str) -> Optional[Field]:
+        """Return a field by name"""
+        return next((field for field in self.fields if field.name == name), None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return map definition"""
+        return {
+            'name': self.name,
+            'function_code': self.function_code,
+            'unit': self.unit,
+            'address': self.address,
+            'count': self.count,
+            'fields': [field.to_dict() for field in self.fields],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RegisterMap':
+        """Create a map from a dictionary as returned by to_dict()"""
+        return cls(
+            [Field(**field) for field in data['fields']],
+            function_code=int(data.get('function_code', READ_HOLDING_REGISTERS)),
+            unit=int(data.get('unit', 1)),
+            name=data.get('name')
+        )
+
+
+def load_register_maps(path: str) -> Dict[str, RegisterMap]:
+    """
+    Load register maps from a JSON file
+
+    The file holds one map object or a list of them (see RegisterMap.to_dict).
+
+    Args:
+        path: JSON file path
+
+    Returns:
+        Maps keyed by name (or list index for unnamed maps); empty if the file could not be loaded
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [data]
+        maps = [RegisterMap.from_dict(entry) for entry in data]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.error(f"Could not load register map {path}: {e}")
+        return {}
+    return {register_map.name or str(index): register_map for index, register_map in enumerate(maps)}
+
+
+def decode_array(registers: List[int], type: str = 'uint16',
+                 byte_order: str = BIG, word_order: str = BIG,
+                 scale: float = 1.0, offset: float = 0.0) -> List[Any]:
+    """
+    Decode consecutive values of one type
+
+    Uses a NumPy view when NumPy is installed, otherwise a single
+    struct.unpack_from with a repeat count.
+
+    Args:
+        registers: Register values
+        type: Numeric type (see TYPES)
+        byte_order: Byte order within a register
+        word_order: Register order of multi-register values
+        scale: Engineering value = raw * scale + offset
+        offset: See scale
+
+    Returns:
+        List of values (trailing registers not forming a whole value are ignored)
+    """
+    if type not in TYPES:
+        raise ValueError(f"Unsupported array type: {type}")
+    code, size = TYPES[type]
+    count = len(registers) // size
+    pack_prefix, value_prefix = _layout(byte_order, word_order)
+    buffer = struct.pack(f'{pack_prefix}{count * size}H', *registers[:count * size])
+    if np is not None:
+        values = np.frombuffer(buffer, dtype=value_prefix + NUMPY_TYPES[type])
+        if scale != 1 or offset:
+            values = values * scale + offset
+        return values.tolist()
+    values = struct.unpack_from(f'{value_prefix}{count}{code}', buffer)
+    if scale != 1 or offset:
+        return [value * scale + offset for value in values]
+    return list(values)
@@ -0,0 +1,386 @@
+"""
+ModbusAPI Detect - Concurrent discovery of Modbus devices on serial ports
+"""
+
+import os
+import json
+import time
+import glob
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from typing import Optional, List, Dict, Any, NamedTuple, Sequence
+
+try:
+    from pymodbus.client.serial import ModbusSerialClient
+    from pymodbus.pdu import ExceptionResponse
+except ImportError:
+    raise ImportError(
+        "pymodbus library not found! Install with: pip install pymodbus[serial]"
+    )
+
+from .timing import RtuTiming, READ_COILS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Baud rates tried in order (the most common first)
+DEFAULT_BAUDRATES = [9600, 19200, 38400, 57600, 115200]
+
+# Unit IDs probed on every port and baud rate
+DEFAULT_UNITS = [1, 2, 3]
+
+# Stable names of USB serial adapters (symlinks to the current /dev/tty* node)
+BY_ID_DIR = '/dev/serial/by-id'
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'modbusapi', 'detect.json')
+
+
+class DetectedDevice(NamedTuple):
+    """Serial line settings at which Modbus units answered"""
+    port: str
+    baudrate: int
+    parity: str
+    units: List[int]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return detection result"""
+        return self._asdict()
+
+
+def find_serial_ports() -> List[str]:
+    """
+    Find all available serial ports (ACM and USB)
+
+    Returns:
+        List of available serial port paths
+    """
+    ports = []
+
+    # Check for ACM ports (USB CDC devices)
+    acm_ports = glob.glob('/dev/ttyACM*')
+    ports.extend(sorted(acm_ports))
+
+    # Check for USB serial ports
+    usb_ports = glob.glob('/dev/ttyUSB*')
+    ports.extend(sorted(usb_ports))
+
+    logger.info(f"Found serial ports: {ports}")
+    return ports
+
+
+def device_identity(port: str) -> str:
+    """
+    Stable identity of a serial port
+
+    Args:
+        port: Serial port path (e.g. /dev/ttyUSB0)
+
+    Returns:
+        The /dev/serial/by-id link pointing at the port, or the port itself
+        if it has none (built-in UARTs, pseudo-terminals)
+    """
+    real = os.path.realpath(port)
+    for link in sorted(glob.glob(os.path.join(BY_ID_DIR, '*'))):
+        if os.path.realpath(link) == real:
+            return link
+    return port
+
+
+class DetectionCache:
+    """
+    Last working line settings per adapter, persisted as JSON
+
+    Entries are keyed by device_identity(), so an adapter is found again after
+    it was renumbered (ttyUSB0 -> ttyUSB1). A cached entry is trusted only after
+    one probe of its first unit at the stored settings succeeds.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize cache
+
+        Args:
+            path: JSON file (default: from .env MODBUS_DETECT_CACHE or
+                ~/.cache/modbusapi/detect.json, empty string disables the cache)
+        """
+        self.path = path if path is not None else os.getenv('MODBUS_DETECT_CACHE', DEFAULT_CACHE_PATH)
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self) -> bool:
+        """
+        Load the cache file
+
+        Returns:
+            True if loaded, False otherwise
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            entries = {
+                identity: {
+                    'port': entry['port'],
+                    'baudrate': int(entry['baudrate']),
+                    'parity': entry.get('parity', 'N'),
+                    'units': [int(unit) for unit in entry['units']],
+                    'updated': entry.get('updated'),
+                }
+                for identity, entry in data.get('devices', {}).items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Could not load detection cache from {self.path}: {e}")
+            return False
+        with self._lock:
+            self.entries = entries
+        return True
+
+    def save(self) -> bool:
+        """
+        Write the cache file
+
+        Returns:
+            True if saved, False otherwise
+        """
+        if not self.path:
+            return False
+        with self._lock:
+            data = {'version': 1, 'devices': dict(self.entries)}
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not save detection cache to {self.path}: {e}")
+            return False
+
+    def store(self, devices: Sequence[DetectedDevice]):
+        """Remember the settings of detected devices (and save the file)"""
+        if not devices:
+            return
+        with self._lock:
+            for device in devices:
+                entry = dict(device.to_dict(), updated=time.time())
+                self.entries[device_identity(device.port)] = entry
+        self.save()
+
+    def forget(self, identity: str):
+        """Drop an entry whose settings stopped working"""
+        with self._lock:
+            removed = self.entries.pop(identity, None)
+        if removed is not None:
+            self.save()
+
+    def validate(self, ports: Optional[Sequence[str]] = None, first: bool = True) -> List[DetectedDevice]:
+        """
+        Probe cached settings, one request per adapter
+
+        Args:
+            ports: Only consider adapters currently at these ports (default: any)
+            first: Stop at the first confirmed adapter
+
+        Returns:
+            Confirmed devices at their current port; entries that fail are dropped
+        """
+        with self._lock:
+            entries = list(self.entries.items())
+        confirmed = []
+        for identity, entry in entries:
+            port = os.path.realpath(identity) if identity.startswith(BY_ID_DIR) else entry['port']
+            if not os.path.exists(identity) or (ports is not None and port not in ports):
+                continue
+            if probe_port(port, [entry['baudrate']], [entry['parity']], entry['units'][:1]) is None:
+                logger.info(f"Cached settings for {identity} no longer answer")
+                self.forget(identity)
+                continue
+            confirmed.append(DetectedDevice(port, entry['baudrate'], entry['parity'], entry['units']))
+            if first:
+                break
+        return confirmed
+
+
+_cache: Optional[DetectionCache] = None
+
+
+def default_cache() -> DetectionCache:
+    """Detection cache at MODBUS_DETECT_CACHE, loaded once"""
+    global _cache
+    if _cache is None:
+        _cache = DetectionCache()
+    return _cache
+
+
+def _answered(result: Any) -> bool:
+    """True for a normal or exception response (both prove a device is listening)"""
+    return isinstance(result, ExceptionResponse) or (hasattr(result, 'isError') and not result.isError())
+
+
+def probe_port(port: str, baudrates: Sequence[int] = DEFAULT_BAUDRATES, parities: Sequence[str] = ('N',),
+               units: Sequence[int] = DEFAULT_UNITS, deadline: Optional[float] = None,
+               stop: Optional[threading.Event] = None) -> Optional[DetectedDevice]:
+    """
+    Find the line settings at which units answer on one port
+
+    Every baud rate and parity is tried in turn with a one-coil read (then a
+    one-register read) per unit, each waiting only as long as the predicted
+    response time. At the first settings with an answer, all units are probed.
+
+    Args:
+        port: Serial port path
+        baudrates: Baud rates to try, in order
+        parities: Parities to try, in order
+        units: Unit IDs to probe
+        deadline: time.monotonic() value after which probing stops
+        stop: Event set when probing should stop early
+
+    Returns:
+        DetectedDevice, or None if nothing answered
+    """
+    def cancelled() -> bool:
+        return (stop is not None and stop.is_set()) or (deadline is not None and time.monotonic() > deadline)
+
+    for baudrate in baudrates:
+        for parity in parities:
+            if cancelled():
+                return None
+            timeout = RtuTiming(baudrate, parity=parity).response_timeout(READ_COILS, 1)
+            client = ModbusSerialClient(method='rtu', port=port, baudrate=baudrate, parity=parity,
+                                        stopbits=1, bytesize=8, timeout=timeout)
+            try:
+                if not client.connect():
+                    logger.debug(f"Failed to open {port}")
+                    return None
+                responding = []
+                for unit in units:
+                    if cancelled():
+                        break
+                    try:
+                        if _answered(client.read_coils(0, 1, unit=unit)) or \
+                                _answered(client.read_holding_registers(0, 1, unit=unit)):
+                            responding.append(unit)
+                    except Exception as e:
+                        logger.debug(f"Probe of unit {unit} on {port} at {baudrate} baud failed: {e}")
+            finally:
+                client.close()
+            if responding:
+                logger.info(f"Modbus device found on {port} at {baudrate} baud, parity {parity}, "
+                            f"units {responding}")
+                return DetectedDevice(port, baudrate, parity, responding)
+    return None
+
+
+def detect_modbus_devices(ports: Optional[Sequence[str]] = None,
+                          baudrates: Optional[Sequence[int]] = None,
+                          parities: Sequence[str] = ('N',),
+                          units: Optional[Sequence[int]] = None,
+                          budget: Optional[float] = None,
+                          first: bool = True,
+                          cache: Optional[DetectionCache] = None) -> List[DetectedDevice]:
+    """
+    Probe serial ports concurrently, one worker per port
+
+    Settings cached from an earlier run are tried first with a single probe
+    per adapter; only the ports not confirmed that way are scanned.
+
+    Args:
+        ports: Ports to probe (default: all ACM and USB serial ports)
+        baudrates: Baud rates to try (default: 9600, 19200, 38400, 57600, 115200)
+        parities: Parities to try (default: 'N')
+        units: Unit IDs to probe (default: 1, 2, 3)
+        budget: Total time in seconds (default: from .env MODBUS_DETECT_BUDGET or 10)
+        first: Stop at the first port with an answer instead of probing all
+        cache: Detection cache (default: default_cache(); disabled when
+            MODBUS_DETECT_CACHE is empty)
+
+    Returns:
+        Detected devices in port order (empty if none answered within the budget)
+    """
+    ports = list(find_serial_ports() if ports is None else ports)
+    if not ports:
+        return []
+    cache = cache or default_cache()
+    confirmed = cache.validate(ports, first) if cache.path else []
+    if confirmed and first:
+        return confirmed
+    known = {device.port for device in confirmed}
+    scanned = _scan(ports=[port for port in ports if port not in known], baudrates=baudrates,
+                    parities=parities, units=units, budget=budget, first=first)
+    if cache.path:
+        cache.store(scanned)
+    return sorted(confirmed + scanned, key=lambda device: ports.index(device.port))
+
+
+def _scan(ports: List[str], baudrates: Optional[Sequence[int]], parities: Sequence[str],
+          units: Optional[Sequence[int]], budget: Optional[float], first: bool) -> List[DetectedDevice]:
+    """Full concurrent scan of ports (see detect_modbus_devices)"""
+    if not ports:
+        return []
+    budget = budget if budget is not None else float(os.getenv('MODBUS_DETECT_BUDGET', '10'))
+    deadline = time.monotonic() + budget
+    stop = threading.Event()
+    found = []
+
+    executor = ThreadPoolExecutor(max_workers=len(ports), thread_name_prefix='modbus-detect')
+    futures = [
+        executor.submit(probe_port, port, baudrates or DEFAULT_BAUDRATES, parities,
+                        units or DEFAULT_UNITS, deadline, stop)
+        for port in ports
+    ]
+    try:
+        for future in as_completed(futures, timeout=budget):
+            result = future.result()
+            if result is not None:
+                found.append(result)
+                if first:
+                    break
+    except FutureTimeout:
+        logger.warning(f"Modbus detection budget of {budget:.1f}s exhausted")
+    finally:
+        # Workers still probing stop after their current request
+        stop.set()
+        executor.shutdown(wait=False)
+    return sorted(found, key=lambda device: ports.index(device.port))
+
+
+def auto_detect_modbus_device(baudrates: List[int] = None) -> Optional[DetectedDevice]:
+    """
+    Automatically detect a working Modbus device and its line settings
+
+    Args:
+        baudrates: List of baud rates to test (default: common rates)
+
+    Returns:
+        Port, baud rate, parity and answering units, or None if not found
+    """
+    print("Scanning for Modbus devices...")
+    devices = detect_modbus_devices(baudrates=baudrates)
+    if not devices:
+        print("No Modbus devices found!")
+        return None
+    device = devices[0]
+    print(f"✓ Modbus device detected on {device.port} at {device.baudrate} baud {device.parity} "
+          f"(units {device.units})")
+    return device
+
+
+def auto_detect_modbus_port(baudrates: List[int] = None) -> Optional[str]:
+    """
+    Automatically detect which serial port has a working Modbus device
+
+    The port alone is not enough to open it: use auto_detect_modbus_device
+    to also get the baud rate and parity the device answered at.
+
+    Args:
+        baudrates: List of baud rates to test (default: common rates)
+
+    Returns:
+        Path to working Modbus port or None if not found
+    """
+    device = auto_detect_modbus_device(baudrates)
+    return device.port if device else None
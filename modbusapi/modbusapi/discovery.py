@@ -0,0 +1,348 @@
+"""
+ModbusAPI Discovery - Unit ID sweeps of a bus and a persisted device inventory
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Iterable, Sequence, Tuple
+
+try:
+    import serial
+except ImportError:
+    raise ImportError(
+        "pyserial library not found! Install with: pip install pymodbus[serial]"
+    )
+
+from .timing import RtuTiming, READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS
+from .protocol import ClientProtocol, ProtocolError, Response, transact
+from .image import TABLE_NAMES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Unit IDs a slave may use (0 is broadcast, 248-255 are reserved)
+MIN_UNIT = 1
+MAX_UNIT = 247
+
+# Read function codes mapped on every unit that answers
+DEFAULT_FUNCTION_CODES = (READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS)
+
+# Exception codes (Modbus spec)
+ILLEGAL_FUNCTION = 1
+ILLEGAL_DATA_ADDRESS = 2
+# Sent by gateways for units behind them that do not answer
+GATEWAY_CODES = (10, 11)
+
+# Highest coil/register address
+MAX_ADDRESS = 0xFFFF
+
+DEFAULT_INVENTORY_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'modbusapi', 'inventory.json')
+
+
+class _CountingStream:
+    """Serial port wrapper counting the bytes received (to tell silence from noise)"""
+
+    def __init__(self, stream: Any):
+        self.stream = stream
+        self.received = 0
+
+    def write(self, data: bytes) -> int:
+        return self.stream.write(data)
+
+    def read(self, size: int) -> bytes:
+        data = self.stream.read(size)
+        self.received += len(data)
+        return data
+
+
+class BusSweep:
+    """
+    Unit ID sweep of one serial line
+
+    Every unit is asked for one holding register; any answer, including an
+    exception, proves the unit exists. The response timeout starts short (the
+    wire time plus MODBUS_DISCOVERY_TURNAROUND) and grows to twice the slowest
+    turnaround seen, or when bytes arrive too late to be a clean timeout. When
+    MODBUS_DISCOVERY_SILENCE is set, the sweep ends early after that many units
+    in a row with no byte at all on the line, counted from the last unit that
+    answered (so a bus whose lowest unit is high is still swept in full).
+    """
+
+    def __init__(self, stream: Any, baudrate: int = 9600, parity: str = 'N',
+                 turnaround: Optional[float] = None, silence_abort: Optional[int] = None):
+        """
+        Initialize sweep
+
+        Args:
+            stream: Open serial port (pyserial Serial or compatible)
+            baudrate: Baud rate of the line
+            parity: Parity of the line
+            turnaround: Initial slave turnaround allowance in seconds (default:
+                from .env MODBUS_DISCOVERY_TURNAROUND or 0.03)
+            silence_abort: Silent units in a row after a responder that end the
+                sweep (default: from .env MODBUS_DISCOVERY_SILENCE or 0, sweeping every unit)
+        """
+        self.stream = _CountingStream(stream)
+        self.timing = RtuTiming(baudrate, parity=parity)
+        self.turnaround = turnaround if turnaround is not None else \
+            float(os.getenv('MODBUS_DISCOVERY_TURNAROUND', '0.03'))
+        # Never wait longer than a normal transaction would
+        self.max_turnaround = max(self.turnaround, self.timing.turnaround)
+        self.silence_abort = silence_abort if silence_abort is not None else \
+            int(os.getenv('MODBUS_DISCOVERY_SILENCE', '0'))
+        self.protocol = ClientProtocol()
+        self.probes = 0
+
+    def request(self, unit: int, function_code: int, address: int) -> Tuple[Optional[Response], bool]:
+        """
+        Read one point
+
+        Returns:
+            (response or None, True if nothing at all was received)
+        """
+        timeout = self.timing.response_timeout(function_code, 1, self.turnaround)
+        self.stream.stream.reset_input_buffer()
+        self.stream.stream.timeout = timeout
+        received = self.stream.received
+        self.probes += 1
+        start = time.monotonic()
+        try:
+            response = transact(self.stream, self.protocol, unit, function_code, address, 1, timeout)
+        except ProtocolError as e:
+            logger.debug(f"Garbled answer to unit {unit}: {e}")
+            self.protocol.reset()
+            response = None
+        if response is not None:
+            latency = time.monotonic() - start - self.timing.transaction_wire_time(function_code, 1)
+            self.turnaround = min(self.max_turnaround, max(self.turnaround, 2 * latency))
+        return response, self.stream.received == received
+
+    def find_units(self, units: Iterable[int], stop: Optional[threading.Event] = None) -> Tuple[List[int], bool]:
+        """
+        Sweep unit IDs
+
+        Args:
+            units: Unit IDs, in sweep order
+            stop: Event set when the sweep should stop early
+
+        Returns:
+            (units that answered, True if the sweep ended early on silence)
+        """
+        found = []
+        silent = 0
+        for unit in units:
+            if stop is not None and stop.is_set():
+                break
+            response, clean = self.request(unit, READ_HOLDING_REGISTERS, 0)
+            if response is None and not clean and self.turnaround < self.max_turnaround:
+                # Bytes after the deadline: a slow slave, ask again with more time
+                self.turnaround = min(self.max_turnaround, 2 * self.turnaround)
+                response, clean = self.request(unit, READ_HOLDING_REGISTERS, 0)
+            if response is not None and response.exception_code not in GATEWAY_CODES:
+                found.append(unit)
+                silent = 0
+                continue
+            # Silence only counts once a unit has answered
+            silent = silent + 1 if clean and found else 0
+            if self.silence_abort and silent >= self.silence_abort:
+                logger.info(f"No answer from {silent} units in a row, ending sweep after unit {unit}")
+                return found, True
+        return found, False
+
+    def answers(self, unit: int, function_code: int, address: int) -> Optional[int]:
+        """Exception code of a one-point read (0 if it succeeded, None if no answer)"""
+        response, _ = self.request(unit, function_code, address)
+        if response is None:
+            return None
+        return response.exception_code or 0
+
+    def map_range(self, unit: int, function_code: int) -> Optional[Dict[str, int]]:
+        """
+        Find the first contiguous block of addresses a unit serves for a function
+
+        The block starts at address 0 (or 1) and its end is found with an
+        exponential, then a binary search on one-point reads.
+
+        Returns:
+            {'start', 'count'}, or None if the function or both start addresses fail
+        """
+        start = None
+        for candidate in (0, 1):
+            code = self.answers(unit, function_code, candidate)
+            if code == 0:
+                start = candidate
+                break
+            if code != ILLEGAL_DATA_ADDRESS:
+                return None
+        if start is None:
+            return None
+        good, step = start, 1
+        while good + step <= MAX_ADDRESS and self.answers(unit, function_code, good + step) == 0:
+            good += step
+            step *= 2
+        bad = min(good + step, MAX_ADDRESS + 1)
+        while bad - good > 1:
+            middle = (good + bad) // 2
+            if self.answers(unit, function_code, middle) == 0:
+                good = middle
+            else:
+                bad = middle
+        return {'start': start, 'count': good - start + 1}
+
+
+def discover_bus(port: str, baudrate: int = 9600, parity: str = 'N',
+                 units: Optional[Iterable[int]] = None,
+                 function_codes: Sequence[int] = DEFAULT_FUNCTION_CODES,
+                 map_ranges: bool = True,
+                 turnaround: Optional[float] = None,
+                 silence_abort: Optional[int] = None,
+                 stop: Optional[threading.Event] = None) -> Dict[str, Any]:
+    """
+    Find the units on a serial line and what each of them answers
+
+    Args:
+        port: Serial port path
+        baudrate: Baud rate of the line
+        parity: Parity of the line
+        units: Unit IDs to try (default: 1-247)
+        function_codes: Read function codes mapped on every unit found
+        map_ranges: Map address ranges (otherwise only unit IDs are found)
+        turnaround: Initial turnaround allowance (see BusSweep)
+        silence_abort: Silent units that end the sweep (see BusSweep)
+        stop: Event set when the sweep should stop early
+
+    Returns:
+        Bus inventory: line settings, sweep statistics and one entry per unit
+        with its turnaround and address range per table
+    """
+    units = list(range(MIN_UNIT, MAX_UNIT + 1) if units is None else units)
+    start = time.monotonic()
+    record = {
+        'port': port, 'baudrate': baudrate, 'parity': parity,
+        'scanned': time.time(), 'duration': 0.0, 'probes': 0, 'aborted': False,
+        'error': None, 'units': {},
+    }
+    try:
+        with serial.Serial(port, baudrate, parity=parity, bytesize=8, stopbits=1) as stream:
+            sweep = BusSweep(stream, baudrate, parity, turnaround, silence_abort)
+            found, record['aborted'] = sweep.find_units(units, stop)
+            for unit in found:
+                tables = {}
+                for function_code in function_codes if map_ranges else ():
+                    block = sweep.map_range(unit, function_code)
+                    if block is not None:
+                        tables[TABLE_NAMES[function_code]] = block
+                record['units'][str(unit)] = {'unit': unit, 'tables': tables}
+            record['probes'] = sweep.probes
+            record['turnaround'] = round(sweep.turnaround, 4)
+    except (serial.SerialException, OSError) as e:
+        logger.error(f"Cannot sweep {port}: {e}")
+        record['error'] = str(e)
+    record['duration'] = round(time.monotonic() - start, 3)
+    logger.info(f"Swept {port}: units {sorted(int(unit) for unit in record['units'])} "
+                f"in {record['duration']}s ({record['probes']} requests)")
+    return record
+
+
+def discover_buses(buses: Sequence[Any], **kwargs) -> List[Dict[str, Any]]:
+    """
+    Sweep several serial lines at the same time, one worker per line
+
+    Args:
+        buses: Line settings as DetectedDevice, (port, baudrate, parity) tuples
+            or dicts with those keys
+        kwargs: Options for discover_bus
+
+    Returns:
+        Bus inventories in the order of buses
+    """
+    settings = [
+        (bus['port'], bus.get('baudrate', 9600), bus.get('parity', 'N')) if isinstance(bus, dict)
+        else tuple(bus)[:3]
+        for bus in buses
+    ]
+    if not settings:
+        return []
+    with ThreadPoolExecutor(max_workers=len(settings), thread_name_prefix='modbus-discovery') as executor:
+        futures = [executor.submit(discover_bus, *line, **kwargs) for line in settings]
+        return [future.result() for future in futures]
+
+
+class Inventory:
+    """
+    Units found on every swept bus, persisted as JSON
+
+    One record per port (see discover_bus); a new sweep of a port replaces
+    its record.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize inventory
+
+        Args:
+            path: JSON file (default: from .env MODBUS_INVENTORY or
+                ~/.cache/modbusapi/inventory.json, empty string keeps it in memory)
+        """
+        self.path = path if path is not None else os.getenv('MODBUS_INVENTORY', DEFAULT_INVENTORY_PATH)
+        self._lock = threading.Lock()
+        self.buses: Dict[str, Dict[str, Any]] = {}
+        self.load()
+
+    def load(self) -> bool:
+        """
+        Load the inventory file
+
+        Returns:
+            True if loaded, False otherwise
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                buses = json.load(f)['buses']
+            if not isinstance(buses, dict):
+                raise TypeError('buses is not an object')
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not load inventory from {self.path}: {e}")
+            return False
+        with self._lock:
+            self.buses = buses
+        return True
+
+    def save(self) -> bool:
+        """
+        Write the inventory file
+
+        Returns:
+            True if saved, False otherwise
+        """
+        if not self.path:
+            return False
+        data = {'version': 1, 'buses': self.to_dict()}
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+            return True
+        except OSError as e:
+            logger.warning(f"Could not save inventory to {self.path}: {e}")
+            return False
+
+    def update(self, records: Iterable[Dict[str, Any]]):
+        """Replace the records of the swept ports (and save the file)"""
+        with self._lock:
+            for record in records:
+                self.buses[record['port']] = record
+        self.save()
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Return bus records keyed by port"""
+        with self._lock:
+            return dict(self.buses)
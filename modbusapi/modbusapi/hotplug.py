@@ -0,0 +1,276 @@
+"""
+ModbusAPI Hotplug - Rebinding clients when serial adapters are re-enumerated
+"""
+
+import os
+import time
+import struct
+import select
+import ctypes
+import ctypes.util
+import fnmatch
+import logging
+import threading
+from collections import deque
+from typing import Optional, List, Dict, Any, Callable, Iterable, Set
+
+from .detect import detect_modbus_devices, DetectedDevice
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Device nodes of USB serial adapters
+DEFAULT_PATTERNS = ('ttyUSB*', 'ttyACM*')
+
+# inotify event masks (linux/inotify.h)
+IN_ATTRIB = 0x00000004
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event header: wd, mask, cookie, len
+_EVENT_HEADER = struct.Struct('iIII')
+
+# Hotplug events kept for get_stats()
+EVENT_HISTORY = 50
+
+
+class _Inotify:
+    """Minimal inotify binding through libc (Linux only)"""
+
+    def __init__(self, directory: str, mask: int = WATCH_MASK):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"Cannot watch {directory}")
+
+    def wait(self, timeout: float) -> List[str]:
+        """
+        Wait for events
+
+        Args:
+            timeout: Maximum wait in seconds
+
+        Returns:
+            Names of the directory entries that changed (empty on timeout)
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            names.append(os.fsdecode(data[offset:offset + length].rstrip(b'\0')))
+            offset += length
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+def _probe(ports: List[str]) -> List[DetectedDevice]:
+    """Probe new device nodes (cached settings first, see detect_modbus_devices)"""
+    return detect_modbus_devices(ports, first=False)
+
+
+class HotplugWatcher:
+    """
+    Watch a device directory and rebind clients to re-enumerated adapters
+
+    A client whose port disappears is closed. When adapter nodes appear, only
+    the new nodes are probed, and every client left without a port is moved
+    to a new node where its unit answers (ModbusClient.rebind), between two
+    transactions when the client is arbitrated. Uses inotify where available,
+    otherwise rescans the directory every interval.
+    """
+
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 patterns: Iterable[str] = DEFAULT_PATTERNS,
+                 settle: Optional[float] = None,
+                 interval: Optional[float] = None,
+                 probe: Callable[[List[str]], List[DetectedDevice]] = _probe,
+                 on_change: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Initialize watcher
+
+        Args:
+            directory: Directory holding the device nodes (default: from .env
+                MODBUS_HOTPLUG_DIR or /dev)
+            patterns: Glob patterns of adapter node names
+            settle: Delay in seconds between an event and the probe, while udev
+                finishes setting up the node (default: from .env MODBUS_HOTPLUG_SETTLE or 0.5)
+            interval: Rescan interval in seconds without inotify (default: 2.0)
+            probe: Function probing a list of ports
+            on_change: Called with every change handled by check()
+        """
+        self.directory = directory or os.getenv('MODBUS_HOTPLUG_DIR', '/dev')
+        self.patterns = tuple(patterns)
+        self.settle = settle if settle is not None else float(os.getenv('MODBUS_HOTPLUG_SETTLE', '0.5'))
+        self.interval = interval if interval is not None else 2.0
+        self.probe = probe
+        self.on_change = on_change
+        self.clients: List[Any] = []
+        self.nodes = self.scan()
+        self.events = deque(maxlen=EVENT_HISTORY)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._inotify: Optional[_Inotify] = None
+
+    def watch(self, client: Any):
+        """
+        Keep a client bound to its adapter
+
+        Args:
+            client: ModbusClient or ArbitratedClient on a serial port
+        """
+        with self._lock:
+            if client not in self.clients:
+                self.clients.append(client)
+
+    def scan(self) -> Set[str]:
+        """Return the adapter nodes currently in the directory"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError as e:
+            logger.warning(f"Cannot list {self.directory}: {e}")
+            return set()
+        return {
+            os.path.join(self.directory, name) for name in names
+            if any(fnmatch.fnmatch(name, pattern) for pattern in self.patterns)
+        }
+
+    def check(self) -> Dict[str, Any]:
+        """
+        Compare the directory with the last scan and handle the difference
+
+        Returns:
+            Dictionary with the added and removed nodes and the clients
+            rebound ({old port: new port})
+        """
+        with self._lock:
+            nodes = self.scan()
+            added = sorted(nodes - self.nodes)
+            removed = sorted(self.nodes - nodes)
+            self.nodes = nodes
+            clients = list(self.clients)
+        change = {'time': time.time(), 'added': added, 'removed': removed, 'rebound': {}}
+        if not added and not removed:
+            return change
+
+        for node in removed:
+            logger.warning(f"Serial adapter {node} disappeared")
+        orphans = [
+            client for client in clients
+            if not client.endpoint.is_network and (client.port in removed or not os.path.exists(client.port))
+        ]
+        for client in orphans:
+            if client.is_connected():
+                client.disconnect()
+
+        if added and orphans:
+            logger.info(f"Serial adapters appeared: {added}, probing")
+            devices = self.probe(added)
+            for client in orphans:
+                device = self._match(client, devices)
+                if device is None:
+                    logger.error(f"No new adapter answers for unit {client.unit_id} of {client.port}, "
+                                 f"leaving it closed")
+                    continue
+                devices.remove(device)
+                old_port = client.port
+                if client.rebind(device.port, device.baudrate, device.parity):
+                    change['rebound'][old_port] = device.port
+
+        self.events.append(change)
+        if self.on_change is not None:
+            self.on_change(change)
+        return change
+
+    @staticmethod
+    def _match(client: Any, devices: List[DetectedDevice]) -> Optional[DetectedDevice]:
+        """
+        Pick the new adapter for a client: one where its unit answers
+
+        Any other adapter may be a different bus with a unit of the same ID,
+        so a client whose unit answers nowhere is not rebound.
+        """
+        for device in devices:
+            if client.unit_id in device.units:
+                return device
+        return None
+
+    def start(self):
+        """Start watching on a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        try:
+            self._inotify = _Inotify(self.directory)
+        except (OSError, AttributeError) as e:
+            logger.info(f"inotify not available ({e}), rescanning {self.directory} every {self.interval}s")
+            self._inotify = None
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='modbus-hotplug', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background thread
+
+        Args:
+            timeout: Maximum time to wait for the thread to finish
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._inotify is not None:
+                names = self._inotify.wait(self.interval)
+                if not any(fnmatch.fnmatch(name, pattern) for name in names for pattern in self.patterns):
+                    continue
+                # Events come in bursts (create, then attributes); handle them once
+                self._stop.wait(self.settle)
+            else:
+                self._stop.wait(self.interval)
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Hotplug check failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get watcher state
+
+        Returns:
+            Dictionary with the watched directory, current nodes, client ports
+            and the last changes handled
+        """
+        with self._lock:
+            clients = list(self.clients)
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'inotify': self._inotify is not None,
+            'directory': self.directory,
+            'nodes': sorted(self.nodes),
+            'clients': [client.port for client in clients],
+            'events': list(self.events),
+        }
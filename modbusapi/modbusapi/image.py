@@ -0,0 +1,314 @@
+"""
+ModbusAPI Image - Shadow process image of every unit seen on a bus
+"""
+
+import os
+import time
+import logging
+import threading
+from array import array
+from typing import Optional, List, Dict, Any, NamedTuple, Sequence
+
+from .planner import (
+    READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS,
+    READ_METHODS
+)
+from .timing import WRITE_SINGLE_COIL, WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_COILS, WRITE_MULTIPLE_REGISTERS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Point quality
+QUALITY_GOOD = 'good'
+QUALITY_STALE = 'stale'
+QUALITY_COMM_FAILED = 'comm_failed'
+
+# Quality stored per point (stale is derived from the age when read)
+_UNKNOWN = 0
+_GOOD = 1
+_FAILED = 2
+
+# Table holding the points each function code reads or writes
+TABLES = {
+    READ_COILS: READ_COILS,
+    READ_DISCRETE_INPUTS: READ_DISCRETE_INPUTS,
+    READ_HOLDING_REGISTERS: READ_HOLDING_REGISTERS,
+    READ_INPUT_REGISTERS: READ_INPUT_REGISTERS,
+    WRITE_SINGLE_COIL: READ_COILS,
+    WRITE_MULTIPLE_COILS: READ_COILS,
+    WRITE_SINGLE_REGISTER: READ_HOLDING_REGISTERS,
+    WRITE_MULTIPLE_REGISTERS: READ_HOLDING_REGISTERS,
+}
+
+TABLE_NAMES = {
+    READ_COILS: 'coils',
+    READ_DISCRETE_INPUTS: 'discrete_inputs',
+    READ_HOLDING_REGISTERS: 'holding_registers',
+    READ_INPUT_REGISTERS: 'input_registers',
+}
+
+
+class Snapshot(NamedTuple):
+    """Points served from the process image"""
+    values: List[Any]
+    timestamp: float
+    quality: str
+    version: int
+
+    @property
+    def age(self) -> float:
+        """Seconds since the oldest point was updated"""
+        return time.time() - self.timestamp
+
+
+class _Table:
+    """One point type of one unit: values, update times and quality per address"""
+
+    def __init__(self, bits: bool):
+        self.bits = bits
+        self.values = array('B' if bits else 'H')
+        self.timestamps = array('d')
+        self.quality = array('B')
+
+    def _grow(self, end: int):
+        missing = end - len(self.values)
+        if missing > 0:
+            self.values.extend(bytes(missing) if self.bits else [0] * missing)
+            self.timestamps.extend([0.0] * missing)
+            self.quality.extend(bytes(missing))
+
+    def update(self, address: int, values: Sequence[Any], timestamp: float):
+        end = address + len(values)
+        self._grow(end)
+        self.values[address:end] = array(self.values.typecode, values)
+        self.timestamps[address:end] = array('d', [timestamp]) * len(values)
+        self.quality[address:end] = array('B', [_GOOD]) * len(values)
+
+    def fail(self, address: int, count: int):
+        # Points never seen have no value to flag: they stay unknown
+        for index in range(address, min(address + count, len(self.quality))):
+            if self.quality[index] == _GOOD:
+                self.quality[index] = _FAILED
+
+    def read(self, address: int, count: int):
+        end = address + count
+        if end > len(self.values):
+            return None
+        quality = self.quality[address:end]
+        if _UNKNOWN in quality:
+            return None
+        values = self.values[address:end]
+        return (
+            [bool(v) for v in values] if self.bits else values.tolist(),
+            min(self.timestamps[address:end]),
+            _FAILED in quality
+        )
+
+
+class UnitImage:
+    """Process image of one unit"""
+
+    def __init__(self, unit: int):
+        self.unit = unit
+        self.version = 0
+        self.tables = {table: _Table(table in (READ_COILS, READ_DISCRETE_INPUTS)) for table in TABLE_NAMES}
+
+
+class ProcessImage:
+    """
+    Last known values of every point read from or written to the units of a bus
+
+    Values are kept in ``array('H')`` (registers) and byte arrays (bits) per
+    unit, with the time of the last update and a quality flag per point.
+    Points older than ``stale_after`` are reported stale; points whose last
+    transaction failed are reported comm_failed until read again. Every update
+    bumps the unit's version, so callers can tell whether anything changed.
+    """
+
+    def __init__(self, stale_after: Optional[float] = None):
+        """
+        Initialize process image
+
+        Args:
+            stale_after: Age in seconds after which points are stale
+                (default: from .env MODBUS_IMAGE_STALE_AFTER or 10.0)
+        """
+        if stale_after is None:
+            stale_after = float(os.getenv('MODBUS_IMAGE_STALE_AFTER', '10.0'))
+        self.stale_after = stale_after
+        self._units: Dict[int, UnitImage] = {}
+        self._lock = threading.Lock()
+
+    def _unit(self, unit: int) -> UnitImage:
+        image = self._units.get(unit)
+        if image is None:
+            image = self._units[unit] = UnitImage(unit)
+        return image
+
+    def update(self, function_code: int, address: int, values: Sequence[Any], unit: int = 1,
+               timestamp: Optional[float] = None):
+        """
+        Store values read from or written to the device
+
+        Args:
+            function_code: Read or write function code of the transaction
+            address: Address of the first value
+            values: Values read or written
+            unit: Slave unit ID
+            timestamp: Time of the transaction (default: now)
+        """
+        table = TABLES.get(function_code)
+        if table is None or not values:
+            return
+        with self._lock:
+            image = self._unit(unit)
+            image.tables[table].update(address, values, timestamp or time.time())
+            image.version += 1
+
+    def fail(self, function_code: int, address: int, count: int, unit: int = 1):
+        """Mark points whose transaction failed as comm_failed (values are kept)"""
+        table = TABLES.get(function_code)
+        if table is None or count <= 0:
+            return
+        with self._lock:
+            image = self._unit(unit)
+            image.tables[table].fail(address, count)
+            image.version += 1
+
+    def version(self, unit: int = 1) -> int:
+        """Update counter of a unit (0 if never seen)"""
+        image = self._units.get(unit)
+        return image.version if image else 0
+
+    def read(self, function_code: int, address: int, count: int = 1, unit: int = 1,
+             max_age: Optional[float] = None) -> Optional[Snapshot]:
+        """
+        Serve points from memory
+
+        Args:
+            function_code: Table to read (read function code 1-4)
+            address: Starting address
+            count: Number of points
+            unit: Slave unit ID
+            max_age: Return None if any point is older than this (seconds)
+
+        Returns:
+            Snapshot with the worst quality of the points, or None if a point
+            was never seen or is too old
+        """
+        with self._lock:
+            image = self._units.get(unit)
+            if image is None or function_code not in TABLE_NAMES:
+                return None
+            found = image.tables[function_code].read(address, count)
+            version = image.version
+        if found is None:
+            return None
+        values, timestamp, failed = found
+        age = time.time() - timestamp
+        if max_age is not None and age > max_age:
+            return None
+        if failed:
+            quality = QUALITY_COMM_FAILED
+        elif age > self.stale_after:
+            quality = QUALITY_STALE
+        else:
+            quality = QUALITY_GOOD
+        return Snapshot(values, timestamp, quality, version)
+
+    def fetch(self, client: Any, function_code: int, address: int, count: int = 1, unit: int = 1,
+              max_age: float = 0.0) -> Optional[Snapshot]:
+        """
+        Serve points from memory if fresh enough, otherwise read them from the bus
+
+        Args:
+            client: Client used for the bus read (its reads update this image)
+            function_code: Read function code (1-4)
+            address: Starting address
+            count: Number of points
+            unit: Slave unit ID
+            max_age: Largest acceptable age in seconds
+
+        Returns:
+            Snapshot, or None if the bus read failed
+        """
+        snapshot = self.read(function_code, address, count, unit, max_age)
+        if snapshot is not None and snapshot.quality != QUALITY_COMM_FAILED:
+            return snapshot
+        values = getattr(client, READ_METHODS[function_code])(address, count, unit)
+        if values is None:
+            return None
+        snapshot = self.read(function_code, address, count, unit)
+        if snapshot is None:
+            # Client not wired to this image: remember the values ourselves
+            self.update(function_code, address, values, unit)
+            snapshot = self.read(function_code, address, count, unit)
+        return snapshot
+
+    def to_dict(self, unit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Dump the image for JSON output
+
+        Args:
+            unit: Only this unit (default: all units)
+
+        Returns:
+            Dictionary keyed by unit ID with version and known points per table
+        """
+        now = time.time()
+        result = {}
+        with self._lock:
+            if unit is None:
+                units = list(self._units.values())
+            else:
+                units = [self._units[unit]] if unit in self._units else []
+            for image in units:
+                tables = {}
+                for table, name in TABLE_NAMES.items():
+                    data = image.tables[table]
+                    points = {}
+                    for address, code in enumerate(data.quality):
+                        if code == _UNKNOWN:
+                            continue
+                        age = now - data.timestamps[address]
+                        value = data.values[address]
+                        points[str(address)] = {
+                            'value': bool(value) if data.bits else value,
+                            'age': round(age, 3),
+                            'quality': QUALITY_COMM_FAILED if code == _FAILED
+                            else QUALITY_STALE if age > self.stale_after else QUALITY_GOOD,
+                        }
+                    if points:
+                        tables[name] = points
+                result[str(image.unit)] = {'version': image.version, 'tables': tables}
+        return result
+
+
+# Process images shared by all clients of a bus, keyed by port
+_images: Dict[str, ProcessImage] = {}
+_images_lock = threading.Lock()
+
+
+def get_image(port: str) -> ProcessImage:
+    """
+    Return the process image of a bus, creating it on first use
+
+    Args:
+        port: Port (or gateway URL) of the bus
+
+    Returns:
+        ProcessImage
+    """
+    with _images_lock:
+        image = _images.get(port)
+        if image is None:
+            image = _images[port] = ProcessImage()
+        return image
+
+
+def move_image(old_port: str, new_port: str):
+    """Register the process image of a bus under its new port (e.g. after a rebind)"""
+    with _images_lock:
+        image = _images.pop(old_port, None)
+        if image is not None:
+            _images[new_port] = image
@@ -10,7 +10,9 @@ from typing import Dict, Any, Optional, Union, Tuple
 from datetime import datetime
 from flask import Flask, Response, request, jsonify
 
-from .client import ModbusClient, auto_detect_modbus_port
+from .client import ModbusClient, auto_detect_modbus_device
+from .arbiter import arbitrate
+from .combiner import WriteCombiner, KIND_COIL
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -270,22 +272,26 @@ def create_output_app(port: Optional[str] = None,
         log.setLevel(logging.ERROR)
     
     # Create Modbus client
+    parity = 'N'
     if port is None:
-        port = auto_detect_modbus_port()
-        if port is None:
+        device = auto_detect_modbus_device()
+        if device is None:
             logger.error("No Modbus device found! Output Module will not work correctly.")
+        else:
+            port, baudrate, parity = device.port, device.baudrate, device.parity
+    
+    # All bus access goes through the arbiter owning the port
+    modbus_client = arbitrate(ModbusClient(port=port, baudrate=baudrate, parity=parity, timeout=timeout))
     
-    modbus_client = ModbusClient(port=port, baudrate=baudrate, timeout=timeout)
+    # Open the port once; the client reconnects lazily after I/O failures
+    modbus_client.connect()
+    
+    # Toggles arriving together (e.g. several widgets) share one Write Multiple Coils
+    writes = WriteCombiner(modbus_client)
     
     # Configuration
     MODBUS_UNIT = int(os.getenv('MODBUS_DEVICE_ADDRESS', '1'))
     
-    @app.before_request
-    def connect_modbus():
-        """Connect to Modbus device before each request"""
-        if not hasattr(modbus_client, '_connected') or not modbus_client._connected:
-            modbus_client.connect()
-    
     @app.after_request
     def add_cors_headers(response):
         """Add CORS headers to allow cross-origin requests"""
@@ -307,6 +313,7 @@ def create_output_app(port: Optional[str] = None,
         else:
             state = result[0]
             error_msg = ""
+            writes.observe(KIND_COIL, channel, result, MODBUS_UNIT)
             
         # Generate configuration
         config = {
@@ -346,7 +353,7 @@ def create_output_app(port: Optional[str] = None,
         new_state = not current_state
         
         # Write new state
-        if not modbus_client.write_coil(channel, new_state, MODBUS_UNIT):
+        if not writes.write_coil(channel, new_state, MODBUS_UNIT):
             return f"Error toggling coil {channel}: Write failed", 500
             
         # Read state again to confirm
@@ -388,7 +395,8 @@ def create_output_app(port: Optional[str] = None,
         return jsonify({
             'api': {
                 'baseUrl': request.host_url.rstrip('/'),
-                'status': 'active' if modbus_client._connected else 'inactive',
+                'status': 'active' if modbus_client.is_connected() else 'inactive',
+                'state': modbus_client.state,
                 'port': modbus_client.port,
                 'baudrate': modbus_client.baudrate
             },
@@ -0,0 +1,252 @@
+"""
+ModbusAPI Planner - Read coalescing for Modbus point reads
+"""
+
+import os
+import logging
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional
+
+from .retry import ERROR_EXCEPTION
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Modbus read function codes
+READ_COILS = 1
+READ_DISCRETE_INPUTS = 2
+READ_HOLDING_REGISTERS = 3
+READ_INPUT_REGISTERS = 4
+
+# Maximum number of points a single read PDU may request (Modbus spec)
+MAX_READ_COUNT = {
+    READ_COILS: 2000,
+    READ_DISCRETE_INPUTS: 2000,
+    READ_HOLDING_REGISTERS: 125,
+    READ_INPUT_REGISTERS: 125,
+}
+
+# ModbusClient method serving each read function code
+READ_METHODS = {
+    READ_COILS: 'read_coils',
+    READ_DISCRETE_INPUTS: 'read_discrete_inputs',
+    READ_HOLDING_REGISTERS: 'read_holding_registers',
+    READ_INPUT_REGISTERS: 'read_input_registers',
+}
+
+# Short names accepted by parse_function_code (REST/CLI friendly)
+FUNCTION_CODE_NAMES = {
+    'coil': READ_COILS,
+    'coils': READ_COILS,
+    'discrete_input': READ_DISCRETE_INPUTS,
+    'discrete_inputs': READ_DISCRETE_INPUTS,
+    'holding_register': READ_HOLDING_REGISTERS,
+    'holding_registers': READ_HOLDING_REGISTERS,
+    'input_register': READ_INPUT_REGISTERS,
+    'input_registers': READ_INPUT_REGISTERS,
+}
+
+
+def parse_function_code(value: Any) -> int:
+    """
+    Convert a function code given as int or name to an int
+
+    Args:
+        value: Function code (1-4) or name (e.g. 'coils', 'holding_registers')
+
+    Returns:
+        Read function code
+
+    Raises:
+        ValueError: If the value is not a supported read function code
+    """
+    if isinstance(value, str):
+        if value.isdigit():
+            value = int(value)
+        elif value.lower() in FUNCTION_CODE_NAMES:
+            return FUNCTION_CODE_NAMES[value.lower()]
+    if value not in MAX_READ_COUNT:
+        raise ValueError(f"Unsupported read function code: {value}")
+    return value
+
+
+class ReadRequest(NamedTuple):
+    """Single pending point read"""
+    function_code: int
+    address: int
+    count: int = 1
+    unit: int = 1
+
+
+class ReadBlock:
+    """One wire transaction covering one or more read requests"""
+
+    def __init__(self, function_code: int, unit: int, address: int, count: int):
+        self.function_code = function_code
+        self.unit = unit
+        self.address = address
+        self.count = count
+        self.requests: List[ReadRequest] = []
+
+    @property
+    def end(self) -> int:
+        """First address after the block"""
+        return self.address + self.count
+
+    def slice(self, values: List[Any], request: ReadRequest) -> List[Any]:
+        """
+        Extract the values of a single request from the block result
+
+        Args:
+            values: Values returned for the whole block
+            request: Request covered by this block
+
+        Returns:
+            Values belonging to the request
+        """
+        offset = request.address - self.address
+        return list(values[offset:offset + request.count])
+
+    def __repr__(self) -> str:
+        return (f"ReadBlock(fc={self.function_code}, unit={self.unit}, "
+                f"address={self.address}, count={self.count}, "
+                f"requests={len(self.requests)})")
+
+
+class ReadPlanner:
+    """
+    Merge pending point reads into the fewest Modbus PDUs
+
+    Requests with the same function code and unit are sorted by address and
+    merged while the gap between them is at most ``max_gap`` addresses and the
+    resulting block stays within ``max_span`` (and the protocol limit of
+    125 registers / 2000 bits).
+    """
+
+    def __init__(self, max_gap: Optional[int] = None, max_span: Optional[int] = None,
+                 split_on_error: bool = True):
+        """
+        Initialize read planner
+
+        Args:
+            max_gap: Maximum number of unrequested addresses bridged between two
+                requests (default: from .env MODBUS_PLANNER_MAX_GAP or 8)
+            max_span: Maximum block size in points, capped at the protocol limit
+                (default: from .env MODBUS_PLANNER_MAX_SPAN or protocol limit)
+            split_on_error: Re-read the requests of a merged block one by one when
+                the device rejects it with an exception response, so an illegal
+                address inside a gap does not fail its neighbours (timeouts and
+                other failures fail the whole block)
+        """
+        if max_gap is None:
+            max_gap = int(os.getenv('MODBUS_PLANNER_MAX_GAP', '8'))
+        if max_span is None and os.getenv('MODBUS_PLANNER_MAX_SPAN'):
+            max_span = int(os.getenv('MODBUS_PLANNER_MAX_SPAN'))
+        if max_gap < 0:
+            raise ValueError("max_gap must not be negative")
+        if max_span is not None and max_span < 1:
+            raise ValueError("max_span must be positive")
+
+        self.max_gap = max_gap
+        self.max_span = max_span
+        self.split_on_error = split_on_error
+        self.stats = {
+            'requests': 0,
+            'transactions': 0,
+            'saved': 0,
+            'failed_blocks': 0,
+        }
+
+    def span_limit(self, function_code: int) -> int:
+        """Return the maximum block size for a function code"""
+        limit = MAX_READ_COUNT[function_code]
+        if self.max_span is not None:
+            limit = min(limit, self.max_span)
+        return limit
+
+    def plan(self, requests: Iterable[ReadRequest]) -> List[ReadBlock]:
+        """
+        Build the list of wire transactions for a set of requests
+
+        Args:
+            requests: Pending point reads
+
+        Returns:
+            List of blocks, each covering one or more requests
+        """
+        groups: Dict[tuple, List[ReadRequest]] = {}
+        for request in requests:
+            if request.function_code not in MAX_READ_COUNT:
+                raise ValueError(f"Unsupported read function code: {request.function_code}")
+            if request.count < 1:
+                raise ValueError(f"Invalid count {request.count} for address {request.address}")
+            groups.setdefault((request.unit, request.function_code), []).append(request)
+
+        blocks = []
+        for (unit, function_code), group in groups.items():
+            limit = self.span_limit(function_code)
+            block = None
+            for request in sorted(group, key=lambda r: (r.address, r.count)):
+                request_end = request.address + request.count
+                if block is not None:
+                    new_end = max(block.end, request_end)
+                    gap = request.address - block.end
+                    if gap <= self.max_gap and new_end - block.address <= limit:
+                        block.count = new_end - block.address
+                        block.requests.append(request)
+                        continue
+
+                block = ReadBlock(function_code, unit, request.address, request.count)
+                block.requests.append(request)
+                blocks.append(block)
+
+        return blocks
+
+    def execute(self, client: Any, requests: Iterable[ReadRequest]) -> Dict[ReadRequest, Optional[List[Any]]]:
+        """
+        Plan and execute reads on a client, slicing results back to each request
+
+        Args:
+            client: Object exposing ModbusClient's read_* methods
+            requests: Pending point reads
+
+        Returns:
+            Dictionary mapping each request to its values (None if the read failed)
+        """
+        requests = list(requests)
+        blocks = self.plan(requests)
+        results: Dict[ReadRequest, Optional[List[Any]]] = {}
+        transactions = 0
+
+        for block in blocks:
+            read = getattr(client, READ_METHODS[block.function_code])
+            values = read(block.address, block.count, block.unit)
+            transactions += 1
+
+            if values is not None:
+                for request in block.requests:
+                    results[request] = block.slice(values, request)
+                continue
+
+            self.stats['failed_blocks'] += 1
+            # Only a device that answered can serve the requests one by one; clients
+            # without error classes are assumed to have been answered
+            rejected = getattr(client, 'last_error_class', ERROR_EXCEPTION) == ERROR_EXCEPTION
+            if self.split_on_error and rejected and len(block.requests) > 1:
+                logger.debug(f"Merged read failed, splitting {block}")
+                for request in block.requests:
+                    if request not in results:
+                        results[request] = read(request.address, request.count, request.unit)
+                        transactions += 1
+            else:
+                for request in block.requests:
+                    results[request] = None
+
+        self.stats['requests'] += len(requests)
+        self.stats['transactions'] += transactions
+        self.stats['saved'] += len(requests) - transactions
+
+        return results
+
+    def get_stats(self) -> Dict[str, int]:
+        """Return cumulative planner statistics"""
+        return dict(self.stats)
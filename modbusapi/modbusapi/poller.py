@@ -0,0 +1,308 @@
+"""
+ModbusAPI Poller - Round-robin polling of many units with dead-unit backoff
+"""
+
+import os
+import time
+import logging
+import threading
+from typing import Optional, List, Dict, Any, Callable, Iterable, Tuple
+
+from .profile import Device, DeviceProfile, default_profile
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Unit states
+UNIT_ALIVE = 'alive'
+UNIT_DEAD = 'dead'
+
+# Cycle durations kept for the average
+CYCLE_SAMPLES = 100
+
+
+class UnitStats:
+    """Health and deadline statistics of one polled unit"""
+
+    def __init__(self, unit: int):
+        self.unit = unit
+        self.state = UNIT_ALIVE
+        self.failures = 0
+        self.polls = 0
+        self.errors = 0
+        self.probes = 0
+        self.missed_deadlines = 0
+        self.last_good: Optional[float] = None
+        self.last_poll: Optional[float] = None
+        self.next_probe = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'unit': self.unit,
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'polls': self.polls,
+            'errors': self.errors,
+            'probes': self.probes,
+            'missed_deadlines': self.missed_deadlines,
+            'last_good': self.last_good,
+            'last_poll': self.last_poll,
+        }
+
+
+class Poller:
+    """
+    Background poller cycling through the units of one bus
+
+    Every unit is a device profile compiled for it, so each point is read at
+    its own poll rate with coalesced block reads. Units are visited in turn,
+    starting one unit later every cycle. A unit that fails ``dead_after``
+    polls in a row is demoted: instead of its points, only one point is read
+    every ``probe_interval`` seconds until it answers again, so its timeouts
+    no longer stretch the cycle for the other units.
+
+    A unit misses a deadline when its points are read more than one poll
+    period (of its fastest point) after they fell due.
+    """
+
+    def __init__(self,
+                 client: Any,
+                 devices: Iterable[Device],
+                 dead_after: Optional[int] = None,
+                 probe_interval: Optional[float] = None,
+                 on_cycle: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Initialize poller
+
+        Args:
+            client: Object exposing ModbusClient's read_* methods (e.g. an
+                ArbitratedClient on the poll lane)
+            devices: Devices to poll, one per unit
+            dead_after: Failed polls before a unit is demoted
+                (default: from .env MODBUS_POLL_DEAD_AFTER or 3)
+            probe_interval: Seconds between probes of a demoted unit
+                (default: from .env MODBUS_POLL_PROBE_INTERVAL or 30)
+            on_cycle: Called with get_stats() after every cycle that polled something
+        """
+        self.client = client
+        self.dead_after = dead_after if dead_after is not None else int(os.getenv('MODBUS_POLL_DEAD_AFTER', '3'))
+        self.probe_interval = (probe_interval if probe_interval is not None
+                               else float(os.getenv('MODBUS_POLL_PROBE_INTERVAL', '30')))
+        self.on_cycle = on_cycle
+        self.devices: Dict[int, Device] = {}
+        self.units: Dict[int, UnitStats] = {}
+        for device in devices:
+            self.add_device(device)
+        self.cycles = 0
+        self.cycle_time = 0.0
+        self.max_cycle_time = 0.0
+        self._cycle_times: List[float] = []
+        self._offset = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_device(self, device: Device):
+        """Add (or replace) the device polled for a unit"""
+        self.devices[device.unit] = device
+        self.units.setdefault(device.unit, UnitStats(device.unit))
+
+    def plan(self, now: Optional[float] = None) -> List[Tuple[Device, List[str], Optional[float]]]:
+        """
+        Select the points to read in this cycle, advancing the schedules
+
+        Args:
+            now: Current time (default: time.monotonic())
+
+        Returns:
+            One entry per unit with work: device, point names and the time the
+            points fell due (None for a probe of a demoted unit)
+        """
+        now = time.monotonic() if now is None else now
+        order = list(self.devices.values())
+        if order:
+            start = self._offset % len(order)
+            order = order[start:] + order[:start]
+        work = []
+        for device in order:
+            stats = self.units[device.unit]
+            if stats.state == UNIT_DEAD:
+                if now >= stats.next_probe:
+                    stats.next_probe = now + self.probe_interval
+                    work.append((device, self._probe_point(device), None))
+                continue
+            due_at = device.next_due()
+            names = device.due(now)
+            if names:
+                work.append((device, names, due_at))
+        if work:
+            self._offset += 1
+        return work
+
+    @staticmethod
+    def _probe_point(device: Device) -> List[str]:
+        """One point read to check whether a demoted unit is back"""
+        for names in device.schedule.values():
+            return names[:1]
+        return list(device.points)[:1]
+
+    def record(self, device: Device, names: List[str], results: List[Optional[List[Any]]],
+               due_at: Optional[float], now: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Store the results of one unit's reads and update its health
+
+        Args:
+            device: Polled device
+            names: Point names read
+            results: Raw values per point (None if the read failed)
+            due_at: Time the points fell due (None for a probe)
+            now: Time the reads completed (default: time.monotonic())
+
+        Returns:
+            Decoded values by point name (None for failed reads)
+        """
+        now = time.monotonic() if now is None else now
+        stats = self.units[device.unit]
+        values = device.update(names, results)
+        answered = any(result is not None for result in results)
+        stats.last_poll = time.time()
+        if due_at is None:
+            stats.probes += 1
+        else:
+            stats.polls += 1
+            # Points never polled before (due_at 0) have no deadline yet
+            if due_at and device.schedule and now > due_at + min(device.schedule):
+                stats.missed_deadlines += 1
+
+        if answered:
+            stats.failures = 0
+            stats.last_good = stats.last_poll
+            if stats.state == UNIT_DEAD:
+                logger.info(f"Unit {device.unit} answers again, resuming polling")
+                stats.state = UNIT_ALIVE
+                device.reset_schedule()
+        else:
+            stats.errors += 1
+            stats.failures += 1
+            if stats.state == UNIT_ALIVE and stats.failures >= self.dead_after:
+                logger.warning(f"Unit {device.unit} not answering after {stats.failures} polls, "
+                               f"probing every {self.probe_interval:.0f}s")
+                stats.state = UNIT_DEAD
+                stats.next_probe = now + self.probe_interval
+        return values
+
+    def run_cycle(self, now: Optional[float] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Poll every unit with due points once
+
+        Args:
+            now: Current time (default: time.monotonic())
+
+        Returns:
+            Decoded values by unit and point name
+        """
+        start = time.monotonic()
+        values = {}
+        with self._lock:
+            work = self.plan(start if now is None else now)
+            for device, names, due_at in work:
+                results = device.planner.execute(self.client, [device.requests[name] for name in names])
+                values[device.unit] = self.record(
+                    device, names, [results.get(device.requests[name]) for name in names],
+                    due_at, None if now is None else now
+                )
+            if work:
+                self.record_cycle(time.monotonic() - start)
+        if work and self.on_cycle:
+            try:
+                self.on_cycle(self.get_stats())
+            except Exception as e:
+                logger.error(f"Error publishing poller statistics: {e}")
+        return values
+
+    def record_cycle(self, duration: float):
+        """Record the duration of one cycle driven outside run_cycle (e.g. by an asyncio loop)"""
+        self.cycles += 1
+        self.cycle_time = duration
+        self.max_cycle_time = max(self.max_cycle_time, duration)
+        self._cycle_times.append(duration)
+        del self._cycle_times[:-CYCLE_SAMPLES]
+
+    def next_due(self) -> Optional[float]:
+        """Earliest time a poll or probe falls due (None if nothing is polled)"""
+        times = []
+        for unit, device in self.devices.items():
+            stats = self.units[unit]
+            if stats.state == UNIT_DEAD:
+                times.append(stats.next_probe)
+            elif device.next_due() is not None:
+                times.append(device.next_due())
+        return min(times) if times else None
+
+    def start(self):
+        """Start polling on a background thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='modbus-poller', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Stop the background thread
+
+        Args:
+            timeout: Maximum time to wait for the current cycle to finish
+        """
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_cycle()
+            except Exception as e:
+                logger.error(f"Poller cycle failed: {e}")
+            next_due = self.next_due()
+            wait = 1.0 if next_due is None else next_due - time.monotonic()
+            self._stop.wait(max(0.0, wait))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cycle and per-unit statistics
+
+        Returns:
+            Dictionary with cycle times (seconds) and health, last good poll
+            (epoch seconds) and missed deadlines per unit
+        """
+        times = self._cycle_times
+        return {
+            'running': self._thread is not None and self._thread.is_alive(),
+            'cycles': self.cycles,
+            'cycle_time': round(self.cycle_time, 4),
+            'cycle_time_avg': round(sum(times) / len(times), 4) if times else 0.0,
+            'cycle_time_max': round(self.max_cycle_time, 4),
+            'dead_after': self.dead_after,
+            'probe_interval': self.probe_interval,
+            'units': {str(unit): stats.to_dict() for unit, stats in sorted(self.units.items())},
+        }
+
+
+def create_poller(client: Any, units: Iterable[int], profile: Optional[DeviceProfile] = None,
+                  **kwargs) -> Poller:
+    """
+    Create a poller for several units sharing one device profile
+
+    Args:
+        client: Object exposing ModbusClient's read_* methods
+        units: Unit IDs to poll
+        profile: Device profile (default: MODBUS_PROFILE or the built-in default)
+        kwargs: Further Poller arguments
+
+    Returns:
+        Poller (not started)
+    """
+    profile = profile or default_profile()
+    return Poller(client, [profile.compile(unit) for unit in units], **kwargs)
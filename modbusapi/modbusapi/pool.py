@@ -0,0 +1,333 @@
+"""
+ModbusAPI Pool - Clients for several serial buses with parallel fan-out
+"""
+
+import os
+import logging
+import threading
+from typing import Optional, List, Dict, Any, NamedTuple, Iterable, Tuple
+
+from .client import ModbusClient
+from .arbiter import ArbitratedClient, BusBusyError, LANE_INTERACTIVE, arbitrate
+from .planner import ReadPlanner, ReadRequest, parse_function_code
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class BusKey(NamedTuple):
+    """Serial line identity: one open port per key"""
+    port: str
+    baudrate: int
+    parity: str
+
+
+class BusReadRequest(NamedTuple):
+    """Point read on a named bus"""
+    bus: Optional[str]
+    function_code: int
+    address: int
+    count: int = 1
+    unit: int = 1
+
+    @property
+    def request(self) -> ReadRequest:
+        """Read request without the bus"""
+        return ReadRequest(self.function_code, self.address, self.count, self.unit)
+
+
+def parse_bus_spec(spec: str) -> Dict[str, Any]:
+    """
+    Parse a bus definition
+
+    Format: ``[name=]port[:baudrate[:parity]]``, e.g. ``boiler=/dev/ttyUSB1:19200:E``
+
+    Args:
+        spec: Bus definition
+
+    Returns:
+        Dictionary with name, port, baudrate and parity (None when not given)
+    """
+    name, sep, rest = spec.strip().partition('=')
+    if not sep:
+        name, rest = None, name
+    parts = rest.split(':')
+    if not parts[0]:
+        raise ValueError(f"Missing port in bus definition: {spec!r}")
+    return {
+        'name': name or None,
+        'port': parts[0],
+        'baudrate': int(parts[1]) if len(parts) > 1 and parts[1] else None,
+        'parity': parts[2].upper() if len(parts) > 2 and parts[2] else 'N',
+    }
+
+
+def parse_point(text: str) -> BusReadRequest:
+    """
+    Parse a point address
+
+    Format: ``[bus:]unit:type:address[:count]``, e.g. ``boiler:5:holding_registers:10:2``.
+    A leading non-numeric field is the bus name or port.
+
+    Args:
+        text: Point address
+
+    Returns:
+        BusReadRequest (bus is None when not given)
+    """
+    parts = text.strip().split(':')
+    bus = None
+    if parts and not parts[0].isdigit():
+        bus, parts = parts[0], parts[1:]
+    if len(parts) not in (3, 4):
+        raise ValueError(f"Invalid point address: {text!r}")
+    count = int(parts[3]) if len(parts) > 3 else 1
+    return BusReadRequest(bus, parse_function_code(parts[1]), int(parts[2]), count, int(parts[0]))
+
+
+def parse_units(text: str) -> List[int]:
+    """
+    Parse a unit list such as '1-30,40'
+
+    Args:
+        text: Comma separated unit IDs and inclusive ranges
+
+    Returns:
+        Sorted unit IDs
+
+    Raises:
+        ValueError: If a unit ID is outside 1-247
+    """
+    units = set()
+    for part in text.split(','):
+        if not part:
+            continue
+        first, _, last = part.partition('-')
+        units.update(range(int(first), int(last or first) + 1))
+    invalid = [unit for unit in units if not 1 <= unit <= 247]
+    if invalid:
+        raise ValueError(f"Invalid unit ID: {invalid[0]}")
+    return sorted(units)
+
+
+class ModbusClientPool:
+    """
+    Clients for several serial buses, keyed by (port, baudrate, parity)
+
+    Every bus has its own arbiter and therefore its own worker thread, so
+    transactions on different buses run in parallel while each bus still
+    sees one transaction at a time. Buses are addressed by name or port.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, verbose: bool = False):
+        """
+        Initialize client pool
+
+        Args:
+            timeout: Timeout for buses created by the pool (default: from .env or 1.0)
+            verbose: Enable verbose logging in created clients
+        """
+        self.timeout = timeout
+        self.verbose = verbose
+        self._clients: Dict[BusKey, ArbitratedClient] = {}
+        self._names: Dict[str, BusKey] = {}
+        self._default: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def add_client(self, client: Any, name: Optional[str] = None) -> Optional[str]:
+        """
+        Add an existing client to the pool
+
+        Args:
+            client: ModbusClient (or ArbitratedClient) instance
+            name: Bus name (default: the client's port)
+
+        Returns:
+            Bus name, or None if the port is already used with other settings
+        """
+        key = BusKey(client.port, client.baudrate, client.parity)
+        name = name or str(client.port)
+        with self._lock:
+            for existing in self._clients:
+                if existing.port == key.port and existing != key:
+                    logger.error(f"Port {key.port} already open as {existing.baudrate} {existing.parity}")
+                    return None
+            if key not in self._clients:
+                self._clients[key] = arbitrate(client)
+                self._clients[key].arbiter.add_move_listener(self._bus_moved)
+            self._names[name] = key
+            self._names.setdefault(str(key.port), key)
+            if self._default is None:
+                self._default = name
+        logger.info(f"Bus {name}: {key.port} {key.baudrate} {key.parity}")
+        return name
+
+    def add_bus(self, port: str, baudrate: Optional[int] = None, parity: str = 'N',
+                name: Optional[str] = None) -> Optional[str]:
+        """
+        Create a client for a serial bus and add it to the pool
+
+        Args:
+            port: Serial port path
+            baudrate: Baud rate (default: from .env or 9600)
+            parity: Parity bit ('N', 'E', 'O')
+            name: Bus name (default: the port)
+
+        Returns:
+            Bus name, or None if the port is already used with other settings
+        """
+        existing = self.get(port)
+        if existing is not None and (baudrate is None or existing.baudrate == baudrate) \
+                and existing.parity == parity:
+            return self.add_client(existing.client, name)
+        client = ModbusClient(port=port, baudrate=baudrate, parity=parity,
+                              timeout=self.timeout, verbose=self.verbose)
+        return self.add_client(client, name)
+
+    def add_from_env(self, specs: Optional[str] = None) -> List[str]:
+        """
+        Add buses from a comma separated list of bus definitions
+
+        Args:
+            specs: Definitions (default: from .env MODBUS_BUSES), see parse_bus_spec
+
+        Returns:
+            Names of the buses added
+        """
+        specs = specs if specs is not None else os.getenv('MODBUS_BUSES', '')
+        names = []
+        for spec in filter(None, (s.strip() for s in specs.split(','))):
+            try:
+                bus = parse_bus_spec(spec)
+            except ValueError as e:
+                logger.error(str(e))
+                continue
+            name = self.add_bus(bus['port'], bus['baudrate'], bus['parity'], bus['name'])
+            if name:
+                names.append(name)
+        return names
+
+    def _bus_moved(self, old_port: str, new_port: str):
+        """Re-key the bus of a client rebound to another port (called on its arbiter thread)"""
+        with self._lock:
+            moved = {key: client for key, client in self._clients.items() if str(key.port) == old_port}
+            for key, client in moved.items():
+                new_key = BusKey(client.port, client.baudrate, client.parity)
+                self._clients[new_key] = self._clients.pop(key)
+                for name, named in list(self._names.items()):
+                    if named != key:
+                        continue
+                    if name == old_port:
+                        del self._names[name]
+                        name = new_port
+                    self._names[name] = new_key
+                if self._default == old_port:
+                    self._default = new_port
+        if moved:
+            logger.info(f"Bus {old_port} moved to {new_port}")
+
+    def get(self, bus: Optional[str] = None) -> Optional[ArbitratedClient]:
+        """
+        Return the client of a bus
+
+        Args:
+            bus: Bus name or port (default: the first bus added)
+
+        Returns:
+            ArbitratedClient or None if the bus is unknown
+        """
+        with self._lock:
+            key = self._names.get(bus if bus else self._default)
+            return self._clients.get(key) if key else None
+
+    def names(self) -> List[str]:
+        """Return the names of all buses"""
+        return [name for name, _ in self._bus_names()]
+
+    def connect(self) -> Dict[str, bool]:
+        """Open the ports of all buses"""
+        return {name: self._clients[key].connect() for name, key in self._bus_names()}
+
+    def disconnect(self):
+        """Close the ports of all buses"""
+        for client in list(self._clients.values()):
+            client.disconnect()
+
+    def read_many(self, points: Iterable[BusReadRequest],
+                  planner: Optional[ReadPlanner] = None,
+                  lane: int = LANE_INTERACTIVE) -> List[Optional[List[Any]]]:
+        """
+        Read points on several buses, running each bus's reads in parallel
+
+        Reads on one bus are coalesced by a planner and queued on that bus's
+        arbiter as a single job; all buses are queued before waiting.
+
+        Args:
+            points: Point reads (BusReadRequest instances or equivalent tuples)
+            planner: Planner whose settings are used; its statistics are updated
+            lane: Arbiter lane used for the reads
+
+        Returns:
+            List of values (or None if error or unknown bus) in the order of the points
+        """
+        points = [BusReadRequest(*point) for point in points]
+        planner = planner or ReadPlanner()
+        results: List[Optional[List[Any]]] = [None] * len(points)
+
+        groups: Dict[BusKey, List[int]] = {}
+        clients: Dict[BusKey, ArbitratedClient] = {}
+        for index, point in enumerate(points):
+            client = self.get(point.bus)
+            if client is None:
+                logger.error(f"Unknown bus: {point.bus}")
+                continue
+            key = BusKey(client.port, client.baudrate, client.parity)
+            clients[key] = client
+            groups.setdefault(key, []).append(index)
+
+        futures = []
+        for key, indices in groups.items():
+            bus_planner = ReadPlanner(planner.max_gap, planner.max_span, planner.split_on_error)
+            requests = [points[index].request for index in indices]
+            client = clients[key]
+            try:
+                future = client.arbiter.submit(bus_planner.execute, client.client, requests, lane=lane)
+            except BusBusyError as e:
+                logger.warning(f"Rejected reads on {key.port}: {e}")
+                continue
+            futures.append((indices, requests, bus_planner, future))
+
+        for indices, requests, bus_planner, future in futures:
+            try:
+                values = future.result()
+            except Exception as e:
+                logger.error(f"Error reading bus: {e}")
+                continue
+            for index, request in zip(indices, requests):
+                results[index] = values.get(request)
+            for name, value in bus_planner.stats.items():
+                planner.stats[name] += value
+
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return connection state and arbiter statistics of every bus"""
+        return {
+            name: {
+                'port': key.port,
+                'baudrate': key.baudrate,
+                'parity': key.parity,
+                'state': self._clients[key].get_state(),
+                'arbiter': self._clients[key].arbiter.get_stats(),
+            }
+            for name, key in self._bus_names()
+        }
+
+    def _bus_names(self) -> List[Tuple[str, BusKey]]:
+        """One (name, key) pair per bus, preferring explicit names over ports"""
+        with self._lock:
+            seen = {}
+            for name, key in self._names.items():
+                if key not in seen or seen[key] == str(key.port):
+                    seen[key] = name
+            return [(name, key) for key, name in seen.items()]
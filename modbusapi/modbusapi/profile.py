@@ -0,0 +1,481 @@
+"""
+ModbusAPI Profile - Declarative device profiles compiled into reads, decoders and validators
+"""
+
+import os
+import json
+import time
+import logging
+from typing import Optional, List, Dict, Any, Iterable
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from .planner import (
+    READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS,
+    MAX_READ_COUNT, ReadRequest, ReadPlanner, parse_function_code
+)
+from .decoder import Field, RegisterMap
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Type of coil and discrete input points
+TYPE_BOOL = 'bool'
+
+# Tables holding single bits, and tables a master may write
+BIT_TABLES = (READ_COILS, READ_DISCRETE_INPUTS)
+WRITABLE_TABLES = (READ_COILS, READ_HOLDING_REGISTERS)
+
+# Errors of a missing or malformed profile file
+LOAD_ERRORS = (OSError, ValueError, KeyError, TypeError, AttributeError) + ((yaml.YAMLError,) if yaml else ())
+
+# Profile used when MODBUS_PROFILE is not set
+DEFAULT_PROFILE = 'waveshare-io-8ch'
+
+# Profiles shipped with the package, by name
+BUILTIN_PROFILES: Dict[str, Dict[str, Any]] = {
+    'waveshare-io-8ch': {
+        'name': 'waveshare-io-8ch',
+        'description': 'Waveshare Modbus RTU IO 8CH',
+        'poll': 1.0,
+        'points': [
+            {'name': 'outputs', 'function_code': 'coils', 'address': 0, 'count': 8, 'writable': True},
+            {'name': 'inputs', 'function_code': 'discrete_inputs', 'address': 0, 'count': 8},
+        ],
+    },
+}
+
+
+class Point:
+    """One named value of a device: a run of bits or a typed register value"""
+
+    def __init__(self,
+                 name: str,
+                 function_code: Any,
+                 address: int,
+                 type: Optional[str] = None,
+                 count: int = 1,
+                 poll: Optional[float] = None,
+                 writable: bool = False,
+                 min: Optional[float] = None,
+                 max: Optional[float] = None,
+                 description: Optional[str] = None,
+                 **options):
+        """
+        Initialize point
+
+        Args:
+            name: Point name, unique within a profile
+            function_code: Read function code (1-4) or name (e.g. 'coils', 'input_registers')
+            address: First address
+            type: 'bool' for coils/discrete inputs (default), a decoder type for registers (default 'uint16')
+            count: Number of bits of a bit point (a list is returned when > 1)
+            poll: Seconds between polls (default: the profile's; 0 = read on demand only)
+            writable: Point may be written (coils and holding registers only)
+            min: Smallest value accepted by writes
+            max: Largest value accepted by writes
+            description: Free text
+            **options: Field options of register points (scale, offset, byte_order, word_order,
+                       bit, width, length, units)
+        """
+        self.name = name
+        self.function_code = parse_function_code(function_code)
+        self.address = int(address)
+        self.poll = poll
+        self.writable = bool(writable)
+        self.min = min
+        self.max = max
+        self.description = description
+        if self.address < 0:
+            raise ValueError(f"Point {name}: negative address")
+        if self.writable and self.function_code not in WRITABLE_TABLES:
+            raise ValueError(f"Point {name}: only coils and holding registers are writable")
+
+        if self.function_code in BIT_TABLES:
+            if type not in (None, TYPE_BOOL) or options:
+                raise ValueError(f"Point {name}: bit points take no type or decoding options")
+            if not 1 <= count <= MAX_READ_COUNT[self.function_code]:
+                raise ValueError(f"Point {name}: invalid count {count}")
+            self.type = TYPE_BOOL
+            self.count = int(count)
+            self.field = None
+            self._map = None
+        else:
+            self.type = type or 'uint16'
+            self.field = Field(name, self.address, self.type, **options)
+            self.count = self.field.registers
+            self._map = RegisterMap([self.field], self.function_code, name=name)
+
+    @property
+    def end(self) -> int:
+        """First address after the point"""
+        return self.address + self.count
+
+    @property
+    def units(self) -> Optional[str]:
+        """Engineering units of a register point"""
+        return self.field.units if self.field else None
+
+    def decode(self, values: List[Any]) -> Any:
+        """
+        Turn the raw values of the point into its engineering value
+
+        Args:
+            values: Bits or registers self.address .. self.end - 1
+
+        Returns:
+            bool (or list of bools when count > 1) for bit points, the typed value for registers
+        """
+        if self._map is None:
+            bits = [bool(value) for value in values[:self.count]]
+            return bits[0] if self.count == 1 else bits
+        return self._map.decode(values)[self.name]
+
+    def encode(self, value: Any) -> List[Any]:
+        """
+        Turn an engineering value into the raw values to write at self.address
+
+        Raises:
+            ValueError: If the point is read-only or the value is out of range
+        """
+        if not self.writable:
+            raise ValueError(f"Point {self.name} is read-only")
+        if self._map is None:
+            bits = value if isinstance(value, (list, tuple)) else [value]
+            if len(bits) != self.count:
+                raise ValueError(f"Point {self.name} takes {self.count} values, got {len(bits)}")
+            return [bool(bit) for bit in bits]
+        if self.min is not None and value < self.min or self.max is not None and value > self.max:
+            raise ValueError(f"Value {value} out of range for point {self.name} ({self.min} - {self.max})")
+        return self.field.encode(value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return point definition"""
+        data = {'name': self.name, 'function_code': self.function_code, 'address': self.address}
+        if self.field is None:
+            data.update(type=self.type, count=self.count)
+        else:
+            data.update({key: value for key, value in self.field.to_dict().items() if key not in ('name', 'address')})
+        for key in ('poll', 'min', 'max', 'description'):
+            if getattr(self, key) is not None:
+                data[key] = getattr(self, key)
+        data['writable'] = self.writable
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Point':
+        """Create a point from a dictionary as returned by to_dict()"""
+        return cls(**data)
+
+    def __repr__(self) -> str:
+        return f"Point({self.name}, fc={self.function_code}, address={self.address}, count={self.count})"
+
+
+class DeviceProfile:
+    """
+    Points of a device model
+
+    Profiles describe what a device actually has, so a master polls only
+    defined points and rejects reads and writes outside them. A profile is
+    compiled once per unit into a Device (see compile()).
+    """
+
+    def __init__(self, name: str, points: Iterable[Point], description: Optional[str] = None,
+                 poll: float = 1.0):
+        """
+        Initialize device profile
+
+        Args:
+            name: Profile name
+            points: Point definitions
+            description: Device model description
+            poll: Default seconds between polls of points without their own rate
+        """
+        self.name = name
+        self.points = list(points)
+        self.description = description
+        self.poll = poll
+        if not self.points:
+            raise ValueError(f"Profile {name} needs at least one point")
+        names = [point.name for point in self.points]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Point names of profile {name} must be unique")
+
+    def point(self, name: str) -> Optional[Point]:
+        """Return a point by name"""
+        return next((point for point in self.points if point.name == name), None)
+
+    def poll_rate(self, point: Point) -> float:
+        """Seconds between polls of a point (0 = not polled)"""
+        return self.poll if point.poll is None else point.poll
+
+    def addresses(self, function_code: int, writable: bool = False) -> List[int]:
+        """
+        Addresses defined in a table
+
+        Args:
+            function_code: Table (read function code 1-4)
+            writable: Only addresses of writable points
+
+        Returns:
+            Sorted list of addresses
+        """
+        return sorted({
+            address
+            for point in self.points
+            if point.function_code == function_code and (point.writable or not writable)
+            for address in range(point.address, point.end)
+        })
+
+    def compile(self, unit: int = 1, planner: Optional[ReadPlanner] = None) -> 'Device':
+        """Compile the profile for one unit"""
+        return Device(self, unit, planner)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return profile definition"""
+        data = {'name': self.name, 'poll': self.poll, 'points': [point.to_dict() for point in self.points]}
+        if self.description:
+            data['description'] = self.description
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DeviceProfile':
+        """Create a profile from a dictionary as returned by to_dict()"""
+        return cls(
+            data.get('name', 'device'),
+            [Point.from_dict(point) for point in data['points']],
+            description=data.get('description'),
+            poll=float(data.get('poll', 1.0))
+        )
+
+
+class Device:
+    """
+    A profile compiled for one unit
+
+    Holds the read requests of every point grouped by poll rate, the sets of
+    readable and writable addresses per table, and the last decoded values.
+    """
+
+    def __init__(self, profile: DeviceProfile, unit: int = 1, planner: Optional[ReadPlanner] = None):
+        """
+        Initialize device
+
+        Args:
+            profile: Device profile
+            unit: Slave unit ID
+            planner: Planner merging the point reads (default: a new ReadPlanner)
+        """
+        self.profile = profile
+        self.unit = unit
+        self.planner = planner or ReadPlanner()
+        self.points = {point.name: point for point in profile.points}
+        self.requests = {
+            point.name: ReadRequest(point.function_code, point.address, point.count, unit)
+            for point in profile.points
+        }
+        self.schedule: Dict[float, List[str]] = {}
+        for point in profile.points:
+            rate = profile.poll_rate(point)
+            if rate > 0:
+                self.schedule.setdefault(rate, []).append(point.name)
+        self._next_poll = {rate: 0.0 for rate in self.schedule}
+        self._readable = {fc: frozenset(profile.addresses(fc)) for fc in MAX_READ_COUNT}
+        self._writable = {fc: frozenset(profile.addresses(fc, writable=True)) for fc in WRITABLE_TABLES}
+        self.values: Dict[str, Any] = {}
+        self.timestamps: Dict[str, float] = {}
+
+    def validate_read(self, function_code: int, address: int, count: int = 1):
+        """
+        Check that a read stays within defined points
+
+        Raises:
+            ValueError: If an address in the range is not defined by the profile
+        """
+        defined = self._readable.get(function_code, frozenset())
+        missing = [a for a in range(address, address + count) if a not in defined]
+        if missing:
+            raise ValueError(f"Address {missing[0]} (fc {function_code}) is not defined by profile {self.profile.name}")
+
+    def validate_write(self, function_code: int, address: int, count: int = 1):
+        """
+        Check that a write only touches writable points
+
+        Args:
+            function_code: Table written (READ_COILS or READ_HOLDING_REGISTERS)
+            address: First address
+            count: Number of points
+
+        Raises:
+            ValueError: If an address in the range is not writable
+        """
+        defined = self._writable.get(function_code, frozenset())
+        missing = [a for a in range(address, address + count) if a not in defined]
+        if missing:
+            raise ValueError(f"Address {missing[0]} (fc {function_code}) is not writable in profile {self.profile.name}")
+
+    def due(self, now: Optional[float] = None) -> List[str]:
+        """
+        Names of the points whose poll is due, advancing their schedule
+
+        Args:
+            now: Current time (default: time.monotonic())
+        """
+        now = time.monotonic() if now is None else now
+        names = []
+        for rate, group in self.schedule.items():
+            if now >= self._next_poll[rate]:
+                names.extend(group)
+                self._next_poll[rate] += rate
+                if self._next_poll[rate] <= now:
+                    # Skip missed polls instead of bursting to catch up
+                    self._next_poll[rate] = now + rate
+        return names
+
+    def next_due(self) -> Optional[float]:
+        """Time the next poll falls due (None if no point is polled)"""
+        return min(self._next_poll.values()) if self._next_poll else None
+
+    def reset_schedule(self):
+        """Make every polled point due immediately"""
+        self._next_poll = {rate: 0.0 for rate in self.schedule}
+
+    def update(self, names: Iterable[str], results: Iterable[Optional[List[Any]]]) -> Dict[str, Any]:
+        """
+        Decode read results and store them as the device's last values
+
+        Args:
+            names: Point names
+            results: Raw values of each point (None if the read failed)
+
+        Returns:
+            Decoded values by point name (None for failed reads)
+        """
+        now = time.time()
+        decoded = {}
+        for name, values in zip(names, results):
+            if values is None:
+                decoded[name] = None
+                continue
+            decoded[name] = self.values[name] = self.points[name].decode(values)
+            self.timestamps[name] = now
+        return decoded
+
+    def read(self, client: Any, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Read points now with coalesced block reads
+
+        Args:
+            client: Object exposing ModbusClient's read_* methods
+            names: Points to read (default: all)
+
+        Returns:
+            Decoded values by point name (None for failed reads)
+        """
+        names = list(self.points if names is None else names)
+        unknown = [name for name in names if name not in self.points]
+        if unknown:
+            raise ValueError(f"Unknown point: {unknown[0]}")
+        results = self.planner.execute(client, [self.requests[name] for name in names])
+        return self.update(names, [results.get(self.requests[name]) for name in names])
+
+    def poll(self, client: Any, now: Optional[float] = None) -> Dict[str, Any]:
+        """Read the points whose poll is due (see due() and read())"""
+        names = self.due(now)
+        return self.read(client, names) if names else {}
+
+    def write(self, client: Any, name: str, value: Any) -> bool:
+        """
+        Write a point
+
+        Args:
+            client: Object exposing ModbusClient's write_* methods
+            name: Point name
+            value: Engineering value (list of bools for multi-bit points)
+
+        Returns:
+            True if successful, False otherwise
+
+        Raises:
+            ValueError: If the point is unknown or read-only, or the value is invalid
+        """
+        point = self.points.get(name)
+        if point is None:
+            raise ValueError(f"Unknown point: {name}")
+        values = point.encode(value)
+        if point.function_code == READ_COILS:
+            if len(values) == 1:
+                success = client.write_coil(point.address, values[0], self.unit)
+            else:
+                success = client.write_coils(point.address, values, self.unit)
+        elif len(values) == 1:
+            success = client.write_register(point.address, values[0], self.unit)
+        else:
+            success = client.write_registers(point.address, values, self.unit)
+        if success:
+            self.values[name] = point.decode(values)
+            self.timestamps[name] = time.time()
+        return bool(success)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the last values with their age"""
+        now = time.time()
+        return {
+            'profile': self.profile.name,
+            'unit': self.unit,
+            'points': {
+                name: {
+                    'value': self.values[name],
+                    'age': round(now - self.timestamps[name], 3),
+                    **({'units': self.points[name].units} if self.points[name].units else {})
+                }
+                for name in self.points if name in self.values
+            }
+        }
+
+
+def load_profile(source: str) -> Optional[DeviceProfile]:
+    """
+    Load a device profile
+
+    Args:
+        source: Name of a built-in profile, or path of a JSON or YAML file
+                (YAML requires PyYAML)
+
+    Returns:
+        DeviceProfile, or None if the profile could not be loaded
+    """
+    if source in BUILTIN_PROFILES:
+        return DeviceProfile.from_dict(BUILTIN_PROFILES[source])
+    try:
+        with open(source) as f:
+            if source.endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    logger.error(f"PyYAML is required to load {source} (pip install pyyaml)")
+                    return None
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        return DeviceProfile.from_dict(data)
+    except LOAD_ERRORS as e:
+        logger.error(f"Could not load device profile {source}: {e}")
+        return None
+
+
+_default: Optional[DeviceProfile] = None
+
+
+def default_profile() -> DeviceProfile:
+    """
+    Profile named by MODBUS_PROFILE (default: waveshare-io-8ch), loaded once
+
+    Falls back to the built-in default if the configured profile cannot be loaded.
+    """
+    global _default
+    if _default is None:
+        source = os.getenv('MODBUS_PROFILE', DEFAULT_PROFILE)
+        _default = load_profile(source) or DeviceProfile.from_dict(BUILTIN_PROFILES[DEFAULT_PROFILE])
+    return _default
@@ -0,0 +1,451 @@
+"""
+ModbusAPI Protocol - Sans-IO Modbus RTU/TCP framing and client state machine
+"""
+
+import time
+import struct
+import asyncio
+import logging
+from typing import Optional, List, Any, NamedTuple, Union, Sequence
+
+from .timing import (
+    READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS,
+    WRITE_SINGLE_COIL, WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_COILS, WRITE_MULTIPLE_REGISTERS,
+    BROADCAST_UNIT, request_length, response_length, EXCEPTION_RESPONSE_LENGTH
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Largest frames (Modbus spec): RTU ADU and MBAP header + PDU
+MAX_RTU_FRAME = 256
+MAX_TCP_FRAME = 260
+
+# MBAP header: transaction ID, protocol ID, length, unit ID
+MBAP_HEADER = struct.Struct('>HHHB')
+
+# Client protocol states
+STATE_IDLE = 'idle'
+STATE_WAITING = 'waiting'
+
+_ADDRESS_VALUE = struct.Struct('>HH')
+_MULTIPLE_WRITE = struct.Struct('>HHB')
+_CRC = struct.Struct('<H')
+_READS = (READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS)
+_BIT_READS = (READ_COILS, READ_DISCRETE_INPUTS)
+
+
+def _crc_table() -> List[int]:
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+# Bits of every byte value, LSB first, as coil/input responses pack them
+_BYTE_BITS = [tuple(bool(byte >> bit & 1) for bit in range(8)) for byte in range(256)]
+
+
+def crc16(data: Union[bytes, bytearray, memoryview]) -> int:
+    """
+    Modbus RTU CRC of a frame
+
+    A frame followed by its own CRC has a CRC of 0.
+
+    Args:
+        data: Frame without its CRC
+
+    Returns:
+        CRC value (sent low byte first)
+    """
+    crc = 0xFFFF
+    table = _CRC_TABLE
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+def add_crc(frame: bytes) -> bytes:
+    """Append the CRC to a frame"""
+    return frame + _CRC.pack(crc16(frame))
+
+
+def pack_bits(bits: Sequence[Any]) -> bytes:
+    """Pack bits LSB first, as in coil requests and responses"""
+    packed = bytearray((len(bits) + 7) // 8)
+    for index, bit in enumerate(bits):
+        if bit:
+            packed[index >> 3] |= 1 << (index & 7)
+    return bytes(packed)
+
+
+class ProtocolError(Exception):
+    """Malformed or unexpected frame (CRC error, wrong unit, function or length)"""
+
+
+class Response(NamedTuple):
+    """Decoded response: read values, or the echoed address and value/count of a write"""
+    unit: int
+    function_code: int
+    values: Optional[List[Any]] = None
+    exception_code: Optional[int] = None
+
+    def isError(self) -> bool:
+        """True for exception responses (same name as pymodbus responses)"""
+        return self.exception_code is not None
+
+
+def encode_pdu(buffer: bytearray, offset: int, function_code: int, address: int,
+               value: Union[int, bool, Sequence[Any]]) -> int:
+    """
+    Encode a request PDU into a buffer
+
+    Args:
+        buffer: Destination buffer
+        offset: Position of the function code
+        function_code: Modbus function code
+        address: Starting address
+        value: Count (reads), value (single writes) or values (multiple writes)
+
+    Returns:
+        Offset just past the PDU
+
+    Raises:
+        ValueError: If the function code is not supported
+    """
+    buffer[offset] = function_code
+    if function_code in _READS or function_code == WRITE_SINGLE_REGISTER:
+        _ADDRESS_VALUE.pack_into(buffer, offset + 1, address, value)
+        return offset + 5
+    if function_code == WRITE_SINGLE_COIL:
+        _ADDRESS_VALUE.pack_into(buffer, offset + 1, address, 0xFF00 if value else 0x0000)
+        return offset + 5
+    if function_code == WRITE_MULTIPLE_COILS:
+        data = pack_bits(value)
+        _MULTIPLE_WRITE.pack_into(buffer, offset + 1, address, len(value), len(data))
+        end = offset + 6 + len(data)
+        buffer[offset + 6:end] = data
+        return end
+    if function_code == WRITE_MULTIPLE_REGISTERS:
+        count = len(value)
+        _MULTIPLE_WRITE.pack_into(buffer, offset + 1, address, count, 2 * count)
+        struct.pack_into(f'>{count}H', buffer, offset + 6, *value)
+        return offset + 6 + 2 * count
+    raise ValueError(f"Unsupported function code: {function_code}")
+
+
+def decode_pdu(view: memoryview, function_code: int, count: int) -> List[Any]:
+    """
+    Decode a normal response PDU
+
+    Args:
+        view: PDU starting at the function code
+        function_code: Function code of the request
+        count: Number of coils/registers requested
+
+    Returns:
+        Read values, or [address, value/count] for writes
+
+    Raises:
+        ProtocolError: If the PDU does not match the request
+    """
+    if view[0] != function_code:
+        raise ProtocolError(f"Function code {view[0]} in response to {function_code}")
+    if function_code in _BIT_READS:
+        if view[1] != (count + 7) // 8:
+            raise ProtocolError(f"Byte count {view[1]} for {count} bits")
+        values = []
+        for byte in view[2:2 + view[1]]:
+            values.extend(_BYTE_BITS[byte])
+        del values[count:]
+        return values
+    if function_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+        if view[1] != 2 * count:
+            raise ProtocolError(f"Byte count {view[1]} for {count} registers")
+        return list(struct.unpack_from(f'>{count}H', view, 2))
+    return list(_ADDRESS_VALUE.unpack_from(view, 1))
+
+
+class RtuFramer:
+    """RTU frames (unit, PDU, CRC) encoded into one preallocated buffer"""
+
+    def __init__(self):
+        self.buffer = bytearray(MAX_RTU_FRAME)
+        self._view = memoryview(self.buffer)
+
+    @staticmethod
+    def request_length(function_code: int, count: int) -> int:
+        """Request frame length"""
+        return request_length(function_code, count)
+
+    @staticmethod
+    def response_length(function_code: int, count: int) -> int:
+        """Normal response frame length"""
+        return response_length(function_code, count)
+
+    @staticmethod
+    def header_length() -> int:
+        """Bytes needed to tell a normal from an exception response"""
+        return 2
+
+    @staticmethod
+    def exception_length() -> int:
+        """Exception response frame length"""
+        return EXCEPTION_RESPONSE_LENGTH
+
+    def encode(self, unit: int, function_code: int, address: int, value: Any) -> memoryview:
+        """
+        Encode a request
+
+        Returns:
+            View of the frame in the framer's buffer (valid until the next encode)
+        """
+        self.buffer[0] = unit
+        end = encode_pdu(self.buffer, 1, function_code, address, value)
+        _CRC.pack_into(self.buffer, end, crc16(self._view[:end]))
+        return self._view[:end + 2]
+
+    def decode(self, frame: memoryview, unit: int, function_code: int, count: int) -> Response:
+        """
+        Decode a complete response frame
+
+        Raises:
+            ProtocolError: On CRC errors or a frame not answering the request
+        """
+        if crc16(frame) != 0:
+            raise ProtocolError("CRC error")
+        if frame[0] != unit:
+            raise ProtocolError(f"Response from unit {frame[0]} to a request for unit {unit}")
+        if frame[1] == function_code | 0x80:
+            return Response(unit, function_code, exception_code=frame[2])
+        return Response(unit, function_code, decode_pdu(frame[1:-2], function_code, count))
+
+
+class TcpFramer:
+    """Modbus TCP frames (MBAP header and PDU) encoded into one preallocated buffer"""
+
+    def __init__(self):
+        self.buffer = bytearray(MAX_TCP_FRAME)
+        self._view = memoryview(self.buffer)
+        self.transaction_id = 0
+
+    @staticmethod
+    def request_length(function_code: int, count: int) -> int:
+        """Request frame length"""
+        return request_length(function_code, count) + 4
+
+    @staticmethod
+    def response_length(function_code: int, count: int) -> int:
+        """Normal response frame length"""
+        return response_length(function_code, count) + 4
+
+    @staticmethod
+    def header_length() -> int:
+        """Bytes needed to tell a normal from an exception response"""
+        return MBAP_HEADER.size + 1
+
+    @staticmethod
+    def exception_length() -> int:
+        """Exception response frame length"""
+        return EXCEPTION_RESPONSE_LENGTH + 4
+
+    def encode(self, unit: int, function_code: int, address: int, value: Any) -> memoryview:
+        """
+        Encode a request with the next transaction ID
+
+        Returns:
+            View of the frame in the framer's buffer (valid until the next encode)
+        """
+        self.transaction_id = (self.transaction_id + 1) & 0xFFFF
+        end = encode_pdu(self.buffer, MBAP_HEADER.size, function_code, address, value)
+        MBAP_HEADER.pack_into(self.buffer, 0, self.transaction_id, 0, end - MBAP_HEADER.size + 1, unit)
+        return self._view[:end]
+
+    def decode(self, frame: memoryview, unit: int, function_code: int, count: int) -> Response:
+        """
+        Decode a complete response frame
+
+        Raises:
+            ProtocolError: If the frame does not answer the last request
+        """
+        transaction_id, protocol_id, length, frame_unit = MBAP_HEADER.unpack_from(frame)
+        if transaction_id != self.transaction_id or protocol_id != 0:
+            raise ProtocolError(f"Unexpected transaction {transaction_id} (protocol {protocol_id})")
+        if length != len(frame) - MBAP_HEADER.size + 1:
+            raise ProtocolError(f"MBAP length {length} for a {len(frame)} byte frame")
+        if frame_unit != unit:
+            raise ProtocolError(f"Response from unit {frame_unit} to a request for unit {unit}")
+        pdu = frame[MBAP_HEADER.size:]
+        if pdu[0] == function_code | 0x80:
+            return Response(unit, function_code, exception_code=pdu[1])
+        return Response(unit, function_code, decode_pdu(pdu, function_code, count))
+
+
+class ClientProtocol:
+    """
+    Client side of one Modbus line, without I/O
+
+    The transport writes the frame returned by request(), then reads
+    expected() bytes at a time and passes them to feed() until it returns
+    the response. Received bytes are collected in a preallocated buffer.
+    RTU broadcasts (unit 0) expect no response.
+    """
+
+    def __init__(self, framer: Union[RtuFramer, TcpFramer, None] = None):
+        """
+        Initialize protocol
+
+        Args:
+            framer: RtuFramer or TcpFramer (default: RtuFramer)
+        """
+        self.framer = framer or RtuFramer()
+        self.state = STATE_IDLE
+        self._buffer = bytearray(len(self.framer.buffer))
+        self._view = memoryview(self._buffer)
+        self._received = 0
+        self._expected = 0
+        self._request = None
+
+    def request(self, unit: int, function_code: int, address: int, value: Any) -> memoryview:
+        """
+        Start a transaction
+
+        Args:
+            unit: Slave unit ID
+            function_code: Modbus function code
+            address: Starting address
+            value: Count (reads), value (single writes) or values (multiple writes)
+
+        Returns:
+            Frame to send (valid until the next request)
+        """
+        frame = self.framer.encode(unit, function_code, address, value)
+        count = value if function_code in _READS else len(value) if isinstance(value, (list, tuple)) else 1
+        self._request = (unit, function_code, count)
+        self._received = 0
+        self._expected = self.framer.response_length(function_code, count)
+        broadcast = unit == BROADCAST_UNIT and isinstance(self.framer, RtuFramer)
+        self.state = STATE_IDLE if broadcast else STATE_WAITING
+        return frame
+
+    def expected(self) -> int:
+        """Bytes still missing from the response (0 when idle)"""
+        if self.state != STATE_WAITING:
+            return 0
+        header = self.framer.header_length()
+        if self._received < header:
+            return header - self._received
+        return self._expected - self._received
+
+    def feed(self, data: Union[bytes, bytearray, memoryview]) -> Optional[Response]:
+        """
+        Add received bytes
+
+        Args:
+            data: Bytes read from the transport
+
+        Returns:
+            Response once complete, None while more bytes are needed
+
+        Raises:
+            ProtocolError: If the response is malformed (the protocol returns to idle)
+        """
+        if self.state != STATE_WAITING:
+            raise ProtocolError("No request pending")
+        end = self._received + len(data)
+        if end > len(self._buffer):
+            self.reset()
+            raise ProtocolError("Response too long")
+        self._buffer[self._received:end] = data
+        self._received = end
+        header = self.framer.header_length()
+        if end >= header and self._buffer[header - 1] & 0x80:
+            self._expected = self.framer.exception_length()
+        if end < max(header, self._expected):
+            return None
+        unit, function_code, count = self._request
+        self.state = STATE_IDLE
+        return self.framer.decode(self._view[:self._expected], unit, function_code, count)
+
+    def reset(self):
+        """Abandon the pending transaction (e.g. after a timeout)"""
+        self.state = STATE_IDLE
+        self._received = 0
+
+
+def transact(stream: Any, protocol: ClientProtocol, unit: int, function_code: int,
+             address: int, value: Any, timeout: Optional[float] = None) -> Optional[Response]:
+    """
+    Run one transaction on a blocking stream (pyserial port, socket file)
+
+    Args:
+        stream: Object with write(data) and read(n) (read returns b'' on timeout)
+        protocol: Client protocol of the line
+        unit: Slave unit ID
+        function_code: Modbus function code
+        address: Starting address
+        value: Count, value or values
+        timeout: Overall deadline in seconds (default: the stream's own read timeout)
+
+    Returns:
+        Response, or None on timeout and for broadcasts
+
+    Raises:
+        ProtocolError: If the response is malformed
+    """
+    stream.write(protocol.request(unit, function_code, address, value))
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while protocol.state == STATE_WAITING:
+        data = stream.read(protocol.expected())
+        if not data or (deadline is not None and time.monotonic() > deadline):
+            protocol.reset()
+            return None
+        response = protocol.feed(data)
+        if response is not None:
+            return response
+    return None
+
+
+async def transact_async(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                         protocol: ClientProtocol, unit: int, function_code: int,
+                         address: int, value: Any, timeout: float = 1.0) -> Optional[Response]:
+    """
+    Run one transaction on asyncio streams
+
+    Args:
+        reader: Stream reader
+        writer: Stream writer
+        protocol: Client protocol of the line
+        unit: Slave unit ID
+        function_code: Modbus function code
+        address: Starting address
+        value: Count, value or values
+        timeout: Response deadline in seconds
+
+    Returns:
+        Response, or None on timeout and for broadcasts
+
+    Raises:
+        ProtocolError: If the response is malformed
+    """
+    writer.write(protocol.request(unit, function_code, address, value))
+    await writer.drain()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    try:
+        while protocol.state == STATE_WAITING:
+            data = await asyncio.wait_for(reader.read(protocol.expected()), deadline - loop.time())
+            if not data:
+                protocol.reset()
+                return None
+            response = protocol.feed(data)
+            if response is not None:
+                return response
+    except asyncio.TimeoutError:
+        protocol.reset()
+    return None
@@ -0,0 +1,252 @@
+"""
+ModbusAPI Retry - Error classification, retry policy and per-unit circuit breakers
+"""
+
+import os
+import time
+import random
+import socket
+import logging
+import threading
+from typing import Optional, Dict, Any, Iterable
+
+try:
+    from pymodbus.exceptions import ConnectionException, ModbusIOException, InvalidMessageReceivedException
+    from pymodbus.pdu import ExceptionResponse
+except ImportError:
+    raise ImportError(
+        "pymodbus library not found! Install with: pip install pymodbus[serial]"
+    )
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Failure classes
+ERROR_TIMEOUT = 'timeout'
+ERROR_CRC = 'crc'
+ERROR_EXCEPTION = 'exception'
+ERROR_PORT = 'port'
+ERROR_CIRCUIT_OPEN = 'circuit_open'
+ERROR_UNKNOWN = 'unknown'
+
+# Failures worth another attempt: the request may succeed on the next try
+RETRYABLE_ERRORS = frozenset([ERROR_TIMEOUT, ERROR_CRC])
+
+# Failures showing the unit is not answering
+UNIT_FAILURES = frozenset([ERROR_TIMEOUT, ERROR_CRC])
+
+# Circuit breaker states
+BREAKER_CLOSED = 'closed'
+BREAKER_OPEN = 'open'
+BREAKER_HALF_OPEN = 'half_open'
+
+
+def classify_error(error: Any) -> str:
+    """
+    Classify a failed transaction
+
+    Args:
+        error: Error response returned by pymodbus or exception raised by the call
+
+    Returns:
+        One of ERROR_TIMEOUT, ERROR_CRC, ERROR_EXCEPTION, ERROR_PORT, ERROR_UNKNOWN
+    """
+    if isinstance(error, ExceptionResponse):
+        return ERROR_EXCEPTION
+    if isinstance(error, ConnectionException):
+        return ERROR_PORT
+    if isinstance(error, (ModbusIOException, InvalidMessageReceivedException)):
+        message = str(error).lower()
+        # pymodbus appends "Unable to decode response" to timeouts as well
+        if 'no response' in message:
+            return ERROR_TIMEOUT
+        if 'crc' in message or 'decode' in message or 'incomplete' in message or 'invalid' in message:
+            return ERROR_CRC
+        return ERROR_TIMEOUT
+    if isinstance(error, (socket.timeout, TimeoutError)):
+        return ERROR_TIMEOUT
+    if isinstance(error, OSError):
+        return ERROR_PORT
+    # pyserial is an optional import here; match by name to avoid the dependency
+    if type(error).__name__ == 'SerialException':
+        return ERROR_PORT
+    return ERROR_UNKNOWN
+
+
+class RetryPolicy:
+    """
+    Bounded retries with exponential backoff and jitter
+
+    Only retryable failure classes are retried, at most ``max_retries`` times
+    per transaction. Retries also draw from a shared budget that refills with
+    successful transactions, so a failing bus cannot multiply its own load.
+    """
+
+    def __init__(self,
+                 max_retries: Optional[int] = None,
+                 backoff: Optional[float] = None,
+                 jitter: float = 0.5,
+                 retry_on: Iterable[str] = RETRYABLE_ERRORS,
+                 budget_ratio: float = 0.2,
+                 budget_max: float = 10.0):
+        """
+        Initialize retry policy
+
+        Args:
+            max_retries: Retries per transaction (default: from .env MODBUS_RETRIES or 2)
+            backoff: Delay before the first retry (default: from .env MODBUS_RETRY_BACKOFF or 0.05)
+            jitter: Relative random spread of each delay (0.5 = +/-50%)
+            retry_on: Failure classes that may be retried
+            budget_ratio: Retry tokens earned per successful transaction
+            budget_max: Maximum retry tokens (also the initial budget)
+        """
+        self.max_retries = max_retries if max_retries is not None else int(os.getenv('MODBUS_RETRIES', '2'))
+        self.backoff = backoff if backoff is not None else float(os.getenv('MODBUS_RETRY_BACKOFF', '0.05'))
+        self.jitter = jitter
+        self.retry_on = frozenset(retry_on)
+        self.budget_ratio = budget_ratio
+        self.budget_max = budget_max
+        self.tokens = budget_max
+        self.retries = 0
+        self.exhausted = 0
+        self._lock = threading.Lock()
+
+    def should_retry(self, error_class: str, attempt: int) -> bool:
+        """
+        Decide whether to retry and take a token from the budget if so
+
+        Args:
+            error_class: Failure class of the last attempt
+            attempt: Number of retries already made for this transaction
+
+        Returns:
+            True if the transaction should be retried
+        """
+        if error_class not in self.retry_on or attempt >= self.max_retries:
+            return False
+        with self._lock:
+            if self.tokens < 1:
+                self.exhausted += 1
+                return False
+            self.tokens -= 1
+            self.retries += 1
+            return True
+
+    def delay(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (0-based)"""
+        base = self.backoff * (2 ** attempt)
+        return max(0.0, base * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def record_success(self):
+        """Refill the retry budget after a successful transaction"""
+        with self._lock:
+            self.tokens = min(self.budget_max, self.tokens + self.budget_ratio)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return policy configuration and counters"""
+        return {
+            'max_retries': self.max_retries,
+            'backoff': self.backoff,
+            'jitter': self.jitter,
+            'retry_on': sorted(self.retry_on),
+            'budget_tokens': self.tokens,
+            'retries': self.retries,
+            'budget_exhausted': self.exhausted,
+        }
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one slave unit
+
+    After ``threshold`` consecutive unit failures the breaker opens and
+    requests are rejected without touching the bus. After ``cooldown``
+    seconds one probe request is let through (half-open); success closes the
+    breaker, failure opens it again.
+    """
+
+    def __init__(self, threshold: int = 5, cooldown: float = 10.0):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = BREAKER_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent to the unit
+
+        Returns:
+            True if the request may proceed
+        """
+        if self.state == BREAKER_OPEN:
+            if time.monotonic() - self.opened_at < self.cooldown:
+                self.rejected += 1
+                return False
+            self.state = BREAKER_HALF_OPEN
+        return True
+
+    def record_success(self):
+        """Record an answer from the unit"""
+        self.failures = 0
+        self.state = BREAKER_CLOSED
+
+    def record_failure(self, error_class: str):
+        """Record a failed request; only silence or garbled answers count"""
+        if error_class not in UNIT_FAILURES:
+            return
+        self.failures += 1
+        self.last_error = error_class
+        if self.state == BREAKER_HALF_OPEN or self.failures >= self.threshold:
+            if self.state != BREAKER_OPEN:
+                logger.warning(f"Circuit opened after {self.failures} failures ({error_class})")
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return breaker state"""
+        retry_in = None
+        if self.state == BREAKER_OPEN:
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'rejected': self.rejected,
+            'last_error': self.last_error,
+            'retry_in': retry_in,
+        }
+
+
+class CircuitBreakers:
+    """Circuit breakers of all units on a bus"""
+
+    def __init__(self, threshold: Optional[int] = None, cooldown: Optional[float] = None):
+        """
+        Initialize breaker registry
+
+        Args:
+            threshold: Consecutive failures opening a breaker
+                (default: from .env MODBUS_BREAKER_THRESHOLD or 5)
+            cooldown: Seconds an open breaker rejects requests
+                (default: from .env MODBUS_BREAKER_COOLDOWN or 10)
+        """
+        self.threshold = threshold if threshold is not None else int(os.getenv('MODBUS_BREAKER_THRESHOLD', '5'))
+        self.cooldown = cooldown if cooldown is not None else float(os.getenv('MODBUS_BREAKER_COOLDOWN', '10'))
+        self._breakers: Dict[int, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, unit: int) -> CircuitBreaker:
+        """Return the breaker of a unit, creating it on first use"""
+        with self._lock:
+            breaker = self._breakers.get(unit)
+            if breaker is None:
+                breaker = self._breakers[unit] = CircuitBreaker(self.threshold, self.cooldown)
+            return breaker
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the state of every known unit's breaker"""
+        with self._lock:
+            breakers = list(self._breakers.items())
+        return {str(unit): breaker.to_dict() for unit, breaker in sorted(breakers)}
@@ -9,7 +9,11 @@ import argparse
 import logging
 from typing import Dict, Any, List, Optional, Union
 
-from .client import ModbusClient, auto_detect_modbus_port
+from .client import ModbusClient, auto_detect_modbus_device, detect_modbus_devices
+from .discovery import discover_buses, Inventory
+from .arbiter import arbitrate
+from .pool import ModbusClientPool, parse_point, parse_units
+from .bitmask import FORMATS, FORMAT_VERBOSE
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -58,6 +62,9 @@ Options:
   -p, --port PORT  Specify Modbus port (default: auto-detect or from .env)
   -b, --baud BAUD  Specify baud rate (default: from .env or 9600)
   -t, --timeout T  Specify timeout in seconds (default: from .env or 1.0)
+  --bus BUS        Bus name (from MODBUS_BUSES) or port for the command
+  --format FMT     Output of rc/ri: verbose (default), hex or base64
+  --units UNITS    Unit IDs swept by --scan (default: 1-247)
 
 Commands:
   rc <address> <count> [unit]  Read coils
@@ -65,14 +72,25 @@ Commands:
   ri <address> <count> [unit]  Read discrete inputs
   rh <address> <count> [unit]  Read holding registers
   wh <address> <value> [unit]  Write holding register
+  bc <address> <values> [units]  Broadcast coil write to all units (values: 1,0,1;
+                               units: read back afterwards, e.g. 1-30,40)
+  bh <address> <values> [units]  Broadcast holding register write to all units
+  read <point> [<point>...]    Read points on one or more buses in parallel
+                               (point: [bus:]unit:type:address[:count])
+  bench [options]              Run transport benchmarks (bench --help for options)
   --interactive                Start interactive mode
-  --scan                       Scan for Modbus devices
+  --scan                       Sweep unit IDs on every detected bus (or -p PORT) and
+                               print the inventory (units, address range per table)
 
 Examples:
   modbusapi -v rc 0 8 1        # Read 8 coils with verbose logging
   modbusapi wc 0 on 1          # Turn on coil at address 0, unit 1
   modbusapi rh 0 5 1           # Read 5 holding registers
   modbusapi -p /dev/ttyACM0 wc 0 1  # Specify port explicitly
+  modbusapi --bus boiler rh 0 5 2   # Use a bus defined in MODBUS_BUSES
+  modbusapi --format hex ri 0 64 1  # 64 inputs as one packed hex string
+  modbusapi bc 0 0,0,0,0,0,0,0,0 1-30  # All outputs off everywhere, verify 30 units
+  modbusapi read /dev/ttyUSB0:1:coils:0:8 /dev/ttyUSB1:5:holding_registers:10:2
 """)
 
 
@@ -94,18 +112,58 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument('-p', '--port', help='Specify Modbus port')
     parser.add_argument('-b', '--baud', type=int, help='Specify baud rate')
     parser.add_argument('-t', '--timeout', type=float, help='Specify timeout in seconds')
+    parser.add_argument('--bus', help='Bus name (from MODBUS_BUSES) or port')
+    parser.add_argument('--format', choices=FORMATS, default=FORMAT_VERBOSE,
+                        help='Output of coil and discrete input reads')
+    parser.add_argument('--units', help='Unit IDs swept by --scan (e.g. 1-50)')
     
     # Special modes
     parser.add_argument('--interactive', action='store_true', help='Start interactive mode')
-    parser.add_argument('--scan', action='store_true', help='Scan for Modbus devices')
+    parser.add_argument('--scan', action='store_true', help='Sweep unit IDs and print the device inventory')
     
     # Command and arguments
-    parser.add_argument('command', nargs='?', help='Modbus command (rc, wc, ri, rh, wh)')
+    parser.add_argument('command', nargs='?', help='Modbus command (rc, wc, ri, rh, wh, bc, bh, read)')
     parser.add_argument('args', nargs='*', help='Command arguments')
     
     return parser.parse_args()
 
 
+def scan_buses(args: argparse.Namespace) -> bool:
+    """
+    Sweep unit IDs on the given port, or on every port where detection finds a
+    device (in parallel), then print and save the inventory
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        True if any unit answered, False otherwise
+    """
+    response = create_response('scan')
+    try:
+        units = parse_units(args.units) if args.units else None
+    except ValueError as e:
+        response['error'] = str(e)
+        output_json(response)
+        return False
+        
+    if args.port:
+        buses = [(args.port, args.baud or int(os.getenv('MODBUS_BAUDRATE', '9600')), 'N')]
+    else:
+        buses = detect_modbus_devices(first=False)
+    if not buses:
+        response['error'] = "No Modbus device found on any serial port"
+        output_json(response)
+        return False
+        
+    records = discover_buses(buses, units=units)
+    Inventory().update(records)
+    response['success'] = any(record['units'] for record in records)
+    response['buses'] = {record['port']: record for record in records}
+    output_json(response)
+    return response['success']
+
+
 def interactive_mode(port: Optional[str] = None, baudrate: Optional[int] = None, 
                     timeout: Optional[float] = None, verbose: bool = False):
     """
@@ -120,15 +178,17 @@ def interactive_mode(port: Optional[str] = None, baudrate: Optional[int] = None,
     print("Modbus API Interactive Mode")
     print("Type 'help' for available commands, 'exit' to quit")
     
-    # Auto-detect port if not specified
+    # Auto-detect port (and its line settings) if not specified
+    parity = 'N'
     if not port:
-        port = auto_detect_modbus_port()
-        if not port:
+        device = auto_detect_modbus_device()
+        if not device:
             print("No Modbus device found! Please connect a device and try again.")
             return
+        port, baudrate, parity = device.port, device.baudrate, device.parity
             
     # Create client
-    client = ModbusClient(port=port, baudrate=baudrate, timeout=timeout, verbose=verbose)
+    client = arbitrate(ModbusClient(port=port, baudrate=baudrate, parity=parity, timeout=timeout, verbose=verbose))
     if not client.connect():
         print(f"Failed to connect to {port}")
         return
@@ -244,10 +304,9 @@ def command_line_mode(args: argparse.Namespace) -> bool:
         print_command_help()
         return True
         
-    # Scan for devices
+    # Sweep buses for units
     if args.scan:
-        port = auto_detect_modbus_port()
-        return port is not None
+        return scan_buses(args)
         
     # Interactive mode
     if args.interactive:
@@ -266,14 +325,16 @@ def command_line_mode(args: argparse.Namespace) -> bool:
     try:
         # Use the configured port or auto-detect
         port = args.port
+        baudrate, parity = args.baud, 'N'
         if not port:
             port = os.getenv('MODBUS_PORT')
             if not port:
-                port = auto_detect_modbus_port()
-                if not port:
+                device = auto_detect_modbus_device()
+                if not device:
                     response['error'] = "Could not auto-detect Modbus port"
                     output_json(response)
                     return False
+                port, baudrate, parity = device.port, device.baudrate, device.parity
                 response['port_source'] = 'auto_detected'
             else:
                 response['port_source'] = 'env_file'
@@ -282,16 +343,28 @@ def command_line_mode(args: argparse.Namespace) -> bool:
             
         response['port'] = port
         
-        # Initialize modbus client
-        modbus = ModbusClient(
+        # Initialize modbus clients: the selected port plus buses from MODBUS_BUSES
+        pool = ModbusClientPool(timeout=args.timeout, verbose=args.verbose)
+        pool.add_client(ModbusClient(
             port=port,
-            baudrate=args.baud,
+            baudrate=baudrate,
+            parity=parity,
             timeout=args.timeout,
             verbose=args.verbose
-        )
+        ))
+        pool.add_from_env()
+        bus = getattr(args, 'bus', None)
+        if bus and pool.get(bus) is None and bus.startswith('/'):
+            pool.add_bus(bus, args.baud)
+        modbus = pool.get(bus)
+        if modbus is None:
+            response['error'] = f"Unknown bus: {bus}"
+            output_json(response)
+            return False
+        response['bus'] = bus or port
         
         if not modbus.connect():
-            response['error'] = f"Failed to connect to port {port}"
+            response['error'] = f"Failed to connect to port {modbus.port}"
             output_json(response)
             return False
             
@@ -316,7 +389,18 @@ def command_line_mode(args: argparse.Namespace) -> bool:
                 'register_type': 'coil'
             })
             
-            result = modbus.read_coils(address, count, unit)
+            fmt = getattr(args, 'format', FORMAT_VERBOSE)
+            result = None
+            if fmt != FORMAT_VERBOSE:
+                mask = modbus.read_coils_mask(address, count, unit)
+                if mask is not None:
+                    response.update({'success': True, 'data': mask.to_dict(fmt)})
+                else:
+                    response['error'] = "Failed to read coils"
+            else:
+                result = modbus.read_coils(address, count, unit)
+                if result is None:
+                    response['error'] = "Failed to read coils"
             if result is not None:
                 response.update({
                     'success': True,
@@ -327,8 +411,6 @@ def command_line_mode(args: argparse.Namespace) -> bool:
                         'values_dict': {str(i): val for i, val in enumerate(result, address)}
                     }
                 })
-            else:
-                response['error'] = "Failed to read coils"
                 
         elif cmd == 'wc':  # Write coil
             if len(command_args) < 2:
@@ -378,7 +460,18 @@ def command_line_mode(args: argparse.Namespace) -> bool:
                 'register_type': 'discrete_input'
             })
             
-            result = modbus.read_discrete_inputs(address, count, unit)
+            fmt = getattr(args, 'format', FORMAT_VERBOSE)
+            result = None
+            if fmt != FORMAT_VERBOSE:
+                mask = modbus.read_discrete_inputs_mask(address, count, unit)
+                if mask is not None:
+                    response.update({'success': True, 'data': mask.to_dict(fmt)})
+                else:
+                    response['error'] = "Failed to read discrete inputs"
+            else:
+                result = modbus.read_discrete_inputs(address, count, unit)
+                if result is None:
+                    response['error'] = "Failed to read discrete inputs"
             if result is not None:
                 response.update({
                     'success': True,
@@ -390,8 +483,6 @@ def command_line_mode(args: argparse.Namespace) -> bool:
                     },
                     'message': f"Read {count} discrete inputs starting at address {address}"
                 })
-            else:
-                response['error'] = "Failed to read discrete inputs"
                 
         elif cmd == 'rh':  # Read holding registers
             if len(command_args) < 2:
@@ -459,6 +550,73 @@ def command_line_mode(args: argparse.Namespace) -> bool:
             else:
                 response['error'] = f"Failed to write holding register {address}"
                 
+        elif cmd in ('bc', 'bh'):  # Broadcast write
+            if len(command_args) < 2:
+                response['error'] = f"Usage: {cmd} <address> <values> [units]"
+                output_json(response)
+                return False
+                
+            address = int(command_args[0])
+            if cmd == 'bc':
+                values = [value.lower() in ('1', 'true', 'on') for value in command_args[1].split(',')]
+            else:
+                values = [int(value, 0) for value in command_args[1].split(',')]
+            units = parse_units(command_args[2]) if len(command_args) > 2 else []
+            
+            response.update({
+                'address': address,
+                'values': values,
+                'register_type': 'coil' if cmd == 'bc' else 'holding_register'
+            })
+            
+            result = modbus.broadcast('coils' if cmd == 'bc' else 'holding_registers',
+                                      address, values if len(values) > 1 else values[0], units)
+            if result['sent']:
+                failed = [unit for unit, ok in result['verified'].items() if not ok]
+                response.update({
+                    'success': not failed,
+                    'message': f"Broadcast {len(values)} value(s) to address {address}",
+                    'data': {
+                        'address': address,
+                        'values': values,
+                        'verified': {str(unit): ok for unit, ok in result['verified'].items()}
+                    }
+                })
+                if failed:
+                    response['error'] = f"Readback mismatch or failure on units: {failed}"
+            else:
+                response['error'] = f"Failed to broadcast write to {address}"
+                
+        elif cmd == 'read':  # Read points on one or more buses
+            if not command_args:
+                response['error'] = "Usage: read <[bus:]unit:type:address[:count]> ..."
+                output_json(response)
+                return False
+                
+            points = [parse_point(text) for text in command_args]
+            points = [point._replace(bus=point.bus or bus) for point in points]
+            unknown = sorted({str(point.bus) for point in points if pool.get(point.bus) is None})
+            if unknown:
+                response['error'] = f"Unknown bus: {', '.join(unknown)}"
+            else:
+                results = pool.read_many(points)
+                response.update({
+                    'success': all(result is not None for result in results),
+                    'data': [
+                        {
+                            'bus': point.bus or port,
+                            'unit': point.unit,
+                            'function_code': point.function_code,
+                            'address': point.address,
+                            'count': point.count,
+                            'values': result
+                        }
+                        for point, result in zip(points, results)
+                    ]
+                })
+                if not response['success']:
+                    response['error'] = "Failed to read some points"
+                
         else:
             response['error'] = f"Unknown command: {cmd}"
             print_command_help()
@@ -467,8 +625,8 @@ def command_line_mode(args: argparse.Namespace) -> bool:
         response['error'] = str(e)
         
     finally:
-        if 'modbus' in locals():
-            modbus.disconnect()
+        if 'pool' in locals():
+            pool.disconnect()
             
         # Output response as JSON
         output_json(response)
@@ -479,6 +637,10 @@ def command_line_mode(args: argparse.Namespace) -> bool:
 
 def main():
     """Main entry point for the command line interface"""
+    # Benchmarks have their own options
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        from .bench import main as bench_main
+        sys.exit(bench_main(sys.argv[2:]))
     args = parse_args()
     success = command_line_mode(args)
     sys.exit(0 if success else 1)
@@ -0,0 +1,407 @@
+"""
+ModbusAPI Simulator - Modbus RTU slaves on a pseudo-terminal
+"""
+
+import os
+import json
+import time
+import tty
+import struct
+import select
+import logging
+import threading
+from array import array
+from typing import Optional, List, Dict, Any, Iterable, Union
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from .timing import (
+    RtuTiming, BROADCAST_UNIT,
+    READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS,
+    WRITE_SINGLE_COIL, WRITE_SINGLE_REGISTER, WRITE_MULTIPLE_COILS, WRITE_MULTIPLE_REGISTERS
+)
+from .profile import load_profile
+from .protocol import crc16, add_crc, pack_bits
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Modbus exception codes
+ILLEGAL_FUNCTION = 1
+ILLEGAL_DATA_ADDRESS = 2
+ILLEGAL_DATA_VALUE = 3
+
+# Points per table of a slave without a layout
+DEFAULT_BANK_SIZE = 100
+
+# Bank names in layout files, by read function code
+BANK_NAMES = {
+    READ_COILS: 'coils',
+    READ_DISCRETE_INPUTS: 'discrete_inputs',
+    READ_HOLDING_REGISTERS: 'holding_registers',
+    READ_INPUT_REGISTERS: 'input_registers',
+}
+
+# Most points a single read may return (Modbus spec)
+_MAX_READ = {READ_COILS: 2000, READ_DISCRETE_INPUTS: 2000, READ_HOLDING_REGISTERS: 125, READ_INPUT_REGISTERS: 125}
+
+
+def _request_length(buffer: bytearray) -> Optional[int]:
+    """Length of the request frame at the start of buffer (None: need more bytes, 0: unknown)"""
+    if len(buffer) < 2:
+        return None
+    function_code = buffer[1]
+    if function_code in (WRITE_MULTIPLE_COILS, WRITE_MULTIPLE_REGISTERS):
+        return 9 + buffer[6] if len(buffer) >= 7 else None
+    if function_code in (READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS,
+                         WRITE_SINGLE_COIL, WRITE_SINGLE_REGISTER):
+        return 8
+    return 0
+
+
+class SlaveError(Exception):
+    """Modbus exception returned by a simulated slave"""
+
+    def __init__(self, code: int):
+        super().__init__(f"Modbus exception {code}")
+        self.code = code
+
+
+class SlaveDevice:
+    """Register banks of one simulated slave and the PDU handling on them"""
+
+    def __init__(self,
+                 unit: int = 1,
+                 coils: Union[int, Iterable[int]] = DEFAULT_BANK_SIZE,
+                 discrete_inputs: Union[int, Iterable[int]] = DEFAULT_BANK_SIZE,
+                 holding_registers: Union[int, Iterable[int]] = DEFAULT_BANK_SIZE,
+                 input_registers: Union[int, Iterable[int]] = DEFAULT_BANK_SIZE,
+                 delay: float = 0.0):
+        """
+        Initialize slave
+
+        Args:
+            unit: Slave unit ID (1-247)
+            coils: Number of coils, or their initial values
+            discrete_inputs: Number of discrete inputs, or their initial values
+            holding_registers: Number of holding registers, or their initial values
+            input_registers: Number of input registers, or their initial values
+            delay: Seconds the slave takes to start answering after a request
+        """
+        if not 1 <= unit <= 247:
+            raise ValueError(f"Invalid unit ID: {unit}")
+        self.unit = unit
+        self.delay = delay
+        self.coils = bytearray(coils) if isinstance(coils, int) else bytearray(bool(v) for v in coils)
+        self.discrete_inputs = (bytearray(discrete_inputs) if isinstance(discrete_inputs, int)
+                                else bytearray(bool(v) for v in discrete_inputs))
+        self.holding_registers = array('H', [0] * holding_registers if isinstance(holding_registers, int)
+                                       else holding_registers)
+        self.input_registers = array('H', [0] * input_registers if isinstance(input_registers, int)
+                                     else input_registers)
+        self.tables = {
+            READ_COILS: self.coils,
+            READ_DISCRETE_INPUTS: self.discrete_inputs,
+            READ_HOLDING_REGISTERS: self.holding_registers,
+            READ_INPUT_REGISTERS: self.input_registers,
+        }
+
+    @staticmethod
+    def _check(table, address: int, count: int, limit: int):
+        if not 1 <= count <= limit:
+            raise SlaveError(ILLEGAL_DATA_VALUE)
+        if address + count > len(table):
+            raise SlaveError(ILLEGAL_DATA_ADDRESS)
+
+    def handle(self, pdu: bytes) -> bytes:
+        """
+        Execute a request PDU
+
+        Args:
+            pdu: Function code and data
+
+        Returns:
+            Response PDU (an exception response if the request is not valid)
+        """
+        function_code = pdu[0]
+        try:
+            return self._handle(function_code, pdu)
+        except SlaveError as e:
+            return bytes([function_code | 0x80, e.code])
+        except (struct.error, IndexError):
+            return bytes([function_code | 0x80, ILLEGAL_DATA_VALUE])
+
+    def _handle(self, function_code: int, pdu: bytes) -> bytes:
+        if function_code in (READ_COILS, READ_DISCRETE_INPUTS):
+            address, count = struct.unpack_from('>HH', pdu, 1)
+            table = self.tables[function_code]
+            self._check(table, address, count, _MAX_READ[function_code])
+            data = pack_bits(table[address:address + count])
+            return bytes([function_code, len(data)]) + data
+        if function_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+            address, count = struct.unpack_from('>HH', pdu, 1)
+            table = self.tables[function_code]
+            self._check(table, address, count, _MAX_READ[function_code])
+            return bytes([function_code, 2 * count]) + struct.pack(f'>{count}H', *table[address:address + count])
+        if function_code == WRITE_SINGLE_COIL:
+            address, value = struct.unpack_from('>HH', pdu, 1)
+            if value not in (0x0000, 0xFF00):
+                raise SlaveError(ILLEGAL_DATA_VALUE)
+            self._check(self.coils, address, 1, 1)
+            self.coils[address] = value == 0xFF00
+            return pdu[:5]
+        if function_code == WRITE_SINGLE_REGISTER:
+            address, value = struct.unpack_from('>HH', pdu, 1)
+            self._check(self.holding_registers, address, 1, 1)
+            self.holding_registers[address] = value
+            return pdu[:5]
+        if function_code == WRITE_MULTIPLE_COILS:
+            address, count, byte_count = struct.unpack_from('>HHB', pdu, 1)
+            if byte_count != (count + 7) // 8 or len(pdu) < 6 + byte_count:
+                raise SlaveError(ILLEGAL_DATA_VALUE)
+            self._check(self.coils, address, count, 1968)
+            data = pdu[6:6 + byte_count]
+            for index in range(count):
+                self.coils[address + index] = (data[index // 8] >> (index % 8)) & 1
+            return pdu[:5]
+        if function_code == WRITE_MULTIPLE_REGISTERS:
+            address, count, byte_count = struct.unpack_from('>HHB', pdu, 1)
+            if byte_count != 2 * count or len(pdu) < 6 + byte_count:
+                raise SlaveError(ILLEGAL_DATA_VALUE)
+            self._check(self.holding_registers, address, count, 123)
+            self.holding_registers[address:address + count] = array('H', struct.unpack_from(f'>{count}H', pdu, 6))
+            return pdu[:5]
+        raise SlaveError(ILLEGAL_FUNCTION)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SlaveDevice':
+        """
+        Create a slave from a layout entry
+
+        Banks are given as a size or a list of initial values. With 'profile'
+        (a built-in device profile name or file), banks not given are sized to
+        the addresses the profile defines.
+        """
+        banks = {}
+        profile = None
+        if data.get('profile'):
+            profile = load_profile(data['profile'])
+            if profile is None:
+                raise ValueError(f"Unknown device profile: {data['profile']}")
+        for function_code, name in BANK_NAMES.items():
+            if name in data:
+                banks[name] = data[name]
+            elif profile is not None:
+                addresses = profile.addresses(function_code)
+                banks[name] = addresses[-1] + 1 if addresses else 0
+        return cls(int(data.get('unit', 1)), delay=float(data.get('delay', 0.0)), **banks)
+
+
+def load_layout(path: str) -> List[SlaveDevice]:
+    """
+    Load simulated slaves from a JSON or YAML file
+
+    The file holds a list of slave entries (or an object with a 'slaves'
+    list), see SlaveDevice.from_dict.
+
+    Args:
+        path: Layout file path
+
+    Returns:
+        List of slaves; empty if the file could not be loaded
+    """
+    try:
+        with open(path) as f:
+            if path.endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    logger.error(f"PyYAML is required to load {path} (pip install pyyaml)")
+                    return []
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('slaves', [data])
+        return [SlaveDevice.from_dict(entry) for entry in data]
+    except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        logger.error(f"Could not load simulator layout {path}: {e}")
+        return []
+
+
+class RtuSimulator:
+    """
+    Modbus RTU slaves answering on a pseudo-terminal
+
+    The client opens ``simulator.port`` like any serial port. Requests are
+    framed by length (and by the silent interval for unknown function codes),
+    checked for CRC errors, and answered after the time the request would
+    take on the wire, the silent interval and the slave's response delay.
+    Responses are paced to the configured baud rate.
+    """
+
+    def __init__(self,
+                 slaves: Iterable[SlaveDevice],
+                 baudrate: int = 9600,
+                 bytesize: int = 8,
+                 parity: str = 'N',
+                 stopbits: int = 1,
+                 pacing: bool = True):
+        """
+        Initialize simulator
+
+        Args:
+            slaves: Simulated slaves (unique unit IDs)
+            baudrate: Line speed used for pacing
+            bytesize: Data bits (for pacing)
+            parity: Parity bit (for pacing)
+            stopbits: Stop bits (for pacing)
+            pacing: Emulate wire time; if False responses are written at once
+        """
+        self.slaves: Dict[int, SlaveDevice] = {}
+        for slave in slaves:
+            if slave.unit in self.slaves:
+                raise ValueError(f"Duplicate unit ID: {slave.unit}")
+            self.slaves[slave.unit] = slave
+        self.timing = RtuTiming(baudrate, bytesize, parity, stopbits)
+        self.pacing = pacing
+        self.port: Optional[str] = None
+        self.stats = {
+            'requests': 0,
+            'responses': 0,
+            'exceptions': 0,
+            'broadcasts': 0,
+            'crc_errors': 0,
+            'unanswered': 0,
+        }
+        self._master: Optional[int] = None
+        self._slave: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def open(self) -> str:
+        """
+        Create the pseudo-terminal pair
+
+        Returns:
+            Device path clients connect to
+        """
+        if self._master is None:
+            self._master, self._slave = os.openpty()
+            # Raw mode until the client configures the port; the slave end stays
+            # open so the pair survives clients reconnecting
+            tty.setraw(self._slave)
+            self.port = os.ttyname(self._slave)
+        return self.port
+
+    def close(self):
+        """Stop serving and close the pseudo-terminal"""
+        self.stop()
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def start(self) -> str:
+        """
+        Serve requests in a background thread
+
+        Returns:
+            Device path clients connect to
+        """
+        port = self.open()
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self.serve_forever, name='modbus-simulator', daemon=True)
+            self._thread.start()
+        return port
+
+    def stop(self):
+        """Stop the background thread"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'RtuSimulator':
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def serve_forever(self):
+        """Read, frame and answer requests until stop() is called"""
+        self.open()
+        self._running = True
+        buffer = bytearray()
+        first_byte = last_byte = 0.0
+        frame_gap = self.timing.silent_interval
+        while self._running:
+            readable, _, _ = select.select([self._master], [], [], frame_gap if buffer else 0.05)
+            now = time.monotonic()
+            if readable:
+                try:
+                    data = os.read(self._master, 512)
+                except OSError:
+                    continue
+                if not buffer:
+                    first_byte = now
+                buffer.extend(data)
+                last_byte = now
+            while buffer:
+                length = _request_length(buffer)
+                if not length or len(buffer) < length:
+                    break
+                self._process(bytes(buffer[:length]), first_byte)
+                del buffer[:length]
+                first_byte = time.monotonic()
+            if buffer and now - last_byte >= frame_gap:
+                # Frame ended by silence: unknown function code or garbage
+                self._process(bytes(buffer), first_byte)
+                buffer.clear()
+
+    def _process(self, frame: bytes, received: float):
+        if len(frame) < 4 or crc16(frame[:-2]) != struct.unpack('<H', frame[-2:])[0]:
+            self.stats['crc_errors'] += 1
+            logger.debug(f"Dropped frame with bad CRC: {frame.hex()}")
+            return
+        self.stats['requests'] += 1
+        unit, pdu = frame[0], frame[1:-2]
+        if unit == BROADCAST_UNIT:
+            self.stats['broadcasts'] += 1
+            for slave in self.slaves.values():
+                slave.handle(pdu)
+            return
+        slave = self.slaves.get(unit)
+        if slave is None:
+            self.stats['unanswered'] += 1
+            return
+        response = add_crc(bytes([unit]) + slave.handle(pdu))
+        if response[1] & 0x80:
+            self.stats['exceptions'] += 1
+        self.stats['responses'] += 1
+
+        start = time.monotonic() + slave.delay
+        if self.pacing:
+            # The slave sees the request once it is fully on the wire and the line went silent
+            start = max(start, received + self.timing.wire_time(len(frame))
+                        + self.timing.silent_interval + slave.delay)
+        self._send(response, start)
+
+    def _send(self, frame: bytes, start: float):
+        """Write a frame from time start on, one character time per byte when pacing"""
+        char_time = self.timing.char_time if self.pacing else 0.0
+        sent = 0
+        while sent < len(frame):
+            now = time.monotonic()
+            if now < start + sent * char_time:
+                time.sleep(start + sent * char_time - now)
+                continue
+            due = len(frame) if not char_time else min(len(frame), int((now - start) / char_time) + 1)
+            sent += os.write(self._master, frame[sent:due])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return request counters"""
+        return dict(self.stats, port=self.port, units=sorted(self.slaves))
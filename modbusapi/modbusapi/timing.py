@@ -0,0 +1,239 @@
+"""
+ModbusAPI Timing - Modbus RTU frame timing and response-length prediction
+"""
+
+import os
+import logging
+from collections import deque
+from typing import Optional, Dict, Any
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Function codes with predictable frame lengths
+READ_COILS = 1
+READ_DISCRETE_INPUTS = 2
+READ_HOLDING_REGISTERS = 3
+READ_INPUT_REGISTERS = 4
+WRITE_SINGLE_COIL = 5
+WRITE_SINGLE_REGISTER = 6
+WRITE_MULTIPLE_COILS = 15
+WRITE_MULTIPLE_REGISTERS = 16
+
+# Unit ID addressing every slave of a serial line (writes only, never answered)
+BROADCAST_UNIT = 0
+
+# Function code used by each ModbusClient method
+METHOD_FUNCTION_CODES = {
+    'read_coils': READ_COILS,
+    'read_discrete_inputs': READ_DISCRETE_INPUTS,
+    'read_holding_registers': READ_HOLDING_REGISTERS,
+    'read_input_registers': READ_INPUT_REGISTERS,
+    'write_coil': WRITE_SINGLE_COIL,
+    'write_register': WRITE_SINGLE_REGISTER,
+    'write_coils': WRITE_MULTIPLE_COILS,
+    'write_registers': WRITE_MULTIPLE_REGISTERS,
+}
+
+# Exception response: address, function code | 0x80, exception code, CRC
+EXCEPTION_RESPONSE_LENGTH = 5
+
+# Above 19200 baud the spec fixes the inter-frame/inter-character times
+FIXED_TIMING_BAUDRATE = 19200
+FIXED_SILENT_INTERVAL = 0.00175
+FIXED_INTER_CHAR_TIMEOUT = 0.00075
+
+
+def request_length(function_code: int, count: int = 1) -> int:
+    """
+    Predict the RTU request frame length (address, PDU and CRC)
+
+    Args:
+        function_code: Modbus function code
+        count: Number of coils/registers in the request
+
+    Returns:
+        Frame length in bytes
+    """
+    if function_code == WRITE_MULTIPLE_COILS:
+        return 9 + (count + 7) // 8
+    if function_code == WRITE_MULTIPLE_REGISTERS:
+        return 9 + 2 * count
+    return 8
+
+
+def response_length(function_code: int, count: int = 1) -> int:
+    """
+    Predict the RTU response frame length (address, PDU and CRC)
+
+    Args:
+        function_code: Modbus function code
+        count: Number of coils/registers in the request
+
+    Returns:
+        Frame length in bytes
+    """
+    if function_code in (READ_COILS, READ_DISCRETE_INPUTS):
+        return 5 + (count + 7) // 8
+    if function_code in (READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS):
+        return 5 + 2 * count
+    return 8
+
+
+class RtuTiming:
+    """Character, silent-interval and transaction times for one serial line"""
+
+    def __init__(self, baudrate: int, bytesize: int = 8, parity: str = 'N',
+                 stopbits: int = 1, turnaround: Optional[float] = None,
+                 broadcast_delay: Optional[float] = None):
+        """
+        Initialize RTU timing
+
+        Args:
+            baudrate: Communication speed
+            bytesize: Data bits
+            parity: Parity bit ('N', 'E', 'O')
+            stopbits: Stop bits
+            turnaround: Time allowed for the slave to start answering
+                (default: from .env MODBUS_TURNAROUND or 0.1)
+            broadcast_delay: Time slaves are given to process a broadcast before
+                the next request (default: from .env MODBUS_BROADCAST_DELAY or 0.1)
+        """
+        self.baudrate = baudrate
+        self.bits_per_char = 1 + bytesize + (0 if parity == 'N' else 1) + stopbits
+        self.char_time = self.bits_per_char / baudrate
+        if turnaround is None:
+            turnaround = float(os.getenv('MODBUS_TURNAROUND', '0.1'))
+        self.turnaround = turnaround
+        if broadcast_delay is None:
+            broadcast_delay = float(os.getenv('MODBUS_BROADCAST_DELAY', '0.1'))
+        self.broadcast_delay = broadcast_delay
+
+        if baudrate > FIXED_TIMING_BAUDRATE:
+            self.silent_interval = FIXED_SILENT_INTERVAL
+            self.inter_char_timeout = FIXED_INTER_CHAR_TIMEOUT
+        else:
+            self.silent_interval = 3.5 * self.char_time
+            self.inter_char_timeout = 1.5 * self.char_time
+
+    def wire_time(self, nbytes: int) -> float:
+        """Time needed to transmit nbytes on the line"""
+        return nbytes * self.char_time
+
+    def transaction_wire_time(self, function_code: int, count: int = 1) -> float:
+        """
+        Minimum time a request/response exchange occupies the bus
+
+        Args:
+            function_code: Modbus function code
+            count: Number of coils/registers
+
+        Returns:
+            Request + response transmission time plus one silent interval
+        """
+        nbytes = request_length(function_code, count) + response_length(function_code, count)
+        return self.wire_time(nbytes) + self.silent_interval
+
+    def response_timeout(self, function_code: int, count: int = 1,
+                         turnaround: Optional[float] = None) -> float:
+        """
+        Deadline for a complete response, measured from writing the request
+
+        Args:
+            function_code: Modbus function code
+            count: Number of coils/registers
+            turnaround: Slave processing allowance (default: self.turnaround)
+
+        Returns:
+            Timeout in seconds
+        """
+        if turnaround is None:
+            turnaround = self.turnaround
+        return self.transaction_wire_time(function_code, count) + turnaround
+
+    def broadcast_time(self, function_code: int, count: int = 1) -> float:
+        """
+        Time a broadcast occupies the bus: the request, the silent interval and
+        the turnaround delay during which no other request may be sent
+
+        Args:
+            function_code: Write function code
+            count: Number of coils/registers written
+        """
+        return self.wire_time(request_length(function_code, count)) + self.silent_interval + self.broadcast_delay
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return timing parameters"""
+        return {
+            'baudrate': self.baudrate,
+            'bits_per_char': self.bits_per_char,
+            'char_time': self.char_time,
+            'silent_interval': self.silent_interval,
+            'inter_char_timeout': self.inter_char_timeout,
+            'turnaround': self.turnaround,
+            'broadcast_delay': self.broadcast_delay,
+        }
+
+
+class TimingStats:
+    """Per-transaction wire time vs wall time"""
+
+    def __init__(self, samples: int = 1000):
+        """
+        Initialize timing statistics
+
+        Args:
+            samples: Number of recent transactions kept for the averages
+        """
+        self.transactions = 0
+        self.failures = 0
+        self.wire_time_total = 0.0
+        self.wall_time_total = 0.0
+        self.recent = deque(maxlen=samples)
+
+    def record(self, function_code: int, count: int, wire_time: float, wall_time: float):
+        """
+        Record a completed transaction
+
+        Args:
+            function_code: Modbus function code
+            count: Number of coils/registers
+            wire_time: Predicted time on the wire
+            wall_time: Measured duration of the call
+        """
+        self.transactions += 1
+        self.wire_time_total += wire_time
+        self.wall_time_total += wall_time
+        self.recent.append((function_code, count, wire_time, wall_time))
+
+    def record_failure(self):
+        """Record a transaction that did not complete"""
+        self.failures += 1
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarise recorded transactions
+
+        Returns:
+            Totals, averages and wire efficiency (wire time / wall time)
+        """
+        recent_wire = sum(sample[2] for sample in self.recent)
+        recent_wall = sum(sample[3] for sample in self.recent)
+        n = len(self.recent)
+        last = self.recent[-1] if self.recent else None
+        return {
+            'transactions': self.transactions,
+            'failures': self.failures,
+            'wire_time_total': self.wire_time_total,
+            'wall_time_total': self.wall_time_total,
+            'wire_time_avg': recent_wire / n if n else 0.0,
+            'wall_time_avg': recent_wall / n if n else 0.0,
+            'overhead_avg': (recent_wall - recent_wire) / n if n else 0.0,
+            'efficiency': recent_wire / recent_wall if recent_wall else 0.0,
+            'last': {
+                'function_code': last[0],
+                'count': last[1],
+                'wire_time': last[2],
+                'wall_time': last[3],
+            } if last else None,
+        }
@@ -0,0 +1,228 @@
+"""
+ModbusAPI Trace - Structured per-transaction records for registered sinks
+"""
+
+import os
+import logging
+import threading
+from collections import deque
+from typing import Optional, List, Dict, Any, Callable, NamedTuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Outcome of a successful transaction (failures use the retry error classes)
+OUTCOME_OK = 'ok'
+
+
+class Transaction(NamedTuple):
+    """One PDU sent on a bus (or refused before reaching it)"""
+    timestamp: float
+    port: str
+    unit: int
+    function_code: int
+    address: int
+    count: int
+    request_bytes: int
+    response_bytes: int
+    queue_wait: float
+    latency: float
+    attempt: int
+    outcome: str
+
+    @property
+    def ok(self) -> bool:
+        """True if the slave answered with a normal response"""
+        return self.outcome == OUTCOME_OK
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as a JSON-serializable dictionary"""
+        return self._asdict()
+
+    def __str__(self) -> str:
+        return (f"{self.port} unit {self.unit} fc {self.function_code} "
+                f"@{self.address}x{self.count}: {self.outcome} "
+                f"({self.request_bytes}/{self.response_bytes} B, "
+                f"wait {self.queue_wait * 1000:.1f} ms, wire {self.latency * 1000:.1f} ms"
+                f"{f', attempt {self.attempt + 1}' if self.attempt else ''})")
+
+
+Sink = Callable[[Transaction], None]
+
+
+class Tracer:
+    """
+    Dispatches transaction records to registered sinks
+
+    Clients check ``tracer.sinks`` before building a record, so with no sinks
+    registered tracing costs one attribute lookup per transaction.
+    """
+
+    def __init__(self, sinks: Optional[List[Sink]] = None):
+        """
+        Initialize tracer
+
+        Args:
+            sinks: Initial sinks (callables receiving a Transaction)
+        """
+        self.sinks: List[Sink] = list(sinks or [])
+
+    def add_sink(self, sink: Sink) -> Sink:
+        """Register a sink and return it"""
+        self.sinks = self.sinks + [sink]
+        return sink
+
+    def remove_sink(self, sink: Sink):
+        """Unregister a sink"""
+        self.sinks = [s for s in self.sinks if s is not sink]
+
+    def emit(self, record: Transaction):
+        """Pass a record to every sink; a failing sink does not affect the others"""
+        for sink in self.sinks:
+            try:
+                sink(record)
+            except Exception as e:
+                logger.debug(f"Trace sink {sink!r} failed: {e}")
+
+
+class RingBufferSink:
+    """Keeps the most recent records in memory"""
+
+    def __init__(self, size: int = 1000):
+        """
+        Initialize ring buffer
+
+        Args:
+            size: Number of records kept (default: 1000)
+        """
+        self.size = size
+        self._records = deque(maxlen=size)
+
+    def __call__(self, record: Transaction):
+        self._records.append(record)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def records(self, limit: Optional[int] = None, errors_only: bool = False) -> List[Transaction]:
+        """
+        Return buffered records, oldest first
+
+        Args:
+            limit: Return only the newest records (default: all)
+            errors_only: Return only failed transactions
+        """
+        records = list(self._records)
+        if errors_only:
+            records = [record for record in records if not record.ok]
+        return records[-limit:] if limit else records
+
+    def clear(self):
+        """Drop all buffered records"""
+        self._records.clear()
+
+
+class SamplingSink:
+    """
+    Forwards a fraction of successful records (and every failure) to a sink
+
+    Sampling is deterministic: with rate 0.1 every tenth successful record is
+    forwarded.
+    """
+
+    def __init__(self, sink: Sink, rate: float = 0.1, keep_errors: bool = True):
+        """
+        Initialize sampling sink
+
+        Args:
+            sink: Sink receiving the sampled records
+            rate: Fraction of successful records forwarded (0.0 - 1.0)
+            keep_errors: Always forward failed transactions
+        """
+        self.sink = sink
+        self.rate = rate
+        self.keep_errors = keep_errors
+        self._credit = 0.0
+
+    def __call__(self, record: Transaction):
+        if self.keep_errors and not record.ok:
+            self.sink(record)
+            return
+        self._credit += self.rate
+        if self._credit >= 1.0:
+            self._credit -= 1.0
+            self.sink(record)
+
+
+class LoggingSink:
+    """Writes records to a logger, formatting them only if the level is enabled"""
+
+    def __init__(self, log: Optional[logging.Logger] = None, level: int = logging.INFO):
+        """
+        Initialize logging sink
+
+        Args:
+            log: Logger to write to (default: this module's logger)
+            level: Level of successful transactions (failures use WARNING or higher)
+        """
+        self.log = log or logger
+        self.level = level
+
+    def __call__(self, record: Transaction):
+        level = self.level if record.ok else max(self.level, logging.WARNING)
+        if self.log.isEnabledFor(level):
+            self.log.log(level, "%s", record)
+
+
+# Time the current arbiter job spent queued, set by the bus owner thread
+_context = threading.local()
+
+
+def set_queue_wait(seconds: float):
+    """Record the queue wait of the job about to run on this thread"""
+    _context.queue_wait = seconds
+
+
+def queue_wait() -> float:
+    """Queue wait of the job running on this thread (0 outside an arbiter)"""
+    return getattr(_context, 'queue_wait', 0.0)
+
+
+_buffer: Optional[RingBufferSink] = None
+_buffer_lock = threading.Lock()
+
+
+def trace_buffer() -> Optional[RingBufferSink]:
+    """
+    Ring buffer shared by all clients, sized by MODBUS_TRACE_BUFFER
+
+    Returns:
+        RingBufferSink, or None if MODBUS_TRACE_BUFFER is 0 (the default)
+    """
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            size = int(os.getenv('MODBUS_TRACE_BUFFER', '0'))
+            if size > 0:
+                _buffer = RingBufferSink(size)
+        return _buffer
+
+
+def default_tracer(verbose: bool = False) -> Tracer:
+    """
+    Tracer for a new client
+
+    Feeds the shared trace buffer (sampled with MODBUS_TRACE_SAMPLE) when
+    enabled, and the log when verbose.
+
+    Args:
+        verbose: Log every transaction at INFO level
+    """
+    tracer = Tracer()
+    buffer = trace_buffer()
+    if buffer is not None:
+        rate = float(os.getenv('MODBUS_TRACE_SAMPLE', '1.0'))
+        tracer.add_sink(buffer if rate >= 1.0 else SamplingSink(buffer, rate))
+    if verbose:
+        tracer.add_sink(LoggingSink())
+    return tracer
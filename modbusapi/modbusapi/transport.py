@@ -0,0 +1,212 @@
+"""
+ModbusAPI Transport - Serial, Modbus TCP and RTU-over-TCP transports
+"""
+
+import socket
+import logging
+import threading
+from typing import Optional, Dict, Any, NamedTuple
+from urllib.parse import urlsplit
+
+try:
+    from pymodbus.client.serial import ModbusSerialClient, AsyncModbusSerialClient
+    from pymodbus.client.tcp import ModbusTcpClient, AsyncModbusTcpClient
+    from pymodbus.framer.rtu_framer import ModbusRtuFramer
+    from pymodbus.framer.socket_framer import ModbusSocketFramer
+except ImportError:
+    raise ImportError(
+        "pymodbus library not found! Install with: pip install pymodbus[serial]"
+    )
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Transports
+TRANSPORT_SERIAL = 'serial'
+TRANSPORT_TCP = 'tcp'
+TRANSPORT_RTU_TCP = 'rtu+tcp'
+
+# URL schemes accepted in place of a serial port path
+SCHEMES = {
+    'tcp': TRANSPORT_TCP,
+    'modbus+tcp': TRANSPORT_TCP,
+    'rtu+tcp': TRANSPORT_RTU_TCP,
+    'rtu-over-tcp': TRANSPORT_RTU_TCP,
+}
+
+DEFAULT_TCP_PORT = 502
+
+
+class Endpoint(NamedTuple):
+    """Where a bus is reached: serial port path or TCP gateway"""
+    transport: str
+    address: str
+    port: Optional[int] = None
+
+    @property
+    def is_network(self) -> bool:
+        """True for TCP gateways"""
+        return self.transport != TRANSPORT_SERIAL
+
+    def __str__(self) -> str:
+        if not self.is_network:
+            return self.address
+        return f"{self.transport}://{self.address}:{self.port}"
+
+
+def parse_endpoint(port: str) -> Endpoint:
+    """
+    Parse a port setting
+
+    Serial ports are plain paths (``/dev/ttyUSB0``, ``COM3``); gateways are URLs:
+    ``tcp://host[:502]`` for Modbus TCP and ``rtu+tcp://host:port`` for RTU
+    frames tunnelled over TCP.
+
+    Args:
+        port: Serial port path or gateway URL
+
+    Returns:
+        Endpoint
+    """
+    port = str(port)
+    if '://' not in port:
+        return Endpoint(TRANSPORT_SERIAL, port)
+    url = urlsplit(port)
+    transport = SCHEMES.get(url.scheme.lower())
+    if transport is None:
+        raise ValueError(f"Unsupported transport: {url.scheme}")
+    if not url.hostname:
+        raise ValueError(f"Missing host in {port}")
+    return Endpoint(transport, url.hostname, url.port or DEFAULT_TCP_PORT)
+
+
+def create_client(endpoint: Endpoint,
+                  baudrate: int = 9600,
+                  parity: str = 'N',
+                  stopbits: int = 1,
+                  bytesize: int = 8,
+                  timeout: float = 1.0,
+                  **kwargs) -> Any:
+    """
+    Create a synchronous pymodbus client for an endpoint
+
+    Args:
+        endpoint: Serial port or gateway
+        baudrate, parity, stopbits, bytesize: Serial line settings (serial only)
+        timeout: Response timeout in seconds
+        kwargs: Extra pymodbus client options
+
+    Returns:
+        ModbusSerialClient or ModbusTcpClient
+    """
+    if endpoint.transport == TRANSPORT_SERIAL:
+        return ModbusSerialClient(
+            method='rtu',
+            port=endpoint.address,
+            baudrate=baudrate,
+            parity=parity,
+            stopbits=stopbits,
+            bytesize=bytesize,
+            timeout=timeout,
+            **kwargs
+        )
+    framer = ModbusRtuFramer if endpoint.transport == TRANSPORT_RTU_TCP else ModbusSocketFramer
+    return ModbusTcpClient(endpoint.address, port=endpoint.port, framer=framer, timeout=timeout, **kwargs)
+
+
+def create_async_client(endpoint: Endpoint,
+                        baudrate: int = 9600,
+                        parity: str = 'N',
+                        stopbits: int = 1,
+                        bytesize: int = 8,
+                        timeout: float = 1.0) -> Any:
+    """
+    Create an asyncio pymodbus client for an endpoint
+
+    Returns:
+        AsyncModbusSerialClient or AsyncModbusTcpClient
+    """
+    if endpoint.transport == TRANSPORT_SERIAL:
+        return AsyncModbusSerialClient(
+            port=endpoint.address,
+            baudrate=baudrate,
+            parity=parity,
+            stopbits=stopbits,
+            bytesize=bytesize,
+            timeout=timeout
+        )
+    framer = ModbusRtuFramer if endpoint.transport == TRANSPORT_RTU_TCP else ModbusSocketFramer
+    return AsyncModbusTcpClient(endpoint.address, port=endpoint.port, framer=framer, timeout=timeout)
+
+
+def tune_socket(client: Any):
+    """Disable Nagle and enable keepalive on an open gateway socket"""
+    sock = getattr(client, 'socket', None)
+    if not isinstance(sock, socket.socket):
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    except OSError as e:
+        logger.debug(f"Could not tune socket: {e}")
+
+
+class GatewayPool:
+    """
+    Persistent TCP connections shared per gateway
+
+    Every client talking to the same gateway uses one pymodbus client (one
+    socket). The socket stays open while any client holds a reference and is
+    closed when the last one releases it.
+    """
+
+    def __init__(self):
+        self._clients: Dict[Endpoint, Any] = {}
+        self._refs: Dict[Endpoint, int] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, endpoint: Endpoint, timeout: float = 1.0) -> Any:
+        """
+        Return the shared client of a gateway, creating it on first use
+
+        Args:
+            endpoint: Gateway endpoint
+            timeout: Response timeout for a new client
+
+        Returns:
+            ModbusTcpClient
+        """
+        with self._lock:
+            client = self._clients.get(endpoint)
+            if client is None:
+                client = self._clients[endpoint] = create_client(endpoint, timeout=timeout)
+            self._refs[endpoint] = self._refs.get(endpoint, 0) + 1
+            return client
+
+    def release(self, endpoint: Endpoint):
+        """Drop one reference, closing the socket when none are left"""
+        with self._lock:
+            refs = self._refs.get(endpoint, 0) - 1
+            if refs > 0:
+                self._refs[endpoint] = refs
+                return
+            self._refs.pop(endpoint, None)
+            client = self._clients.pop(endpoint, None)
+        if client is not None:
+            client.close()
+            logger.info(f"Closed gateway connection {endpoint}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return open gateways with their reference counts"""
+        with self._lock:
+            return {
+                str(endpoint): {
+                    'references': self._refs.get(endpoint, 0),
+                    'open': client.is_socket_open(),
+                }
+                for endpoint, client in self._clients.items()
+            }
+
+
+# Connections shared by every client in the process
+gateways = GatewayPool()
@@ -0,0 +1,98 @@
+"""
+Tests for modbusapi.adaptive module
+"""
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.adaptive import AdaptiveTimeouts, RttHistogram
+
+
+class TestRttHistogram(unittest.TestCase):
+    """Test cases for RttHistogram class"""
+
+    def test_percentile(self):
+        """Test percentile lookup on bucketed values"""
+        histogram = RttHistogram()
+        for _ in range(99):
+            histogram.add(0.010)
+        histogram.add(0.200)
+        self.assertLess(histogram.percentile(50), 0.013)
+        self.assertGreaterEqual(histogram.percentile(100), 0.200)
+
+    def test_rolling_window(self):
+        """Test that old observations fade out"""
+        histogram = RttHistogram(window=100)
+        for _ in range(100):
+            histogram.add(0.5)
+        for _ in range(400):
+            histogram.add(0.005)
+        self.assertLess(histogram.percentile(95), 0.01)
+
+
+class TestAdaptiveTimeouts(unittest.TestCase):
+    """Test cases for AdaptiveTimeouts class"""
+
+    def make(self, path=''):
+        return AdaptiveTimeouts(percentile=99, margin=0.01, floor=0.02, ceiling=1.0,
+                                min_samples=5, path=path)
+
+    def test_default_until_learned(self):
+        """Test that the default applies until enough samples are seen"""
+        timeouts = self.make()
+        self.assertEqual(timeouts.timeout('/dev/ttyUSB0', 1, 3, default=0.3), 0.3)
+        for _ in range(5):
+            timeouts.record('/dev/ttyUSB0', 1, 3, 0.004)
+        learned = timeouts.timeout('/dev/ttyUSB0', 1, 3, wire_time=0.02, default=0.3)
+        self.assertLess(learned, 0.05)
+        # Other units and function codes are not affected
+        self.assertEqual(timeouts.timeout('/dev/ttyUSB0', 2, 3, default=0.3), 0.3)
+
+    def test_floor_and_ceiling(self):
+        """Test clamping of learned timeouts"""
+        timeouts = self.make()
+        for _ in range(5):
+            timeouts.record('p', 1, 1, 0.0)
+            timeouts.record('p', 2, 1, 5.0)
+        self.assertEqual(timeouts.timeout('p', 1, 1), 0.02)
+        self.assertEqual(timeouts.timeout('p', 2, 1), 1.0)
+
+    def test_timeouts_raise_learned_value(self):
+        """Test that timed-out transactions push the learned timeout to the ceiling"""
+        timeouts = self.make()
+        for _ in range(20):
+            timeouts.record('p', 1, 3, 0.004)
+        self.assertLess(timeouts.timeout('p', 1, 3), 0.05)
+        timeouts.record_timeout('p', 1, 3)
+        self.assertEqual(timeouts.timeout('p', 1, 3), 1.0)
+
+    def test_persistence_opt_in(self):
+        """Test that nothing is persisted unless a state file is configured"""
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('MODBUS_TIMEOUT_STATE', None)
+            timeouts = AdaptiveTimeouts()
+        self.assertEqual(timeouts.path, '')
+        self.assertFalse(timeouts.save())
+
+    def test_persistence(self):
+        """Test that learned values survive a restart"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'timeouts.json')
+            timeouts = self.make(path)
+            for _ in range(5):
+                timeouts.record('/dev/ttyUSB0', 7, 4, 0.05)
+            self.assertTrue(timeouts.save())
+
+            restored = self.make(path)
+            self.assertEqual(restored.learned('/dev/ttyUSB0', 7, 4),
+                             timeouts.learned('/dev/ttyUSB0', 7, 4))
+            self.assertEqual(restored.to_dict()['units'][0]['samples'], 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,6 +12,7 @@ import flask
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from modbusapi.api import create_rest_app, start_mqtt_broker
+from modbusapi.bitmask import BitMask
 
 
 class TestRestApi(unittest.TestCase):
@@ -27,6 +28,9 @@ class TestRestApi(unittest.TestCase):
     def test_status_endpoint(self):
         """Test /api/status endpoint"""
         self.mock_client.is_connected.return_value = True
+        self.mock_client.get_state.return_value = {
+            'state': 'connected', 'port': '/dev/ttyUSB0', 'baudrate': 9600, 'consecutive_failures': 0
+        }
         response = self.client.get('/api/status')
         self.assertEqual(response.status_code, 200)
         data = json.loads(response.data)
@@ -52,6 +56,15 @@ class TestRestApi(unittest.TestCase):
         self.assertEqual(data['count'], 3)
         self.assertEqual(data['values'], [True, False, True])
 
+    def test_read_coils_packed(self):
+        """Test /api/coils/<address>/<count> with ?format=hex and base64"""
+        self.mock_client.read_coils_mask.return_value = BitMask.from_bits([True, False, True] + [False] * 6, 0)
+        data = json.loads(self.client.get('/api/coils/0/9?format=hex').data)
+        self.assertEqual((data['count'], data['format'], data['data']), (9, 'hex', '0500'))
+        data = json.loads(self.client.get('/api/coils/0/9?format=base64').data)
+        self.assertEqual(data['data'], 'BQA=')
+        self.assertEqual(self.client.get('/api/coils/0/9?format=csv').status_code, 400)
+
     def test_write_coil_endpoint(self):
         """Test POST /api/coils/<address> endpoint"""
         self.mock_client.write_coil.return_value = True
@@ -126,14 +139,76 @@ class TestRestApi(unittest.TestCase):
         self.assertEqual(data['count'], 2)
         self.assertEqual(data['values'], [789, 101])
 
+    def test_read_points_endpoint(self):
+        """Test POST /api/read endpoint"""
+        self.mock_client.read_coils.return_value = [True]
+        self.mock_client.read_holding_registers.return_value = [123, 456]
+        response = self.client.post('/api/read',
+                                   data=json.dumps({'points': [
+                                       {'type': 'coils', 'address': 0},
+                                       {'type': 'holding_registers', 'address': 10, 'count': 2}
+                                   ]}),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['success'], True)
+        self.assertEqual(data['results'][1]['values'], [123, 456])
+
+    def test_read_holding_registers_decoded(self):
+        """Test engineering values from /api/holding_registers with ?type="""
+        self.mock_client.read_holding_registers.return_value = [0x3FC0, 0x0000, 0x4120, 0x0000]
+        response = self.client.get('/api/holding_registers/0/4?type=float32&scale=2')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['decoded'], [3.0, 20.0])
+
+        response = self.client.get('/api/holding_registers/0/4?type=float16')
+        self.assertEqual(response.status_code, 400)
+
+    @patch.dict(os.environ, {'MODBUS_PROFILE': 'waveshare-io-8ch'})
+    @patch('modbusapi.api.ModbusClient')
+    def test_device_profile_endpoints(self, mock_client_class):
+        """Test /api/device and address validation against MODBUS_PROFILE"""
+        mock_client = mock_client_class.return_value
+        client = create_rest_app(port='/dev/ttyUSB0').test_client()
+        mock_client.read_coils.return_value = [True] + [False] * 7
+        mock_client.read_discrete_inputs.return_value = [False] * 8
+        data = json.loads(client.get('/api/device').data)
+        self.assertEqual(data['values']['outputs'][0], True)
+        self.assertEqual(len(data['values']['inputs']), 8)
+
+        self.assertEqual(client.get('/api/coils/4/8').status_code, 400)
+        self.assertEqual(client.get('/api/holding_registers/0/1').status_code, 400)
+        self.assertEqual(client.post('/api/device/inputs', json={'value': [True] * 8}).status_code, 400)
+
+    def test_broadcast_endpoint(self):
+        """Test POST /api/broadcast/<address> endpoint"""
+        self.mock_client.broadcast.return_value = {'sent': True, 'verified': {1: True, 2: False}}
+        response = self.client.post('/api/broadcast/0', json={'values': [0, 0], 'verify': [1, 2]})
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertEqual(data['success'], False)
+        self.assertEqual(data['verified'], {'1': True, '2': False})
+        self.mock_client.broadcast.assert_called_with(1, 0, [0, 0], [1, 2])
+        self.assertEqual(self.client.post('/api/broadcast/0', json={'type': 'input_registers', 'value': 1})
+                         .status_code, 400)
+
     def test_scan_endpoint(self):
         """Test /api/scan endpoint"""
-        with patch('modbusapi.api.auto_detect_modbus_port') as mock_scan:
-            mock_scan.return_value = '/dev/ttyUSB0'
-            response = self.client.get('/api/scan')
+        self.mock_client.endpoint.is_network = False
+        self.mock_client.discover.return_value = {
+            'port': '/dev/ttyUSB0', 'baudrate': 19200,
+            'units': {'12': {'unit': 12, 'tables': {'coils': {'start': 0, 'count': 8}}}}
+        }
+        with patch('modbusapi.api.Inventory') as mock_inventory:
+            response = self.client.get('/api/scan?units=10-20')
             self.assertEqual(response.status_code, 200)
             data = json.loads(response.data)
-            self.assertEqual(data['port'], '/dev/ttyUSB0')
+            self.assertTrue(data['success'])
+            self.assertEqual(data['buses']['/dev/ttyUSB0']['units']['12']['tables']['coils']['count'], 8)
+            self.mock_client.discover.assert_called_with(list(range(10, 21)), True)
+            mock_inventory.return_value.update.assert_called_once()
+            self.assertEqual(self.client.get('/api/scan?units=0').status_code, 400)
 
 
 class TestMqttApi(unittest.TestCase):
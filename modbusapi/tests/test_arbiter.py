@@ -0,0 +1,118 @@
+"""
+Tests for modbusapi.arbiter module
+"""
+import threading
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.arbiter import (
+    BusArbiter, ArbitratedClient, BusBusyError,
+    LANE_WRITE, LANE_INTERACTIVE, LANE_POLL
+)
+
+
+class TestBusArbiter(unittest.TestCase):
+    """Test cases for BusArbiter class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.arbiter = BusArbiter('/dev/ttyTEST')
+        self.release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            self.release.wait()
+
+        # Occupy the worker so following transactions queue up
+        self.arbiter.submit(block, lane=LANE_POLL)
+        started.wait(1)
+
+    def tearDown(self):
+        self.release.set()
+        self.arbiter.stop(timeout=1)
+
+    def test_priority_order(self):
+        """Test that writes run before interactive reads before polling"""
+        order = []
+        futures = [
+            self.arbiter.submit(order.append, 'poll', lane=LANE_POLL),
+            self.arbiter.submit(order.append, 'read', lane=LANE_INTERACTIVE),
+            self.arbiter.submit(order.append, 'write', lane=LANE_WRITE),
+            self.arbiter.submit(order.append, 'write2', lane=LANE_WRITE),
+        ]
+        self.release.set()
+        for future in futures:
+            future.result(timeout=1)
+        self.assertEqual(order, ['write', 'write2', 'read', 'poll'])
+
+    def test_lane_depth_limit(self):
+        """Test that a full lane rejects new transactions"""
+        self.arbiter.max_depth[LANE_POLL] = 2
+        self.arbiter.submit(len, [], lane=LANE_POLL)
+        self.arbiter.submit(len, [], lane=LANE_POLL)
+        with self.assertRaises(BusBusyError):
+            self.arbiter.submit(len, [], lane=LANE_POLL)
+        # Other lanes are not affected
+        self.arbiter.submit(len, [], lane=LANE_WRITE)
+
+        stats = self.arbiter.get_stats()['lanes']
+        self.assertEqual(stats['poll']['rejected'], 1)
+        self.assertEqual(stats['poll']['depth'], 2)
+
+    def test_wait_statistics(self):
+        """Test that completed transactions record wait times"""
+        future = self.arbiter.submit(len, [1, 2], lane=LANE_INTERACTIVE)
+        self.release.set()
+        self.assertEqual(future.result(timeout=1), 2)
+        stats = self.arbiter.get_stats()['lanes']['interactive']
+        self.assertEqual(stats['completed'], 1)
+        self.assertGreater(stats['wait_max'], 0)
+
+    def test_exception_propagates(self):
+        """Test that exceptions raised by a transaction reach the caller"""
+        future = self.arbiter.submit(int, 'x')
+        self.release.set()
+        with self.assertRaises(ValueError):
+            future.result(timeout=1)
+
+
+class TestArbitratedClient(unittest.TestCase):
+    """Test cases for ArbitratedClient proxy"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.mock_client = MagicMock()
+        self.mock_client.port = '/dev/ttyPROXY'
+        self.arbiter = BusArbiter('/dev/ttyPROXY')
+        self.client = ArbitratedClient(self.mock_client, self.arbiter)
+
+    def tearDown(self):
+        self.arbiter.stop(timeout=1)
+
+    def test_calls_run_on_worker_thread(self):
+        """Test that bus calls are executed by the arbiter thread"""
+        threads = []
+        self.mock_client.read_coils.side_effect = lambda *args: threads.append(
+            threading.current_thread().name) or [True]
+        self.assertEqual(self.client.read_coils(0, 1, 1), [True])
+        self.assertEqual(threads, ['modbus-arbiter-/dev/ttyPROXY'])
+
+    def test_attribute_passthrough(self):
+        """Test that non-bus attributes come from the wrapped client"""
+        self.assertEqual(self.client.port, '/dev/ttyPROXY')
+
+    def test_busy_lane_returns_failure(self):
+        """Test that a rejected write reports failure like a bus error"""
+        self.arbiter.max_depth[LANE_WRITE] = 0
+        self.assertFalse(self.client.write_coil(0, True, 1))
+        self.mock_client.write_coil.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+"""
+Tests for modbusapi.async_client module
+"""
+import asyncio
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+import os
+import sys
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.async_client import AsyncModbusClient
+from modbusapi.planner import ReadRequest, READ_COILS
+
+
+def make_response(**attributes):
+    """Create a successful pymodbus-like response"""
+    response = MagicMock(**attributes)
+    response.isError.return_value = False
+    return response
+
+
+class TestAsyncModbusClient(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncModbusClient class"""
+
+    async def asyncSetUp(self):
+        """Set up test fixtures"""
+        patcher = patch('modbusapi.async_client.AsyncModbusSerialClient')
+        self.mock_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_serial = self.mock_class.return_value
+        self.mock_serial.connected = True
+        self.mock_serial.connect = AsyncMock()
+        self.mock_serial.close = AsyncMock()
+        self.client = AsyncModbusClient(port='/dev/ttyUSB0', baudrate=9600)
+        self.assertTrue(await self.client.connect())
+
+    async def asyncTearDown(self):
+        await self.client.disconnect()
+
+    async def test_read_coils(self):
+        """Test read_coils method"""
+        self.mock_serial.read_coils = AsyncMock(return_value=make_response(bits=[True, False, True, False]))
+        result = await self.client.read_coils(0, 3, 2)
+        self.assertEqual(result, [True, False, True])
+        self.mock_serial.read_coils.assert_called_with(0, 3, slave=2)
+
+    async def test_write_register_error(self):
+        """Test write_register method with error response"""
+        response = MagicMock()
+        response.isError.return_value = True
+        self.mock_serial.write_register = AsyncMock(return_value=response)
+        self.assertFalse(await self.client.write_register(0, 123))
+
+    async def test_transactions_are_serialised(self):
+        """Test that concurrent callers never overlap on the port"""
+        active = []
+        overlaps = []
+
+        async def read_holding_registers(address, count, slave):
+            if active:
+                overlaps.append(address)
+            active.append(address)
+            await asyncio.sleep(0.01)
+            active.remove(address)
+            return make_response(registers=[address] * count)
+
+        self.mock_serial.read_holding_registers = read_holding_registers
+        results = await asyncio.gather(*[
+            self.client.read_holding_registers(address, 1) for address in range(5)
+        ])
+        self.assertEqual(results, [[0], [1], [2], [3], [4]])
+        self.assertEqual(overlaps, [])
+
+    async def test_timeout_returns_none(self):
+        """Test that a transaction exceeding the timeout fails cleanly"""
+        self.client.timeout = 0.01
+
+        async def read_input_registers(address, count, slave):
+            await asyncio.sleep(1)
+
+        self.mock_serial.read_input_registers = read_input_registers
+        self.assertIsNone(await self.client.read_input_registers(0, 1))
+
+    async def test_read_many(self):
+        """Test coalesced reads"""
+        self.mock_serial.read_coils = AsyncMock(return_value=make_response(bits=[True, False, False, True]))
+        results = await self.client.read_many([
+            ReadRequest(READ_COILS, 0, 1), ReadRequest(READ_COILS, 3, 1)
+        ])
+        self.assertEqual(results, [[True], [True]])
+        self.assertEqual(self.mock_serial.read_coils.call_count, 1)
+
+    async def test_port_shared_between_clients(self):
+        """Test that clients of one port share one connection, closed by the last to leave"""
+        other = AsyncModbusClient(port='/dev/ttyUSB0', baudrate=9600)
+        self.assertTrue(await other.connect())
+        self.assertIs(other.client, self.client.client)
+        self.assertEqual(self.mock_class.call_count, 1)
+
+        await other.disconnect()
+        self.mock_serial.close.assert_not_called()
+        self.mock_serial.read_coils = AsyncMock(return_value=make_response(bits=[True]))
+        self.assertEqual(await self.client.read_coils(0, 1), [True])
+
+        await self.client.disconnect()
+        self.mock_serial.close.assert_awaited_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
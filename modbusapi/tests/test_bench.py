@@ -0,0 +1,69 @@
+"""
+Tests for modbusapi.bench module
+"""
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.bench import run_workload, run_benchmarks, run_framing, compare, format_report, WORKLOADS
+from modbusapi.timing import RtuTiming
+
+
+class TestBench(unittest.TestCase):
+    """Test cases for benchmark workloads and reports"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.client = MagicMock()
+        self.client.port = '/dev/ttyUSB0'
+        self.client.baudrate = 9600
+        self.client.timing = RtuTiming(9600)
+        self.client.read_holding_registers.return_value = [42] * 10
+        self.client.read_coils.return_value = [True] * 8
+        self.client.write_register.return_value = True
+        self.client.write_coil.return_value = True
+
+    def test_mixed_writes_back_read_values(self):
+        """Test that the mixed workload only writes values it just read"""
+        result = run_workload(self.client, 'mixed', transactions=8, warmup=0)
+        self.assertEqual((result['transactions'], result['errors']), (8, 0))
+        self.assertEqual(self.client.write_register.call_count, 2)
+        self.client.write_register.assert_called_with(0, 42, 1)
+        self.client.write_coil.assert_called_with(0, True, 1)
+
+    def test_round_robin_and_errors(self):
+        """Test that round robin cycles through the units and counts failures"""
+        self.client.read_holding_registers.side_effect = lambda address, count, unit: None if unit == 3 else [0] * count
+        result = run_workload(self.client, 'round_robin', transactions=6, units=(1, 2, 3), warmup=0)
+        units = [call.args[2] for call in self.client.read_holding_registers.call_args_list]
+        self.assertEqual(units, [1, 2, 3, 1, 2, 3])
+        self.assertEqual(result['errors'], 2)
+        self.assertGreater(result['wire_utilisation'], 0)
+        self.assertLessEqual(result['latency_ms']['p50'], result['latency_ms']['p99'])
+
+    def test_compare_with_baseline(self):
+        """Test regression detection against a stored report"""
+        report = run_benchmarks(self.client, ['single_coil'], transactions=5)
+        self.assertIn('single_coil', format_report(report))
+        self.assertEqual(compare(report, report), [])
+        baseline = {'results': {'single_coil': dict(report['results']['single_coil'],
+                                                    tps=report['results']['single_coil']['tps'] * 2)}}
+        self.assertEqual(len(compare(report, baseline)), 1)
+        with self.assertRaises(ValueError):
+            run_workload(self.client, 'unknown')
+        self.assertEqual(set(WORKLOADS), {'single_coil', 'block_read', 'mixed', 'round_robin'})
+
+
+    def test_framing(self):
+        """Test that both framing paths are measured"""
+        result = run_framing(iterations=20, count=10)
+        self.assertGreater(result['sans_io_us'], 0)
+        self.assertGreater(result['pymodbus_us'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
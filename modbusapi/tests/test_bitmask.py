@@ -0,0 +1,62 @@
+"""
+Tests for modbusapi.bitmask module
+"""
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.bitmask import BitMask, FORMAT_BASE64
+from modbusapi.client import ModbusClient
+
+
+class TestBitMask(unittest.TestCase):
+    """Test cases for BitMask class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.bits = [True, False, True, True, False, False, False, False, True, False]
+        self.mask = BitMask.from_bits(self.bits, address=100)
+
+    def test_packing_matches_modbus(self):
+        """Test that bytes use the Modbus order (LSB of first byte first)"""
+        self.assertEqual(self.mask.to_bytes(), b'\x0d\x01')
+        self.assertEqual(self.mask.hex(), '0d01')
+        self.assertEqual(BitMask.from_bytes(b'\x0d\x01', 10, 100), self.mask)
+        self.assertEqual(BitMask.decode(self.mask.base64(), 10, 100, FORMAT_BASE64), self.mask)
+
+    def test_access_and_slicing(self):
+        """Test per-bit access, absolute addresses and slices"""
+        self.assertEqual(list(self.mask), self.bits)
+        self.assertTrue(self.mask[-2])
+        self.assertTrue(self.mask.get(108))
+        part = self.mask[2:5]
+        self.assertEqual((part.address, part.to_list()), (102, [True, True, False]))
+        self.assertEqual(self.mask[::2], self.bits[::2])
+        with self.assertRaises(IndexError):
+            self.mask[10]
+
+    def test_change_detection(self):
+        """Test XOR change detection between two reads"""
+        current = self.mask.set(0, False).set(9, True)
+        self.assertEqual(current.changed_addresses(self.mask), [100, 109])
+        self.assertEqual(current.changes(self.mask).popcount(), 2)
+        with self.assertRaises(ValueError):
+            current.changes(self.mask[1:])
+
+    def test_client_read(self):
+        """Test ModbusClient.read_coils_mask builds a mask from the response"""
+        client = ModbusClient(port='/dev/null')
+        result = MagicMock()
+        result.bits = self.bits + [False] * 6
+        client._execute = MagicMock(return_value=result)
+        self.assertEqual(client.read_coils_mask(100, 10, 1), self.mask)
+        client._execute.return_value = None
+        self.assertIsNone(client.read_discrete_inputs_mask(100, 10, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
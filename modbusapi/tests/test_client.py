@@ -9,7 +9,10 @@ import sys
 # Add parent directory to path to import modbusapi
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from modbusapi.client import ModbusClient, auto_detect_modbus_port
+from modbusapi.client import (
+    ModbusClient, auto_detect_modbus_port,
+    STATE_CLOSED, STATE_CONNECTED, STATE_DEGRADED, STATE_RECONNECTING
+)
 
 
 class TestModbusClient(unittest.TestCase):
@@ -214,5 +217,92 @@ class TestModbusClient(unittest.TestCase):
         self.assertIsNone(port)
 
 
+class TestConnectionLifecycle(unittest.TestCase):
+    """Test cases for ModbusClient connection state machine"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        patcher = patch('modbusapi.client.ModbusSerialClient')
+        self.mock_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_serial = self.mock_class.return_value
+        self.mock_serial.connect.return_value = True
+        self.mock_serial.is_socket_open.return_value = True
+        self.client = ModbusClient(port='/dev/ttyUSB0')
+        self.client.max_failures = 2
+
+    def test_port_opened_once(self):
+        """Test that the port is kept open across requests"""
+        self.assertEqual(self.client.state, STATE_CLOSED)
+        response = MagicMock()
+        response.isError.return_value = False
+        response.bits = [True]
+        self.mock_serial.read_coils.return_value = response
+
+        for _ in range(3):
+            self.client.read_coils(0, 1)
+
+        self.assertEqual(self.mock_class.call_count, 1)
+        self.assertEqual(self.mock_serial.connect.call_count, 1)
+        self.assertEqual(self.client.state, STATE_CONNECTED)
+        self.assertTrue(self.client.is_connected())
+
+    def test_degrade_and_reconnect(self):
+        """Test degraded state, reconnect backoff and recovery"""
+        self.client.connect()
+        self.mock_serial.read_coils.side_effect = OSError("I/O error")
+
+        self.assertIsNone(self.client.read_coils(0, 1))
+        self.assertEqual(self.client.state, STATE_DEGRADED)
+        self.assertIsNone(self.client.read_coils(0, 1))
+        self.assertEqual(self.client.state, STATE_RECONNECTING)
+        self.mock_serial.close.assert_called()
+
+        # No reconnect attempt while backing off
+        self.mock_serial.is_socket_open.return_value = False
+        self.assertIsNone(self.client.read_coils(0, 1))
+        self.assertEqual(self.mock_serial.connect.call_count, 1)
+
+        # Reconnects lazily once the backoff delay has passed
+        self.client._next_attempt = 0
+        self.mock_serial.read_coils.side_effect = None
+        response = MagicMock()
+        response.isError.return_value = False
+        response.bits = [False]
+        self.mock_serial.read_coils.return_value = response
+        self.assertEqual(self.client.read_coils(0, 1), [False])
+        self.assertEqual(self.client.state, STATE_CONNECTED)
+        self.assertEqual(self.client.get_state()['consecutive_failures'], 0)
+
+    def test_broadcast(self):
+        """Test that broadcasts go to unit 0 without retries and hold back the next request"""
+        self.mock_serial.write_coils.return_value = b"Broadcast write sent - no response expected"
+        response = MagicMock()
+        response.isError.return_value = False
+        response.bits = [False, False]
+        self.mock_serial.read_coils.return_value = response
+        self.client.timing.broadcast_delay = 0.05
+
+        result = self.client.broadcast('coils', 0, [0, 0], verify_units=[3])
+        self.assertEqual(result, {'sent': True, 'verified': {3: True}})
+        self.mock_serial.write_coils.assert_called_once_with(0, [False, False], unit=0)
+        self.assertFalse(self.mock_serial.params.broadcast_enable)
+        self.assertGreater(self.client._quiet_until, 0)
+        with self.assertRaises(ValueError):
+            self.client.broadcast('input_registers', 0, 1)
+
+        self.mock_serial.write_register.side_effect = OSError("I/O error")
+        self.assertEqual(self.client.broadcast(6, 0, 1), {'sent': False, 'verified': {}})
+        self.assertEqual(self.mock_serial.write_register.call_count, 1)
+        self.assertIsNone(self.client.read_coils(0, 1, unit=0))
+
+    def test_disconnect(self):
+        """Test that disconnect closes the client"""
+        self.client.connect()
+        self.client.disconnect()
+        self.assertEqual(self.client.state, STATE_CLOSED)
+        self.assertFalse(self.client.is_connected())
+
+
 if __name__ == '__main__':
     unittest.main()
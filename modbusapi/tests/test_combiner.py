@@ -0,0 +1,117 @@
+"""
+Tests for modbusapi.combiner module
+"""
+import os
+import sys
+import time
+import asyncio
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.combiner import (
+    plan_writes, WriteRequest, WriteCombiner, AsyncWriteCombiner, KIND_COIL, KIND_REGISTER
+)
+
+
+def coil(address, value=True, unit=1):
+    """Build a coil write"""
+    return WriteRequest(KIND_COIL, address, value, unit)
+
+
+class TestPlanWrites(unittest.TestCase):
+    """Test cases for plan_writes function"""
+
+    def test_contiguous_writes_merged(self):
+        """Test that eight coil writes become one block"""
+        blocks = plan_writes([coil(i, i % 2 == 0) for i in reversed(range(8))])
+        self.assertEqual(len(blocks), 1)
+        self.assertEqual((blocks[0].method, blocks[0].address), ('write_coils', 0))
+        self.assertEqual(blocks[0].values, [True, False] * 4)
+
+    def test_gap_filled_from_known_state(self):
+        """Test that gaps are bridged only with known values"""
+        known = {(KIND_REGISTER, 1, 11): 7}
+        writes = [WriteRequest(KIND_REGISTER, 10, 1), WriteRequest(KIND_REGISTER, 12, 3)]
+        blocks = plan_writes(writes, lambda *key: known.get(key), max_gap=4)
+        self.assertEqual([(b.address, b.values) for b in blocks], [(10, [1, 7, 3])])
+        blocks = plan_writes(writes, lambda *key: None, max_gap=4)
+        self.assertEqual([b.method for b in blocks], ['write_register', 'write_register'])
+
+    def test_repeated_point_keeps_order(self):
+        """Test that a second write to the same point goes in a later transaction"""
+        blocks = plan_writes([coil(0, True), coil(1), coil(0, False), coil(0, unit=2)])
+        self.assertEqual([(b.unit, b.address, b.values) for b in blocks],
+                         [(1, 0, [True, True]), (1, 0, [False]), (2, 0, [True])])
+
+
+class TestWriteCombiner(unittest.TestCase):
+    """Test cases for WriteCombiner class"""
+
+    def test_write_many_reports_each_outcome(self):
+        """Test one transaction per block and an outcome per write"""
+        client = MagicMock()
+        client.write_coils.return_value = True
+        client.write_register.return_value = False
+        combiner = WriteCombiner(client, window=1.0)
+        results = combiner.write_many([coil(0), coil(1), WriteRequest(KIND_REGISTER, 5, 9), coil(2)])
+        self.assertEqual(results, [True, True, False, True])
+        client.write_coils.assert_called_once_with(0, [True, True, True], 1)
+        self.assertEqual(combiner.get_stats()['saved'], 2)
+        self.assertTrue(combiner.known_value(KIND_COIL, 1, 2))
+
+    def test_old_values_do_not_bridge_gaps(self):
+        """Test that values older than max_age are not written back into gaps"""
+        client = MagicMock()
+        combiner = WriteCombiner(client, window=1.0, max_gap=4, max_age=0.05)
+        combiner.observe(KIND_REGISTER, 11, [7])
+        self.assertEqual(combiner.known_value(KIND_REGISTER, 1, 11), 7)
+        time.sleep(0.1)
+        self.assertIsNone(combiner.known_value(KIND_REGISTER, 1, 11))
+        combiner.write_many([WriteRequest(KIND_REGISTER, 10, 1), WriteRequest(KIND_REGISTER, 12, 3)])
+        client.write_registers.assert_not_called()
+        self.assertEqual(client.write_register.call_count, 2)
+
+    def test_cancelled_write(self):
+        """Test that a cancelled write does not break the flush of the others"""
+        client = MagicMock()
+        client.write_coils.return_value = True
+        combiner = WriteCombiner(client, window=1.0)
+        first = combiner.submit_coil(0, True, 1)
+        second = combiner.submit_coil(1, True, 1)
+        self.assertTrue(first.cancel())
+        combiner.flush()
+        self.assertTrue(second.result(timeout=1))
+        client.write_coils.assert_called_once_with(0, [True, True], 1)
+
+    def test_window_combines_concurrent_writes(self):
+        """Test that writes submitted within the window share a transaction"""
+        client = MagicMock()
+        client.write_coils.return_value = True
+        combiner = WriteCombiner(client, window=0.05)
+        futures = [combiner.submit_coil(i, True, 1) for i in range(3)]
+        self.assertEqual([f.result(timeout=1) for f in futures], [True] * 3)
+        client.write_coils.assert_called_once_with(0, [True] * 3, 1)
+        client.write_coil.assert_not_called()
+
+
+class TestAsyncWriteCombiner(unittest.TestCase):
+    """Test cases for AsyncWriteCombiner class"""
+
+    def test_concurrent_writes(self):
+        """Test that concurrent coroutine writes are combined"""
+        client = MagicMock()
+        client.write_coils = AsyncMock(return_value=True)
+
+        async def run():
+            combiner = AsyncWriteCombiner(client, window=0.01)
+            return await asyncio.gather(*(combiner.write_coil(i, False, 3) for i in range(4)))
+
+        self.assertEqual(asyncio.run(run()), [True] * 4)
+        client.write_coils.assert_awaited_once_with(0, [False] * 4, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for modbusapi.decoder module
+"""
+import os
+import sys
+import json
+import struct
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.decoder import Field, RegisterMap, decode_array, load_register_maps, BIG, LITTLE
+from modbusapi.planner import READ_INPUT_REGISTERS
+
+
+def registers(fmt, *values):
+    """Pack values big-endian and split them into registers"""
+    data = struct.pack(fmt, *values)
+    return list(struct.unpack(f'>{len(data) // 2}H', data))
+
+
+class TestField(unittest.TestCase):
+    """Test cases for Field class"""
+
+    def test_byte_and_word_orders(self):
+        """Test that encode and decode agree for all four orders"""
+        expected = {
+            (BIG, BIG): [0x0102, 0x0304],
+            (BIG, LITTLE): [0x0304, 0x0102],
+            (LITTLE, BIG): [0x0201, 0x0403],
+            (LITTLE, LITTLE): [0x0403, 0x0201],
+        }
+        for (byte_order, word_order), regs in expected.items():
+            field = Field('x', 0, 'uint32', byte_order=byte_order, word_order=word_order)
+            self.assertEqual(field.encode(0x01020304), regs)
+            self.assertEqual(RegisterMap([field]).decode(regs), {'x': 0x01020304})
+
+    def test_scaled_encode(self):
+        """Test that scale and offset are undone when encoding"""
+        field = Field('t', 0, 'int16', scale=0.1, offset=-40)
+        self.assertEqual(field.encode(-20.0), [200])
+
+    def test_invalid_type(self):
+        """Test that unknown types are rejected"""
+        with self.assertRaises(ValueError):
+            Field('x', 0, 'float16')
+
+
+class TestRegisterMap(unittest.TestCase):
+    """Test cases for RegisterMap class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.map = RegisterMap([
+            Field('voltage', 0, 'float32', units='V'),
+            Field('energy', 2, 'uint64', word_order=LITTLE),
+            Field('alarm', 6, 'bits', bit=3),
+            Field('mode', 6, 'bits', bit=8, width=4),
+            Field('serial', 7, 'string', length=2),
+            Field('temperature', 10, 'int16', scale=0.1),
+        ], function_code=READ_INPUT_REGISTERS, unit=4, name='meter')
+        energy = registers('>Q', 123456789)
+        self.block = (registers('>f', 230.5) + energy[::-1] + [0x0A08]
+                      + registers('>4s', b'AB\x00\x00') + [0] + [0xFFF6])
+
+    def test_span(self):
+        """Test block address and size"""
+        self.assertEqual((self.map.address, self.map.count), (0, 11))
+
+    def test_decode(self):
+        """Test decoding of mixed fields in one block"""
+        self.assertEqual(self.map.decode(self.block), {
+            'voltage': 230.5,
+            'energy': 123456789,
+            'alarm': True,
+            'mode': 10,
+            'serial': 'AB',
+            'temperature': -1.0,
+        })
+
+    def test_read(self):
+        """Test reading the block from a client with one transaction"""
+        client = MagicMock()
+        client.read_input_registers.return_value = self.block
+        values = self.map.read(client)
+        client.read_input_registers.assert_called_once_with(0, 11, 4)
+        self.assertEqual(values['voltage'], 230.5)
+
+        client.read_input_registers.return_value = None
+        self.assertIsNone(self.map.read(client))
+
+    def test_round_trip_through_file(self):
+        """Test saving and loading map definitions"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'maps.json')
+            with open(path, 'w') as f:
+                json.dump([self.map.to_dict()], f)
+            maps = load_register_maps(path)
+        self.assertEqual(list(maps), ['meter'])
+        self.assertEqual(maps['meter'].decode(self.block), self.map.decode(self.block))
+
+
+class TestDecodeArray(unittest.TestCase):
+    """Test cases for decode_array function"""
+
+    def test_float_array(self):
+        """Test decoding consecutive word-swapped floats with scaling"""
+        regs = []
+        for value in (1.5, -2.0, 10.0):
+            high, low = registers('>f', value)
+            regs += [low, high]
+        self.assertEqual(decode_array(regs, 'float32', word_order=LITTLE, scale=2), [3.0, -4.0, 20.0])
+
+    def test_partial_value_ignored(self):
+        """Test that trailing registers not forming a value are dropped"""
+        self.assertEqual(decode_array([0xFFFF, 1, 2], 'int32'), [-65535])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for modbusapi.detect module
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.detect import (
+    detect_modbus_devices, probe_port, auto_detect_modbus_device, auto_detect_modbus_port,
+    DetectedDevice, DetectionCache
+)
+from modbusapi.simulator import RtuSimulator, SlaveDevice
+
+
+@unittest.skipUnless(hasattr(os, 'openpty'), 'pseudo-terminals not available')
+class TestDetect(unittest.TestCase):
+    """Test cases for concurrent port detection against simulators"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.first = RtuSimulator([SlaveDevice(1), SlaveDevice(3)], baudrate=115200)
+        self.second = RtuSimulator([SlaveDevice(2)], baudrate=115200)
+        self.ports = ['/nonexistent/ttyUSB9', self.first.start(), self.second.start()]
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, 'detect.json')
+        self.cache_patch = patch('modbusapi.detect._cache', DetectionCache(self.cache_path))
+        self.cache_patch.start()
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.cache_patch.stop()
+        self.temp_dir.cleanup()
+        self.first.close()
+        self.second.close()
+
+    def test_probe_port(self):
+        """Test that a probe reports line settings and every answering unit"""
+        self.assertEqual(probe_port(self.ports[1], [115200]),
+                         DetectedDevice(self.ports[1], 115200, 'N', [1, 3]))
+        self.assertIsNone(probe_port(self.ports[0], [115200]))
+
+    def test_detect_all(self):
+        """Test that all ports are probed and reported in port order"""
+        devices = detect_modbus_devices(self.ports, [115200], first=False, budget=5)
+        self.assertEqual([(device.port, device.units) for device in devices],
+                         [(self.ports[1], [1, 3]), (self.ports[2], [2])])
+        self.assertEqual(devices[1].to_dict()['baudrate'], 115200)
+
+    def test_budget(self):
+        """Test that detection gives up when the time budget is spent"""
+        start = time.monotonic()
+        devices = detect_modbus_devices(self.ports, [115200], units=range(4, 40), first=False, budget=0.3)
+        self.assertEqual(devices, [])
+        self.assertLess(time.monotonic() - start, 1.0)
+
+    def test_cache(self):
+        """Test that cached settings are confirmed with one request instead of a scan"""
+        self.assertEqual(detect_modbus_devices(self.ports[1:], [115200])[0].units, [1, 3])
+        with open(self.cache_path) as f:
+            self.assertEqual(json.load(f)['devices'][self.ports[1]]['units'], [1, 3])
+
+        requests = self.first.stats['requests']
+        cache = DetectionCache(self.cache_path)
+        devices = detect_modbus_devices(self.ports[1:], [9600, 115200], cache=cache)
+        self.assertEqual(devices, [DetectedDevice(self.ports[1], 115200, 'N', [1, 3])])
+        self.assertEqual(self.first.stats['requests'] - requests, 1)
+
+        # Settings that stop answering are dropped and the ports are scanned again
+        self.first.stop()
+        self.assertEqual(detect_modbus_devices(self.ports[1:], [115200], cache=cache)[0].port, self.ports[2])
+        self.assertEqual(list(cache.entries), [self.ports[2]])
+
+
+class TestAutoDetect(unittest.TestCase):
+    """Test cases for auto-detection helpers"""
+
+    @patch('modbusapi.detect.detect_modbus_devices')
+    def test_line_settings_kept(self, mock_detect):
+        """Test that the detected baud rate and parity are returned with the port"""
+        device = DetectedDevice('/dev/ttyUSB1', 19200, 'E', [1])
+        mock_detect.return_value = [device]
+        self.assertEqual(auto_detect_modbus_device(), device)
+        self.assertEqual(auto_detect_modbus_port(), '/dev/ttyUSB1')
+        mock_detect.return_value = []
+        self.assertIsNone(auto_detect_modbus_device())
+
+
+if __name__ == '__main__':
+    unittest.main()
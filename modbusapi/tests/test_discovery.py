@@ -0,0 +1,87 @@
+"""
+Tests for modbusapi.discovery module
+"""
+import os
+import sys
+import tempfile
+import unittest
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.client import ModbusClient
+from modbusapi.discovery import discover_bus, discover_buses, Inventory
+from modbusapi.simulator import RtuSimulator, SlaveDevice
+
+
+@unittest.skipUnless(hasattr(os, 'openpty'), 'pseudo-terminals not available')
+class TestDiscovery(unittest.TestCase):
+    """Test cases for unit sweeps against simulators"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.simulator = RtuSimulator([
+            SlaveDevice(12, coils=8, discrete_inputs=0, holding_registers=20, input_registers=0),
+            SlaveDevice(30, coils=0, discrete_inputs=16, holding_registers=300, input_registers=0),
+        ], baudrate=115200)
+        self.port = self.simulator.start()
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.simulator.close()
+
+    def test_sweep(self):
+        """Test that units above 3 are found with the address ranges they answer"""
+        record = discover_bus(self.port, 115200, units=range(1, 41), silence_abort=0)
+        self.assertEqual(sorted(record['units']), ['12', '30'])
+        self.assertEqual(record['units']['12']['tables'],
+                         {'coils': {'start': 0, 'count': 8}, 'holding_registers': {'start': 0, 'count': 20}})
+        self.assertEqual(record['units']['30']['tables'],
+                         {'discrete_inputs': {'start': 0, 'count': 16},
+                          'holding_registers': {'start': 0, 'count': 300}})
+        self.assertFalse(record['aborted'])
+        self.assertIsNone(record['error'])
+
+    def test_high_units(self):
+        """Test that units above the silence limit are found with the default settings"""
+        with RtuSimulator([SlaveDevice(40), SlaveDevice(100)], baudrate=115200) as simulator:
+            record = discover_bus(simulator.start(), 115200, map_ranges=False)
+        self.assertEqual(sorted(record['units'], key=int), ['40', '100'])
+        self.assertFalse(record['aborted'])
+        self.assertEqual(record['probes'], 247)
+
+    def test_silence_abort(self):
+        """Test that the sweep ends after enough silent units in a row after a responder"""
+        record = discover_bus(self.port, 115200, map_ranges=False, silence_abort=20)
+        self.assertEqual(sorted(record['units']), ['12', '30'])
+        self.assertTrue(record['aborted'])
+        self.assertEqual(record['probes'], 50)
+
+    def test_parallel_buses_and_inventory(self):
+        """Test that buses are swept together and the inventory is persisted per port"""
+        with RtuSimulator([SlaveDevice(5)], baudrate=115200) as other:
+            records = discover_buses([(self.port, 115200, 'N'), {'port': other.start(), 'baudrate': 115200},
+                                      ('/nonexistent/ttyUSB9', 9600, 'N')],
+                                     units=range(1, 16), map_ranges=False)
+        self.assertEqual([sorted(record['units']) for record in records], [['12'], ['5'], []])
+        self.assertIsNotNone(records[2]['error'])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'inventory.json')
+            Inventory(path).update(records)
+            inventory = Inventory(path).to_dict()
+            self.assertEqual(inventory[self.port]['units']['12']['unit'], 12)
+            self.assertEqual(len(inventory), 3)
+
+    def test_client_discover(self):
+        """Test that a connected client sweeps its own bus and stays usable"""
+        client = ModbusClient(port=self.port, baudrate=115200, timeout=0.2)
+        self.assertTrue(client.connect())
+        record = client.discover(range(10, 14), map_ranges=False)
+        self.assertEqual(list(record['units']), ['12'])
+        self.assertEqual(client.read_coils(0, 2, 12), [False, False])
+        client.disconnect()
+
+
+if __name__ == '__main__':
+    unittest.main()
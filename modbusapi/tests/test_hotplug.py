@@ -0,0 +1,108 @@
+"""
+Tests for modbusapi.hotplug module
+"""
+import os
+import sys
+import time
+import tempfile
+import unittest
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.client import ModbusClient
+from modbusapi.arbiter import arbitrate, get_arbiter
+from modbusapi.detect import detect_modbus_devices, DetectionCache
+from modbusapi.hotplug import HotplugWatcher
+from modbusapi.image import get_image
+from modbusapi.pool import ModbusClientPool
+from modbusapi.simulator import RtuSimulator, SlaveDevice
+
+
+@unittest.skipUnless(hasattr(os, 'openpty'), 'pseudo-terminals not available')
+class TestHotplugWatcher(unittest.TestCase):
+    """Test cases for HotplugWatcher class, with symlinks to simulators as adapter nodes"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.old = RtuSimulator([SlaveDevice(1, holding_registers=[1])], baudrate=115200)
+        self.new = RtuSimulator([SlaveDevice(1, holding_registers=[2])], baudrate=115200)
+        self.node = os.path.join(self.temp_dir.name, 'ttyUSB0')
+        os.symlink(self.old.start(), self.node)
+        self.new.start()
+        self.watcher = HotplugWatcher(self.temp_dir.name, settle=0, interval=0.1, probe=self.probe)
+        self.probed = []
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.watcher.stop()
+        self.old.close()
+        self.new.close()
+        self.temp_dir.cleanup()
+
+    def probe(self, ports):
+        """Probe only the simulators' baud rate, without the detection cache"""
+        self.probed.append(ports)
+        return detect_modbus_devices(ports, [115200], first=False, cache=DetectionCache(''))
+
+    def test_rebind(self):
+        """Test that a client follows its adapter to the new node and others are untouched"""
+        pool = ModbusClientPool(timeout=0.2)
+        pool.add_bus(self.node, 115200)
+        client = pool.get(self.node)
+        image = client.image
+        other = ModbusClient(port=self.old.port, baudrate=115200, timeout=0.2)
+        self.watcher.watch(client)
+        self.watcher.watch(other)
+        self.assertEqual(client.read_holding_registers(0, 1, 1), [1])
+
+        # Re-enumeration: ttyUSB0 disappears, ttyUSB1 appears
+        os.unlink(self.node)
+        new_node = os.path.join(self.temp_dir.name, 'ttyUSB1')
+        os.symlink(self.new.port, new_node)
+        change = self.watcher.check()
+        self.assertEqual(change['removed'], [self.node])
+        self.assertEqual(change['rebound'], {self.node: new_node})
+        self.assertEqual(self.probed, [[new_node]])
+        self.assertEqual(client.port, new_node)
+        self.assertEqual(client.read_holding_registers(0, 1, 1), [2])
+        self.assertEqual(other.port, self.old.port)
+
+        # The bus registries follow the client to the new port
+        self.assertIs(pool.get(new_node), client)
+        self.assertIsNone(pool.get(self.node))
+        self.assertEqual(pool.names(), [new_node])
+        self.assertIs(get_arbiter(new_node), client.arbiter)
+        self.assertIs(get_image(new_node), image)
+        self.assertIs(arbitrate(ModbusClient(port=new_node)).arbiter, client.arbiter)
+        client.disconnect()
+
+    def test_no_rebind_to_other_bus(self):
+        """Test that a client whose unit answers on no new node stays closed"""
+        client = arbitrate(ModbusClient(port=self.node, baudrate=115200, timeout=0.2))
+        client.unit_id = 9
+        self.watcher.watch(client)
+        os.unlink(self.node)
+        os.symlink(self.new.port, os.path.join(self.temp_dir.name, 'ttyUSB1'))
+        change = self.watcher.check()
+        self.assertEqual(change['rebound'], {})
+        self.assertEqual(client.port, self.node)
+        self.assertFalse(client.is_connected())
+
+    def test_background_watch(self):
+        """Test that new nodes are noticed by the background thread"""
+        self.watcher.start()
+        os.symlink(self.new.port, os.path.join(self.temp_dir.name, 'ttyACM0'))
+        os.symlink(self.new.port, os.path.join(self.temp_dir.name, 'console'))
+        deadline = time.monotonic() + 3
+        while not self.watcher.events and time.monotonic() < deadline:
+            time.sleep(0.05)
+        stats = self.watcher.get_stats()
+        self.assertTrue(stats['running'])
+        self.assertEqual(stats['events'][0]['added'], [os.path.join(self.temp_dir.name, 'ttyACM0')])
+        self.assertEqual(len(stats['nodes']), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
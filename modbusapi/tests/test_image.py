@@ -0,0 +1,94 @@
+"""
+Tests for modbusapi.image module
+"""
+import os
+import sys
+import time
+import unittest
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymodbus.exceptions import ModbusIOException
+
+from modbusapi.client import ModbusClient
+from modbusapi.image import ProcessImage, QUALITY_GOOD, QUALITY_STALE, QUALITY_COMM_FAILED
+from modbusapi.planner import READ_COILS, READ_HOLDING_REGISTERS
+from modbusapi.timing import WRITE_SINGLE_COIL, WRITE_MULTIPLE_REGISTERS
+
+
+class TestProcessImage(unittest.TestCase):
+    """Test cases for ProcessImage class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.image = ProcessImage(stale_after=5.0)
+
+    def test_reads_and_writes_update_tables(self):
+        """Test that writes land in the table their reads come from"""
+        self.image.update(READ_COILS, 0, [True, False, True], unit=2)
+        self.image.update(WRITE_SINGLE_COIL, 1, [True], unit=2)
+        self.image.update(WRITE_MULTIPLE_REGISTERS, 10, [100, 65535], unit=2)
+        self.assertEqual(self.image.read(READ_COILS, 0, 3, 2).values, [True, True, True])
+        snapshot = self.image.read(READ_HOLDING_REGISTERS, 10, 2, 2)
+        self.assertEqual((snapshot.values, snapshot.quality), ([100, 65535], QUALITY_GOOD))
+        self.assertEqual(self.image.version(2), 3)
+        self.assertIsNone(self.image.read(READ_HOLDING_REGISTERS, 9, 2, 2))
+        self.assertIsNone(self.image.read(READ_COILS, 0, 3, 1))
+
+    def test_quality_and_max_age(self):
+        """Test stale and comm_failed points and the max-age cut-off"""
+        self.image.update(READ_HOLDING_REGISTERS, 0, [1, 2], timestamp=time.time() - 60)
+        self.assertEqual(self.image.read(READ_HOLDING_REGISTERS, 0, 2).quality, QUALITY_STALE)
+        self.assertIsNone(self.image.read(READ_HOLDING_REGISTERS, 0, 2, max_age=30))
+        self.image.update(READ_HOLDING_REGISTERS, 0, [3, 4])
+        self.image.fail(READ_HOLDING_REGISTERS, 1, 1)
+        snapshot = self.image.read(READ_HOLDING_REGISTERS, 0, 2, max_age=30)
+        self.assertEqual((snapshot.values, snapshot.quality), ([3, 4], QUALITY_COMM_FAILED))
+        self.assertEqual(self.image.to_dict(1)['1']['tables']['holding_registers']['0']['value'], 3)
+
+    def test_fail_unseen_points(self):
+        """Test that a failed read leaves points never seen unknown"""
+        self.image.update(READ_HOLDING_REGISTERS, 0, [5])
+        self.image.fail(READ_HOLDING_REGISTERS, 0, 3)
+        self.assertIsNone(self.image.read(READ_HOLDING_REGISTERS, 0, 3))
+        self.assertIsNone(self.image.read(READ_HOLDING_REGISTERS, 20, 1))
+        self.assertEqual(self.image.read(READ_HOLDING_REGISTERS, 0, 1).quality, QUALITY_COMM_FAILED)
+        self.assertEqual(list(self.image.to_dict(1)['1']['tables']['holding_registers']), ['0'])
+
+    def test_fetch(self):
+        """Test that fetch reads the bus only when memory is too old"""
+        client = MagicMock()
+        client.read_holding_registers.return_value = [7]
+        self.assertEqual(self.image.fetch(client, READ_HOLDING_REGISTERS, 5, 1, 1, max_age=1).values, [7])
+        self.assertEqual(self.image.fetch(client, READ_HOLDING_REGISTERS, 5, 1, 1, max_age=1).values, [7])
+        client.read_holding_registers.assert_called_once_with(5, 1, 1)
+
+
+class TestClientImage(unittest.TestCase):
+    """Test cases for process image updates by ModbusClient"""
+
+    def test_transactions_update_image(self):
+        """Test that successful and failed transactions reach the image"""
+        client = ModbusClient(port='/dev/ttyIMAGE')
+        client.adaptive = None
+        client.retry_policy.max_retries = 0
+        client._ensure_connected = MagicMock(return_value=True)
+        client.client = MagicMock()
+        response = MagicMock(registers=[11, 12])
+        response.isError.return_value = False
+        client.client.read_holding_registers.return_value = response
+        client.client.write_register.return_value = response
+
+        client.read_holding_registers(0, 2, 4)
+        client.write_register(1, 99, 4)
+        self.assertEqual(client.image.read(READ_HOLDING_REGISTERS, 0, 2, 4).values, [11, 99])
+
+        client.client.read_holding_registers.side_effect = ModbusIOException('timeout')
+        self.assertIsNone(client.read_holding_registers(0, 2, 4))
+        self.assertEqual(client.image.read(READ_HOLDING_REGISTERS, 0, 2, 4).quality, QUALITY_COMM_FAILED)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Tests for modbusapi.planner module
+"""
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.planner import (
+    ReadPlanner, ReadRequest, parse_function_code,
+    READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS
+)
+from modbusapi.retry import ERROR_EXCEPTION, ERROR_TIMEOUT
+
+
+class TestReadPlanner(unittest.TestCase):
+    """Test cases for ReadPlanner class"""
+
+    def test_merge_adjacent_and_nearby(self):
+        """Test merging of requests within the gap tolerance"""
+        planner = ReadPlanner(max_gap=2)
+        blocks = planner.plan([
+            ReadRequest(READ_COILS, 0, 1),
+            ReadRequest(READ_COILS, 1, 1),
+            ReadRequest(READ_COILS, 4, 2),
+            ReadRequest(READ_COILS, 20, 1),
+        ])
+        self.assertEqual([(b.address, b.count) for b in blocks], [(0, 6), (20, 1)])
+
+    def test_separate_function_codes_and_units(self):
+        """Test that different function codes and units are never merged"""
+        planner = ReadPlanner(max_gap=10)
+        blocks = planner.plan([
+            ReadRequest(READ_COILS, 0, 1, 1),
+            ReadRequest(READ_DISCRETE_INPUTS, 1, 1, 1),
+            ReadRequest(READ_COILS, 1, 1, 2),
+        ])
+        self.assertEqual(len(blocks), 3)
+
+    def test_span_limit(self):
+        """Test that blocks respect max_span and the protocol limit"""
+        planner = ReadPlanner(max_gap=0, max_span=4)
+        blocks = planner.plan([ReadRequest(READ_HOLDING_REGISTERS, a, 1) for a in range(10)])
+        self.assertEqual([b.count for b in blocks], [4, 4, 2])
+
+        planner = ReadPlanner(max_gap=0)
+        blocks = planner.plan([ReadRequest(READ_HOLDING_REGISTERS, a, 1) for a in range(200)])
+        self.assertEqual([b.count for b in blocks], [125, 75])
+
+    def test_execute_slices_results(self):
+        """Test that block results are sliced back to each request"""
+        client = MagicMock()
+        client.read_holding_registers.return_value = [10, 11, 12, 13, 14]
+        planner = ReadPlanner(max_gap=2)
+        first = ReadRequest(READ_HOLDING_REGISTERS, 100, 2)
+        second = ReadRequest(READ_HOLDING_REGISTERS, 103, 2)
+
+        results = planner.execute(client, [first, second])
+
+        client.read_holding_registers.assert_called_once_with(100, 5, 1)
+        self.assertEqual(results[first], [10, 11])
+        self.assertEqual(results[second], [13, 14])
+        self.assertEqual(planner.get_stats()['saved'], 1)
+
+    def test_execute_splits_failed_block(self):
+        """Test that a merged block rejected by the device falls back to individual reads"""
+        client = MagicMock()
+        client.last_error_class = ERROR_EXCEPTION
+        client.read_coils.side_effect = [None, [True], None]
+        planner = ReadPlanner(max_gap=4)
+        first = ReadRequest(READ_COILS, 0, 1)
+        second = ReadRequest(READ_COILS, 3, 1)
+
+        results = planner.execute(client, [first, second])
+
+        self.assertEqual(results[first], [True])
+        self.assertIsNone(results[second])
+        self.assertEqual(planner.get_stats()['transactions'], 3)
+
+    def test_execute_timed_out_block_not_split(self):
+        """Test that a merged block that timed out fails without individual reads"""
+        client = MagicMock()
+        client.last_error_class = ERROR_TIMEOUT
+        client.read_coils.return_value = None
+        planner = ReadPlanner(max_gap=4)
+        first = ReadRequest(READ_COILS, 0, 1)
+        second = ReadRequest(READ_COILS, 3, 1)
+
+        results = planner.execute(client, [first, second])
+
+        self.assertEqual(results, {first: None, second: None})
+        client.read_coils.assert_called_once_with(0, 4, 1)
+
+    def test_parse_function_code(self):
+        """Test parsing function codes from names and numbers"""
+        self.assertEqual(parse_function_code('coils'), READ_COILS)
+        self.assertEqual(parse_function_code('3'), READ_HOLDING_REGISTERS)
+        with self.assertRaises(ValueError):
+            parse_function_code(5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for modbusapi.poller module
+"""
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.client import ModbusClient, STATE_CONNECTED
+from modbusapi.poller import create_poller, UNIT_ALIVE, UNIT_DEAD
+from modbusapi.pool import parse_units
+from modbusapi.profile import load_profile
+from modbusapi.simulator import RtuSimulator, SlaveDevice
+
+
+class TestPoller(unittest.TestCase):
+    """Test cases for Poller class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.dead = {2}
+        self.client = MagicMock()
+        self.client.read_coils.side_effect = lambda address, count, unit: (
+            None if unit in self.dead else [True] * count
+        )
+        self.client.read_discrete_inputs.side_effect = lambda address, count, unit: (
+            None if unit in self.dead else [False] * count
+        )
+        self.poller = create_poller(self.client, [1, 2, 3], load_profile('waveshare-io-8ch'),
+                                    dead_after=2, probe_interval=30)
+
+    def units_read(self):
+        """Units addressed since the last call"""
+        units = [call.args[2] for call in self.client.read_coils.call_args_list]
+        self.client.read_coils.reset_mock()
+        return units
+
+    def test_round_robin(self):
+        """Test that every unit is polled once per period, starting one unit later each cycle"""
+        self.dead.clear()
+        values = self.poller.run_cycle(now=100.0)
+        self.assertEqual(sorted(values), [1, 2, 3])
+        self.assertEqual(values[3]['outputs'], [True] * 8)
+        self.assertEqual(self.units_read(), [1, 2, 3])
+        self.assertEqual(self.poller.run_cycle(now=100.5), {})
+        self.poller.run_cycle(now=101.0)
+        self.assertEqual(self.units_read(), [2, 3, 1])
+        self.assertEqual(self.poller.next_due(), 102.0)
+
+    def test_dead_unit_backoff(self):
+        """Test that a silent unit is demoted to probes and promoted when it answers"""
+        self.poller.run_cycle(now=100.0)
+        self.poller.run_cycle(now=101.0)
+        stats = self.poller.get_stats()['units']
+        self.assertEqual(stats['2']['state'], UNIT_DEAD)
+        self.assertIsNone(stats['2']['last_good'])
+        self.assertIsNotNone(stats['1']['last_good'])
+
+        # Not addressed at all until the probe falls due
+        self.units_read()
+        self.poller.run_cycle(now=102.0)
+        self.assertNotIn(2, self.units_read())
+
+        # The probe reads a single point; once answered, all points are polled again
+        self.dead.clear()
+        self.client.read_discrete_inputs.reset_mock()
+        self.poller.run_cycle(now=131.0)
+        self.assertEqual(self.poller.units[2].state, UNIT_ALIVE)
+        self.assertEqual(self.poller.units[2].probes, 1)
+        self.assertEqual(self.units_read().count(2), 1)
+        self.assertNotIn(2, [call.args[2] for call in self.client.read_discrete_inputs.call_args_list])
+        self.poller.run_cycle(now=131.5)
+        self.assertEqual(self.units_read(), [2])
+
+    def test_missed_deadlines(self):
+        """Test that polls more than one period late are counted"""
+        self.dead.clear()
+        self.poller.run_cycle(now=100.0)
+        self.poller.run_cycle(now=101.2)
+        self.poller.run_cycle(now=104.0)
+        self.assertEqual(self.poller.units[1].missed_deadlines, 1)
+        self.assertEqual(self.poller.get_stats()['cycles'], 3)
+
+    def test_parse_units(self):
+        """Test unit lists with ranges"""
+        self.assertEqual(parse_units('1-3,7,2'), [1, 2, 3, 7])
+        with self.assertRaises(ValueError):
+            parse_units('0-2')
+
+
+@unittest.skipUnless(hasattr(os, 'openpty'), 'pseudo-terminals not available')
+class TestPollerOnBus(unittest.TestCase):
+    """Test cases for Poller with a real client against a simulated bus"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.simulator = RtuSimulator([SlaveDevice(1), SlaveDevice(3), SlaveDevice(4)], baudrate=115200)
+        self.client = ModbusClient(port=self.simulator.start(), baudrate=115200, timeout=0.1)
+        self.poller = create_poller(self.client, [1, 2, 3, 4], load_profile('waveshare-io-8ch'),
+                                    dead_after=2, probe_interval=30)
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.client.disconnect()
+        self.simulator.close()
+
+    def test_silent_unit_spares_live_units(self):
+        """Test that a silent unit never fails the reads of the live units in its cycle"""
+        for now in (100.0, 101.0, 102.0):
+            values = self.poller.run_cycle(now=now)
+            for unit in (1, 3, 4):
+                self.assertEqual(values[unit]['outputs'], [False] * 8)
+        self.assertEqual(self.client.state, STATE_CONNECTED)
+        stats = self.poller.get_stats()['units']
+        self.assertEqual(stats['2']['state'], UNIT_DEAD)
+        self.assertEqual([stats[unit]['errors'] for unit in ('1', '3', '4')], [0, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for modbusapi.pool module
+"""
+import os
+import sys
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.pool import ModbusClientPool, BusReadRequest, parse_bus_spec, parse_point
+from modbusapi.planner import READ_COILS, READ_HOLDING_REGISTERS
+
+
+def make_client(port, baudrate=9600, parity='N'):
+    """Create a ModbusClient-like mock"""
+    client = MagicMock()
+    client.port = port
+    client.baudrate = baudrate
+    client.parity = parity
+    return client
+
+
+class TestParsing(unittest.TestCase):
+    """Test cases for bus and point parsing"""
+
+    def test_parse_bus_spec(self):
+        """Test bus definitions with and without name and settings"""
+        self.assertEqual(parse_bus_spec('boiler=/dev/ttyUSB1:19200:e'),
+                         {'name': 'boiler', 'port': '/dev/ttyUSB1', 'baudrate': 19200, 'parity': 'E'})
+        self.assertEqual(parse_bus_spec('/dev/ttyUSB0'),
+                         {'name': None, 'port': '/dev/ttyUSB0', 'baudrate': None, 'parity': 'N'})
+        with self.assertRaises(ValueError):
+            parse_bus_spec('boiler=')
+
+    def test_parse_point(self):
+        """Test point addresses with and without bus"""
+        self.assertEqual(parse_point('boiler:5:holding_registers:10:2'),
+                         BusReadRequest('boiler', READ_HOLDING_REGISTERS, 10, 2, 5))
+        self.assertEqual(parse_point('1:coils:0'), BusReadRequest(None, READ_COILS, 0, 1, 1))
+        with self.assertRaises(ValueError):
+            parse_point('boiler:coils')
+
+
+class TestModbusClientPool(unittest.TestCase):
+    """Test cases for ModbusClientPool class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.pool = ModbusClientPool()
+        self.bus0 = make_client('/dev/pool-test0')
+        self.bus1 = make_client('/dev/pool-test1', 19200, 'E')
+        self.pool.add_client(self.bus0)
+        self.pool.add_client(self.bus1, name='boiler')
+
+    def test_lookup(self):
+        """Test lookup by name, port and default"""
+        self.assertIs(self.pool.get().client, self.bus0)
+        self.assertIs(self.pool.get('boiler').client, self.bus1)
+        self.assertIs(self.pool.get('/dev/pool-test1').client, self.bus1)
+        self.assertIsNone(self.pool.get('unknown'))
+        self.assertEqual(sorted(self.pool.names()), ['/dev/pool-test0', 'boiler'])
+
+    def test_conflicting_settings(self):
+        """Test that a port cannot be added twice with other line settings"""
+        self.assertIsNone(self.pool.add_client(make_client('/dev/pool-test0', 115200)))
+
+    def test_read_many_in_parallel(self):
+        """Test that reads on different buses overlap in time"""
+        barrier = threading.Barrier(2, timeout=2)
+
+        def read_holding_registers(address, count, unit):
+            barrier.wait()
+            return [unit] * count
+
+        self.bus0.read_holding_registers.side_effect = read_holding_registers
+        self.bus1.read_holding_registers.side_effect = read_holding_registers
+
+        results = self.pool.read_many([
+            BusReadRequest(None, READ_HOLDING_REGISTERS, 0, 2, 1),
+            BusReadRequest('boiler', READ_HOLDING_REGISTERS, 10, 1, 5),
+            BusReadRequest('missing', READ_HOLDING_REGISTERS, 0, 1, 1),
+        ])
+        self.assertEqual(results, [[1, 1], [5], None])
+
+
+if __name__ == '__main__':
+    unittest.main()
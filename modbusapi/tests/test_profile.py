@@ -0,0 +1,142 @@
+"""
+Tests for modbusapi.profile module
+"""
+import os
+import sys
+import json
+import struct
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.profile import DeviceProfile, Point, load_profile, BUILTIN_PROFILES
+from modbusapi.planner import READ_COILS, READ_DISCRETE_INPUTS, READ_HOLDING_REGISTERS, READ_INPUT_REGISTERS
+
+METER = {
+    'name': 'meter',
+    'poll': 1.0,
+    'points': [
+        {'name': 'voltage', 'function_code': 'input_registers', 'address': 0, 'type': 'float32', 'units': 'V'},
+        {'name': 'energy', 'function_code': 4, 'address': 2, 'type': 'uint32', 'scale': 0.01, 'poll': 60},
+        {'name': 'relays', 'function_code': 'coils', 'address': 0, 'count': 4, 'writable': True},
+        {'name': 'setpoint', 'function_code': 'holding_registers', 'address': 10, 'type': 'int16',
+         'scale': 0.1, 'writable': True, 'min': 5, 'max': 30},
+        {'name': 'serial', 'function_code': 'holding_registers', 'address': 20, 'type': 'string',
+         'length': 2, 'poll': 0},
+    ],
+}
+
+
+def registers(fmt, *values):
+    """Pack values big-endian and split them into registers"""
+    data = struct.pack(fmt, *values)
+    return list(struct.unpack(f'>{len(data) // 2}H', data))
+
+
+class TestDeviceProfile(unittest.TestCase):
+    """Test cases for DeviceProfile and Point classes"""
+
+    def test_round_trip(self):
+        """Test that to_dict output recreates an equivalent profile"""
+        profile = DeviceProfile.from_dict(METER)
+        copy = DeviceProfile.from_dict(json.loads(json.dumps(profile.to_dict())))
+        self.assertEqual(copy.to_dict(), profile.to_dict())
+        self.assertEqual(copy.point('energy').count, 2)
+
+    def test_invalid_points(self):
+        """Test that malformed point definitions are rejected"""
+        with self.assertRaises(ValueError):
+            Point('x', 'discrete_inputs', 0, writable=True)
+        with self.assertRaises(ValueError):
+            Point('x', 'coils', 0, type='float32')
+        with self.assertRaises(ValueError):
+            Point('x', 5, 0)
+        with self.assertRaises(ValueError):
+            DeviceProfile('dup', [Point('a', 1, 0), Point('a', 1, 1)])
+
+    def test_addresses(self):
+        """Test defined and writable addresses per table"""
+        profile = DeviceProfile.from_dict(METER)
+        self.assertEqual(profile.addresses(READ_INPUT_REGISTERS), [0, 1, 2, 3])
+        self.assertEqual(profile.addresses(READ_HOLDING_REGISTERS, writable=True), [10])
+        self.assertEqual(profile.addresses(READ_DISCRETE_INPUTS), [])
+
+    def test_load_profile(self):
+        """Test loading built-in and JSON profiles"""
+        builtin = load_profile('waveshare-io-8ch')
+        self.assertEqual(builtin.addresses(READ_COILS, writable=True), list(range(8)))
+        self.assertEqual(builtin.addresses(READ_DISCRETE_INPUTS), list(range(8)))
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(METER, f)
+        try:
+            self.assertEqual(load_profile(f.name).name, 'meter')
+        finally:
+            os.unlink(f.name)
+        self.assertIsNone(load_profile('/nonexistent/profile.json'))
+        self.assertIn('waveshare-io-8ch', BUILTIN_PROFILES)
+
+
+class TestDevice(unittest.TestCase):
+    """Test cases for Device class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.device = DeviceProfile.from_dict(METER).compile(unit=3)
+        self.client = MagicMock()
+        self.client.read_input_registers.return_value = registers('>fI', 229.5, 123456)
+        self.client.read_coils.return_value = [True, False, False, True]
+        self.client.read_holding_registers.side_effect = lambda address, count, unit: (
+            [215] if address == 10 else registers('>4s', b'AB12')
+        )
+
+    def test_read_merges_and_decodes(self):
+        """Test that point reads are merged into block reads and decoded"""
+        values = self.device.read(self.client)
+        self.assertAlmostEqual(values['voltage'], 229.5)
+        self.assertAlmostEqual(values['energy'], 1234.56)
+        self.assertEqual(values['relays'], [True, False, False, True])
+        self.assertAlmostEqual(values['setpoint'], 21.5)
+        self.assertEqual(values['serial'], 'AB12')
+        self.client.read_input_registers.assert_called_once_with(0, 4, 3)
+
+    def test_poll_schedule(self):
+        """Test that points are polled at their own rate and on-demand points never"""
+        first = self.device.poll(self.client, now=100.0)
+        self.assertEqual(set(first), {'voltage', 'energy', 'relays', 'setpoint'})
+        self.assertEqual(set(self.device.poll(self.client, now=101.0)), {'voltage', 'relays', 'setpoint'})
+        self.assertEqual(self.device.poll(self.client, now=101.5), {})
+        self.assertIn('energy', self.device.poll(self.client, now=160.0))
+
+    def test_validators(self):
+        """Test that reads and writes outside the profile are rejected"""
+        self.device.validate_read(READ_INPUT_REGISTERS, 0, 4)
+        self.device.validate_write(READ_COILS, 0, 4)
+        with self.assertRaises(ValueError):
+            self.device.validate_read(READ_INPUT_REGISTERS, 2, 4)
+        with self.assertRaises(ValueError):
+            self.device.validate_write(READ_HOLDING_REGISTERS, 20)
+        with self.assertRaises(ValueError):
+            self.device.validate_read(READ_DISCRETE_INPUTS, 0)
+
+    def test_write(self):
+        """Test that writes are encoded, range-checked and sent to the right method"""
+        self.client.write_register.return_value = True
+        self.client.write_coils.return_value = True
+        self.assertTrue(self.device.write(self.client, 'setpoint', 21.5))
+        self.client.write_register.assert_called_once_with(10, 215, 3)
+        self.assertTrue(self.device.write(self.client, 'relays', [1, 1, 0, 0]))
+        self.client.write_coils.assert_called_once_with(0, [True, True, False, False], 3)
+        self.assertEqual(self.device.values['relays'], [True, True, False, False])
+        with self.assertRaises(ValueError):
+            self.device.write(self.client, 'setpoint', 50)
+        with self.assertRaises(ValueError):
+            self.device.write(self.client, 'voltage', 1.0)
+        with self.assertRaises(ValueError):
+            self.device.write(self.client, 'relays', [True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Tests for modbusapi.protocol module
+"""
+import os
+import sys
+import struct
+import asyncio
+import socket
+import unittest
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.protocol import (
+    ClientProtocol, RtuFramer, TcpFramer, ProtocolError, transact, transact_async,
+    crc16, add_crc, STATE_IDLE, STATE_WAITING
+)
+from modbusapi.simulator import RtuSimulator, SlaveDevice
+
+
+class TestFramers(unittest.TestCase):
+    """Test cases for RtuFramer and TcpFramer classes"""
+
+    def test_rtu_requests(self):
+        """Test request frames against known pymodbus output"""
+        framer = RtuFramer()
+        self.assertEqual(bytes(framer.encode(1, 3, 0, 10)), bytes.fromhex('01030000000ac5cd'))
+        self.assertEqual(bytes(framer.encode(1, 5, 9, True))[:6], bytes.fromhex('01050009ff00'))
+        frame = bytes(framer.encode(2, 15, 0, [True, False, True]))
+        self.assertEqual(frame[:8], bytes.fromhex('020f000000030105'))
+        self.assertEqual(crc16(frame), 0)
+        frame = bytes(framer.encode(2, 16, 2, [7, 8]))
+        self.assertEqual(frame[:11], bytes.fromhex('0210000200020400070008'))
+
+    def test_rtu_responses(self):
+        """Test decoding of reads, writes, exceptions and bad frames"""
+        framer = RtuFramer()
+        registers = add_crc(bytes([1, 3, 4]) + struct.pack('>2H', 513, 7))
+        self.assertEqual(framer.decode(memoryview(registers), 1, 3, 2).values, [513, 7])
+        coils = add_crc(bytes([1, 1, 2, 0b101, 0b1]))
+        self.assertEqual(framer.decode(memoryview(coils), 1, 1, 9).values,
+                         [True, False, True] + [False] * 5 + [True])
+        exception = framer.decode(memoryview(add_crc(bytes([1, 0x83, 2]))), 1, 3, 2)
+        self.assertTrue(exception.isError())
+        self.assertEqual(exception.exception_code, 2)
+        with self.assertRaises(ProtocolError):
+            framer.decode(memoryview(registers[:-1] + b'\x00'), 1, 3, 2)
+        with self.assertRaises(ProtocolError):
+            framer.decode(memoryview(registers), 2, 3, 2)
+
+    def test_tcp_round_trip(self):
+        """Test MBAP framing and transaction ID checks"""
+        framer = TcpFramer()
+        request = bytes(framer.encode(5, 4, 100, 2))
+        self.assertEqual(request, bytes.fromhex('000100000006050400640002'))
+        response = struct.pack('>HHHBBB2H', 1, 0, 7, 5, 4, 4, 10, 20)
+        self.assertEqual(framer.decode(memoryview(response), 5, 4, 2).values, [10, 20])
+        framer.encode(5, 4, 100, 2)
+        with self.assertRaises(ProtocolError):
+            framer.decode(memoryview(response), 5, 4, 2)
+
+
+class TestClientProtocol(unittest.TestCase):
+    """Test cases for ClientProtocol class"""
+
+    def test_partial_reads(self):
+        """Test that responses arriving in pieces are reassembled"""
+        protocol = ClientProtocol()
+        protocol.request(1, 3, 0, 2)
+        self.assertEqual((protocol.state, protocol.expected()), (STATE_WAITING, 2))
+        response = add_crc(bytes([1, 3, 4]) + struct.pack('>2H', 1, 2))
+        self.assertIsNone(protocol.feed(response[:2]))
+        self.assertEqual(protocol.expected(), 7)
+        self.assertIsNone(protocol.feed(response[2:5]))
+        self.assertEqual(protocol.feed(response[5:]).values, [1, 2])
+        self.assertEqual(protocol.state, STATE_IDLE)
+
+    def test_exception_and_broadcast(self):
+        """Test the shorter exception response and broadcasts without response"""
+        protocol = ClientProtocol()
+        protocol.request(1, 16, 0, [1, 2, 3])
+        self.assertIsNone(protocol.feed(bytes([1, 0x90])))
+        self.assertEqual(protocol.expected(), 3)
+        self.assertEqual(protocol.feed(add_crc(bytes([1, 0x90, 2]))[2:]).exception_code, 2)
+        protocol.request(0, 5, 0, False)
+        self.assertEqual((protocol.state, protocol.expected()), (STATE_IDLE, 0))
+        with self.assertRaises(ProtocolError):
+            protocol.feed(b'\x00')
+
+
+@unittest.skipUnless(hasattr(os, 'openpty'), 'pseudo-terminals not available')
+class TestTransports(unittest.TestCase):
+    """End-to-end tests of the sync and asyncio drivers"""
+
+    def test_sync_serial(self):
+        """Test transact() over a serial port against the simulator"""
+        import serial
+        with RtuSimulator([SlaveDevice(1, holding_registers=[4, 5, 6])], baudrate=115200) as simulator:
+            simulator.start()
+            with serial.Serial(simulator.port, 115200, timeout=0.2) as port:
+                protocol = ClientProtocol()
+                self.assertEqual(transact(port, protocol, 1, 3, 0, 3).values, [4, 5, 6])
+                self.assertEqual(transact(port, protocol, 1, 16, 0, [9]).values, [0, 1])
+                self.assertEqual(transact(port, protocol, 1, 3, 0, 1).values, [9])
+                self.assertIsNone(transact(port, protocol, 7, 3, 0, 1))
+
+    def test_asyncio_stream(self):
+        """Test transact_async() over a socket pair answering as a TCP slave"""
+        async def run():
+            client_socket, server_socket = socket.socketpair()
+            reader, writer = await asyncio.open_connection(sock=client_socket)
+            server_reader, server_writer = await asyncio.open_connection(sock=server_socket)
+
+            async def serve():
+                request = await server_reader.readexactly(12)
+                server_writer.write(request[:4] + struct.pack('>HBBBH', 5, 1, 3, 2, 42))
+                await server_writer.drain()
+
+            task = asyncio.ensure_future(serve())
+            response = await transact_async(reader, writer, ClientProtocol(TcpFramer()), 1, 3, 0, 1)
+            await task
+            timeout = await transact_async(reader, writer, ClientProtocol(TcpFramer()), 1, 3, 0, 1, timeout=0.05)
+            writer.close()
+            server_writer.close()
+            return response, timeout
+
+        response, timeout = asyncio.run(run())
+        self.assertEqual(response.values, [42])
+        self.assertIsNone(timeout)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+"""
+Tests for modbusapi.retry module
+"""
+import os
+import sys
+import unittest
+from unittest.mock import patch, MagicMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymodbus.exceptions import ConnectionException, ModbusIOException, InvalidMessageReceivedException
+from pymodbus.pdu import ExceptionResponse
+
+from modbusapi.client import ModbusClient, STATE_CONNECTED
+from modbusapi.retry import (
+    RetryPolicy, CircuitBreaker, classify_error,
+    ERROR_TIMEOUT, ERROR_CRC, ERROR_EXCEPTION, ERROR_PORT, ERROR_UNKNOWN,
+    ERROR_CIRCUIT_OPEN, BREAKER_CLOSED, BREAKER_OPEN, BREAKER_HALF_OPEN
+)
+
+
+class TestClassifyError(unittest.TestCase):
+    """Test cases for classify_error function"""
+
+    def test_classes(self):
+        """Test classification of pymodbus responses and exceptions"""
+        self.assertEqual(classify_error(ExceptionResponse(3, 2)), ERROR_EXCEPTION)
+        self.assertEqual(classify_error(ModbusIOException(
+            "No Response received from the remote unit/Unable to decode response")), ERROR_TIMEOUT)
+        self.assertEqual(classify_error(InvalidMessageReceivedException(
+            "No response received, expected at least 4 bytes (0 received)")), ERROR_TIMEOUT)
+        self.assertEqual(classify_error(ModbusIOException("Unable to decode response")), ERROR_CRC)
+        self.assertEqual(classify_error(InvalidMessageReceivedException(
+            "Incomplete message received, expected at least 4 bytes (2 received)")), ERROR_CRC)
+        self.assertEqual(classify_error(ConnectionException("port closed")), ERROR_PORT)
+        self.assertEqual(classify_error(OSError("I/O error")), ERROR_PORT)
+        self.assertEqual(classify_error(TimeoutError()), ERROR_TIMEOUT)
+        self.assertEqual(classify_error(ValueError()), ERROR_UNKNOWN)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for RetryPolicy class"""
+
+    def test_only_retryable_classes(self):
+        """Test that exception responses and port errors are not retried"""
+        policy = RetryPolicy(max_retries=2)
+        self.assertTrue(policy.should_retry(ERROR_TIMEOUT, 0))
+        self.assertTrue(policy.should_retry(ERROR_CRC, 1))
+        self.assertFalse(policy.should_retry(ERROR_TIMEOUT, 2))
+        self.assertFalse(policy.should_retry(ERROR_EXCEPTION, 0))
+        self.assertFalse(policy.should_retry(ERROR_PORT, 0))
+
+    def test_budget(self):
+        """Test that retries stop when the budget is spent and refill on success"""
+        policy = RetryPolicy(max_retries=5, budget_max=2, budget_ratio=0.5)
+        self.assertTrue(policy.should_retry(ERROR_TIMEOUT, 0))
+        self.assertTrue(policy.should_retry(ERROR_TIMEOUT, 0))
+        self.assertFalse(policy.should_retry(ERROR_TIMEOUT, 0))
+        policy.record_success()
+        policy.record_success()
+        self.assertTrue(policy.should_retry(ERROR_TIMEOUT, 0))
+        self.assertEqual(policy.to_dict()['budget_exhausted'], 1)
+
+    def test_delay_jitter(self):
+        """Test exponential backoff within the jitter bounds"""
+        policy = RetryPolicy(backoff=0.1, jitter=0.5)
+        for attempt in range(3):
+            delay = policy.delay(attempt)
+            self.assertGreaterEqual(delay, 0.05 * 2 ** attempt)
+            self.assertLessEqual(delay, 0.15 * 2 ** attempt)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for CircuitBreaker class"""
+
+    def test_open_and_half_open(self):
+        """Test opening after the threshold and probing after the cool-down"""
+        breaker = CircuitBreaker(threshold=2, cooldown=60)
+        breaker.record_failure(ERROR_TIMEOUT)
+        self.assertTrue(breaker.allow())
+        breaker.record_failure(ERROR_TIMEOUT)
+        self.assertEqual(breaker.state, BREAKER_OPEN)
+        self.assertFalse(breaker.allow())
+
+        breaker.opened_at -= 61
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, BREAKER_HALF_OPEN)
+        breaker.record_failure(ERROR_CRC)
+        self.assertEqual(breaker.state, BREAKER_OPEN)
+
+        breaker.opened_at -= 61
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, BREAKER_CLOSED)
+
+    def test_port_errors_do_not_count(self):
+        """Test that port errors are not blamed on the unit"""
+        breaker = CircuitBreaker(threshold=1)
+        breaker.record_failure(ERROR_PORT)
+        self.assertEqual(breaker.state, BREAKER_CLOSED)
+
+
+class TestClientRetries(unittest.TestCase):
+    """Test cases for retries and breakers in ModbusClient"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        patcher = patch('modbusapi.client.ModbusSerialClient')
+        self.mock_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.mock_serial = self.mock_class.return_value
+        self.mock_serial.connect.return_value = True
+        self.mock_serial.is_socket_open.return_value = True
+        self.client = ModbusClient(port='/dev/ttyUSB0')
+        self.client.retry_policy = RetryPolicy(max_retries=2, backoff=0)
+
+    def test_timeout_retried(self):
+        """Test that a timed out read is retried"""
+        response = MagicMock(registers=[42])
+        response.isError.return_value = False
+        self.mock_serial.read_holding_registers.side_effect = [
+            ModbusIOException("No Response received from the remote unit"), response
+        ]
+        self.assertEqual(self.client.read_holding_registers(0, 1), [42])
+        self.assertEqual(self.mock_serial.read_holding_registers.call_count, 2)
+
+    def test_exception_response_not_retried(self):
+        """Test that an exception response fails without retries"""
+        self.mock_serial.read_holding_registers.return_value = ExceptionResponse(3, 2)
+        self.assertIsNone(self.client.read_holding_registers(0, 1))
+        self.assertEqual(self.mock_serial.read_holding_registers.call_count, 1)
+        self.assertEqual(self.client.last_error_class, ERROR_EXCEPTION)
+
+    def test_breaker_skips_dead_unit(self):
+        """Test that an open breaker stops requests to the unit only"""
+        self.client.breakers.threshold = 1
+        self.client.max_failures = 100
+        self.mock_serial.read_coils.return_value = ModbusIOException("No Response")
+        self.assertIsNone(self.client.read_coils(0, 1, unit=5))
+        self.assertEqual(self.mock_serial.read_coils.call_count, 3)
+
+        self.assertIsNone(self.client.read_coils(0, 1, unit=5))
+        self.assertEqual(self.mock_serial.read_coils.call_count, 3)
+        self.assertEqual(self.client.last_error_class, ERROR_CIRCUIT_OPEN)
+
+        self.client.read_coils(0, 1, unit=6)
+        self.assertEqual(self.mock_serial.read_coils.call_count, 6)
+        self.assertEqual(self.client.get_health()['breakers']['5']['state'], BREAKER_OPEN)
+
+    def test_dead_unit_keeps_port_open(self):
+        """Test that timeouts of a dead unit do not disturb reads of a live unit"""
+        response = MagicMock(bits=[True])
+        response.isError.return_value = False
+
+        def read_coils(address, count, unit):
+            if unit == 5:
+                raise ModbusIOException("No Response received from the remote unit/Unable to decode response")
+            return response
+
+        self.mock_serial.read_coils.side_effect = read_coils
+        for _ in range(self.client.max_failures + 1):
+            self.assertIsNone(self.client.read_coils(0, 1, unit=5))
+        self.assertEqual(self.client.state, STATE_CONNECTED)
+        self.mock_serial.close.assert_not_called()
+
+        self.assertEqual(self.client.read_coils(0, 1, unit=1), [True])
+        self.assertIsNone(self.client.last_error_class)
+        self.assertEqual(self.mock_serial.connect.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
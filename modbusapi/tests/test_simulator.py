@@ -0,0 +1,107 @@
+"""
+Tests for modbusapi.simulator module
+"""
+import os
+import sys
+import json
+import struct
+import tempfile
+import unittest
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.simulator import (
+    RtuSimulator, SlaveDevice, load_layout, crc16, add_crc,
+    ILLEGAL_FUNCTION, ILLEGAL_DATA_ADDRESS, ILLEGAL_DATA_VALUE
+)
+from modbusapi.client import ModbusClient
+from modbusapi.retry import RetryPolicy
+
+
+class TestSlaveDevice(unittest.TestCase):
+    """Test cases for SlaveDevice class"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.slave = SlaveDevice(1, coils=16, holding_registers=[10, 20, 30, 40])
+
+    def test_crc(self):
+        """Test the CRC against a known frame"""
+        self.assertEqual(add_crc(bytes.fromhex('010300000001')), bytes.fromhex('010300000001840a'))
+        self.assertEqual(crc16(b''), 0xFFFF)
+
+    def test_reads_and_writes(self):
+        """Test read and write PDUs against the banks"""
+        self.assertEqual(self.slave.handle(struct.pack('>BHH', 3, 1, 2)), bytes([3, 4, 0, 20, 0, 30]))
+        self.assertEqual(self.slave.handle(struct.pack('>BHH', 5, 9, 0xFF00)), struct.pack('>BHH', 5, 9, 0xFF00))
+        self.slave.handle(struct.pack('>BHHB', 15, 0, 3, 1) + bytes([0b101]))
+        self.assertEqual(self.slave.handle(struct.pack('>BHH', 1, 0, 10)), bytes([1, 2, 0b101, 0b10]))
+        self.slave.handle(struct.pack('>BHHBHH', 16, 2, 2, 4, 7, 8))
+        self.assertEqual(list(self.slave.holding_registers), [10, 20, 7, 8])
+
+    def test_exceptions(self):
+        """Test exception responses for invalid requests"""
+        self.assertEqual(self.slave.handle(struct.pack('>BHH', 3, 3, 2)), bytes([0x83, ILLEGAL_DATA_ADDRESS]))
+        self.assertEqual(self.slave.handle(struct.pack('>BHH', 3, 0, 0)), bytes([0x83, ILLEGAL_DATA_VALUE]))
+        self.assertEqual(self.slave.handle(struct.pack('>BHH', 5, 0, 1)), bytes([0x85, ILLEGAL_DATA_VALUE]))
+        self.assertEqual(self.slave.handle(bytes([43, 14, 1, 0])), bytes([0xAB, ILLEGAL_FUNCTION]))
+
+    def test_load_layout(self):
+        """Test slaves loaded from a JSON layout, sized by a device profile"""
+        layout = {'slaves': [
+            {'unit': 1, 'profile': 'waveshare-io-8ch', 'delay': 0.01},
+            {'unit': 7, 'input_registers': [1, 2, 3]},
+        ]}
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(layout, f)
+        try:
+            slaves = load_layout(f.name)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual([slave.unit for slave in slaves], [1, 7])
+        self.assertEqual((len(slaves[0].coils), len(slaves[0].holding_registers), slaves[0].delay), (8, 0, 0.01))
+        self.assertEqual(list(slaves[1].input_registers), [1, 2, 3])
+        self.assertEqual(load_layout('/nonexistent/layout.json'), [])
+
+
+@unittest.skipUnless(hasattr(os, 'openpty'), 'pseudo-terminals not available')
+class TestRtuSimulator(unittest.TestCase):
+    """End-to-end tests of ModbusClient against the simulator"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.simulator = RtuSimulator([SlaveDevice(1, holding_registers=[1, 2, 3, 4]), SlaveDevice(2)],
+                                      baudrate=115200)
+        self.client = ModbusClient(port=self.simulator.start(), baudrate=115200, timeout=0.2)
+        self.client.retry_policy = RetryPolicy(max_retries=0)
+        self.assertTrue(self.client.connect())
+
+    def tearDown(self):
+        """Tear down test fixtures"""
+        self.client.disconnect()
+        self.simulator.close()
+
+    def test_round_trips(self):
+        """Test reads, writes and exception responses over real RTU frames"""
+        self.assertEqual(self.client.read_holding_registers(0, 4, 1), [1, 2, 3, 4])
+        self.assertTrue(self.client.write_coils(0, [True, False, True], 2))
+        self.assertEqual(self.client.read_coils(0, 3, 2), [True, False, True])
+        self.assertIsNone(self.client.read_holding_registers(2, 4, 1))
+        stats = self.simulator.get_stats()
+        self.assertEqual((stats['responses'], stats['exceptions'], stats['crc_errors']), (4, 1, 0))
+
+    def test_broadcast(self):
+        """Test that a broadcast reaches every slave and is verified by readback"""
+        result = self.client.broadcast('holding_registers', 0, [7, 7], verify_units=[1, 2])
+        self.assertEqual(result, {'sent': True, 'verified': {1: True, 2: True}})
+        self.assertEqual(self.simulator.get_stats()['broadcasts'], 1)
+
+    def test_unknown_unit_times_out(self):
+        """Test that requests to absent units are not answered"""
+        self.assertIsNone(self.client.read_holding_registers(0, 1, 9))
+        self.assertGreaterEqual(self.simulator.get_stats()['unanswered'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+Tests for modbusapi.timing module
+"""
+import unittest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from modbusapi.client import ModbusClient
+from modbusapi.timing import (
+    RtuTiming, TimingStats, request_length, response_length,
+    READ_COILS, READ_HOLDING_REGISTERS, WRITE_MULTIPLE_COILS, WRITE_MULTIPLE_REGISTERS
+)
+
+
+class TestFrameLengths(unittest.TestCase):
+    """Test cases for frame length prediction"""
+
+    def test_read_lengths(self):
+        """Test read request/response lengths"""
+        self.assertEqual(request_length(READ_COILS, 8), 8)
+        self.assertEqual(response_length(READ_COILS, 8), 6)
+        self.assertEqual(response_length(READ_COILS, 9), 7)
+        self.assertEqual(response_length(READ_HOLDING_REGISTERS, 125), 255)
+
+    def test_write_lengths(self):
+        """Test write request/response lengths"""
+        self.assertEqual(request_length(WRITE_MULTIPLE_COILS, 10), 11)
+        self.assertEqual(request_length(WRITE_MULTIPLE_REGISTERS, 2), 13)
+        self.assertEqual(response_length(WRITE_MULTIPLE_REGISTERS, 2), 8)
+
+
+class TestRtuTiming(unittest.TestCase):
+    """Test cases for RtuTiming class"""
+
+    def test_char_time_and_silent_interval(self):
+        """Test timing derived from the character format"""
+        timing = RtuTiming(9600)
+        self.assertAlmostEqual(timing.char_time, 10 / 9600)
+        self.assertAlmostEqual(timing.silent_interval, 3.5 * 10 / 9600)
+        self.assertAlmostEqual(RtuTiming(9600, parity='E').char_time, 11 / 9600)
+        self.assertEqual(RtuTiming(115200).silent_interval, 0.00175)
+
+    def test_response_timeout(self):
+        """Test response deadline from wire time and turnaround"""
+        timing = RtuTiming(9600, turnaround=0.05)
+        wire = (8 + 6) * 10 / 9600 + timing.silent_interval
+        self.assertAlmostEqual(timing.transaction_wire_time(READ_COILS, 8), wire)
+        self.assertAlmostEqual(timing.response_timeout(READ_COILS, 8), wire + 0.05)
+
+
+class TestTimingStats(unittest.TestCase):
+    """Test cases for TimingStats class"""
+
+    def test_summary(self):
+        """Test wire vs wall time summary"""
+        stats = TimingStats()
+        stats.record(READ_COILS, 8, 0.01, 0.02)
+        stats.record(READ_COILS, 8, 0.01, 0.02)
+        stats.record_failure()
+        summary = stats.summary()
+        self.assertEqual(summary['transactions'], 2)
+        self.assertEqual(summary['failures'], 1)
+        self.assertAlmostEqual(summary['efficiency'], 0.5)
+        self.assertAlmostEqual(summary['overhead_avg'], 0.01)
+
+
+class TestClientTiming(unittest.TestCase):
+    """Test cases for ModbusClient transaction timing"""
+
+    @patch.dict(os.environ, {'MODBUS_PRECISE_TIMING': 'true'})
+    @patch('modbusapi.client.ModbusSerialClient')
+    def test_predicted_timeout_applied(self, mock_serial_client):
+        """Test that each transaction uses the predicted deadline when precise timing is on"""
+        mock_client = mock_serial_client.return_value
+        mock_client.connect.return_value = True
+        mock_client.is_socket_open.return_value = True
+        mock_response = MagicMock()
+        mock_response.isError.return_value = False
+        mock_response.registers = [1] * 10
+        mock_client.read_holding_registers.return_value = mock_response
+
+        client = ModbusClient(port='/dev/ttyUSB0', baudrate=9600, timeout=1.0)
+        client.read_holding_registers(0, 10)
+
+        expected = client.timing.response_timeout(READ_HOLDING_REGISTERS, 10)
+        self.assertLess(expected, 1.0)
+        self.assertAlmostEqual(mock_client.socket.timeout, expected)
+        self.assertEqual(client.get_timing()['transactions']['transactions'], 1)
+
+    @patch.dict(os.environ, {'MODBUS_PRECISE_TIMING': 'true'})
+    @patch('modbusapi.client.time.sleep')
+    @patch('modbusapi.client.ModbusSerialClient')
+    def test_retry_after_timeout(self, mock_serial_client, mock_sleep):
+        """Test that a retry flushes the input and waits the full configured timeout"""
+        mock_client = mock_serial_client.return_value
+        mock_client.connect.return_value = True
+        mock_client.is_socket_open.return_value = True
+        mock_response = MagicMock()
+        mock_response.isError.return_value = False
+        mock_response.registers = [1]
+        mock_client.read_holding_registers.side_effect = [TimeoutError('timed out'), mock_response]
+
+        client = ModbusClient(port='/dev/ttyUSB0', baudrate=9600, timeout=1.0)
+        self.assertEqual(client.read_holding_registers(0, 1), [1])
+
+        mock_client.socket.reset_input_buffer.assert_called_once()
+        self.assertEqual(mock_client.socket.timeout, 1.0)
+
+    def test_precise_timing_default_off(self):
+        """Test that the configured timeout is used unless precise timing is enabled"""
+        with patch.dict(os.environ, {}, clear=False):
+            os.environ.pop('MODBUS_PRECISE_TIMING', None)
+            client = ModbusClient(port='/dev/ttyUSB0', baudrate=9600, timeout=1.0)
+        self.assertFalse(client.precise_timing)
+        self.assertEqual(client._transaction_timeout(READ_HOLDING_REGISTERS, 10, 1), 1.0)
+
+    def test_learned_timeout_without_precise_timing(self):
+        """Test that learned timeouts apply when precise timing is off"""
+        client = ModbusClient(port='/dev/ttyUSB0', baudrate=9600, timeout=1.0)
+        client.precise_timing = False
+        for _ in range(client.adaptive.min_samples):
+            client.adaptive.record(client.port, 1, READ_HOLDING_REGISTERS, 0.01)
+        timeout = client._transaction_timeout(READ_HOLDING_REGISTERS, 10, 1)
+        self.assertLess(timeout, 0.1)
+        self.assertGreater(timeout, client.timing.transaction_wire_time(READ_HOLDING_REGISTERS, 10))
+        self.assertEqual(client._transaction_timeout(READ_HOLDING_REGISTERS, 10, 2), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Tests for modbusapi.trace module
+"""
+import os
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymodbus.exceptions import ModbusIOException
+
+from modbusapi.client import ModbusClient
+from modbusapi.arbiter import BusArbiter
+from modbusapi.trace import Tracer, Transaction, RingBufferSink, SamplingSink, OUTCOME_OK
+
+
+def record(outcome=OUTCOME_OK, address=0):
+    """Build a transaction record"""
+    return Transaction(0.0, '/dev/ttyUSB0', 1, 3, address, 1, 8, 7, 0.0, 0.01, 0, outcome)
+
+
+class TestSinks(unittest.TestCase):
+    """Test cases for trace sinks"""
+
+    def test_ring_buffer(self):
+        """Test that the ring buffer keeps the newest records"""
+        ring = RingBufferSink(3)
+        for address in range(5):
+            ring(record(address=address))
+        ring(record('timeout', address=5))
+        self.assertEqual([r.address for r in ring.records()], [3, 4, 5])
+        self.assertEqual([r.address for r in ring.records(1)], [5])
+        self.assertEqual([r.address for r in ring.records(errors_only=True)], [5])
+
+    def test_sampling_keeps_errors(self):
+        """Test deterministic sampling that forwards every failure"""
+        ring = RingBufferSink()
+        sampler = SamplingSink(ring, rate=0.25)
+        for _ in range(8):
+            sampler(record())
+        sampler(record('crc'))
+        self.assertEqual([r.outcome for r in ring.records()], ['ok', 'ok', 'crc'])
+
+    def test_failing_sink_isolated(self):
+        """Test that an exception in one sink does not stop the others"""
+        ring = RingBufferSink()
+        tracer = Tracer([MagicMock(side_effect=RuntimeError), ring])
+        tracer.emit(record())
+        self.assertEqual(len(ring), 1)
+
+
+class TestClientTracing(unittest.TestCase):
+    """Test cases for records emitted by ModbusClient"""
+
+    def setUp(self):
+        """Set up a client with a mocked pymodbus client"""
+        self.client = ModbusClient(port='/dev/ttyUSB0', baudrate=9600)
+        self.client.adaptive = None
+        self.client.retry_policy.backoff = 0
+        self.client._ensure_connected = MagicMock(return_value=True)
+        self.client.client = MagicMock()
+        self.ring = self.client.tracer.add_sink(RingBufferSink())
+
+    def test_record_per_attempt(self):
+        """Test one record per PDU, including retried attempts"""
+        response = MagicMock(registers=[1, 2])
+        response.isError.return_value = False
+        self.client.client.read_holding_registers.side_effect = [ModbusIOException('timeout'), response]
+        self.assertEqual(self.client.read_holding_registers(10, 2, 5), [1, 2])
+
+        failed, ok = self.ring.records()
+        self.assertEqual((failed.outcome, failed.attempt, failed.response_bytes), ('timeout', 0, 0))
+        self.assertEqual((ok.outcome, ok.attempt), ('ok', 1))
+        self.assertEqual((ok.unit, ok.function_code, ok.address, ok.count), (5, 3, 10, 2))
+        self.assertEqual((ok.request_bytes, ok.response_bytes), (8, 9))
+
+    def test_queue_wait_from_arbiter(self):
+        """Test that transactions run by an arbiter report their queue wait"""
+        response = MagicMock()
+        response.isError.return_value = False
+        self.client.client.write_register.return_value = response
+        arbiter = BusArbiter('trace-test')
+        self.addCleanup(arbiter.stop)
+        self.assertTrue(arbiter.call(self.client.write_register, 1, 2, 1))
+        self.assertGreater(self.ring.records()[0].queue_wait, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,172 @@
+"""
+Tests for modbusapi.transport module
+"""
+import os
+import sys
+import socket
+import struct
+import threading
+import unittest
+
+# Add parent directory to path to import modbusapi
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pymodbus.utilities import computeCRC
+
+from modbusapi.client import ModbusClient
+from modbusapi.transport import (
+    parse_endpoint, gateways, Endpoint,
+    TRANSPORT_SERIAL, TRANSPORT_TCP, TRANSPORT_RTU_TCP
+)
+
+
+class TcpSlave:
+    """In-process Modbus slave on a local TCP port (MBAP or RTU framing)"""
+
+    def __init__(self, rtu: bool = False):
+        self.rtu = rtu
+        self.registers = list(range(100))
+        self.coils = [i % 2 == 0 for i in range(100)]
+        self.connections = 0
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+        self._connections = []
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"{'rtu+tcp' if self.rtu else 'tcp'}://127.0.0.1:{self.port}"
+
+    def close(self):
+        self.server.close()
+
+    def drop_connections(self):
+        for conn in list(self._connections):
+            conn.close()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self.connections += 1
+            self._connections.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _recv(self, conn, size):
+        data = b''
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+    def _serve(self, conn):
+        try:
+            while True:
+                if self.rtu:
+                    frame = self._recv(conn, 8)
+                    assert struct.pack('>H', computeCRC(frame[:6])) == frame[6:]
+                    unit, pdu = frame[0], frame[1:6]
+                    reply = bytes([unit]) + self._process(pdu)
+                    conn.sendall(reply + struct.pack('>H', computeCRC(reply)))
+                else:
+                    tid, pid, length, unit = struct.unpack('>HHHB', self._recv(conn, 7))
+                    reply = self._process(self._recv(conn, length - 1))
+                    conn.sendall(struct.pack('>HHHB', tid, pid, len(reply) + 1, unit) + reply)
+        except (ConnectionError, OSError):
+            conn.close()
+
+    def _process(self, pdu):
+        function_code, address, value = struct.unpack('>BHH', pdu[:5])
+        if function_code == 3:
+            values = self.registers[address:address + value]
+            return struct.pack(f'>BB{len(values)}H', 3, 2 * len(values), *values)
+        if function_code == 1:
+            bits = self.coils[address:address + value]
+            data = bytearray((len(bits) + 7) // 8)
+            for i, bit in enumerate(bits):
+                if bit:
+                    data[i // 8] |= 1 << (i % 8)
+            return bytes([1, len(data)]) + bytes(data)
+        if function_code == 6:
+            self.registers[address] = value
+            return pdu[:5]
+        return bytes([function_code | 0x80, 1])
+
+
+class TestParseEndpoint(unittest.TestCase):
+    """Test cases for parse_endpoint function"""
+
+    def test_parse(self):
+        """Test serial paths and gateway URLs"""
+        self.assertEqual(parse_endpoint('/dev/ttyUSB0'), Endpoint(TRANSPORT_SERIAL, '/dev/ttyUSB0'))
+        self.assertEqual(parse_endpoint('tcp://10.0.0.5'), Endpoint(TRANSPORT_TCP, '10.0.0.5', 502))
+        endpoint = parse_endpoint('rtu+tcp://gw.local:4001')
+        self.assertEqual(endpoint, Endpoint(TRANSPORT_RTU_TCP, 'gw.local', 4001))
+        self.assertEqual(str(endpoint), 'rtu+tcp://gw.local:4001')
+        with self.assertRaises(ValueError):
+            parse_endpoint('udp://10.0.0.5')
+
+
+class TestTcpTransport(unittest.TestCase):
+    """Test cases for ModbusClient over TCP against an in-process slave"""
+
+    def _roundtrip(self, slave):
+        client = ModbusClient(port=slave.url, timeout=1.0)
+        client.adaptive = None
+        self.assertTrue(client.connect())
+        try:
+            self.assertEqual(client.read_holding_registers(10, 3, 1), [10, 11, 12])
+            self.assertEqual(client.read_coils(0, 3, 1), [True, False, True])
+            self.assertTrue(client.write_register(5, 1234, 1))
+            self.assertEqual(slave.registers[5], 1234)
+        finally:
+            client.disconnect()
+
+    def test_modbus_tcp(self):
+        """Test reads and writes with MBAP framing"""
+        slave = TcpSlave()
+        self.addCleanup(slave.close)
+        self._roundtrip(slave)
+
+    def test_rtu_over_tcp(self):
+        """Test reads and writes with RTU framing over TCP"""
+        slave = TcpSlave(rtu=True)
+        self.addCleanup(slave.close)
+        self._roundtrip(slave)
+
+    def test_shared_socket_and_reconnect(self):
+        """Test that clients of one gateway share a socket that reconnects"""
+        slave = TcpSlave()
+        self.addCleanup(slave.close)
+        first = ModbusClient(port=slave.url)
+        second = ModbusClient(port=slave.url)
+        first.adaptive = second.adaptive = None
+        second.retry_policy.backoff = 0
+        self.assertTrue(first.connect())
+        self.assertTrue(second.connect())
+        self.assertIs(first.client, second.client)
+
+        first.disconnect()
+        self.assertEqual(second.read_holding_registers(0, 1, 1), [0])
+        self.assertEqual(slave.connections, 1)
+
+        slave.drop_connections()
+        second.reconnect_backoff = 0
+        for _ in range(5):
+            result = second.read_holding_registers(1, 1, 1)
+            if result is not None:
+                break
+        self.assertEqual(result, [1])
+        self.assertEqual(slave.connections, 2)
+        second.disconnect()
+        self.assertEqual(gateways.get_stats(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
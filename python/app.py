@@ -1,6 +1,8 @@
 from flask import Flask, Response, jsonify, request, render_template_string
 from flask_cors import CORS
 import os
+import logging
+import threading
 from dotenv import load_dotenv
 from datetime import datetime
 import json
@@ -10,42 +12,91 @@ from mod import ModbusRTUClient, auto_detect_modbus_port
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Unit the panel talks to
+UNIT = int(os.getenv('MODBUS_DEVICE_ADDRESS', os.getenv('MODBUS_UNIT_ID', '1')))
+
+# Channel addresses from the MODBUS_PROFILE device profile when modbusapi is installed
+OUTPUT_ADDRESSES = INPUT_ADDRESSES = list(range(8))
+try:
+    from modbusapi.profile import default_profile
+    from modbusapi.planner import READ_COILS, READ_DISCRETE_INPUTS
+    _profile = default_profile()
+    OUTPUT_ADDRESSES = _profile.addresses(READ_COILS, writable=True)
+    INPUT_ADDRESSES = _profile.addresses(READ_DISCRETE_INPUTS)
+except ImportError:
+    pass
+except (ValueError, OSError) as e:
+    logger.warning(f"Could not use device profile {os.getenv('MODBUS_PROFILE')}: {e}, using 8 channels")
+OUTPUT_CHANNELS = len(OUTPUT_ADDRESSES)
+INPUT_CHANNELS = len(INPUT_ADDRESSES)
+
 app = Flask(__name__)
 CORS(app)
 
+# Seconds a bus request waits for background detection and connection
+READY_TIMEOUT = float(os.getenv('MODBUS_READY_TIMEOUT', '5.0'))
+modbus_ready = threading.Event()
+
 # Global Modbus client
 modbus_client = None
 device_state = {
     "connected": False,
-    "outputs": [False] * 8,
-    "inputs": [False] * 8,
-    "error": None
+    "outputs": [False] * OUTPUT_CHANNELS,
+    "inputs": [False] * INPUT_CHANNELS,
+    "error": None,
+    "stage": "detecting"  # detecting, connecting, ready or failed
 }
 
 def init_modbus():
-    """Initialize Modbus connection"""
+    """Initialize Modbus connection (runs on a background thread)"""
     global modbus_client, device_state
     
     try:
         # Try auto-detection first
+        device_state["stage"] = "detecting"
         port = auto_detect_modbus_port()
+        device_state["stage"] = "connecting"
         if port:
-            modbus_client = ModbusRTUClient(port=port)
+            client = ModbusRTUClient(port=port)
         else:
             # Use .env configuration
-            modbus_client = ModbusRTUClient()
+            client = ModbusRTUClient()
         
-        if modbus_client.connect():
+        if client.connect():
+            modbus_client = client
             device_state["connected"] = True
             device_state["error"] = None
+            device_state["stage"] = "ready"
             update_device_state()
             return True
+        device_state["error"] = f"Failed to open {client.port}"
+        device_state["stage"] = "failed"
     except Exception as e:
         device_state["error"] = str(e)
         device_state["connected"] = False
+        device_state["stage"] = "failed"
+    finally:
+        modbus_ready.set()
     
     return False
 
+def wait_ready():
+    """Wait up to READY_TIMEOUT for startup; True if the device is connected"""
+    modbus_ready.wait(READY_TIMEOUT)
+    return modbus_client is not None and device_state["connected"]
+
+def read_channels(read, addresses):
+    """Read the points at the given addresses with one block read (None if it failed)"""
+    if not addresses:
+        return []
+    start = addresses[0]
+    values = read(start, addresses[-1] - start + 1, unit=UNIT)
+    if not values:
+        return None
+    return [values[address - start] for address in addresses]
+
 def update_device_state():
     """Update device state from Modbus"""
     global modbus_client, device_state
@@ -55,21 +106,21 @@ def update_device_state():
     
     try:
         # Read outputs
-        outputs = modbus_client.read_coils(0, 8, unit=1)
+        outputs = read_channels(modbus_client.read_coils, OUTPUT_ADDRESSES)
         if outputs:
-            device_state["outputs"] = outputs[:8]
+            device_state["outputs"] = outputs
         
         # Read inputs
-        inputs = modbus_client.read_discrete_inputs(0, 8, unit=1)
+        inputs = read_channels(modbus_client.read_discrete_inputs, INPUT_ADDRESSES)
         if inputs:
-            device_state["inputs"] = inputs[:8]
+            device_state["inputs"] = inputs
             
     except Exception as e:
         device_state["error"] = str(e)
         device_state["connected"] = False
 
-# Initialize on startup
-init_modbus()
+# Initialize in the background so the server answers while the device is detected
+threading.Thread(target=init_modbus, name="modbus-init", daemon=True).start()
 
 @app.route("/")
 def index():
@@ -112,7 +163,9 @@ def index():
                     .then(data => {
                         // Update connection status
                         document.getElementById('connection').textContent = 
-                            data.connected ? 'Connected' : 'Disconnected';
+                            data.connected ? 'Connected' :
+                            (data.stage === 'detecting' || data.stage === 'connecting') ?
+                                'Starting (' + data.stage + ')...' : 'Disconnected';
                         document.getElementById('timestamp').textContent = 
                             new Date().toLocaleTimeString();
                         
@@ -158,8 +211,9 @@ def index():
 
 @app.route("/api/status")
 def api_status():
-    """Get current device status"""
-    update_device_state()
+    """Get current device status (reports the startup stage without waiting)"""
+    if modbus_ready.is_set():
+        update_device_state()
     return jsonify(device_state)
 
 @app.route("/api/toggle/<int:channel>", methods=["POST"])
@@ -167,10 +221,10 @@ def api_toggle(channel):
     """Toggle output channel"""
     global modbus_client, device_state
     
-    if not modbus_client or not device_state["connected"]:
-        return jsonify({"success": False, "error": "Not connected"})
+    if not wait_ready():
+        return jsonify({"success": False, "error": f"Not connected ({device_state['stage']})"})
     
-    if channel < 0 or channel > 7:
+    if channel < 0 or channel >= OUTPUT_CHANNELS:
         return jsonify({"success": False, "error": "Invalid channel"})
     
     try:
@@ -178,8 +232,8 @@ def api_toggle(channel):
         current_state = device_state["outputs"][channel]
         new_state = not current_state
         
-        # Write to Modbus
-        success = modbus_client.write_coil(channel, new_state, unit=1)
+        # Write to Modbus (channels are numbered in the order of the profile's coils)
+        success = modbus_client.write_coil(OUTPUT_ADDRESSES[channel], new_state, unit=UNIT)
         
         if success:
             device_state["outputs"][channel] = new_state
@@ -202,12 +256,12 @@ def modbus_svg():
     
     <g transform="translate(50, 100)">
         <text font-size="20" fill="#666">Digital Outputs:</text>
-        {"".join([f'<rect x="{i*90}" y="20" width="80" height="80" fill="{"#4CAF50" if device_state["outputs"][i] else "#f44336"}" rx="10"/><text x="{i*90+40}" y="65" text-anchor="middle" fill="white" font-size="16">DO{i}</text>' for i in range(8)])}
+        {"".join([f'<rect x="{i*90}" y="20" width="80" height="80" fill="{"#4CAF50" if device_state["outputs"][i] else "#f44336"}" rx="10"/><text x="{i*90+40}" y="65" text-anchor="middle" fill="white" font-size="16">DO{i}</text>' for i in range(OUTPUT_CHANNELS)])}
     </g>
     
     <g transform="translate(50, 250)">
         <text font-size="20" fill="#666">Digital Inputs:</text>
-        {"".join([f'<rect x="{i*90}" y="20" width="80" height="80" fill="{"#2196F3" if device_state["inputs"][i] else "#9E9E9E"}" rx="10"/><text x="{i*90+40}" y="65" text-anchor="middle" fill="white" font-size="16">DI{i}</text>' for i in range(8)])}
+        {"".join([f'<rect x="{i*90}" y="20" width="80" height="80" fill="{"#2196F3" if device_state["inputs"][i] else "#9E9E9E"}" rx="10"/><text x="{i*90+40}" y="65" text-anchor="middle" fill="white" font-size="16">DI{i}</text>' for i in range(INPUT_CHANNELS)])}
     </g>
     
     <text x="50" y="450" font-size="14" fill="#666">
@@ -29,6 +29,12 @@ setup(
         "mqtt": [
             "paho-mqtt>=2.0.0",
         ],
+        "async": [
+            "pyserial-asyncio>=0.6",
+        ],
+        "numpy": [
+            "numpy>=1.20",
+        ],
     },
     entry_points={
         "console_scripts": [